@@ -0,0 +1,135 @@
+import logging
+import time
+from collections import Counter
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.domain.exceptions.template import (
+    ConcurrentModificationError,
+    InvalidTemplateStateError,
+    QuestionNotFoundError,
+    SectionNotFoundError,
+    TemplateLimitExceededError,
+    TemplateNotFoundError,
+)
+from app.infrastructure.workers.command_queue import (
+    CommandQueueFullError,
+    JobNotFoundError,
+)
+from app.infrastructure.workers.process_pool import ProcessPoolSaturatedError
+from app.infrastructure.workers.write_limiter import (
+    WriteBacklogFullError,
+    WriteQueueTimeoutError,
+)
+
+logger = logging.getLogger(__name__)
+
+# HTTP status of each expected error; anything else is a 500. ValueError is
+# deliberately absent: the domain raises the typed subclasses above, and the
+# remaining ones, such as a pydantic ValidationError raised inside a handler
+# or a HandlerNotFoundError, are bugs rather than bad requests.
+ERROR_STATUS: dict[type[Exception], int] = {
+    TemplateNotFoundError: 404,
+    SectionNotFoundError: 404,
+    QuestionNotFoundError: 404,
+    InvalidTemplateStateError: 409,
+    ConcurrentModificationError: 409,
+    JobNotFoundError: 404,
+    TemplateLimitExceededError: 422,
+    WriteBacklogFullError: 429,
+    CommandQueueFullError: 429,
+    ProcessPoolSaturatedError: 503,
+    WriteQueueTimeoutError: 503,
+}
+
+
+async def _expected_error(request: Request, exc: Exception) -> JSONResponse:
+    status = next(ERROR_STATUS[t] for t in type(exc).__mro__ if t in ERROR_STATUS)
+    headers = {"Retry-After": "1"} if status in (429, 503) else None
+    return JSONResponse(
+        status_code=status, content={"detail": str(exc)}, headers=headers
+    )
+
+
+def register_exception_handlers(app: FastAPI) -> None:
+    """Answer expected errors with their status, without logging them."""
+    for exc_type in ERROR_STATUS:
+        app.add_exception_handler(exc_type, _expected_error)
+
+
+class ErrorLogLimiter:
+    """Token bucket deciding which unexpected errors get a logged traceback.
+
+    Up to `burst` tracebacks are logged at once, then one every
+    `interval / burst` seconds; errors beyond that are only counted by type,
+    and the counts are reported with the next logged traceback. An error
+    storm therefore costs a few log lines rather than one traceback each.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 60.0):
+        self.burst = burst
+        self.rate = burst / interval
+        self.tokens = float(burst)
+        self.suppressed: Counter[str] = Counter()
+        self._updated = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def log(self, exc: Exception, method: str, path: str) -> None:
+        if not self.allow():
+            self.suppressed[type(exc).__name__] += 1
+            return
+        suppressed = ""
+        if self.suppressed:
+            counts = ", ".join(f"{n} {name}" for name, n in self.suppressed.items())
+            suppressed = f" ({counts} suppressed since the last traceback)"
+            self.suppressed.clear()
+        logger.error(
+            "Unexpected error on %s %s%s", method, path, suppressed, exc_info=exc
+        )
+
+
+class UnexpectedErrorMiddleware:
+    """Answer errors no exception handler claimed with a 500.
+
+    Handled here rather than by an `Exception` handler, which Starlette
+    re-raises to the server after responding, so the server would log every
+    traceback regardless of `ErrorLogLimiter`.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: ErrorLogLimiter | None = None):
+        self.app = app
+        self.limiter = limiter or ErrorLogLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception as exc:
+            if response_started:
+                raise
+            self.limiter.log(exc, scope["method"], scope["path"])
+            response = JSONResponse(
+                status_code=500, content={"detail": "Internal server error"}
+            )
+            await response(scope, receive, send)
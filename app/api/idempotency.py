@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# (method, path, Idempotency-Key)
+Key = tuple[str, str, bytes]
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: bytes
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    stored_at: float
+
+
+class IdempotencyStore:
+    """Completed responses by idempotency key, LRU-bounded and expiring.
+
+    Besides the responses, it tracks the requests still running for a key,
+    so that a duplicate can wait for the original instead of running too.
+    """
+
+    def __init__(self, max_keys: int, ttl: float):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.replayed = 0
+        self.waited = 0
+        self.evictions = 0
+        self._responses: OrderedDict[Key, StoredResponse] = OrderedDict()
+        self._in_flight: dict[Key, tuple[bytes, asyncio.Future]] = {}
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: Key) -> StoredResponse | None:
+        response = self._responses.get(key)
+        if response is None:
+            return None
+        if time.monotonic() - response.stored_at > self.ttl:
+            del self._responses[key]
+            return None
+        return response
+
+    def put(self, key: Key, response: StoredResponse) -> None:
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_keys:
+            self._responses.popitem(last=False)
+            self.evictions += 1
+
+    def in_flight(self, key: Key) -> tuple[bytes, asyncio.Future] | None:
+        return self._in_flight.get(key)
+
+    def begin(self, key: Key, fingerprint: bytes) -> None:
+        """Mark `key` as running; duplicates wait until `end`."""
+        self._in_flight[key] = (fingerprint, asyncio.get_running_loop().create_future())
+
+    def end(self, key: Key) -> None:
+        _, done = self._in_flight.pop(key)
+        done.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._responses),
+            "in_flight": len(self._in_flight),
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "evictions": self.evictions,
+        }
+
+
+class IdempotencyMiddleware:
+    """Execute a POST or PUT carrying an `Idempotency-Key` header at most once.
+
+    The successful response to a key is stored and replayed, with an
+    `Idempotent-Replayed: true` header, to retries of the same request within
+    the store's TTL. A retry arriving while the original still runs waits for
+    it. Unsuccessful responses are not stored, so a retry runs again. Reusing
+    a key for another request body is rejected with 422, and a body longer
+    than the largest write the template limits allow with 413, before it is
+    read into memory. Keys are scoped by method and path, and stored per
+    process.
+    """
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore, max_body_bytes: int):
+        self.app = app
+        self.store = store
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = self._key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key[2]) > MAX_KEY_LENGTH:
+            await _reject(scope, receive, send, 400, "Idempotency-Key is too long")
+            return
+
+        body = await _read_body(scope, receive, self.max_body_bytes)
+        if body is None:
+            await _reject(scope, receive, send, 413, "Request body is too large")
+            return
+        fingerprint = hashlib.sha256(body).digest()
+        while True:
+            stored = self.store.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    await _reject_reuse(scope, receive, send)
+                    return
+                self.store.replayed += 1
+                await _replay(stored, send)
+                return
+            running = self.store.in_flight(key)
+            if running is None:
+                break
+            if running[0] != fingerprint:
+                await _reject_reuse(scope, receive, send)
+                return
+            self.store.waited += 1
+            await asyncio.shield(running[1])
+
+        self.store.begin(key, fingerprint)
+        try:
+            await self._execute(
+                scope, _replay_body(body, receive), send, key, fingerprint
+            )
+        finally:
+            self.store.end(key)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        key: Key,
+        fingerprint: bytes,
+    ) -> None:
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_recording(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False) and 200 <= start["status"] < 300:
+                    self.store.put(
+                        key,
+                        StoredResponse(
+                            fingerprint=fingerprint,
+                            status=start["status"],
+                            headers=list(start.get("headers", [])),
+                            body=b"".join(chunks),
+                            stored_at=time.monotonic(),
+                        ),
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_recording)
+
+    def _key(self, scope: Scope) -> Key | None:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT"):
+            return None
+        for name, value in scope["headers"]:
+            if name == IDEMPOTENCY_HEADER:
+                return (scope["method"], scope["path"], value)
+        return None
+
+
+async def _read_body(scope: Scope, receive: Receive, limit: int) -> bytes | None:
+    """Read the whole body, or None as soon as it is longer than `limit`."""
+    for name, value in scope["headers"]:
+        if name == b"content-length" and value.isdigit() and int(value) > limit:
+            return None
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    """Receive the already read `body`, then defer to `receive`."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+async def _replay(stored: StoredResponse, send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": [*stored.headers, (REPLAYED_HEADER, b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": stored.body})
+
+
+async def _reject_reuse(scope: Scope, receive: Receive, send: Send) -> None:
+    await _reject(
+        scope, receive, send, 422, "Idempotency-Key was used for another request"
+    )
+
+
+async def _reject(
+    scope: Scope, receive: Receive, send: Send, status: int, detail: str
+) -> None:
+    response = JSONResponse(status_code=status, content={"detail": detail})
+    await response(scope, receive, send)
@@ -0,0 +1,40 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.responses import JSONResponse
+
+from app.api.profiling import ProfiledRoute
+from app.application.commands.base import Command
+from app.infrastructure.dependencies import get_command_queue
+from app.infrastructure.workers.command_queue import CommandQueue
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+async def submit_job(queue: CommandQueue, command: Command) -> Response:
+    """Queue `command` and answer 202 with where to poll its job."""
+    job = await queue.submit(command)
+    return JSONResponse(
+        status_code=202,
+        content={"message": "Command accepted", "job_id": str(job.id)},
+        headers={"Location": f"/jobs/{job.id}", "Preference-Applied": "respond-async"},
+    )
+
+
+@router.get("/stats")
+async def get_job_stats_endpoint(
+    queue: CommandQueue = Depends(get_command_queue),
+) -> Response:
+    return JSONResponse(content=queue.stats())
+
+
+@router.get("/{job_id}")
+async def get_job_endpoint(
+    job_id: UUID,
+    queue: CommandQueue = Depends(get_command_queue),
+) -> Response:
+    job = queue.get(job_id)
+    headers = {"Retry-After": "1"} if job.status in ("queued", "running") else None
+    return Response(
+        content=job.model_dump_json(), media_type="application/json", headers=headers
+    )
@@ -1,24 +1,115 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.errors import UnexpectedErrorMiddleware, register_exception_handlers
+from app.api.idempotency import IdempotencyMiddleware, IdempotencyStore
+from app.api.jobs import router as jobs_router
+from app.api.profiling import ProfilingMiddleware
 from app.api.template import router as template_router
-
-app = FastAPI(
-    title="DDD API", description="A Domain-Driven Design API", version="1.0.0"
+from app.application.queries.search_index import SearchIndex
+from app.infrastructure.dependencies import (
+    create_command_queue,
+    create_compressor,
+    create_id_generator,
+    create_process_pool,
+    create_storage,
+    create_template_cache,
+    create_template_feed,
+    create_template_limits,
+    create_template_reader,
+    create_write_limiter,
 )
+from app.infrastructure.persistence.search_indexer import SearchIndexer
+from app.infrastructure.settings import Settings
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, replace with specific origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(template_router, prefix="/templates")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build long-lived resources once per process and tear them down."""
+    settings = app.state.settings
+    app.state.template_limits = create_template_limits(settings)
+    app.state.id_generator = create_id_generator(settings)
+    app.state.write_limiter = create_write_limiter(settings)
+
+    # Each resource is registered as soon as it exists, so that a failing
+    # startup step still releases everything started before it.
+    async with AsyncExitStack() as stack:
+        storage = create_storage(settings)
+        await storage.open()
+        stack.push_async_callback(storage.close)
+        app.state.storage = storage
+        app.state.template_cache = create_template_cache(settings, storage)
+        app.state.compressor = create_compressor(settings)
+        app.state.template_reader = create_template_reader(
+            settings, app.state, app.state.compressor
+        )
+        app.state.search_index = SearchIndex()
+        app.state.template_feed = create_template_feed(settings, storage)
+        stack.callback(app.state.template_feed.close)
+        search_indexer = SearchIndexer(app.state.search_index, storage)
+        await search_indexer.start()
+        stack.push_async_callback(search_indexer.close)
+
+        process_pool = create_process_pool(settings)
+        process_pool.start()
+        stack.push_async_callback(process_pool.shutdown)
+        app.state.process_pool = process_pool
+
+        command_queue = create_command_queue(settings, app.state)
+        await command_queue.start()
+        stack.push_async_callback(command_queue.close)
+        app.state.command_queue = command_queue
+        yield
+
+
+def create_app(settings: Settings | None = None) -> FastAPI:
+    app = FastAPI(
+        title="DDD API",
+        description="A Domain-Driven Design API",
+        version="1.0.0",
+        lifespan=lifespan,
+    )
+    app.state.settings = settings or Settings.from_env()
+
+    register_exception_handlers(app)
+    if app.state.settings.idempotency_max_keys:
+        app.state.idempotency_store = IdempotencyStore(
+            app.state.settings.idempotency_max_keys,
+            ttl=app.state.settings.idempotency_ttl,
+        )
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=app.state.idempotency_store,
+            max_body_bytes=create_template_limits(app.state.settings).max_request_bytes,
+        )
+    app.add_middleware(UnexpectedErrorMiddleware)
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, replace with specific origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=app.state.settings.profile_token,
+        sample_rate=app.state.settings.profile_sample_rate,
+        dump_directory=app.state.settings.profile_directory,
+    )
+
+    app.include_router(template_router, prefix="/templates")
+    app.include_router(jobs_router, prefix="/jobs")
+
+    @app.get("/")
+    async def root():
+        return {"message": "Welcome to the DDD API"}
+
+    return app
 
 
-@app.get("/")
-async def root():
-    return {"message": "Welcome to the DDD API"}
+app = create_app()
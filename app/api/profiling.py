@@ -0,0 +1,188 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import logging
+import os
+import random
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.application.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+# The `parse` phase of the current request, open until its endpoint starts.
+_parsing: ContextVar = ContextVar("parsing", default=None)
+
+
+class ProfilingMiddleware:
+    """Opt-in per-request profiling, reported in a `Server-Timing` header.
+
+    A request is profiled when it carries `X-Profile: <token>` matching the
+    configured token, or is drawn by `sample_rate`. Its phases (see
+    `app.application.profiling`) and the allocations traced by `tracemalloc`
+    are reported in `Server-Timing`; with `dump_directory`, a cProfile of the
+    request is written there as a `.pstats` file.
+
+    `tracemalloc` and cProfile see the whole process, including requests
+    served concurrently, so only one profiled request at a time uses them;
+    others overlapping it only get their phase timings.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str | None = None,
+        sample_rate: float = 0.0,
+        dump_directory: str | None = None,
+    ):
+        self.app = app
+        self.token = token.encode() if token else None
+        self.sample_rate = sample_rate
+        self.dump_directory = dump_directory
+        self._tracing = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        tracer = None
+        if not self._tracing:
+            self._tracing = True
+            tracer = _Tracer(self._dump_path(scope) if self.dump_directory else None)
+            tracer.start()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                total = profile.elapsed()
+                # Middleware, routing and whatever no phase covered.
+                profile.record("app", max(total - sum(profile.durations.values()), 0))
+                if tracer is not None:
+                    tracer.stop(profile)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", profile.server_timing(total))
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            if tracer is not None:
+                tracer.stop(profile)
+                self._tracing = False
+                await tracer.dump()
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _dump_path(self, scope: Scope) -> str:
+        route = scope["path"].strip("/").replace("/", "_") or "root"
+        name = f"{time.time_ns()}-{scope['method']}-{route}.pstats"
+        return os.path.join(self.dump_directory, name)
+
+
+class _Tracer:
+    """`tracemalloc` and optional cProfile over one request."""
+
+    def __init__(self, dump_path: str | None):
+        self.dump_path = dump_path
+        self.profiler = cProfile.Profile() if dump_path else None
+        self._started_tracing = False
+        self._stopped = False
+        self._before = 0
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self, profile: RequestProfile) -> None:
+        if self._stopped:
+            return
+        self._stopped = True
+        if self.profiler is not None:
+            self.profiler.disable()
+            profile.extras["cprofile"] = os.path.basename(self.dump_path)
+
+        current, peak = tracemalloc.get_traced_memory()
+        allocations = f"bytes={current - self._before} peak={peak - self._before}"
+        if self._started_tracing:
+            # Tracing began with this request, so every live trace is its own.
+            blocks = len(tracemalloc.take_snapshot().traces)
+            tracemalloc.stop()
+            allocations = f"blocks={blocks} {allocations}"
+        profile.extras["alloc"] = allocations
+
+    async def dump(self) -> None:
+        if self.profiler is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.dump_path), exist_ok=True)
+            await asyncio.to_thread(self.profiler.dump_stats, self.dump_path)
+        except OSError as e:
+            logger.warning("Could not write profile %s: %s", self.dump_path, e)
+
+
+class ProfiledRoute(APIRoute):
+    """Route that, for profiled requests, times reading the body and
+    resolving the endpoint's arguments, DTO validation included, as `parse`,
+    and the endpoint itself as `endpoint`. Phases opened meanwhile, such as
+    waiting for a write slot, are not counted in `parse`."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request):
+            profile = current_profile.get()
+            if profile is None:
+                return await handler(request)
+            parsing = profile.phase("parse")
+            parsing.__enter__()
+            token = _parsing.set(parsing)
+            try:
+                return await handler(request)
+            finally:
+                # Still open if the request was rejected before the endpoint.
+                if _parsing.get() is parsing:
+                    parsing.__exit__(None, None, None)
+                _parsing.reset(token)
+
+        return profiled_handler
+
+
+def _profiled(endpoint):
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return await endpoint(*args, **kwargs)
+        parsing = _parsing.get()
+        if parsing is not None:
+            parsing.__exit__(None, None, None)
+            _parsing.set(None)
+        with profile.phase("endpoint"):
+            return await endpoint(*args, **kwargs)
+
+    return wrapper
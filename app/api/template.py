@@ -1,60 +1,250 @@
-import logging
+import asyncio
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Response
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
 
-from app.api.helpers import handle_exceptions
+from app.api.jobs import submit_job
+from app.api.profiling import ProfiledRoute
 from app.application.commands.factory import create_command_bus
 from app.application.commands.template_commands import (
     AddQuestionCommand,
     AddSectionCommand,
+    CreateRevisionCommand,
     CreateTemplateCommand,
     EditQuestionCommand,
+    MoveQuestionCommand,
+    MoveSectionCommand,
     PublishTemplateCommand,
 )
-from app.application.dtos.question import CreateQuestionDTO, UpdateQuestionDTO
-from app.application.dtos.section import CreateSectionDTO
+from app.application.dtos.question import (
+    CreateQuestionDTO,
+    MoveQuestionDTO,
+    UpdateQuestionDTO,
+)
+from app.application.dtos.section import CreateSectionDTO, MoveSectionDTO
 from app.application.dtos.template import CreateTemplateDTO
+from app.application.queries.search_index import SearchIndex
+from app.application.queries.template_feed import TemplateFeed
+from app.application.queries.template_reader import TemplateJSON, TemplateReader
 from app.domain.repositories.unit_of_work import AbstractUnitOfWork
-from app.infrastructure.dependencies import get_uow
+from app.domain.value_objects.template_limits import TemplateLimits
+from app.domain.value_objects.template_projection import TemplateProjection
+from app.infrastructure.dependencies import (
+    admit_write,
+    async_command_queue,
+    get_compressor,
+    get_process_pool,
+    get_search_index,
+    get_template_feed,
+    get_template_limits,
+    get_template_reader,
+    get_uow,
+)
+from app.infrastructure.serialization.compression import Compressor
+from app.infrastructure.serialization.template_codec import encode_template
+from app.infrastructure.workers.command_queue import CommandQueue
+from app.infrastructure.workers.jobs import template_statistics
+from app.infrastructure.workers.process_pool import ProcessPoolService
 
-logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
-@router.post("/create")
-@handle_exceptions
+@router.post("/create", dependencies=[Depends(admit_write)])
 async def create_template_endpoint(
     payload: CreateTemplateDTO,
     uow: AbstractUnitOfWork = Depends(get_uow),
+    limits: TemplateLimits = Depends(get_template_limits),
+    queue: CommandQueue | None = Depends(async_command_queue),
 ) -> Response:
+    command = CreateTemplateCommand(
+        title=payload.title,
+        description=payload.description,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
     async with uow:
         # Create command bus and execute command
-        command_bus = create_command_bus(uow)
-        command = CreateTemplateCommand(
-            title=payload.title,
-            description=payload.description,
-        )
+        command_bus = create_command_bus(uow, limits=limits)
         template = await command_bus.execute(command)
 
     return JSONResponse(
         status_code=201,
         content={"message": "Template created", "template_id": str(template.id)},
-        headers={"Location": f"/template/{template.id}"},
+        headers={"Location": f"/templates/{template.id}"},
     )
 
 
-@router.post("/{template_id}/publish")
-@handle_exceptions
+@router.get("/search")
+async def search_templates_endpoint(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(20, ge=1, le=100),
+    index: SearchIndex = Depends(get_search_index),
+) -> Response:
+    hits = index.search(q, limit)
+    return JSONResponse(
+        content={
+            "query": q,
+            "results": [
+                {
+                    "template_id": str(hit.template_id),
+                    "title": hit.title,
+                    "status": hit.status,
+                    "score": round(hit.score, 4),
+                }
+                for hit in hits
+            ],
+        }
+    )
+
+
+async def template_projection(
+    fields: str | None = Query(
+        None, description="Comma-separated template fields; all by default"
+    ),
+    include: str | None = Query(
+        None,
+        description="Comma-separated parts among sections, questions and options;"
+        " all by default",
+    ),
+    section: UUID | None = Query(None, description="Only this section"),
+) -> TemplateProjection:
+    values = {"section_id": section}
+    if fields is not None:
+        values["fields"] = _comma_separated(fields)
+    if include is not None:
+        values["include"] = _comma_separated(include)
+    try:
+        return TemplateProjection(**values)
+    except ValidationError as exc:
+        raise RequestValidationError(
+            exc.errors(include_url=False, include_context=False)
+        ) from None
+
+
+def _comma_separated(value: str) -> frozenset[str]:
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+def entity_tag(version: int, encoding: str | None) -> str:
+    """Strong `ETag` of a template version, distinct for each coding."""
+    return f'"{version}-{encoding}"' if encoding else f'"{version}"'
+
+
+def _not_modified(
+    if_none_match: str | None, version: int, compressor: Compressor
+) -> bool:
+    """Whether `If-None-Match` names this version, in any coding."""
+    if not if_none_match:
+        return False
+    tags = {entity_tag(version, e) for e in (None, *compressor.encodings)}
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag in tags:
+            return True
+    return False
+
+
+def _negotiate(
+    request: Request, document: TemplateJSON, compressor: Compressor
+) -> str | None:
+    """Coding of the response; None for small bodies nothing was cached for."""
+    encoding = compressor.negotiate(request.headers.get("accept-encoding"))
+    if encoding in document.encoded or compressor.should_compress(document.body):
+        return encoding
+    return None
+
+
+async def _encode(
+    document: TemplateJSON, encoding: str | None, compressor: Compressor
+) -> bytes:
+    """Body in `encoding`: cached for published templates, else compressed for
+    this response."""
+    if encoding is None:
+        return document.body
+    cached = document.encoded.get(encoding)
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(compressor.encode, document.body, encoding)
+
+
+@router.get("/{template_id}")
+async def get_template_endpoint(
+    template_id: UUID,
+    request: Request,
+    projection: TemplateProjection = Depends(template_projection),
+    reader: TemplateReader = Depends(get_template_reader),
+    compressor: Compressor = Depends(get_compressor),
+) -> Response:
+    document = await reader.get(template_id, projection)
+    encoding = _negotiate(request, document, compressor)
+    headers = {"Vary": "Accept-Encoding"}
+    if document.version is not None:
+        headers["ETag"] = entity_tag(document.version, encoding)
+        if _not_modified(
+            request.headers.get("if-none-match"), document.version, compressor
+        ):
+            return Response(status_code=304, headers=headers)
+
+    content = await _encode(document, encoding, compressor)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+@router.get("/{template_id}/statistics")
+async def template_statistics_endpoint(
+    template_id: UUID,
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    pool: ProcessPoolService = Depends(get_process_pool),
+) -> Response:
+    async with uow:
+        template = await uow.template.get_by_id(template_id)
+    statistics = await pool.submit(template_statistics, encode_template(template))
+    return JSONResponse(content=statistics)
+
+
+@router.get("/{template_id}/events")
+async def template_events_endpoint(
+    template_id: UUID,
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+) -> Response:
+    subscription = feed.subscribe(template_id)
+    try:
+        async with uow:
+            version = await uow.template.get_version(template_id)
+    except BaseException:
+        subscription.close()
+        raise
+    subscription.ready(version)
+    return StreamingResponse(
+        subscription.events(keepalive=feed.keepalive),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also unsubscribes a client gone before the stream started.
+        background=BackgroundTask(subscription.close),
+    )
+
+
+@router.post("/{template_id}/publish", dependencies=[Depends(admit_write)])
 async def publish_template_endpoint(
     template_id: UUID,
     uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    queue: CommandQueue | None = Depends(async_command_queue),
 ) -> Response:
+    command = PublishTemplateCommand(template_id=template_id)
+    if queue is not None:
+        return await submit_job(queue, command)
+
     async with uow:
         # Create command bus and execute command
-        command_bus = create_command_bus(uow)
-        command = PublishTemplateCommand(template_id=template_id)
+        command_bus = create_command_bus(uow, feed)
         template = await command_bus.execute(command)
 
     return JSONResponse(
@@ -63,21 +253,52 @@ async def publish_template_endpoint(
     )
 
 
-@router.post("/{template_id}/sections")
-@handle_exceptions
+@router.post("/{template_id}/revisions", dependencies=[Depends(admit_write)])
+async def create_revision_endpoint(
+    template_id: UUID,
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    queue: CommandQueue | None = Depends(async_command_queue),
+) -> Response:
+    command = CreateRevisionCommand(template_id=template_id)
+    if queue is not None:
+        return await submit_job(queue, command)
+
+    async with uow:
+        # Create command bus and execute command
+        command_bus = create_command_bus(uow)
+        revision = await command_bus.execute(command)
+
+    return JSONResponse(
+        status_code=201,
+        content={
+            "message": "Revision created",
+            "template_id": str(revision.id),
+            "revision_of": str(template_id),
+        },
+        headers={"Location": f"/templates/{revision.id}"},
+    )
+
+
+@router.post("/{template_id}/sections", dependencies=[Depends(admit_write)])
 async def add_section_endpoint(
     template_id: UUID,
     data: CreateSectionDTO,
     uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    limits: TemplateLimits = Depends(get_template_limits),
+    queue: CommandQueue | None = Depends(async_command_queue),
 ) -> Response:
+    command = AddSectionCommand(
+        template_id=template_id,
+        title=data.title,
+        description=data.description,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
     async with uow:
         # Create command bus and execute command
-        command_bus = create_command_bus(uow)
-        command = AddSectionCommand(
-            template_id=template_id,
-            title=data.title,
-            description=data.description,
-        )
+        command_bus = create_command_bus(uow, feed, limits)
         template = await command_bus.execute(command)
 
     return JSONResponse(
@@ -86,25 +307,63 @@ async def add_section_endpoint(
     )
 
 
-@router.post("/{template_id}/sections/{section_id}/questions")
-@handle_exceptions
+@router.post(
+    "/{template_id}/sections/{section_id}/move", dependencies=[Depends(admit_write)]
+)
+async def move_section_endpoint(
+    template_id: UUID,
+    section_id: UUID,
+    data: MoveSectionDTO,
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    queue: CommandQueue | None = Depends(async_command_queue),
+) -> Response:
+    command = MoveSectionCommand(
+        template_id=template_id,
+        section_id=section_id,
+        position=data.position,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
+    async with uow:
+        # Create command bus and execute command
+        command_bus = create_command_bus(uow, feed)
+        template = await command_bus.execute(command)
+
+    return JSONResponse(
+        status_code=200,
+        content={"message": "Section moved", "template_id": str(template.id)},
+    )
+
+
+@router.post(
+    "/{template_id}/sections/{section_id}/questions",
+    dependencies=[Depends(admit_write)],
+)
 async def add_question_endpoint(
     template_id: UUID,
     section_id: UUID,
     question_data: CreateQuestionDTO,
     uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    limits: TemplateLimits = Depends(get_template_limits),
+    queue: CommandQueue | None = Depends(async_command_queue),
 ) -> Response:
+    command = AddQuestionCommand(
+        template_id=template_id,
+        section_id=section_id,
+        question_text=question_data.text,
+        question_type=question_data.type,
+        options=question_data.options,
+        required=question_data.required,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
     async with uow:
         # Create command bus and execute command
-        command_bus = create_command_bus(uow)
-        command = AddQuestionCommand(
-            template_id=template_id,
-            section_id=section_id,
-            question_text=question_data.text,
-            question_type=question_data.type,
-            options=question_data.options,
-            required=question_data.required,
-        )
+        command_bus = create_command_bus(uow, feed, limits)
         template = await command_bus.execute(command)
 
     return JSONResponse(
@@ -113,30 +372,71 @@ async def add_question_endpoint(
     )
 
 
-@router.put("/{template_id}/sections/{section_id}/questions/{question_id}")
-@handle_exceptions
+@router.put(
+    "/{template_id}/sections/{section_id}/questions/{question_id}",
+    dependencies=[Depends(admit_write)],
+)
 async def edit_question_endpoint(
     template_id: UUID,
     section_id: UUID,
     question_id: UUID,
     question_data: UpdateQuestionDTO,
     uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    limits: TemplateLimits = Depends(get_template_limits),
+    queue: CommandQueue | None = Depends(async_command_queue),
 ) -> Response:
+    command = EditQuestionCommand(
+        template_id=template_id,
+        section_id=section_id,
+        question_id=question_id,
+        question_text=question_data.text,
+        question_type=question_data.type,
+        options=question_data.options,
+        required=question_data.required,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
     async with uow:
         # Create command bus and execute command
-        command_bus = create_command_bus(uow)
-        command = EditQuestionCommand(
-            template_id=template_id,
-            section_id=section_id,
-            question_id=question_id,
-            question_text=question_data.text,
-            question_type=question_data.type,
-            options=question_data.options,
-            required=question_data.required,
-        )
+        command_bus = create_command_bus(uow, feed, limits)
         template = await command_bus.execute(command)
 
     return JSONResponse(
         status_code=200,
         content={"message": "Question updated", "template_id": str(template.id)},
     )
+
+
+@router.post(
+    "/{template_id}/sections/{section_id}/questions/{question_id}/move",
+    dependencies=[Depends(admit_write)],
+)
+async def move_question_endpoint(
+    template_id: UUID,
+    section_id: UUID,
+    question_id: UUID,
+    data: MoveQuestionDTO,
+    uow: AbstractUnitOfWork = Depends(get_uow),
+    feed: TemplateFeed = Depends(get_template_feed),
+    queue: CommandQueue | None = Depends(async_command_queue),
+) -> Response:
+    command = MoveQuestionCommand(
+        template_id=template_id,
+        section_id=section_id,
+        question_id=question_id,
+        position=data.position,
+    )
+    if queue is not None:
+        return await submit_job(queue, command)
+
+    async with uow:
+        # Create command bus and execute command
+        command_bus = create_command_bus(uow, feed)
+        template = await command_bus.execute(command)
+
+    return JSONResponse(
+        status_code=200,
+        content={"message": "Question moved", "template_id": str(template.id)},
+    )
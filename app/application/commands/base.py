@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from typing import Generic, Protocol, TypeVar
+from uuid import UUID
 
 T = TypeVar("T")
 
@@ -26,3 +27,11 @@ class CommandBus(ABC):
     async def execute(self, command: Command):
         """Execute a command and return the result."""
         pass
+
+
+class TemplatePublisher(Protocol):
+    """Receiver of the deltas handlers commit, e.g. the live `TemplateFeed`."""
+
+    def publish(self, template_id: UUID, version: int, delta: dict) -> int:
+        """Send `delta`, which produced `version` of the template."""
+        ...
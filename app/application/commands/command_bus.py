@@ -1,8 +1,19 @@
 from typing import Dict, Type
 
+from app.application.profiling import phase, profiled
+
 from .base import Command, CommandBus, CommandHandler
 
 
+class HandlerNotFoundError(ValueError):
+    """Raised when no handler is registered for a command's type.
+
+    A wiring bug rather than a bad request, so it is answered with a 500.
+    """
+
+    pass
+
+
 class SimpleCommandBus(CommandBus):
     """Simple implementation of command bus that routes commands to handlers."""
 
@@ -13,12 +24,16 @@ class SimpleCommandBus(CommandBus):
         """Register a handler for a specific command type."""
         self._handlers[command_type] = handler
 
+    @profiled("bus")
     async def execute(self, command: Command):
         """Execute a command by routing it to the appropriate handler."""
         command_type = type(command)
 
         if command_type not in self._handlers:
-            raise ValueError(f"No handler registered for command type: {command_type}")
+            raise HandlerNotFoundError(
+                f"No handler registered for command type: {command_type}"
+            )
 
         handler = self._handlers[command_type]
-        return await handler.handle(command)
+        with phase("handler"):
+            return await handler.handle(command)
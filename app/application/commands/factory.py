@@ -1,31 +1,59 @@
 from app.domain.repositories.unit_of_work import AbstractUnitOfWork
+from app.domain.value_objects.template_limits import (
+    DEFAULT_TEMPLATE_LIMITS,
+    TemplateLimits,
+)
 
+from .base import TemplatePublisher
 from .command_bus import SimpleCommandBus
 from .handlers import (
     AddQuestionHandler,
     AddSectionHandler,
+    CreateRevisionHandler,
     CreateTemplateHandler,
     EditQuestionHandler,
+    MoveQuestionHandler,
+    MoveSectionHandler,
     PublishTemplateHandler,
 )
 from .template_commands import (
     AddQuestionCommand,
     AddSectionCommand,
+    CreateRevisionCommand,
     CreateTemplateCommand,
     EditQuestionCommand,
+    MoveQuestionCommand,
+    MoveSectionCommand,
     PublishTemplateCommand,
 )
 
+# Handler of each command type, built over the unit of work of the bus.
+COMMAND_HANDLERS = {
+    CreateTemplateCommand: CreateTemplateHandler,
+    PublishTemplateCommand: PublishTemplateHandler,
+    CreateRevisionCommand: CreateRevisionHandler,
+    AddSectionCommand: AddSectionHandler,
+    AddQuestionCommand: AddQuestionHandler,
+    EditQuestionCommand: EditQuestionHandler,
+    MoveSectionCommand: MoveSectionHandler,
+    MoveQuestionCommand: MoveQuestionHandler,
+}
+
+
+def create_command_bus(
+    uow: AbstractUnitOfWork,
+    feed: TemplatePublisher | None = None,
+    limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+) -> SimpleCommandBus:
+    """Factory function to create and configure a command bus with all handlers.
 
-def create_command_bus(uow: AbstractUnitOfWork) -> SimpleCommandBus:
-    """Factory function to create and configure a command bus with all handlers."""
+    Handlers send the changes they commit to the editors subscribed to `feed`,
+    and keep templates within `limits`.
+    """
     command_bus = SimpleCommandBus()
 
     # Register all command handlers
-    command_bus.register_handler(CreateTemplateCommand, CreateTemplateHandler(uow))
-    command_bus.register_handler(PublishTemplateCommand, PublishTemplateHandler(uow))
-    command_bus.register_handler(AddSectionCommand, AddSectionHandler(uow))
-    command_bus.register_handler(AddQuestionCommand, AddQuestionHandler(uow))
-    command_bus.register_handler(EditQuestionCommand, EditQuestionHandler(uow))
+    for command_type, handler_type in COMMAND_HANDLERS.items():
+        command_bus.register_handler(command_type, handler_type(uow, feed, limits))
 
     return command_bus
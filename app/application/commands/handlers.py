@@ -1,28 +1,79 @@
+from uuid import UUID
+
 from app.domain.aggregates.template import TemplateAggregate
 from app.domain.entities.question import QuestionEntity
 from app.domain.entities.section import SectionEntity
 from app.domain.exceptions.template import TemplateNotFoundError
 from app.domain.repositories.unit_of_work import AbstractUnitOfWork
-from app.domain.value_objects.question_options import QuestionOption
-from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.option_set import option_sets
+from app.domain.value_objects.template_limits import (
+    DEFAULT_TEMPLATE_LIMITS,
+    TemplateLimits,
+)
 
-from .base import CommandHandler
+from .base import CommandHandler, TemplatePublisher
 from .template_commands import (
     AddQuestionCommand,
     AddSectionCommand,
+    CreateRevisionCommand,
     CreateTemplateCommand,
     EditQuestionCommand,
+    MoveQuestionCommand,
+    MoveSectionCommand,
     PublishTemplateCommand,
 )
 
 
+async def _commit(
+    uow: AbstractUnitOfWork,
+    feed: TemplatePublisher | None,
+    template_id: UUID,
+    delta: dict,
+) -> None:
+    """Commit, then send `delta` to the editors of the template."""
+    if feed is None:
+        await uow.commit()
+        return
+    version = await uow.template.get_version(template_id) + 1
+    await uow.commit()
+    feed.publish(template_id, version, delta)
+
+
+def _questions(template: TemplateAggregate, section_id: UUID) -> list:
+    section = next((s for s in template.sections if s.id == section_id), None)
+    return [] if section is None else section.questions
+
+
+def _order_keys(entities: list) -> dict[UUID, str]:
+    return {entity.id: entity.order_key for entity in entities}
+
+
+def _changed_order_keys(before: dict[UUID, str], entities: list) -> dict[str, str]:
+    """Order keys that a move changed: the moved entity's, or all its
+    siblings' when they were given fresh ones."""
+    return {
+        str(entity.id): entity.order_key
+        for entity in entities
+        if before.get(entity.id) != entity.order_key
+    }
+
+
 class CreateTemplateHandler(CommandHandler[TemplateAggregate]):
     """Handler for creating templates."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self.uow = uow
+        self.feed = feed
+        self.limits = limits
 
     async def handle(self, command: CreateTemplateCommand) -> TemplateAggregate:
+        self.limits.check_title(command.title)
+        self.limits.check_text(command.description, "Description")
         new_template = await self.uow.template.create(
             TemplateAggregate(title=command.title, description=command.description)
         )
@@ -33,8 +84,15 @@ class CreateTemplateHandler(CommandHandler[TemplateAggregate]):
 class PublishTemplateHandler(CommandHandler[TemplateAggregate]):
     """Handler for publishing templates."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self.uow = uow
+        self.feed = feed
+        self.limits = limits
 
     async def handle(self, command: PublishTemplateCommand) -> TemplateAggregate:
         template = await self.uow.template.get_by_id(command.template_id)
@@ -43,15 +101,50 @@ class PublishTemplateHandler(CommandHandler[TemplateAggregate]):
 
         template.publish()
         await self.uow.template.update(template)
-        await self.uow.commit()
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {"type": "status_changed", "status": template.status.value},
+        )
         return template
 
 
+class CreateRevisionHandler(CommandHandler[TemplateAggregate]):
+    """Handler for creating draft revisions of published templates."""
+
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
+        self.uow = uow
+        self.feed = feed
+        self.limits = limits
+
+    async def handle(self, command: CreateRevisionCommand) -> TemplateAggregate:
+        template = await self.uow.template.get_by_id(command.template_id)
+        if not template:
+            raise TemplateNotFoundError(f"Template {command.template_id} not found")
+
+        revision = await self.uow.template.create(template.create_revision())
+        await self.uow.commit()
+        return revision
+
+
 class AddSectionHandler(CommandHandler[TemplateAggregate]):
     """Handler for adding sections to templates."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self.uow = uow
+        self.feed = feed
+        self.limits = limits
 
     async def handle(self, command: AddSectionCommand) -> TemplateAggregate:
         template = await self.uow.template.get_by_id(command.template_id)
@@ -59,41 +152,60 @@ class AddSectionHandler(CommandHandler[TemplateAggregate]):
             raise TemplateNotFoundError(f"Template {command.template_id} not found")
 
         section = SectionEntity(title=command.title, description=command.description)
-        template.add_section(section)
+        template.add_section(section, self.limits)
         await self.uow.template.update(template)
-        await self.uow.commit()
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {"type": "section_added", "section": section.model_dump(mode="json")},
+        )
         return template
 
 
 class AddQuestionHandler(CommandHandler[TemplateAggregate]):
     """Handler for adding questions to sections."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self.uow = uow
+        self.feed = feed
+        self.limits = limits
 
     async def handle(self, command: AddQuestionCommand) -> TemplateAggregate:
         template = await self.uow.template.get_by_id(command.template_id)
         if not template:
             raise TemplateNotFoundError(f"Template {command.template_id} not found")
 
-        # Create question options if provided
+        # Questions with the same options share one interned set
         options = None
         if command.options:
-            options = [
-                QuestionOption(label=opt, value=opt, order=i)
-                for i, opt in enumerate(command.options)
-            ]
+            self.limits.check_options(len(command.options))
+            options = option_sets.from_labels(command.options)
 
         question = QuestionEntity(
             text=command.question_text,
-            type=QuestionType(command.question_type),
+            type=command.question_type,
             options=options,
             is_required=command.required,
         )
 
-        template.add_question(command.section_id, question)
+        template.add_question(command.section_id, question, self.limits)
         await self.uow.template.update(template)
-        await self.uow.commit()
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {
+                "type": "question_added",
+                "section_id": str(command.section_id),
+                "question": question.model_dump(mode="json"),
+            },
+        )
 
         return template
 
@@ -101,32 +213,124 @@ class AddQuestionHandler(CommandHandler[TemplateAggregate]):
 class EditQuestionHandler(CommandHandler[TemplateAggregate]):
     """Handler for editing questions in sections."""
 
-    def __init__(self, uow: AbstractUnitOfWork):
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self.uow = uow
+        self.feed = feed
+        self.limits = limits
 
     async def handle(self, command: EditQuestionCommand) -> TemplateAggregate:
         template = await self.uow.template.get_by_id(command.template_id)
         if not template:
             raise TemplateNotFoundError(f"Template {command.template_id} not found")
 
-        # Create question options if provided
+        # Questions with the same options share one interned set
         options = None
         if command.options:
-            options = [
-                QuestionOption(label=opt, value=opt, order=i)
-                for i, opt in enumerate(command.options)
-            ]
+            self.limits.check_options(len(command.options))
+            options = option_sets.from_labels(command.options)
 
         question = QuestionEntity(
             id=command.question_id,
             text=command.question_text,
-            type=QuestionType(command.question_type),
+            type=command.question_type,
             options=options,
             is_required=command.required,
         )
 
-        template.edit_question(command.section_id, command.question_id, question)
+        template.edit_question(
+            command.section_id, command.question_id, question, self.limits
+        )
         await self.uow.template.update(template)
-        await self.uow.commit()
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {
+                "type": "question_edited",
+                "section_id": str(command.section_id),
+                "question": question.model_dump(mode="json"),
+            },
+        )
+
+        return template
+
+
+class MoveSectionHandler(CommandHandler[TemplateAggregate]):
+    """Handler for moving sections within templates."""
+
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
+        self.uow = uow
+        self.feed = feed
+        self.limits = limits
+
+    async def handle(self, command: MoveSectionCommand) -> TemplateAggregate:
+        template = await self.uow.template.get_by_id(command.template_id)
+        if not template:
+            raise TemplateNotFoundError(f"Template {command.template_id} not found")
+
+        keys = _order_keys(template.sections)
+        template.move_section(command.section_id, command.position)
+        await self.uow.template.update(template)
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {
+                "type": "section_moved",
+                "section_id": str(command.section_id),
+                "order_keys": _changed_order_keys(keys, template.sections),
+            },
+        )
+
+        return template
+
+
+class MoveQuestionHandler(CommandHandler[TemplateAggregate]):
+    """Handler for moving questions within sections."""
+
+    def __init__(
+        self,
+        uow: AbstractUnitOfWork,
+        feed: TemplatePublisher | None = None,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
+        self.uow = uow
+        self.feed = feed
+        self.limits = limits
+
+    async def handle(self, command: MoveQuestionCommand) -> TemplateAggregate:
+        template = await self.uow.template.get_by_id(command.template_id)
+        if not template:
+            raise TemplateNotFoundError(f"Template {command.template_id} not found")
+
+        questions = _questions(template, command.section_id)
+        keys = _order_keys(questions)
+        template.move_question(
+            command.section_id, command.question_id, command.position
+        )
+        await self.uow.template.update(template)
+        await _commit(
+            self.uow,
+            self.feed,
+            template.id,
+            {
+                "type": "question_moved",
+                "section_id": str(command.section_id),
+                "question_id": str(command.question_id),
+                "order_keys": _changed_order_keys(
+                    keys, _questions(template, command.section_id)
+                ),
+            },
+        )
 
         return template
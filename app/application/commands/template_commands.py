@@ -2,6 +2,8 @@ from uuid import UUID
 
 from pydantic import BaseModel
 
+from app.domain.value_objects.question_type import QuestionType
+
 from .base import Command
 
 
@@ -18,6 +20,12 @@ class PublishTemplateCommand(Command, BaseModel):
     template_id: UUID
 
 
+class CreateRevisionCommand(Command, BaseModel):
+    """Command to start a new draft revision of a published template."""
+
+    template_id: UUID
+
+
 class AddSectionCommand(Command, BaseModel):
     """Command to add a section to a template."""
 
@@ -32,7 +40,7 @@ class AddQuestionCommand(Command, BaseModel):
     template_id: UUID
     section_id: UUID
     question_text: str
-    question_type: str
+    question_type: QuestionType
     options: list[str] | None = None
     required: bool = False
 
@@ -44,6 +52,23 @@ class EditQuestionCommand(Command, BaseModel):
     section_id: UUID
     question_id: UUID
     question_text: str
-    question_type: str
+    question_type: QuestionType
     options: list[str] | None = None
     required: bool = False
+
+
+class MoveSectionCommand(Command, BaseModel):
+    """Command to move a section to another position in its template."""
+
+    template_id: UUID
+    section_id: UUID
+    position: int
+
+
+class MoveQuestionCommand(Command, BaseModel):
+    """Command to move a question to another position in its section."""
+
+    template_id: UUID
+    section_id: UUID
+    question_id: UUID
+    position: int
@@ -4,3 +4,9 @@ from pydantic import BaseModel, Field
 class CreateSectionDTO(BaseModel):
     title: str = Field(default="")
     description: str = Field(default="")
+
+
+class MoveSectionDTO(BaseModel):
+    position: int = Field(
+        ..., ge=0, description="New index among the template's sections"
+    )
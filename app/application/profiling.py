@@ -0,0 +1,95 @@
+import functools
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+# Profile of the request being served in the current context, if it is profiled.
+current_profile: ContextVar["RequestProfile | None"] = ContextVar(
+    "current_profile", default=None
+)
+
+_UNPROFILED = nullcontext()
+
+
+class RequestProfile:
+    """Time spent in each phase of one request.
+
+    Phases nest; each records its exclusive time, so a handler's figure does
+    not include the repository calls and commit it made, and the phases of a
+    request add up to its total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+        self.extras: dict[str, str] = {}
+        # Open phases as [name, start, time spent in nested phases].
+        self._stack: list[list] = []
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float | None = None) -> str:
+        """`Server-Timing` header value, durations in milliseconds."""
+        metrics = []
+        for name, seconds in self.durations.items():
+            metric = f"{name};dur={seconds * 1000:.3f}"
+            if self.calls[name] > 1:
+                metric += f';desc="{self.calls[name]} calls"'
+            metrics.append(metric)
+        for name, description in self.extras.items():
+            metrics.append(f'{name};desc="{description}"')
+        if total is not None:
+            metrics.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(metrics)
+
+
+class _Phase:
+    __slots__ = ("profile", "frame")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.frame = [name, 0.0, 0.0]
+
+    def __enter__(self) -> None:
+        self.frame[1] = time.perf_counter()
+        self.profile._stack.append(self.frame)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        name, started, nested = self.frame
+        elapsed = time.perf_counter() - started
+        stack = self.profile._stack
+        stack.remove(self.frame)
+        if stack:
+            stack[-1][2] += elapsed
+        self.profile.record(name, elapsed - nested)
+
+
+def phase(name: str):
+    """Context manager timing `name` in the current request's profile, if any."""
+    profile = current_profile.get()
+    if profile is None:
+        return _UNPROFILED
+    return profile.phase(name)
+
+
+def profiled(name: str):
+    """Decorator timing each call of a coroutine function as phase `name`."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with phase(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
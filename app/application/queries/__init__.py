@@ -0,0 +1 @@
+# Queries module for the read side
@@ -0,0 +1,302 @@
+"""In-memory full-text index of templates, ranked with BM25.
+
+A template's document is the words of its title and description, of its
+sections' titles and descriptions, and of its questions' texts; title words
+count `TITLE_WEIGHT` times and section title words `SECTION_WEIGHT` times.
+Words are lower-cased and stripped of accents, so `équipe` matches `Equipe`.
+
+A query matches the templates containing every one of its words, either
+exactly or, for words of at least `MIN_PREFIX` characters, as a prefix
+(`satisf` matches `satisfaction`), at a discount of `PREFIX_WEIGHT`.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import sys
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Callable, Iterable, NamedTuple
+from uuid import UUID
+
+from app.domain.aggregates.template import TemplateAggregate
+
+TITLE_WEIGHT = 3
+SECTION_WEIGHT = 2
+MIN_PREFIX = 3
+PREFIX_WEIGHT = 0.5
+# Terms a prefix may expand to; the most frequent ones are kept.
+MAX_EXPANSIONS = 64
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+# New terms are kept unsorted until there are this many.
+_MERGE_THRESHOLD = 1024
+# Templates whose tokenized texts are kept for their next update.
+_TOKENIZED_TEMPLATES = 64
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lower-cased words of `text`, without accents."""
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+def template_terms(
+    template: TemplateAggregate,
+    tokenize: Callable[[str | None], Iterable[str]] = tokenize,
+) -> Counter[str]:
+    """Weighted term frequencies of a template's document."""
+    terms = Counter()
+    for term in tokenize(template.title):
+        terms[term] += TITLE_WEIGHT
+    terms.update(tokenize(template.description))
+    for section in template.sections:
+        for term in tokenize(section.title):
+            terms[term] += SECTION_WEIGHT
+        terms.update(tokenize(section.description))
+        for question in section.questions:
+            terms.update(tokenize(question.text))
+    return terms
+
+
+class SearchHit(NamedTuple):
+    template_id: UUID
+    title: str
+    status: str
+    score: float
+
+
+class _Document(NamedTuple):
+    template_id: UUID
+    version: int
+    title: str
+    status: str
+    terms: tuple[str, ...]
+    length: int
+
+
+class SearchIndex:
+    """Inverted index of templates, updated one template at a time.
+
+    Each template is indexed at a version; an update carrying an older
+    version than the indexed one is ignored, so updates may arrive out of
+    order. Documents get small integer keys so that postings stay compact.
+    """
+
+    def __init__(self):
+        self._documents: dict[int, _Document] = {}
+        self._keys: dict[UUID, int] = {}
+        self._free_keys: list[int] = []
+        # term -> {document key: weighted term frequency}
+        self._postings: dict[str, dict[int, int]] = {}
+        # Document length by key; keys are reused, so this stays dense.
+        self._lengths: list[int] = []
+        self._total_length = 0
+        # Sorted terms for prefix lookups, plus terms added since the last
+        # sort; terms whose postings emptied are dropped at the next sort.
+        self._sorted_terms: list[str] = []
+        self._new_terms: set[str] = set()
+        # Words of each text of the templates updated last: a template being
+        # edited is indexed again and again with most of its texts unchanged,
+        # and only the new ones are tokenized.
+        self._tokenized: OrderedDict[UUID, dict[str, list[str]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, template_id: UUID) -> bool:
+        return template_id in self._keys
+
+    def ids(self) -> list[UUID]:
+        return list(self._keys)
+
+    def version(self, template_id: UUID) -> int:
+        """Indexed version of a template; 0 if it is not indexed."""
+        key = self._keys.get(template_id)
+        return 0 if key is None else self._documents[key].version
+
+    def add(self, template: TemplateAggregate, version: int) -> None:
+        """Index `template` as of `version`, replacing an older document."""
+        key = self._keys.get(template.id)
+        if key is not None:
+            if self._documents[key].version >= version:
+                return
+            self._unpost(key)
+        else:
+            if self._free_keys:
+                key = self._free_keys.pop()
+            else:
+                key = len(self._lengths)
+                self._lengths.append(0)
+            self._keys[template.id] = key
+
+        terms = template_terms(template, self._tokenizer(template.id))
+        length = sum(terms.values())
+        # Interned, so that the documents and postings share each term string.
+        document_terms = tuple(map(sys.intern, terms))
+        self._documents[key] = _Document(
+            template.id,
+            version,
+            template.title,
+            template.status.value,
+            document_terms,
+            length,
+        )
+        self._lengths[key] = length
+        self._total_length += length
+        for term, frequency in zip(document_terms, terms.values()):
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._new_terms.add(term)
+            postings[key] = frequency
+
+    def remove(self, template_id: UUID) -> None:
+        self._tokenized.pop(template_id, None)
+        key = self._keys.pop(template_id, None)
+        if key is None:
+            return
+        self._unpost(key)
+        del self._documents[key]
+        self._free_keys.append(key)
+
+    def search(self, query: str, limit: int = 20) -> list[SearchHit]:
+        """Best `limit` templates containing every word of `query`."""
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self._documents:
+            return []
+
+        # For each word, the terms it matches with their weight.
+        expansions = [self._expand(word) for word in words]
+        candidates = None
+        for terms in sorted(expansions, key=self._match_count):
+            matched = self._matching(terms, candidates)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        count = len(self._documents)
+        lengths = self._lengths
+        # BM25 length normalization: K1 * (1 - B + B * length / average).
+        norm_base = K1 * (1 - B)
+        norm_per_length = K1 * B * count / self._total_length
+        scores = dict.fromkeys(candidates, 0.0)
+        for terms in expansions:
+            for term, weight in terms:
+                postings = self._postings[term]
+                frequency = len(postings)
+                idf = math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+                factor = weight * idf * (K1 + 1)
+                if frequency > len(candidates):
+                    matches = [(k, postings[k]) for k in candidates if k in postings]
+                elif frequency == len(scores) and postings.keys() == scores.keys():
+                    # Exactly the candidates: score them all in one pass.
+                    for key, tf in postings.items():
+                        scores[key] += (
+                            factor
+                            * tf
+                            / (tf + norm_base + norm_per_length * lengths[key])
+                        )
+                    continue
+                else:
+                    matches = [(k, tf) for k, tf in postings.items() if k in candidates]
+                for key, tf in matches:
+                    norm = norm_base + norm_per_length * lengths[key]
+                    scores[key] += factor * tf / (tf + norm)
+
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        hits = []
+        for key in best:
+            document = self._documents[key]
+            hits.append(
+                SearchHit(
+                    document.template_id, document.title, document.status, scores[key]
+                )
+            )
+        return hits
+
+    def _matching(
+        self, terms: list[tuple[str, float]], within: set[int] | None
+    ) -> set[int]:
+        """Documents containing any of `terms`, among `within` if given."""
+        matched = set()
+        for term, _ in terms:
+            postings = self._postings[term]
+            if within is not None and len(within) < len(postings):
+                matched.update(key for key in within if key in postings)
+            else:
+                matched.update(postings)
+        return matched
+
+    def _match_count(self, terms: list[tuple[str, float]]) -> int:
+        return sum(len(self._postings[term]) for term, _ in terms)
+
+    def _expand(self, word: str) -> list[tuple[str, float]]:
+        terms = [(word, 1.0)] if word in self._postings else []
+        if len(word) < MIN_PREFIX:
+            return terms
+        prefixed = [
+            term
+            for term in dict.fromkeys(self._terms_with_prefix(word))
+            if term != word
+        ]
+        if len(prefixed) > MAX_EXPANSIONS:
+            prefixed = heapq.nlargest(
+                MAX_EXPANSIONS, prefixed, key=lambda t: len(self._postings[t])
+            )
+        terms.extend((term, PREFIX_WEIGHT) for term in prefixed)
+        return terms
+
+    def _terms_with_prefix(self, prefix: str) -> Iterable[str]:
+        if len(self._new_terms) > _MERGE_THRESHOLD:
+            self._sort_terms()
+        terms = self._sorted_terms
+        i = bisect.bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            if terms[i] in self._postings:
+                yield terms[i]
+            i += 1
+        for term in self._new_terms:
+            if term.startswith(prefix) and term in self._postings:
+                yield term
+
+    def _sort_terms(self) -> None:
+        self._sorted_terms = sorted(self._postings)
+        self._new_terms.clear()
+
+    def _tokenizer(self, template_id: UUID) -> Callable[[str | None], list[str]]:
+        """`tokenize`, reusing the words of the texts the template had when
+        last indexed, and keeping those of its current texts."""
+        previous = self._tokenized.pop(template_id, {})
+        current = self._tokenized[template_id] = {}
+        if len(self._tokenized) > _TOKENIZED_TEMPLATES:
+            self._tokenized.popitem(last=False)
+
+        def tokenize_once(text: str | None) -> list[str]:
+            if not text:
+                return []
+            words = current.get(text)
+            if words is None:
+                words = previous.get(text)
+                if words is None:
+                    words = tokenize(text)
+                current[text] = words
+            return words
+
+        return tokenize_once
+
+    def _unpost(self, key: int) -> None:
+        document = self._documents[key]
+        self._total_length -= document.length
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
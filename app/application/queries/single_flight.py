@@ -0,0 +1,46 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key starts `fn`; callers arriving while it runs
+    await the same result, or exception, instead of starting their own. The
+    shared call runs in its own task, so a caller that is cancelled does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self._in_flight: dict[Hashable, asyncio.Task[T]] = {}
+
+    @property
+    def collapsed(self) -> int:
+        """Calls that were served by another caller's execution."""
+        return self.calls - self.executions
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+            "in_flight": self.in_flight,
+        }
@@ -0,0 +1,177 @@
+"""Live feed of the changes to a template, for the editors working on it.
+
+Command handlers publish a delta after each commit: `section_added`,
+`section_moved`, `question_added`, `question_edited`, `question_moved` or
+`status_changed`, carrying the template version it produced. Subscribers
+receive Server-Sent Events; the first one, `ready`, gives the version of the
+template when the feed started. A client applies, in order, the deltas
+following the version it read the template at, and ignores older ones.
+
+Commits of other processes are not described by deltas: their version is
+announced with `template_changed`, and the client reads the template again,
+as it does after a `resync`, sent instead of the deltas a subscriber that
+fell too far behind would have missed.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import AsyncIterator
+from uuid import UUID
+
+# Comment line keeping idle connections open through proxies.
+KEEPALIVE = b": keepalive\n\n"
+
+
+def encode_event(event: str, data: dict, event_id: int | None = None) -> bytes:
+    """Server-Sent Events frame of `data` as JSON."""
+    frame = "" if event_id is None else f"id: {event_id}\n"
+    frame += f"event: {event}\ndata: "
+    frame += json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return (frame + "\n\n").encode()
+
+
+class Subscription:
+    """Events of one template for one subscriber, queued until it reads them.
+
+    At most `max_queued` events wait; beyond, they are replaced by a single
+    `resync`, so a stalled connection costs bounded memory.
+    """
+
+    def __init__(self, feed: "TemplateFeed", template_id: UUID, max_queued: int):
+        self.feed = feed
+        self.template_id = template_id
+        self.max_queued = max_queued
+        self.closed = False
+        self._events: deque[bytes] = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, event: bytes) -> None:
+        if len(self._events) >= self.max_queued:
+            self._events.clear()
+            event = self.feed.resync_event(self.template_id)
+        self._events.append(event)
+        self._ready.set()
+
+    def ready(self, version: int) -> None:
+        """Send `ready` with the version read after subscribing, ahead of the
+        deltas queued meanwhile, which that version may already include."""
+        self.feed.announce(self.template_id, version)
+        self._events.appendleft(encode_event("ready", {"version": version}, version))
+        self._ready.set()
+
+    def close(self) -> None:
+        """Stop the subscription; events already queued are still read."""
+        if not self.closed:
+            self.closed = True
+            self.feed.unsubscribe(self)
+            self._ready.set()
+
+    async def events(self, keepalive: float | None = None) -> AsyncIterator[bytes]:
+        """Queued and future events, with a keep-alive comment after each
+        `keepalive` seconds without any; ends once the subscription is
+        closed, and closes it when the reader stops."""
+        try:
+            while self._events or not self.closed:
+                if not self._events:
+                    self._ready.clear()
+                    try:
+                        await asyncio.wait_for(self._ready.wait(), keepalive)
+                    except TimeoutError:
+                        yield KEEPALIVE
+                    continue
+                yield self._events.popleft()
+        finally:
+            self.close()
+
+
+class TemplateFeed:
+    """Fan-out of template deltas to the subscribers of each template.
+
+    A delta is serialized once into an event frame, and the same bytes are
+    queued for every subscriber of its template, so publishing to a thousand
+    editors costs one JSON encoding and a thousand appends. Lives on the
+    event loop; only templates with subscribers are tracked.
+    """
+
+    def __init__(self, max_queued: int = 256, keepalive: float | None = 15.0):
+        self.max_queued = max_queued
+        self.keepalive = keepalive
+        self.published = 0
+        self._subscribers: dict[UUID, set[Subscription]] = {}
+        # Latest version announced to the subscribers of each template.
+        self._versions: dict[UUID, int] = {}
+
+    def __len__(self) -> int:
+        """Number of subscriptions."""
+        return sum(map(len, self._subscribers.values()))
+
+    def subscribe(self, template_id: UUID) -> Subscription:
+        """Subscribe to a template, before reading the version to send with
+        `Subscription.ready`, so that no later delta is missed."""
+        subscription = Subscription(self, template_id, self.max_queued)
+        self._subscribers.setdefault(template_id, set()).add(subscription)
+        self._versions.setdefault(template_id, 0)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.template_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.template_id]
+            del self._versions[subscription.template_id]
+
+    def announce(self, template_id: UUID, version: int) -> None:
+        if template_id in self._versions:
+            self._versions[template_id] = max(self._versions[template_id], version)
+
+    def publish(self, template_id: UUID, version: int, delta: dict) -> int:
+        """Send `delta`, which produced `version`, to the template's
+        subscribers; returns how many there are."""
+        subscribers = self._subscribers.get(template_id)
+        if not subscribers:
+            return 0
+        self.announce(template_id, version)
+        event = encode_event(delta["type"], {**delta, "version": version}, version)
+        for subscription in subscribers:
+            subscription.push(event)
+        self.published += 1
+        return len(subscribers)
+
+    def resync_event(self, template_id: UUID) -> bytes:
+        version = self._versions.get(template_id, 0)
+        return encode_event("resync", {"version": version}, version)
+
+    def on_changes(self, changes: list[tuple[UUID, int]] | None) -> None:
+        """Change feed listener: announce versions committed elsewhere."""
+        if changes is None:
+            for template_id, subscribers in self._subscribers.items():
+                event = self.resync_event(template_id)
+                for subscription in subscribers:
+                    subscription.push(event)
+            return
+        for template_id, version in changes:
+            known = self._versions.get(template_id)
+            if known is None:
+                continue
+            if version == 0:
+                self.publish(template_id, known, {"type": "template_deleted"})
+                for subscription in list(self._subscribers.get(template_id, ())):
+                    subscription.close()
+            elif version > known:
+                self.publish(template_id, version, {"type": "template_changed"})
+
+    def close(self) -> None:
+        """End every subscription, e.g. at shutdown."""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.close()
+
+    def stats(self) -> dict:
+        return {
+            "templates": len(self._subscribers),
+            "subscriptions": len(self),
+            "published": self.published,
+        }
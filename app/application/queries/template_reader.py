@@ -0,0 +1,139 @@
+import asyncio
+import json
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Mapping, NamedTuple
+from uuid import UUID
+
+from app.application.profiling import phase
+from app.domain.exceptions.template import TemplateNotFoundError
+from app.domain.repositories.unit_of_work import AbstractUnitOfWork
+from app.domain.value_objects.template_projection import (
+    FULL_PROJECTION,
+    TemplateProjection,
+)
+from app.domain.value_objects.template_status import TemplateStatus
+
+from .single_flight import SingleFlight
+
+
+class TemplateJSON(NamedTuple):
+    """A template's JSON document, with the version it was read at (None for
+    projections) and the compressed bodies computed for it, by coding."""
+
+    body: bytes
+    version: int | None = None
+    encoded: Mapping[str, bytes] = MappingProxyType({})
+
+
+class TemplateReader:
+    """Read side for templates, serving their JSON representation.
+
+    Concurrent reads of one template share a single load and serialization,
+    so a burst of requests for a popular template costs one repository hit.
+    A read may select parts of the template with a `TemplateProjection`; the
+    repository then loads only those parts.
+
+    Published templates no longer change, so whole documents of published
+    versions are kept, up to `max_bytes`, along with their bodies compressed
+    once by `compress`; a later read only checks the version is current.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], AbstractUnitOfWork],
+        compress: Callable[[bytes], dict[str, bytes]] | None = None,
+        max_bytes: int = 0,
+    ):
+        self.uow_factory = uow_factory
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.loads = SingleFlight[TemplateJSON]()
+        self._published: OrderedDict[UUID, TemplateJSON] = OrderedDict()
+
+    async def get_json(
+        self, template_id: UUID, projection: TemplateProjection = FULL_PROJECTION
+    ) -> bytes:
+        """JSON document of a template; raises `TemplateNotFoundError`."""
+        return (await self.get(template_id, projection)).body
+
+    async def get(
+        self, template_id: UUID, projection: TemplateProjection = FULL_PROJECTION
+    ) -> TemplateJSON:
+        """JSON document of a template with its version and compressed bodies;
+        raises `TemplateNotFoundError`."""
+        if not projection.is_full:
+            return await self.loads.run(
+                (template_id, projection),
+                lambda: self._load_projection(template_id, projection),
+            )
+        cached = self._published.get(template_id)
+        if cached is not None:
+            if await self._is_current(template_id, cached.version):
+                self.hits += 1
+                self._published.move_to_end(template_id)
+                return cached
+            self._discard(template_id)
+        return await self.loads.run(template_id, lambda: self._load(template_id))
+
+    async def _is_current(self, template_id: UUID, version: int) -> bool:
+        try:
+            async with self.uow_factory() as uow:
+                return await uow.template.get_version(template_id) == version
+        except TemplateNotFoundError:
+            return False
+
+    async def _load(self, template_id: UUID) -> TemplateJSON:
+        async with self.uow_factory() as uow:
+            template = await uow.template.get_by_id(template_id)
+            version = await uow.template.get_version(template_id)
+        with phase("serialize"):
+            body = template.model_dump_json().encode()
+        if template.status != TemplateStatus.PUBLISHED or not self.max_bytes:
+            return TemplateJSON(body, version)
+        encoded = {}
+        if self.compress is not None:
+            with phase("compress"):
+                encoded = await asyncio.to_thread(self.compress, body)
+        document = TemplateJSON(body, version, encoded)
+        self._keep(template_id, document)
+        return document
+
+    async def _load_projection(
+        self, template_id: UUID, projection: TemplateProjection
+    ) -> TemplateJSON:
+        async with self.uow_factory() as uow:
+            document = await uow.template.get_projection(template_id, projection)
+        with phase("serialize"):
+            return TemplateJSON(
+                json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode()
+            )
+
+    def _keep(self, template_id: UUID, document: TemplateJSON) -> None:
+        size = _size(document)
+        if size > self.max_bytes:
+            return
+        self._discard(template_id)
+        self._published[template_id] = document
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._published.popitem(last=False)
+            self.size_bytes -= _size(evicted)
+
+    def _discard(self, template_id: UUID) -> None:
+        document = self._published.pop(template_id, None)
+        if document is not None:
+            self.size_bytes -= _size(document)
+
+    def stats(self) -> dict:
+        return {
+            "published": len(self._published),
+            "size_bytes": self.size_bytes,
+            "hits": self.hits,
+        }
+
+
+def _size(document: TemplateJSON) -> int:
+    return len(document.body) + sum(map(len, document.encoded.values()))
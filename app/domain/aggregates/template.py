@@ -2,10 +2,25 @@ from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from app.domain.entities.question import QuestionEntity
 from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import (
+    InvalidOrderKeyError,
+    InvalidTemplateStateError,
+    QuestionNotFoundError,
+    SectionNotFoundError,
+)
+from app.domain.value_objects.order_key import (
+    key_between,
+    keys_between,
+    needs_rebalance,
+)
+from app.domain.value_objects.template_limits import (
+    DEFAULT_TEMPLATE_LIMITS,
+    TemplateLimits,
+)
 from app.domain.value_objects.template_status import TemplateStatus
 
 
@@ -17,50 +32,199 @@ class TemplateAggregate(BaseModel):
     sections: List[SectionEntity] = Field(default_factory=list)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    revision_of: UUID | None = None
+
+    # Sections still shared with the template this one was revised from; they
+    # are copied on their first mutation.
+    _shared_section_ids: set[UUID] = PrivateAttr(default_factory=set)
 
     def publish(self):
         """Domain rule: Only publish if at least one question exists."""
         if self.status == TemplateStatus.PUBLISHED:
-            raise ValueError("Template is already published.")
+            raise InvalidTemplateStateError("Template is already published.")
 
         if self.status == TemplateStatus.ARCHIVED:
-            raise ValueError("Cannot publish an archived template.")
+            raise InvalidTemplateStateError("Cannot publish an archived template.")
 
         if not any(section.questions for section in self.sections):
-            raise ValueError("Cannot publish an empty survey template.")
+            raise InvalidTemplateStateError("Cannot publish an empty survey template.")
 
         self.status = TemplateStatus.PUBLISHED
         self.updated_at = datetime.now()
 
-    def add_section(self, data: SectionEntity):
+    def create_revision(self) -> "TemplateAggregate":
+        """Domain rule: Published templates are revised through a new draft.
+
+        The draft shares this template's sections and questions instead of
+        copying them; a shared section is copied the first time it is edited.
+        """
+        if self.status == TemplateStatus.DRAFT:
+            raise InvalidTemplateStateError(
+                "Cannot revise a draft template; edit it directly."
+            )
+
+        revision = TemplateAggregate(
+            title=self.title,
+            description=self.description,
+            sections=list(self.sections),
+            revision_of=self.id,
+        )
+        self._share_sections_with(revision)
+        return revision
+
+    def copy_on_write(self) -> "TemplateAggregate":
+        """Return an identical template sharing this one's sections.
+
+        Whichever of the two edits a shared section first works on its own
+        copy of it, so neither ever observes the other's changes.
+        """
+        copy = self.model_copy(update={"sections": list(self.sections)})
+        self._share_sections_with(copy)
+        return copy
+
+    def add_section(
+        self, data: SectionEntity, limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS
+    ):
         self._can_edit()
+        limits.check_section_count(len(self.sections) + 1)
+        limits.check_section(data)
+        data.order_key = _key_at(self.sections, len(self.sections))
         self.sections.append(data)
         self.updated_at = datetime.now()
 
-    def add_question(self, section_id: UUID, data: QuestionEntity):
+    def add_question(
+        self,
+        section_id: UUID,
+        data: QuestionEntity,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self._can_edit()
-        section = next((s for s in self.sections if s.id == section_id), None)
-        if not section:
-            raise ValueError(f"Section {section_id} not found.")
+        limits.check_question(data)
+        section = self._section_for_write(section_id)
+        limits.check_question_count(len(section.questions) + 1)
+        data.order_key = _key_at(section.questions, len(section.questions))
         section.questions.append(data)
         self.updated_at = datetime.now()
 
-    def edit_question(self, section_id: UUID, question_id: UUID, data: QuestionEntity):
+    def edit_question(
+        self,
+        section_id: UUID,
+        question_id: UUID,
+        data: QuestionEntity,
+        limits: TemplateLimits = DEFAULT_TEMPLATE_LIMITS,
+    ):
         self._can_edit()
-        section = next((s for s in self.sections if s.id == section_id), None)
-        if not section:
-            raise ValueError(f"Section {section_id} not found.")
+        limits.check_question(data)
+        section = self._section_for_write(section_id)
 
         question = next((q for q in section.questions if q.id == question_id), None)
         if not question:
-            raise ValueError(f"Question {question_id} not found.")
+            raise QuestionNotFoundError(f"Question {question_id} not found.")
 
         index = section.questions.index(question)
+        data.order_key = question.order_key
         section.questions[index] = data
         self.updated_at = datetime.now()
 
+    def move_section(self, section_id: UUID, position: int):
+        """Move a section to `position` among the sections (the end if past it).
+
+        Only the moved section gets a new order key, unless the keys around
+        its new place grew too long and all sections are given fresh ones.
+        """
+        self._can_edit()
+        index = next(
+            (i for i, s in enumerate(self.sections) if s.id == section_id), None
+        )
+        if index is None:
+            raise SectionNotFoundError(f"Section {section_id} not found.")
+        _move(self.sections, index, position)
+        self.updated_at = datetime.now()
+
+    def move_question(self, section_id: UUID, question_id: UUID, position: int):
+        """Move a question to `position` within its section, as `move_section`."""
+        self._can_edit()
+        section = self._section_for_write(section_id)
+        index = next(
+            (i for i, q in enumerate(section.questions) if q.id == question_id), None
+        )
+        if index is None:
+            raise QuestionNotFoundError(f"Question {question_id} not found.")
+        _move(section.questions, index, position)
+        self.updated_at = datetime.now()
+
+    def ensure_order_keys(self):
+        """Give order keys to sections and questions without one, e.g. stored
+        before order keys existed or added other than through this template."""
+        if any(s.order_key is None for s in self.sections):
+            _rekey(self.sections)
+        for section in self.sections:
+            if any(q.order_key is None for q in section.questions):
+                _rekey(self._section_for_write(section.id).questions)
+
+    def _share_sections_with(self, other: "TemplateAggregate"):
+        section_ids = {s.id for s in self.sections}
+        self._shared_section_ids = section_ids
+        other._shared_section_ids = set(section_ids)
+
+    def _section_for_write(self, section_id: UUID) -> SectionEntity:
+        index = next(
+            (i for i, s in enumerate(self.sections) if s.id == section_id), None
+        )
+        if index is None:
+            raise SectionNotFoundError(f"Section {section_id} not found.")
+
+        section = self.sections[index]
+        if section_id in self._shared_section_ids:
+            section = section.model_copy(update={"questions": list(section.questions)})
+            self.sections[index] = section
+            self._shared_section_ids.discard(section_id)
+        return section
+
     def _can_edit(self):
         if self.status == TemplateStatus.PUBLISHED:
-            raise ValueError("Cannot edit a published template.")
+            raise InvalidTemplateStateError("Cannot edit a published template.")
         if self.status == TemplateStatus.ARCHIVED:
-            raise ValueError("Cannot edit an archived template.")
+            raise InvalidTemplateStateError("Cannot edit an archived template.")
+
+
+def _move(siblings: list, index: int, position: int) -> None:
+    entity = siblings.pop(index)
+    position = min(position, len(siblings))
+    key = _key_at(siblings, position)
+    siblings.insert(position, entity.model_copy(update={"order_key": key}))
+
+
+def _key_at(siblings: list, position: int) -> str:
+    """Order key for an entity inserted at `position` of `siblings`; gives
+    the siblings fresh keys first if theirs are missing, out of order or
+    too long."""
+    key = _key_between_neighbours(siblings, position)
+    if key is None or needs_rebalance(key):
+        _rekey(siblings)
+        key = _key_between_neighbours(siblings, position)
+    return key
+
+
+def _key_between_neighbours(siblings: list, position: int) -> str | None:
+    before = siblings[position - 1].order_key if position > 0 else None
+    after = siblings[position].order_key if position < len(siblings) else None
+    if (position > 0 and before is None) or (
+        position < len(siblings) and after is None
+    ):
+        return None
+    try:
+        return key_between(before, after)
+    except InvalidOrderKeyError:
+        return None
+
+
+def _rekey(siblings: list) -> None:
+    """Give siblings evenly spaced keys in their current order.
+
+    Each is replaced by a copy: entities may be shared with other templates,
+    see `TemplateAggregate.copy_on_write`.
+    """
+    keys = keys_between(None, None, len(siblings))
+    for i, key in enumerate(keys):
+        siblings[i] = siblings[i].model_copy(update={"order_key": key})
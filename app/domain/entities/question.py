@@ -1,6 +1,8 @@
-from typing import List
+from typing import Annotated
 
-from app.domain.value_objects.question_options import QuestionOption
+from pydantic import AfterValidator
+
+from app.domain.value_objects.option_set import OptionSet, option_sets
 from app.domain.value_objects.question_type import QuestionType
 
 from .base_entity import BaseEntity
@@ -9,5 +11,9 @@ from .base_entity import BaseEntity
 class QuestionEntity(BaseEntity):
     text: str
     type: QuestionType
-    options: List[QuestionOption] | None = None
+    # Shared with the questions having equal options, see `OptionSetRegistry`.
+    options: Annotated[OptionSet, AfterValidator(option_sets.intern)] | None = None
     is_required: bool = True
+    # Position among the section's questions, see `order_key`; assigned by
+    # the template.
+    order_key: str | None = None
@@ -10,3 +10,6 @@ class SectionEntity(BaseEntity):
     title: str
     description: str | None = None
     questions: List[QuestionEntity] = Field(default_factory=list)
+    # Position among the template's sections, see `order_key`; assigned by
+    # the template.
+    order_key: str | None = None
@@ -2,3 +2,43 @@ class TemplateNotFoundError(Exception):
     """Raised when a survey template with the given ID does not exist."""
 
     pass
+
+
+class ConcurrentModificationError(Exception):
+    """Raised when a template changed in another unit of work since it was loaded."""
+
+    pass
+
+
+# The errors below subclass ValueError, which the domain raised before they
+# existed, so callers catching ValueError keep working.
+
+
+class SectionNotFoundError(ValueError):
+    """Raised when a template has no section with the given ID."""
+
+    pass
+
+
+class QuestionNotFoundError(ValueError):
+    """Raised when a section has no question with the given ID."""
+
+    pass
+
+
+class InvalidTemplateStateError(ValueError):
+    """Raised when a template's status does not allow the requested change."""
+
+    pass
+
+
+class TemplateLimitExceededError(ValueError):
+    """Raised when a change would take a template past its structure limits."""
+
+    pass
+
+
+class InvalidOrderKeyError(ValueError):
+    """Raised when an order key is malformed or out of the order key space."""
+
+    pass
@@ -1,6 +1,25 @@
+from abc import abstractmethod
+from uuid import UUID
+
 from app.domain.aggregates.template import TemplateAggregate
 from app.domain.repositories.base_repository import BaseRepository
+from app.domain.value_objects.template_projection import TemplateProjection
 
 
 class TemplateRepository(BaseRepository[TemplateAggregate]):
-    pass
+    @abstractmethod
+    async def get_version(self, entity_id: UUID) -> int:
+        """Version of a template as this unit of work read it, else its latest
+        committed version, without loading it; raises `TemplateNotFoundError`.
+        """
+        raise NotImplementedError
+
+    async def get_projection(
+        self, entity_id: UUID, projection: TemplateProjection
+    ) -> dict:
+        """Document of the parts of a template selected by `projection`.
+
+        Projects the whole template; repositories that can load only the
+        selected parts override this.
+        """
+        return projection.apply(await self.get_by_id(entity_id))
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from app.domain.value_objects.question_options import QuestionOption
+
+# Options of a question, in order. Tuples of frozen options are immutable, so
+# questions with the same options can share one.
+OptionSet = tuple[QuestionOption, ...]
+
+# Interned option sets kept by the process-wide registry.
+MAX_SETS = 10_000
+
+
+def option_set_id(options: OptionSet) -> bytes:
+    """Content hash identifying `options`, the same in every process."""
+    encoded = json.dumps(
+        [[option.label, option.value, option.order] for option in options],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(encoded.encode(), digest_size=16).digest()
+
+
+def _content(options: Iterable[QuestionOption]) -> tuple[tuple[str, str, int], ...]:
+    return tuple((option.label, option.value, option.order) for option in options)
+
+
+class OptionSetRegistry:
+    """Interns option sets, so that equal ones are a single shared tuple.
+
+    A template of a thousand Likert questions then holds one set of five
+    options. The registry keeps the `max_sets` most recently interned sets;
+    an evicted set is still valid, an equal one is merely no longer shared
+    with it. It is shared by the event loop and the storage threads.
+    """
+
+    def __init__(self, max_sets: int = MAX_SETS):
+        self.max_sets = max_sets
+        self.hits = 0
+        self.misses = 0
+        self._sets: OrderedDict[tuple, OptionSet] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def intern(self, options: Iterable[QuestionOption]) -> OptionSet:
+        """The shared option set equal to `options`."""
+        options = tuple(options)
+        return self._intern(_content(options), lambda: options)
+
+    def from_labels(self, labels: Iterable[str]) -> OptionSet:
+        """The shared option set whose options are `labels`, valued as labelled."""
+        content = tuple((label, label, i) for i, label in enumerate(labels))
+        return self._intern(content, lambda: _options(content))
+
+    def from_rows(self, rows: Iterable[tuple[str, str, int]]) -> OptionSet:
+        """The shared option set of stored (label, value, order) rows."""
+        content = tuple(rows)
+        return self._intern(content, lambda: _options(content))
+
+    def _intern(self, content: tuple, build) -> OptionSet:
+        with self._lock:
+            interned = self._sets.get(content)
+            if interned is not None:
+                self.hits += 1
+                self._sets.move_to_end(content)
+                return interned
+            self.misses += 1
+            interned = self._sets[content] = build()
+            if len(self._sets) > self.max_sets:
+                self._sets.popitem(last=False)
+            return interned
+
+    def stats(self) -> dict:
+        return {"sets": len(self._sets), "hits": self.hits, "misses": self.misses}
+
+
+def _options(content: tuple[tuple[str, str, int], ...]) -> OptionSet:
+    return tuple(
+        QuestionOption(label=label, value=value, order=order)
+        for label, value, order in content
+    )
+
+
+# Process-wide registry used by questions, the codec and the repositories.
+option_sets = OptionSetRegistry()
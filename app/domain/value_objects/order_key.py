@@ -0,0 +1,175 @@
+"""Fractional order keys: strings whose byte order is the order of siblings.
+
+A key between any two others can always be generated, so moving an entity
+only changes its own key. A key is an integer part, a head letter giving its
+length (`a` two characters, `b` three, ...; `Z`, `Y`, ... for the negative
+range) followed by base-62 digits, then an optional fraction without trailing
+zeros. Appending or prepending increments or decrements the integer part, so
+keys grow logarithmically with the number of siblings; inserting repeatedly
+at the same place lengthens the fraction, until `needs_rebalance` asks for
+fresh keys for all siblings.
+"""
+
+from app.domain.exceptions.template import InvalidOrderKeyError
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+# Keys longer than this are replaced by evenly spaced ones.
+MAX_KEY_LENGTH = 32
+
+_ZERO = DIGITS[0]
+_SMALLEST_INTEGER = "A" + _ZERO * 26
+_INDEX = {digit: i for i, digit in enumerate(DIGITS)}
+
+
+def key_between(before: str | None, after: str | None) -> str:
+    """A key sorting after `before` and before `after`; `None` for an open end."""
+    if before is not None:
+        _validate(before)
+    if after is not None:
+        _validate(after)
+    if before is not None and after is not None and before >= after:
+        raise InvalidOrderKeyError(f"Order key {before!r} is not before {after!r}.")
+
+    if before is None:
+        if after is None:
+            return "a" + _ZERO
+        integer = _integer_part(after)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint("", after[len(integer) :])
+        if integer < after:
+            return integer
+        decremented = _decrement(integer)
+        if decremented is None:
+            raise InvalidOrderKeyError("Cannot generate a key before the first one.")
+        return decremented
+
+    integer = _integer_part(before)
+    fraction = before[len(integer) :]
+    if after is None:
+        incremented = _increment(integer)
+        if incremented is None:
+            return integer + _midpoint(fraction, None)
+        return incremented
+
+    integer_after = _integer_part(after)
+    if integer == integer_after:
+        return integer + _midpoint(fraction, after[len(integer) :])
+    incremented = _increment(integer)
+    if incremented is None:
+        raise InvalidOrderKeyError("Cannot generate a key after the last one.")
+    if incremented < after:
+        return incremented
+    return integer + _midpoint(fraction, None)
+
+
+def keys_between(before: str | None, after: str | None, count: int) -> list[str]:
+    """`count` increasing keys between `before` and `after`."""
+    if count <= 0:
+        return []
+    if count == 1:
+        return [key_between(before, after)]
+    if after is None:
+        keys = [key_between(before, None)]
+        for _ in range(count - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if before is None:
+        keys = [key_between(None, after)]
+        for _ in range(count - 1):
+            keys.append(key_between(None, keys[-1]))
+        keys.reverse()
+        return keys
+    middle = count // 2
+    key = key_between(before, after)
+    return [
+        *keys_between(before, key, middle),
+        key,
+        *keys_between(key, after, count - middle - 1),
+    ]
+
+
+def needs_rebalance(key: str) -> bool:
+    return len(key) > MAX_KEY_LENGTH
+
+
+def _midpoint(before: str, after: str | None) -> str:
+    """Fraction between two fractions; `after=None` stands for 1."""
+    if after is not None:
+        common = 0
+        while (before[common] if common < len(before) else _ZERO) == after[common]:
+            common += 1
+        if common > 0:
+            return after[:common] + _midpoint(before[common:], after[common:])
+    digit_before = _INDEX[before[0]] if before else 0
+    digit_after = _INDEX[after[0]] if after is not None else len(DIGITS)
+    if digit_after - digit_before > 1:
+        return DIGITS[(digit_before + digit_after + 1) // 2]
+    if after is not None and len(after) > 1:
+        return after[:1]
+    return DIGITS[digit_before] + _midpoint(before[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise InvalidOrderKeyError(f"Invalid order key head {head!r}.")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise InvalidOrderKeyError(f"Invalid order key {key!r}.")
+    return key[:length]
+
+
+def _validate(key: str) -> None:
+    if not key or key == _SMALLEST_INTEGER:
+        raise InvalidOrderKeyError(f"Invalid order key {key!r}.")
+    integer = _integer_part(key)
+    if any(digit not in _INDEX for digit in key[1:]):
+        raise InvalidOrderKeyError(f"Invalid order key {key!r}.")
+    if len(key) > len(integer) and key[-1] == _ZERO:
+        raise InvalidOrderKeyError(f"Invalid order key {key!r}.")
+
+
+def _increment(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        index = _INDEX[digits[i]] + 1
+        if index < len(DIGITS):
+            digits[i] = DIGITS[index]
+            return head + "".join(digits)
+        digits[i] = _ZERO
+    # Carried out of every digit: move to the next integer length.
+    if head == "Z":
+        return "a" + _ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(_ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        index = _INDEX[digits[i]] - 1
+        if index >= 0:
+            digits[i] = DIGITS[index]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
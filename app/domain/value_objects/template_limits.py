@@ -0,0 +1,90 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import TemplateLimitExceededError
+
+
+class TemplateLimits(BaseModel):
+    """Upper bounds on a template's structure and text sizes.
+
+    Every operation on a template walks its sections and questions, so an
+    unbounded template makes each of them arbitrarily slow.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    max_sections: int = Field(default=200, ge=1)
+    max_questions_per_section: int = Field(default=500, ge=1)
+    max_options_per_question: int = Field(default=100, ge=1)
+    # Titles of templates and sections, and option labels and values.
+    max_title_length: int = Field(default=500, ge=1)
+    # Descriptions and question texts.
+    max_text_length: int = Field(default=5_000, ge=1)
+
+    @property
+    def max_request_bytes(self) -> int:
+        """Size of the largest write request within these limits: a question
+        with the longest text and the most options, with the longest labels
+        and values, every character JSON-escaped as `\\uXXXX`."""
+        characters = (
+            self.max_text_length
+            + 2 * self.max_options_per_question * self.max_title_length
+        )
+        # Keys, quotes and separators of the options and the other fields.
+        return 6 * characters + 64 * self.max_options_per_question + 1024
+
+    def check_title(self, title: str, what: str = "Title") -> None:
+        if len(title) > self.max_title_length:
+            raise TemplateLimitExceededError(
+                f"{what} is longer than {self.max_title_length} characters."
+            )
+
+    def check_text(self, text: str | None, what: str = "Text") -> None:
+        if text and len(text) > self.max_text_length:
+            raise TemplateLimitExceededError(
+                f"{what} is longer than {self.max_text_length} characters."
+            )
+
+    def check_options(self, count: int) -> None:
+        if count > self.max_options_per_question:
+            raise TemplateLimitExceededError(
+                f"A question cannot have more than "
+                f"{self.max_options_per_question} options."
+            )
+
+    def check_question(self, question: QuestionEntity) -> None:
+        self.check_text(question.text, "Question text")
+        if question.options:
+            self.check_options(len(question.options))
+            longest = max(
+                max(len(option.label), len(option.value)) for option in question.options
+            )
+            if longest > self.max_title_length:
+                raise TemplateLimitExceededError(
+                    f"Option label is longer than {self.max_title_length} characters."
+                )
+
+    def check_section(self, section: SectionEntity) -> None:
+        self.check_title(section.title, "Section title")
+        self.check_text(section.description, "Section description")
+        self.check_question_count(len(section.questions))
+        for question in section.questions:
+            self.check_question(question)
+
+    def check_question_count(self, count: int) -> None:
+        if count > self.max_questions_per_section:
+            raise TemplateLimitExceededError(
+                f"A section cannot have more than "
+                f"{self.max_questions_per_section} questions."
+            )
+
+    def check_section_count(self, count: int) -> None:
+        if count > self.max_sections:
+            raise TemplateLimitExceededError(
+                f"A template cannot have more than {self.max_sections} sections."
+            )
+
+
+# Limits of a template when none are configured.
+DEFAULT_TEMPLATE_LIMITS = TemplateLimits()
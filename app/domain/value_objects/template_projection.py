@@ -0,0 +1,164 @@
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import SectionNotFoundError
+
+# The template's own fields, in the order of its JSON document.
+TEMPLATE_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "created_at",
+    "updated_at",
+    "revision_of",
+)
+# Nested parts, each one requiring the previous.
+PARTS = ("sections", "questions", "options")
+
+
+class TemplateProjection(BaseModel):
+    """The parts of a template a read needs; the others are neither loaded
+    nor serialized.
+
+    `fields` are the template's own fields, `include` its nested parts:
+    sections, their questions and the questions' options. Sections read
+    without their questions carry a `question_count` instead. `section_id`
+    keeps a single section.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    fields: frozenset[str] = frozenset(TEMPLATE_FIELDS)
+    include: frozenset[str] = frozenset(PARTS)
+    section_id: UUID | None = None
+
+    @field_validator("fields")
+    @classmethod
+    def _known_fields(cls, fields: frozenset[str]) -> frozenset[str]:
+        unknown = fields.difference(TEMPLATE_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+        return fields
+
+    @field_validator("include")
+    @classmethod
+    def _known_parts(cls, include: frozenset[str]) -> frozenset[str]:
+        unknown = include.difference(PARTS)
+        if unknown:
+            raise ValueError(f"Unknown parts: {', '.join(sorted(unknown))}")
+        for part, required in zip(PARTS[1:], PARTS):
+            if part in include and required not in include:
+                raise ValueError(f"Including {part} requires {required}")
+        return include
+
+    @model_validator(mode="after")
+    def _section_is_included(self) -> "TemplateProjection":
+        if self.section_id is not None and "sections" not in self.include:
+            raise ValueError("Selecting a section requires sections")
+        return self
+
+    @property
+    def is_full(self) -> bool:
+        return self == FULL_PROJECTION
+
+    @property
+    def sections(self) -> bool:
+        return "sections" in self.include
+
+    @property
+    def questions(self) -> bool:
+        return "questions" in self.include
+
+    @property
+    def options(self) -> bool:
+        return "options" in self.include
+
+    def apply(
+        self,
+        template: TemplateAggregate,
+        question_counts: dict[UUID, int] | None = None,
+    ) -> dict:
+        """JSON-compatible document of the selected parts of `template`.
+
+        `template` may hold only those parts, as loaded for this projection;
+        sections without their questions then take their counts from
+        `question_counts`.
+        """
+        values = template.model_dump(mode="json", exclude={"sections"})
+        document = {
+            name: values[name] for name in TEMPLATE_FIELDS if name in self.fields
+        }
+        if not self.sections:
+            return document
+
+        sections = template.sections
+        if self.section_id is not None:
+            sections = [s for s in sections if s.id == self.section_id]
+            if not sections:
+                raise SectionNotFoundError(f"Section {self.section_id} not found.")
+        # Shared option sets are converted once.
+        options: dict[int, list[dict]] = {}
+        document["sections"] = [
+            self._section(section, question_counts, options) for section in sections
+        ]
+        return document
+
+    def _section(
+        self,
+        section: SectionEntity,
+        question_counts: dict[UUID, int] | None,
+        options: dict[int, list[dict]],
+    ) -> dict:
+        document = {
+            "id": _str(section.id),
+            "title": section.title,
+            "description": section.description,
+        }
+        if self.questions:
+            document["questions"] = [
+                self._question(question, options) for question in section.questions
+            ]
+        elif question_counts is not None:
+            document["question_count"] = question_counts.get(section.id, 0)
+        else:
+            document["question_count"] = len(section.questions)
+        document["order_key"] = section.order_key
+        return document
+
+    def _question(
+        self, question: QuestionEntity, options: dict[int, list[dict]]
+    ) -> dict:
+        document = {
+            "id": _str(question.id),
+            "text": question.text,
+            "type": question.type.value,
+        }
+        if self.options:
+            document["options"] = _options(question.options, options)
+        document["is_required"] = question.is_required
+        document["order_key"] = question.order_key
+        return document
+
+
+def _str(value: UUID | None) -> str | None:
+    return None if value is None else str(value)
+
+
+def _options(option_set, converted: dict[int, list[dict]]) -> list[dict] | None:
+    if option_set is None:
+        return None
+    document = converted.get(id(option_set))
+    if document is None:
+        document = converted[id(option_set)] = [
+            {"label": option.label, "value": option.value, "order": option.order}
+            for option in option_set
+        ]
+    return document
+
+
+FULL_PROJECTION = TemplateProjection()
@@ -1,6 +1,219 @@
+from contextlib import AsyncExitStack
+from functools import partial
+from typing import AsyncIterator
+
+from fastapi import Request
+from starlette.datastructures import State
+
+from app.application.commands.base import Command
+from app.application.commands.factory import COMMAND_HANDLERS, create_command_bus
+from app.application.profiling import phase
+from app.application.queries.search_index import SearchIndex
+from app.application.queries.template_feed import TemplateFeed
+from app.application.queries.template_reader import TemplateReader
+from app.domain.identifiers import IdGenerator, UUID4Generator, UUID7Generator
 from app.domain.repositories.unit_of_work import AbstractUnitOfWork
-from app.infrastructure.persistence.unit_of_work_mock import UnitOfWorkMock
+from app.domain.value_objects.template_limits import TemplateLimits
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_cache import TemplateCache
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+from app.infrastructure.persistence.write_ahead_log import WriteAheadLog
+from app.infrastructure.serialization.compression import Compressor
+from app.infrastructure.settings import Settings
+from app.infrastructure.workers.command_queue import CommandQueue, JobJournal
+from app.infrastructure.workers.process_pool import ProcessPoolService
+from app.infrastructure.workers.write_limiter import WriteLimiter
+
+
+def create_storage(settings: Settings) -> InMemoryTemplateStore | SQLiteDatabase:
+    """Build the storage of the configured persistence backend; not yet open."""
+    if settings.persistence_backend == "sqlite":
+        return SQLiteDatabase(
+            settings.sqlite_path,
+            readers=settings.sqlite_readers,
+            statement_cache=settings.sqlite_statement_cache,
+        )
+
+    wal = None
+    if settings.wal_directory:
+        wal = WriteAheadLog(
+            settings.wal_directory,
+            group_commit_window=settings.wal_group_commit_window,
+            checkpoint_interval=settings.wal_checkpoint_interval,
+        )
+    return InMemoryTemplateStore(wal=wal)
+
+
+def create_template_cache(
+    settings: Settings, storage: InMemoryTemplateStore | SQLiteDatabase
+) -> TemplateCache | None:
+    """Build the template cache for a SQLite storage, fed by its change feed.
+
+    The in-memory store already keeps hydrated templates, so it gets none.
+    """
+    if not isinstance(storage, SQLiteDatabase) or not settings.template_cache_bytes:
+        return None
+    cache = TemplateCache(
+        settings.template_cache_bytes, ttl=settings.template_cache_ttl
+    )
+    storage.changes.subscribe(cache.on_changes)
+    return cache
+
+
+def create_template_feed(
+    settings: Settings, storage: InMemoryTemplateStore | SQLiteDatabase
+) -> TemplateFeed:
+    """Build the feed of template deltas; over SQLite, it also announces the
+    versions other processes commit, from the change feed."""
+    feed = TemplateFeed(
+        max_queued=settings.feed_max_queued, keepalive=settings.feed_keepalive
+    )
+    if isinstance(storage, SQLiteDatabase):
+        storage.changes.subscribe(feed.on_changes)
+    return feed
+
+
+def create_process_pool(settings: Settings) -> ProcessPoolService:
+    """Build the process pool for CPU-bound jobs; not yet started."""
+    return ProcessPoolService(
+        max_workers=settings.process_pool_workers,
+        max_pending=settings.process_pool_max_pending,
+        queue_timeout=settings.process_pool_queue_timeout,
+    )
+
+
+def create_id_generator(settings: Settings) -> IdGenerator:
+    if settings.id_version == "uuid4":
+        return UUID4Generator()
+    return UUID7Generator()
+
+
+def create_template_limits(settings: Settings) -> TemplateLimits:
+    return TemplateLimits(
+        max_sections=settings.template_max_sections,
+        max_questions_per_section=settings.template_max_questions_per_section,
+        max_options_per_question=settings.template_max_options_per_question,
+        max_title_length=settings.template_max_title_length,
+        max_text_length=settings.template_max_text_length,
+    )
+
+
+def create_compressor(settings: Settings) -> Compressor:
+    return Compressor(min_size=settings.compression_min_size)
+
+
+def create_template_reader(
+    settings: Settings, state: State, compressor: Compressor
+) -> TemplateReader:
+    """Build the template reader over the storage on `state`, compressing
+    the published templates it keeps."""
+    return TemplateReader(
+        partial(create_unit_of_work, state),
+        compress=compressor.encode_all,
+        max_bytes=settings.published_cache_bytes,
+    )
+
+
+def create_write_limiter(settings: Settings) -> WriteLimiter:
+    return WriteLimiter(
+        max_concurrent=settings.write_max_concurrent,
+        max_queued=settings.write_max_queued,
+        queue_timeout=settings.write_queue_timeout,
+    )
+
+
+def create_command_queue(settings: Settings, state: State) -> CommandQueue:
+    """Build the queue of background commands, each run in its own unit of
+    work over the storage on `state`; not yet started."""
+
+    async def execute(command: Command) -> dict | None:
+        uow = create_unit_of_work(state)
+        async with uow:
+            bus = create_command_bus(uow, state.template_feed, state.template_limits)
+            result = await bus.execute(command)
+        template_id = getattr(result, "id", None)
+        return {"template_id": str(template_id)} if template_id else None
+
+    journal = None
+    if settings.command_journal_path:
+        journal = JobJournal(settings.command_journal_path)
+    return CommandQueue(
+        execute,
+        COMMAND_HANDLERS,
+        workers=settings.command_workers,
+        max_queued=settings.command_max_queued,
+        retention=settings.command_job_retention,
+        journal=journal,
+    )
+
+
+# Request dependencies are coroutines, even those that do not await: FastAPI
+# runs plain functions in its thread pool, a thread hop per dependency.
+async def get_settings(request: Request) -> Settings:
+    return request.app.state.settings
+
+
+def create_unit_of_work(state: State) -> AbstractUnitOfWork:
+    """Unit of work over the storage the lifespan opened on `state`."""
+    if isinstance(state.storage, SQLiteDatabase):
+        return SQLiteUnitOfWork(state.storage, state.template_cache, state.id_generator)
+    return InMemoryUnitOfWork(state.storage, state.id_generator)
+
+
+async def get_uow(request: Request) -> AbstractUnitOfWork:
+    return create_unit_of_work(request.app.state)
+
+
+async def get_template_limits(request: Request) -> TemplateLimits:
+    return request.app.state.template_limits
+
+
+async def get_template_reader(request: Request) -> TemplateReader:
+    return request.app.state.template_reader
+
+
+async def get_compressor(request: Request) -> Compressor:
+    return request.app.state.compressor
+
+
+async def get_template_feed(request: Request) -> TemplateFeed:
+    return request.app.state.template_feed
+
+
+async def get_search_index(request: Request) -> SearchIndex:
+    return request.app.state.search_index
+
+
+async def admit_write(request: Request) -> AsyncIterator[None]:
+    """Hold a write slot for the duration of the request; the wait for it is
+    profiled as `admission`."""
+    async with AsyncExitStack() as stack:
+        with phase("admission"):
+            await stack.enter_async_context(request.app.state.write_limiter.slot())
+        yield
+
+
+async def get_process_pool(request: Request) -> ProcessPoolService:
+    return request.app.state.process_pool
+
+
+async def get_command_queue(request: Request) -> CommandQueue:
+    return request.app.state.command_queue
+
 
+async def async_command_queue(request: Request) -> CommandQueue | None:
+    """The command queue if the client asked for `Prefer: respond-async`.
 
-def get_uow() -> AbstractUnitOfWork:
-    return UnitOfWorkMock()
+    Without a journal, queued jobs would be lost at shutdown after being
+    accepted, so the preference is not applied and the command runs in the
+    request.
+    """
+    queue = request.app.state.command_queue
+    if queue.journal is None:
+        return None
+    preferences = request.headers.get("prefer", "")
+    if any(p.strip() == "respond-async" for p in preferences.split(",")):
+        return queue
+    return None
@@ -0,0 +1,15 @@
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.identifiers import IdGenerator
+
+
+def assign_ids(template: TemplateAggregate, ids: IdGenerator) -> None:
+    """Give new sections and questions their IDs, allocated in one batch, and
+    order keys if they lack them."""
+    missing = []
+    for section in template.sections:
+        if not section.id:
+            missing.append(section)
+        missing.extend(question for question in section.questions if not question.id)
+    for entity, entity_id in zip(missing, ids.batch(len(missing))):
+        entity.id = entity_id
+    template.ensure_order_keys()
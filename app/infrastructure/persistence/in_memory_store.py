@@ -0,0 +1,196 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Iterator, Mapping
+from uuid import UUID
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.exceptions.template import ConcurrentModificationError
+
+from .write_ahead_log import WriteAheadLog, Writes
+
+# Called with the writes of each commit, once applied and durable.
+CommitListener = Callable[[Writes], None]
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryTemplateStore:
+    """Committed templates shared by every `InMemoryUnitOfWork` of an app.
+
+    Stored templates are snapshots: they are never handed out directly, only
+    as copy-on-write working copies, so a unit of work can mutate what it
+    loaded without other units of work observing it before commit. Each
+    template carries a version number, bumped on every committed write.
+
+    The store is confined to the event loop: `apply` runs without awaiting,
+    which is what makes a commit atomic.
+
+    With a `WriteAheadLog`, `open` recovers the committed templates from disk
+    and every applied commit is logged; `commit` returns once it is durable.
+    Units of work may read a commit between its application and its write;
+    if the write fails, the commits not yet durable are rolled back, their
+    `commit` raises `WriteAheadLogError`, and the store refuses further
+    commits. Listeners registered with `subscribe` only see durable commits.
+    """
+
+    def __init__(self, wal: WriteAheadLog | None = None):
+        self._templates: dict[UUID, TemplateAggregate] = {}
+        self._versions: dict[UUID, int] = {}
+        self._listeners: list[CommitListener] = []
+        # Commits applied but not yet durable, in LSN order, with what each
+        # write replaced: (LSN, writes, ID -> (template or None, version)).
+        self._undurable: deque[tuple[int, Writes, Writes]] = deque()
+        self.wal = wal
+
+    def subscribe(self, listener: CommitListener) -> None:
+        self._listeners.append(listener)
+
+    async def open(self) -> None:
+        """Recover templates from the write-ahead log and start logging."""
+        if self.wal is None:
+            return
+        recovered = await asyncio.to_thread(self.wal.recover)
+        for template_id, (template, version) in recovered.items():
+            self._templates[template_id] = template
+            self._versions[template_id] = version
+        await self.wal.start(self.snapshot)
+
+    async def close(self) -> None:
+        """Flush the write-ahead log and write a final checkpoint."""
+        if self.wal is not None:
+            await self.wal.close()
+
+    def snapshot(
+        self, lsn: int | None = None
+    ) -> dict[UUID, tuple[TemplateAggregate, int]]:
+        """Every committed template with its version, as of now or, with a
+        write-ahead log, as of the commit logged at `lsn`."""
+        state = {
+            template_id: (template, self._versions[template_id])
+            for template_id, template in self._templates.items()
+        }
+        if lsn is not None:
+            for logged_lsn, _, previous in reversed(self._undurable):
+                if logged_lsn <= lsn:
+                    break
+                _restore(state, previous)
+        return state
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    def __contains__(self, template_id: UUID) -> bool:
+        return template_id in self._templates
+
+    def ids(self) -> Iterator[UUID]:
+        return iter(list(self._templates))
+
+    def get(self, template_id: UUID) -> tuple[TemplateAggregate, int] | None:
+        """Return the committed snapshot of a template and its version."""
+        template = self._templates.get(template_id)
+        if template is None:
+            return None
+        return template, self._versions[template_id]
+
+    def version(self, template_id: UUID) -> int:
+        """Version of a template; 0 if it does not exist."""
+        return self._versions.get(template_id, 0)
+
+    def put(self, template: TemplateAggregate) -> None:
+        """Store a template directly, outside of any unit of work."""
+        self.apply({template.id: template}, {})
+
+    async def commit(
+        self,
+        writes: Mapping[UUID, TemplateAggregate | None],
+        read_versions: Mapping[UUID, int],
+    ) -> None:
+        """Apply staged writes and wait until they are durable."""
+        durable = self.apply(writes, read_versions)
+        if durable is not None:
+            await asyncio.shield(durable)
+
+    def apply(
+        self,
+        writes: Mapping[UUID, TemplateAggregate | None],
+        read_versions: Mapping[UUID, int],
+    ) -> asyncio.Future | None:
+        """Atomically apply staged writes; `None` deletes a template.
+
+        Raises `ConcurrentModificationError`, applying nothing, if any written
+        template changed since the version it was read at. With a write-ahead
+        log, returns a future resolved once the writes are durable; units of
+        work may read them before that, listeners are only told then.
+        """
+        if self.wal is not None:
+            self.wal.check_writable()
+        for template_id in writes:
+            expected = read_versions.get(template_id)
+            if expected is not None and self.version(template_id) != expected:
+                raise ConcurrentModificationError(
+                    f"Template {template_id} was modified concurrently"
+                )
+
+        logged, previous = {}, {}
+        for template_id, template in writes.items():
+            previous[template_id] = (
+                self._templates.get(template_id),
+                self.version(template_id),
+            )
+            if template is None:
+                self._templates.pop(template_id, None)
+                logged[template_id] = (None, self._versions.pop(template_id, 0))
+                continue
+            snapshot = template.copy_on_write()
+            version = self.version(template_id) + 1
+            self._templates[template_id] = snapshot
+            self._versions[template_id] = version
+            logged[template_id] = (snapshot, version)
+
+        if self.wal is None:
+            self._notify(logged)
+            return None
+        durable = self.wal.append(logged)
+        self._undurable.append((self.wal.last_lsn, logged, previous))
+        durable.add_done_callback(self._on_durable)
+        return durable
+
+    def _on_durable(self, durable: asyncio.Future) -> None:
+        if durable.exception() is not None:
+            self._roll_back()
+            return
+        lsn = durable.result()
+        while self._undurable and self._undurable[0][0] <= lsn:
+            _, logged, _ = self._undurable.popleft()
+            self._notify(logged)
+
+    def _roll_back(self) -> None:
+        """Undo the commits the write-ahead log failed to write, newest first."""
+        while self._undurable:
+            _, _, previous = self._undurable.pop()
+            for template_id, (template, version) in previous.items():
+                if template is None:
+                    self._templates.pop(template_id, None)
+                    self._versions.pop(template_id, None)
+                else:
+                    self._templates[template_id] = template
+                    self._versions[template_id] = version
+
+    def _notify(self, logged: Writes) -> None:
+        for listener in self._listeners:
+            try:
+                listener(logged)
+            except Exception:
+                logger.exception("Commit listener failed")
+
+
+def _restore(
+    state: dict[UUID, tuple[TemplateAggregate, int]], previous: Writes
+) -> None:
+    """Put back in `state` what the writes of one commit replaced."""
+    for template_id, (template, version) in previous.items():
+        if template is None:
+            state.pop(template_id, None)
+        else:
+            state[template_id] = (template, version)
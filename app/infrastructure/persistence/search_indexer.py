@@ -0,0 +1,137 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Iterable
+from uuid import UUID
+
+from app.application.queries.search_index import SearchIndex
+from app.domain.aggregates.template import TemplateAggregate
+
+from .in_memory_store import InMemoryTemplateStore
+from .sqlite_database import SQLiteDatabase
+from .template_repository_sqlite import load_templates
+from .write_ahead_log import Writes
+
+logger = logging.getLogger(__name__)
+
+# Templates indexed between two yields to the event loop.
+BATCH = 500
+
+
+class SearchIndexer:
+    """Keeps a `SearchIndex` in step with the committed templates of a storage.
+
+    Indexing runs in a background task, off the commit path. Over the
+    in-memory store, each commit queues the templates it wrote, and a
+    template committed several times before the task runs is indexed once,
+    at its latest version. Over SQLite, the change feed names the templates
+    committed by any process; they are then loaded through the reader pool
+    and indexed, about one poll interval after their commit. The initial
+    build runs in the background too, so searches meanwhile only see the
+    templates indexed so far.
+    """
+
+    def __init__(
+        self, index: SearchIndex, storage: InMemoryTemplateStore | SQLiteDatabase
+    ):
+        self.index = index
+        self.storage = storage
+        self.ready = asyncio.Event()
+        self._stale: set[UUID] = set()
+        # Latest committed state of the templates to index from the store.
+        self._written: dict[UUID, tuple[TemplateAggregate | None, int]] = {}
+        self._rebuild = False
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if isinstance(self.storage, InMemoryTemplateStore):
+            self.storage.subscribe(self._on_writes)
+            snapshot = self.storage.snapshot().values()
+            self._task = asyncio.create_task(self._follow_store(snapshot))
+        else:
+            self.storage.changes.subscribe(self._on_changes)
+            self._task = asyncio.create_task(self._follow_sqlite())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_writes(self, writes: Writes) -> None:
+        self._written.update(writes)
+        self._wake.set()
+
+    def _on_changes(self, changes: list[tuple[UUID, int]] | None) -> None:
+        if changes is None:
+            self._rebuild = True
+        else:
+            for template_id, version in changes:
+                if version == 0:
+                    self.index.remove(template_id)
+                    self._stale.discard(template_id)
+                elif self.index.version(template_id) < version:
+                    self._stale.add(template_id)
+        self._wake.set()
+
+    async def _build(self, templates: Iterable[tuple[TemplateAggregate, int]]) -> None:
+        for i, (template, version) in enumerate(templates, 1):
+            self.index.add(template, version)
+            if i % BATCH == 0:
+                await asyncio.sleep(0)
+        self.ready.set()
+
+    async def _follow_store(
+        self, snapshot: Iterable[tuple[TemplateAggregate, int]]
+    ) -> None:
+        await self._build(snapshot)
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            written, self._written = self._written, {}
+            for i, (template_id, (template, version)) in enumerate(written.items(), 1):
+                self._index(template_id, template, version)
+                if i % BATCH == 0:
+                    await asyncio.sleep(0)
+
+    async def _follow_sqlite(self) -> None:
+        await self._build_from_sqlite()
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            try:
+                if self._rebuild:
+                    self._rebuild = False
+                    await self._build_from_sqlite()
+                while self._stale:
+                    template_id = self._stale.pop()
+                    loaded = await self.storage.read(
+                        partial(load_templates, template_id=template_id)
+                    )
+                    self._index(template_id, *(loaded[0] if loaded else (None, 0)))
+            except Exception:
+                logger.exception("Updating the search index failed")
+
+    def _index(
+        self, template_id: UUID, template: TemplateAggregate | None, version: int
+    ) -> None:
+        """Index `template`, or remove it when None. A failure is logged and
+        only skips this template, not the rest of its batch."""
+        try:
+            if template is None:
+                self.index.remove(template_id)
+            else:
+                self.index.add(template, version)
+        except Exception:
+            logger.exception("Indexing template %s failed", template_id)
+
+    async def _build_from_sqlite(self) -> None:
+        loaded = await self.storage.read(load_templates)
+        present = {template.id for template, _ in loaded}
+        for template_id in [i for i in self.index.ids() if i not in present]:
+            self.index.remove(template_id)
+        await self._build(loaded)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import sqlite3
+from typing import TYPE_CHECKING, Callable
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from .sqlite_database import SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+# Rows kept in the `changes` table; a process lagging further behind than
+# this is told to invalidate everything.
+CHANGE_RETENTION = 10_000
+
+# Called with the (template ID, version) pairs committed since the last call,
+# version 0 meaning deleted, or with None when changes were missed.
+ChangeListener = Callable[[list[tuple[UUID, int]] | None], None]
+
+_MAX_SEQUENCE = "SELECT coalesce(max(seq), 0) FROM changes"
+_CHANGES_SINCE = "SELECT seq, template_id, version FROM changes WHERE seq > ?"
+
+
+class SQLiteChangeFeed:
+    """Cross-process notifications of template commits to a SQLite database.
+
+    Every write transaction records the templates it changed in the `changes`
+    table. Each process polls `PRAGMA data_version`, which only moves when
+    another connection committed, and reads the new rows when it does, so an
+    idle feed costs one pragma per interval.
+    """
+
+    def __init__(self, database: "SQLiteDatabase", interval: float = 0.05):
+        self.database = database
+        self.interval = interval
+        self.last_sequence = 0
+        self._listeners: list[ChangeListener] = []
+        self._connection: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self._task: asyncio.Task | None = None
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        self._connection = await asyncio.to_thread(
+            self.database.connect, read_only=True
+        )
+        self.last_sequence = await asyncio.to_thread(self._max_sequence)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def poll(self) -> None:
+        """Deliver changes committed since the last poll to the listeners."""
+        changes = await asyncio.to_thread(self._read_changes)
+        if changes == []:
+            return
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception:
+                logger.exception("Change listener failed")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except sqlite3.Error:
+                logger.exception("Polling the change feed failed")
+
+    def _max_sequence(self) -> int:
+        return self._connection.execute(_MAX_SEQUENCE).fetchone()[0]
+
+    def _read_changes(self) -> list[tuple[UUID, int]] | None:
+        data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return []
+        self._data_version = data_version
+
+        rows = self._connection.execute(_CHANGES_SINCE, (self.last_sequence,))
+        rows = rows.fetchall()
+        if not rows:
+            return []
+        missed = rows[0][0] > self.last_sequence + 1
+        self.last_sequence = rows[-1][0]
+        if missed:
+            return None
+        return [(UUID(bytes=template_id), version) for _, template_id, version in rows]
@@ -0,0 +1,275 @@
+import asyncio
+import itertools
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from app.domain.value_objects.option_set import OptionSet, option_set_id, option_sets
+from app.domain.value_objects.order_key import keys_between
+
+from .sqlite_change_feed import SQLiteChangeFeed
+
+T = TypeVar("T")
+
+INSERT_OPTION_SET = (
+    'INSERT OR IGNORE INTO option_sets (id, position, label, value, "order")'
+    " VALUES (?, ?, ?, ?, ?)"
+)
+
+OPTION_SETS_SCHEMA = """
+-- Option lists shared by the questions having them, identified by the hash of
+-- their content (`option_set_id`); an empty set has no rows. Sets are never
+-- deleted, as they are few and shared across templates.
+CREATE TABLE IF NOT EXISTS option_sets (
+    id BLOB NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    value TEXT NOT NULL,
+    "order" INTEGER NOT NULL,
+    PRIMARY KEY (id, position)
+) WITHOUT ROWID;
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    id BLOB PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    revision_of BLOB,
+    version INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    template_id BLOB NOT NULL REFERENCES templates (id) ON DELETE CASCADE,
+    id BLOB NOT NULL,
+    order_key TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    PRIMARY KEY (template_id, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS questions (
+    template_id BLOB NOT NULL,
+    id BLOB NOT NULL,
+    section_id BLOB NOT NULL,
+    order_key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    type TEXT NOT NULL,
+    is_required INTEGER NOT NULL,
+    -- NULL for a question without options.
+    option_set_id BLOB,
+    PRIMARY KEY (template_id, id),
+    FOREIGN KEY (template_id, section_id)
+        REFERENCES sections (template_id, id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS questions_by_section
+    ON questions (template_id, section_id, order_key);
+
+-- Templates written by each commit, for the change feeds of other processes;
+-- version 0 marks a deletion.
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    template_id BLOB NOT NULL,
+    version INTEGER NOT NULL
+);
+""" + OPTION_SETS_SCHEMA
+
+
+def option_set_rows(set_id: bytes, options: OptionSet) -> list[tuple]:
+    """Rows of `options` in the `option_sets` table."""
+    return [
+        (set_id, position, option.label, option.value, option.order)
+        for position, option in enumerate(options)
+    ]
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """Bring tables created by earlier versions to the layout of `SCHEMA`.
+
+    Sections and questions used to be ordered by integer positions; they get
+    order keys in the same order. Options used to be stored per question;
+    equal ones become a single option set.
+    """
+    _migrate_positions(connection)
+    _migrate_options(connection)
+
+
+def _migrate_positions(connection: sqlite3.Connection) -> None:
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(sections)")}
+    if "position" not in columns:
+        return
+    connection.execute("DROP INDEX IF EXISTS questions_by_section")
+    for table, parent in [
+        ("sections", "template_id"),
+        ("questions", "template_id, section_id"),
+    ]:
+        connection.execute(
+            f"ALTER TABLE {table} ADD COLUMN order_key TEXT NOT NULL DEFAULT ''"
+        )
+        rows = connection.execute(
+            f"SELECT {parent}, id FROM {table} ORDER BY {parent}, position"
+        ).fetchall()
+        updates = []
+        for _, siblings in itertools.groupby(rows, key=lambda row: row[:-1]):
+            siblings = list(siblings)
+            keys = keys_between(None, None, len(siblings))
+            updates += [(k, row[0], row[-1]) for k, row in zip(keys, siblings)]
+        connection.executemany(
+            f"UPDATE {table} SET order_key = ? WHERE template_id = ? AND id = ?",
+            updates,
+        )
+        connection.execute(f"ALTER TABLE {table} DROP COLUMN position")
+
+
+def _migrate_options(connection: sqlite3.Connection) -> None:
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(questions)")}
+    if "has_options" not in columns:
+        return
+    connection.execute(OPTION_SETS_SCHEMA)
+    connection.execute("ALTER TABLE questions ADD COLUMN option_set_id BLOB")
+    rows = connection.execute(
+        'SELECT template_id, question_id, label, value, "order" FROM options'
+        " ORDER BY template_id, question_id, position"
+    ).fetchall()
+    stored, updates = set(), []
+    for (template_id, question_id), options in itertools.groupby(
+        rows, key=lambda row: row[:2]
+    ):
+        options = option_sets.from_rows(row[2:] for row in options)
+        set_id = option_set_id(options)
+        if set_id not in stored:
+            stored.add(set_id)
+            connection.executemany(INSERT_OPTION_SET, option_set_rows(set_id, options))
+        updates.append((set_id, template_id, question_id))
+    connection.executemany(
+        "UPDATE questions SET option_set_id = ? WHERE template_id = ? AND id = ?",
+        updates,
+    )
+    # Questions whose options were an empty list.
+    connection.execute(
+        "UPDATE questions SET option_set_id = ?"
+        " WHERE has_options AND option_set_id IS NULL",
+        (option_set_id(()),),
+    )
+    connection.execute("ALTER TABLE questions DROP COLUMN has_options")
+    connection.execute("DROP TABLE options")
+
+
+class SQLiteDatabase:
+    """SQLite database in WAL mode with one writer and a pool of readers.
+
+    Writes run on a dedicated thread owning the only writer connection, so
+    write transactions never contend for SQLite's write lock. Reads run on
+    reader connections borrowed from a pool; in WAL mode they see the last
+    committed state without blocking the writer. Each connection keeps its
+    own cache of prepared statements, reused across requests.
+
+    Several processes may open the same file: commits are serialized by
+    SQLite's lock, and `changes` tells each process what the others wrote.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        readers: int = 4,
+        statement_cache: int = 256,
+        change_poll_interval: float = 0.05,
+    ):
+        self.path = path
+        self.readers = readers
+        self.statement_cache = statement_cache
+        self.changes = SQLiteChangeFeed(self, interval=change_poll_interval)
+        self._writer_thread = ThreadPoolExecutor(1, thread_name_prefix="sqlite-w")
+        self._writer: sqlite3.Connection | None = None
+        self._reader_pool: asyncio.Queue[sqlite3.Connection] | None = None
+        self._all_readers: list[sqlite3.Connection] = []
+
+    async def open(self) -> None:
+        """Create the schema and open every connection."""
+        loop = asyncio.get_running_loop()
+        self._writer = await loop.run_in_executor(self._writer_thread, self.connect)
+        await loop.run_in_executor(
+            self._writer_thread,
+            self._in_transaction,
+            self._writer,
+            migrate,
+            "BEGIN IMMEDIATE",
+        )
+        await loop.run_in_executor(
+            self._writer_thread, self._writer.executescript, SCHEMA
+        )
+
+        self._reader_pool = asyncio.Queue()
+        for _ in range(self.readers):
+            connection = await asyncio.to_thread(self.connect, read_only=True)
+            self._all_readers.append(connection)
+            self._reader_pool.put_nowait(connection)
+        await self.changes.start()
+
+    async def close(self) -> None:
+        """Close every connection; pending writes complete first."""
+        await self.changes.stop()
+        loop = asyncio.get_running_loop()
+        if self._writer is not None:
+            await loop.run_in_executor(self._writer_thread, self._writer.close)
+            self._writer = None
+        for connection in self._all_readers:
+            connection.close()
+        self._all_readers.clear()
+        self._writer_thread.shutdown()
+
+    def connect(self, read_only: bool = False) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+        )
+        connection.execute("PRAGMA busy_timeout = 5000")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        if read_only:
+            connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    async def read(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn` on a pooled reader connection inside one read transaction."""
+        connection = await self._reader_pool.get()
+        task = asyncio.ensure_future(
+            asyncio.to_thread(self._in_transaction, connection, fn, "BEGIN")
+        )
+        # The connection returns to the pool only once its thread is done,
+        # even if the caller is cancelled first.
+        task.add_done_callback(lambda _: self._reader_pool.put_nowait(connection))
+        return await asyncio.shield(task)
+
+    async def write(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run `fn` on the writer connection inside one write transaction."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._writer_thread,
+            self._in_transaction,
+            self._writer,
+            fn,
+            "BEGIN IMMEDIATE",
+        )
+
+    @staticmethod
+    def _in_transaction(
+        connection: sqlite3.Connection,
+        fn: Callable[[sqlite3.Connection], T],
+        begin: str,
+    ) -> T:
+        connection.execute(begin)
+        try:
+            result = fn(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, List
+from uuid import UUID
+
+from app.application.profiling import profiled
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.exceptions.template import TemplateNotFoundError
+from app.domain.repositories.template import TemplateRepository
+
+from .entity_ids import assign_ids
+
+if TYPE_CHECKING:
+    from .unit_of_work_in_memory import InMemoryUnitOfWork
+
+
+class InMemoryTemplateRepository(TemplateRepository):
+    """Template repository reading and staging through the unit of work that
+    owns it."""
+
+    __slots__ = ("uow",)
+
+    def __init__(self, uow: "InMemoryUnitOfWork"):
+        self.uow = uow
+
+    @profiled("repository")
+    async def create(self, entity: TemplateAggregate) -> TemplateAggregate:
+        uow = self.uow
+        entity.id = uow.ids.new()
+        assign_ids(entity, uow.ids)
+        uow.identity_map[entity.id] = entity
+        uow.staged[entity.id] = entity
+        return entity
+
+    @profiled("repository")
+    async def get_by_id(self, entity_id: UUID) -> TemplateAggregate | None:
+        uow = self.uow
+        template = uow.identity_map.get(entity_id)
+        if template is not None:
+            return template
+
+        stored = None if entity_id in uow.staged else uow.store.get(entity_id)
+        if stored is None:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+
+        template, version = stored
+        template = template.copy_on_write()
+        uow.identity_map[entity_id] = template
+        uow.read_versions[entity_id] = version
+        return template
+
+    @profiled("repository")
+    async def get_version(self, entity_id: UUID) -> int:
+        uow = self.uow
+        version = uow.read_versions.get(entity_id)
+        if version is None:
+            version = 0 if entity_id in uow.staged else uow.store.version(entity_id)
+        if not version:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+        return version
+
+    @profiled("repository")
+    async def get_all(self) -> List[TemplateAggregate]:
+        uow = self.uow
+        template_ids = dict.fromkeys([*uow.store.ids(), *uow.staged])
+        return [
+            await self.get_by_id(template_id)
+            for template_id in template_ids
+            if uow.staged.get(template_id, True) is not None
+        ]
+
+    @profiled("repository")
+    async def update(self, entity: TemplateAggregate) -> TemplateAggregate:
+        uow = self.uow
+        if uow.identity_map.get(entity.id) is not entity:
+            await self.get_by_id(entity.id)
+            uow.identity_map[entity.id] = entity
+
+        assign_ids(entity, uow.ids)
+        uow.staged[entity.id] = entity
+        return entity
+
+    @profiled("repository")
+    async def delete(self, entity_id: UUID) -> bool:
+        uow = self.uow
+        try:
+            await self.get_by_id(entity_id)
+        except TemplateNotFoundError:
+            return False
+
+        del uow.identity_map[entity_id]
+        uow.staged[entity_id] = None
+        return True
@@ -0,0 +1,629 @@
+import itertools
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING, Iterable, List, Mapping
+from uuid import UUID
+
+from app.application.profiling import profiled
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import (
+    ConcurrentModificationError,
+    TemplateNotFoundError,
+)
+from app.domain.repositories.template import TemplateRepository
+from app.domain.value_objects.option_set import OptionSet, option_set_id, option_sets
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_projection import TemplateProjection
+from app.domain.value_objects.template_status import TemplateStatus
+
+from .entity_ids import assign_ids
+from .sqlite_change_feed import CHANGE_RETENTION
+from .sqlite_database import INSERT_OPTION_SET, option_set_rows
+
+if TYPE_CHECKING:
+    from .unit_of_work_sqlite import SQLiteUnitOfWork
+
+# Statements are module constants so every connection's statement cache
+# prepares each of them once.
+_SELECT_TEMPLATES = (
+    "SELECT id, title, description, status, created_at, updated_at, revision_of,"
+    " version FROM templates"
+)
+_SELECT_SECTIONS = (
+    "SELECT template_id, id, title, description, order_key FROM sections{}"
+    " ORDER BY template_id, order_key"
+)
+_SELECT_QUESTIONS = (
+    "SELECT template_id, section_id, id, text, type, is_required, option_set_id,"
+    " order_key FROM questions{} ORDER BY template_id, section_id, order_key"
+)
+_SELECT_OPTION_SETS = (
+    'SELECT id, label, value, "order" FROM option_sets{} ORDER BY id, position'
+)
+# (templates, sections, questions, option sets) for every template or for one.
+_LOAD_ALL = (
+    _SELECT_TEMPLATES,
+    _SELECT_SECTIONS.format(""),
+    _SELECT_QUESTIONS.format(""),
+    _SELECT_OPTION_SETS.format(""),
+)
+_LOAD_ONE = (
+    _SELECT_TEMPLATES + " WHERE id = ?",
+    _SELECT_SECTIONS.format(" WHERE template_id = ?"),
+    _SELECT_QUESTIONS.format(" WHERE template_id = ?"),
+    _SELECT_OPTION_SETS.format(
+        " WHERE id IN (SELECT option_set_id FROM questions WHERE template_id = ?)"
+    ),
+)
+
+_SELECT_VERSION = "SELECT version FROM templates WHERE id = ?"
+# Parts of one template for a projection, optionally of one section.
+_SELECT_PROJECTED_SECTIONS = _SELECT_SECTIONS.format(" WHERE template_id = ?{}")
+_SELECT_PROJECTED_QUESTIONS = _SELECT_QUESTIONS.format(" WHERE template_id = ?{}")
+_SELECT_PROJECTED_OPTION_SETS = _SELECT_OPTION_SETS.format(
+    " WHERE id IN (SELECT option_set_id FROM questions WHERE template_id = ?{})"
+)
+_SELECT_QUESTION_COUNTS = (
+    "SELECT section_id, COUNT(*) FROM questions WHERE template_id = ?{}"
+    " GROUP BY section_id"
+)
+
+_INSERT_TEMPLATE = (
+    "INSERT INTO templates (id, title, description, status, created_at,"
+    " updated_at, revision_of, version) VALUES (?, ?, ?, ?, ?, ?, ?, 1)"
+)
+_UPDATE_TEMPLATE = (
+    "UPDATE templates SET title = ?, description = ?, status = ?, created_at = ?,"
+    " updated_at = ?, revision_of = ?, version = version + 1"
+    " WHERE id = ? AND version = ?"
+)
+_DELETE_TEMPLATE = "DELETE FROM templates WHERE id = ? AND version = ?"
+_DELETE_SECTIONS = "DELETE FROM sections WHERE template_id = ?"
+_INSERT_SECTION = (
+    "INSERT INTO sections (template_id, id, order_key, title, description)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+_UPDATE_SECTION = (
+    "UPDATE sections SET order_key = ?, title = ?, description = ?"
+    " WHERE template_id = ? AND id = ?"
+)
+_DELETE_SECTION = "DELETE FROM sections WHERE template_id = ? AND id = ?"
+_INSERT_QUESTION = (
+    "INSERT INTO questions (template_id, id, section_id, order_key, text, type,"
+    " is_required, option_set_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_QUESTION = (
+    "UPDATE questions SET order_key = ?, text = ?, type = ?, is_required = ?,"
+    " option_set_id = ? WHERE template_id = ? AND id = ?"
+)
+_DELETE_QUESTION = "DELETE FROM questions WHERE template_id = ? AND id = ?"
+_INSERT_CHANGE = "INSERT INTO changes (template_id, version) VALUES (?, ?)"
+_PRUNE_CHANGES = "DELETE FROM changes WHERE seq <= ?"
+
+
+def _uuid(value: bytes | None) -> UUID | None:
+    return None if value is None else UUID(bytes=value)
+
+
+def _bytes(value: UUID | None) -> bytes | None:
+    return None if value is None else value.bytes
+
+
+def load_templates(
+    connection: sqlite3.Connection, template_id: UUID | None = None
+) -> list[tuple[TemplateAggregate, int]]:
+    """Load one template, or all of them, with their versions."""
+    if template_id is None:
+        select_templates, select_sections, select_questions, select_option_sets = (
+            _LOAD_ALL
+        )
+        params = ()
+    else:
+        select_templates, select_sections, select_questions, select_option_sets = (
+            _LOAD_ONE
+        )
+        params = (template_id.bytes,)
+
+    option_sets_by_id = _read_option_sets(
+        connection.execute(select_option_sets, params)
+    )
+    questions = _read_questions(
+        connection.execute(select_questions, params), option_sets_by_id
+    )
+    sections = _read_sections(connection.execute(select_sections, params), questions)
+    return _read_templates(connection.execute(select_templates, params), sections)
+
+
+def load_projection(
+    connection: sqlite3.Connection,
+    template_id: UUID,
+    projection: TemplateProjection,
+    cached_version: int | None = None,
+) -> tuple[TemplateAggregate | None, int, dict[UUID, int] | None] | None:
+    """Load only the parts of a template that `projection` selects.
+
+    Returns the template with its version and, for sections read without
+    their questions, their question counts; only the version if that is
+    `cached_version`; None if the template does not exist.
+    """
+    key = template_id.bytes
+    row = connection.execute(_SELECT_VERSION, (key,)).fetchone()
+    if row is None:
+        return None
+    if row[0] == cached_version:
+        return None, cached_version, None
+
+    params = (key,)
+    where = ""
+    if projection.section_id is not None:
+        params = (key, projection.section_id.bytes)
+        where = " AND section_id = ?"
+    sections, question_counts = {}, None
+    if projection.questions:
+        option_sets_by_id = {}
+        if projection.options:
+            option_sets_by_id = _read_option_sets(
+                connection.execute(_SELECT_PROJECTED_OPTION_SETS.format(where), params)
+            )
+        questions = _read_questions(
+            connection.execute(_SELECT_PROJECTED_QUESTIONS.format(where), params),
+            option_sets_by_id,
+        )
+    else:
+        questions = {}
+        if projection.sections:
+            question_counts = {
+                UUID(bytes=section_id): count
+                for section_id, count in connection.execute(
+                    _SELECT_QUESTION_COUNTS.format(where), params
+                )
+            }
+    if projection.sections:
+        where = "" if projection.section_id is None else " AND id = ?"
+        sections = _read_sections(
+            connection.execute(_SELECT_PROJECTED_SECTIONS.format(where), params),
+            questions,
+        )
+    loaded = _read_templates(connection.execute(_LOAD_ONE[0], (key,)), sections)
+    template, version = loaded[0]
+    return template, version, question_counts
+
+
+def _read_option_sets(rows: Iterable[tuple]) -> dict[bytes, OptionSet]:
+    return {
+        set_id: option_sets.from_rows(row[1:] for row in set_rows)
+        for set_id, set_rows in itertools.groupby(rows, key=lambda row: row[0])
+    }
+
+
+def _read_questions(
+    rows: Iterable[tuple], option_sets_by_id: Mapping[bytes, OptionSet]
+) -> dict[tuple[bytes, bytes], list[QuestionEntity]]:
+    """Questions by (template key, section key); options are read from
+    `option_sets_by_id`, and left out if it is empty."""
+    questions = defaultdict(list)
+    for (
+        key,
+        section_id,
+        raw_id,
+        text,
+        type_,
+        required,
+        set_id,
+        order_key,
+    ) in rows:
+        questions[key, section_id].append(
+            QuestionEntity.model_construct(
+                id=UUID(bytes=raw_id),
+                text=text,
+                type=QuestionType(type_),
+                # An empty option set has no rows.
+                options=None if set_id is None else option_sets_by_id.get(set_id, ()),
+                is_required=bool(required),
+                order_key=order_key,
+            )
+        )
+    return questions
+
+
+def _read_sections(
+    rows: Iterable[tuple], questions: Mapping[tuple[bytes, bytes], list]
+) -> dict[bytes, list[SectionEntity]]:
+    sections = defaultdict(list)
+    for key, raw_id, title, description, order_key in rows:
+        sections[key].append(
+            SectionEntity.model_construct(
+                id=UUID(bytes=raw_id),
+                title=title,
+                description=description,
+                questions=questions.get((key, raw_id), []),
+                order_key=order_key,
+            )
+        )
+    return sections
+
+
+def _read_templates(
+    rows: Iterable[tuple], sections: Mapping[bytes, list[SectionEntity]]
+) -> list[tuple[TemplateAggregate, int]]:
+    loaded = []
+    for row in rows:
+        raw_id, title, description, status, created, updated, revision_of, version = row
+        template = TemplateAggregate.model_construct(
+            id=UUID(bytes=raw_id),
+            title=title,
+            description=description,
+            status=TemplateStatus(status),
+            sections=sections.get(raw_id, []),
+            created_at=datetime.fromisoformat(created),
+            updated_at=datetime.fromisoformat(updated),
+            revision_of=_uuid(revision_of),
+        )
+        loaded.append((template, version))
+    return loaded
+
+
+def load_template_unless_cached(
+    connection: sqlite3.Connection, template_id: UUID, cached_version: int | None
+) -> list[tuple[TemplateAggregate | None, int]]:
+    """Load a template, or only its version if that is `cached_version`."""
+    if cached_version is not None:
+        row = connection.execute(_SELECT_VERSION, (template_id.bytes,)).fetchone()
+        if row is None:
+            return []
+        if row[0] == cached_version:
+            return [(None, cached_version)]
+    return load_templates(connection, template_id)
+
+
+def load_version(connection: sqlite3.Connection, template_id: UUID) -> int | None:
+    row = connection.execute(_SELECT_VERSION, (template_id.bytes,)).fetchone()
+    return None if row is None else row[0]
+
+
+def save_templates(
+    connection: sqlite3.Connection,
+    writes: Mapping[UUID, TemplateAggregate | None],
+    read_versions: Mapping[UUID, int],
+    snapshots: Mapping[UUID, TemplateAggregate] | None = None,
+) -> None:
+    """Apply staged writes; `None` deletes a template.
+
+    A template with a snapshot, as it was read at its version, only has the
+    rows of its changed sections and questions written; others have all
+    their rows replaced.
+
+    Raises `ConcurrentModificationError` if any written template changed since
+    the version it was read at; the caller's transaction is then rolled back.
+    """
+    last_change = None
+    for template_id, template in writes.items():
+        expected = read_versions.get(template_id)
+        snapshot = snapshots.get(template_id) if snapshots else None
+        key = template_id.bytes
+        if template is None:
+            if expected is None:
+                continue  # created and deleted in the same unit of work
+            cursor = connection.execute(_DELETE_TEMPLATE, (key, expected))
+        elif expected is None:
+            cursor = connection.execute(
+                _INSERT_TEMPLATE,
+                (
+                    key,
+                    template.title,
+                    template.description,
+                    template.status.value,
+                    template.created_at.isoformat(),
+                    template.updated_at.isoformat(),
+                    _bytes(template.revision_of),
+                ),
+            )
+        else:
+            cursor = connection.execute(
+                _UPDATE_TEMPLATE,
+                (
+                    template.title,
+                    template.description,
+                    template.status.value,
+                    template.created_at.isoformat(),
+                    template.updated_at.isoformat(),
+                    _bytes(template.revision_of),
+                    key,
+                    expected,
+                ),
+            )
+            if snapshot is None:
+                connection.execute(_DELETE_SECTIONS, (key,))
+        if cursor.rowcount != 1:
+            raise ConcurrentModificationError(
+                f"Template {template_id} was modified concurrently"
+            )
+        if template is not None:
+            if expected is not None and snapshot is not None:
+                _update_children(connection, key, snapshot, template)
+            else:
+                _insert_children(connection, key, template)
+        version = 0 if template is None else (expected or 0) + 1
+        last_change = connection.execute(_INSERT_CHANGE, (key, version)).lastrowid
+    if last_change is not None:
+        connection.execute(_PRUNE_CHANGES, (last_change - CHANGE_RETENTION,))
+
+
+def _insert_children(
+    connection: sqlite3.Connection, key: bytes, template: TemplateAggregate
+) -> None:
+    sections, questions, option_set_ids = [], [], _OptionSetIds()
+    for section in template.sections:
+        sections.append(_section_row(key, section))
+        for question in section.questions:
+            questions.append(_question_row(key, section, question, option_set_ids))
+    connection.executemany(INSERT_OPTION_SET, option_set_ids.rows)
+    connection.executemany(_INSERT_SECTION, sections)
+    connection.executemany(_INSERT_QUESTION, questions)
+
+
+def _update_children(
+    connection: sqlite3.Connection,
+    key: bytes,
+    snapshot: TemplateAggregate,
+    template: TemplateAggregate,
+) -> None:
+    """Write the rows of the sections and questions that differ from `snapshot`.
+
+    Templates are copy-on-write, so an entity or list that is still the very
+    object of the snapshot is unchanged and skipped without comparing it;
+    moving a question, for one, only updates its own row.
+    """
+    sections, questions, option_set_ids = [], [], _OptionSetIds()
+    updated_sections, updated_questions, deleted_questions = [], [], []
+    previous_sections = {section.id: section for section in snapshot.sections}
+    for section in template.sections:
+        previous = previous_sections.pop(section.id, None)
+        if previous is section:
+            continue
+        if previous is None:
+            sections.append(_section_row(key, section))
+            for question in section.questions:
+                questions.append(_question_row(key, section, question, option_set_ids))
+            continue
+        if (section.order_key, section.title, section.description) != (
+            previous.order_key,
+            previous.title,
+            previous.description,
+        ):
+            updated_sections.append(
+                (
+                    section.order_key,
+                    section.title,
+                    section.description,
+                    key,
+                    section.id.bytes,
+                )
+            )
+        if section.questions is previous.questions:
+            continue
+
+        previous_questions = {question.id: question for question in previous.questions}
+        for question in section.questions:
+            before = previous_questions.pop(question.id, None)
+            if before is question:
+                continue
+            if before is None:
+                questions.append(_question_row(key, section, question, option_set_ids))
+                continue
+            updated_questions.append(
+                (
+                    question.order_key,
+                    question.text,
+                    question.type.value,
+                    question.is_required,
+                    option_set_ids.get(question.options),
+                    key,
+                    question.id.bytes,
+                )
+            )
+        deleted_questions += [(key, q.id.bytes) for q in previous_questions.values()]
+    deleted_sections = [(key, s.id.bytes) for s in previous_sections.values()]
+
+    connection.executemany(_DELETE_SECTION, deleted_sections)
+    connection.executemany(_DELETE_QUESTION, deleted_questions)
+    connection.executemany(_UPDATE_SECTION, updated_sections)
+    connection.executemany(_UPDATE_QUESTION, updated_questions)
+    connection.executemany(INSERT_OPTION_SET, option_set_ids.rows)
+    connection.executemany(_INSERT_SECTION, sections)
+    connection.executemany(_INSERT_QUESTION, questions)
+
+
+def _section_row(key: bytes, section: SectionEntity) -> tuple:
+    return (
+        key,
+        section.id.bytes,
+        section.order_key,
+        section.title,
+        section.description,
+    )
+
+
+def _question_row(
+    key: bytes,
+    section: SectionEntity,
+    question: QuestionEntity,
+    option_set_ids: "_OptionSetIds",
+) -> tuple:
+    return (
+        key,
+        question.id.bytes,
+        section.id.bytes,
+        question.order_key,
+        question.text,
+        question.type.value,
+        question.is_required,
+        option_set_ids.get(question.options),
+    )
+
+
+class _OptionSetIds:
+    """IDs of the option sets of the questions written, with the rows storing
+    each set, hashed once per shared set."""
+
+    def __init__(self):
+        self.rows: list[tuple] = []
+        # By identity of the sets, which the written templates keep alive.
+        self._ids: dict[int, bytes] = {}
+        self._stored: set[bytes] = set()
+
+    def get(self, options: OptionSet | None) -> bytes | None:
+        if options is None:
+            return None
+        set_id = self._ids.get(id(options))
+        if set_id is None:
+            set_id = self._ids[id(options)] = option_set_id(options)
+            if set_id not in self._stored:
+                self._stored.add(set_id)
+                self.rows += option_set_rows(set_id, options)
+        return set_id
+
+
+class SQLiteTemplateRepository(TemplateRepository):
+    """Template repository reading through the reader pool of the unit of
+    work that owns it and staging writes in it."""
+
+    __slots__ = ("uow",)
+
+    def __init__(self, uow: "SQLiteUnitOfWork"):
+        self.uow = uow
+
+    @profiled("repository")
+    async def create(self, entity: TemplateAggregate) -> TemplateAggregate:
+        uow = self.uow
+        entity.id = uow.ids.new()
+        assign_ids(entity, uow.ids)
+        uow.identity_map[entity.id] = entity
+        uow.staged[entity.id] = entity
+        return entity
+
+    @profiled("repository")
+    async def get_by_id(self, entity_id: UUID) -> TemplateAggregate | None:
+        uow = self.uow
+        template = uow.identity_map.get(entity_id)
+        if template is not None:
+            return template
+
+        if entity_id in uow.staged:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+        cache = uow.cache
+        cached_version = cache.version(entity_id) if cache is not None else None
+        template, version = await self._load(uow, entity_id, cached_version)
+        if cache is not None:
+            cached = cache.get(entity_id, version)
+            if cached is not None:
+                template = cached
+            else:
+                if template is None:  # evicted while the version was read
+                    template, version = await self._load(uow, entity_id, None)
+                cache.put(template, version)
+        # The template as read, to write only what changes in it.
+        uow.snapshots[entity_id] = template
+        template = template.copy_on_write()
+        uow.identity_map[entity_id] = template
+        uow.read_versions[entity_id] = version
+        return template
+
+    @staticmethod
+    async def _load(
+        uow, entity_id: UUID, cached_version: int | None
+    ) -> tuple[TemplateAggregate | None, int]:
+        loaded = await uow.database.read(
+            partial(
+                load_template_unless_cached,
+                template_id=entity_id,
+                cached_version=cached_version,
+            )
+        )
+        if not loaded:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+        return loaded[0]
+
+    @profiled("repository")
+    async def get_version(self, entity_id: UUID) -> int:
+        uow = self.uow
+        version = uow.read_versions.get(entity_id)
+        if version is None and entity_id not in uow.staged:
+            version = await uow.database.read(
+                partial(load_version, template_id=entity_id)
+            )
+        if version is None:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+        return version
+
+    @profiled("repository")
+    async def get_projection(
+        self, entity_id: UUID, projection: TemplateProjection
+    ) -> dict:
+        uow = self.uow
+        if (
+            projection.is_full
+            or entity_id in uow.identity_map
+            or entity_id in uow.staged
+        ):
+            return await super().get_projection(entity_id, projection)
+
+        cache = uow.cache
+        cached_version = cache.version(entity_id) if cache is not None else None
+        loaded = await uow.database.read(
+            partial(
+                load_projection,
+                template_id=entity_id,
+                projection=projection,
+                cached_version=cached_version,
+            )
+        )
+        if loaded is None:
+            raise TemplateNotFoundError(f"Template {entity_id} not found")
+        template, version, question_counts = loaded
+        if template is None:
+            template = cache.get(entity_id, version)
+            if template is None:  # evicted while the version was read
+                return await self.get_projection(entity_id, projection)
+        return projection.apply(template, question_counts)
+
+    @profiled("repository")
+    async def get_all(self) -> List[TemplateAggregate]:
+        uow = self.uow
+        templates = {}
+        for template, version in await uow.database.read(load_templates):
+            if template.id in uow.staged:
+                continue
+            templates[template.id] = uow.identity_map.setdefault(template.id, template)
+            uow.read_versions.setdefault(template.id, version)
+        for template_id, template in uow.staged.items():
+            if template is not None:
+                templates[template_id] = template
+        return list(templates.values())
+
+    @profiled("repository")
+    async def update(self, entity: TemplateAggregate) -> TemplateAggregate:
+        uow = self.uow
+        if uow.identity_map.get(entity.id) is not entity:
+            await self.get_by_id(entity.id)
+            uow.identity_map[entity.id] = entity
+
+        assign_ids(entity, uow.ids)
+        uow.staged[entity.id] = entity
+        return entity
+
+    @profiled("repository")
+    async def delete(self, entity_id: UUID) -> bool:
+        uow = self.uow
+        try:
+            await self.get_by_id(entity_id)
+        except TemplateNotFoundError:
+            return False
+
+        del uow.identity_map[entity_id]
+        uow.staged[entity_id] = None
+        return True
@@ -0,0 +1,64 @@
+from uuid import UUID
+
+from app.application.profiling import profiled
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.identifiers import DEFAULT_ID_GENERATOR, IdGenerator
+from app.domain.repositories.template import TemplateRepository
+from app.domain.repositories.unit_of_work import AbstractUnitOfWork
+
+from .in_memory_store import InMemoryTemplateStore
+from .template_repository_in_memory import InMemoryTemplateRepository
+
+
+class InMemoryUnitOfWork(AbstractUnitOfWork):
+    """Transaction over an `InMemoryTemplateStore`.
+
+    Writes are staged in the unit of work and applied to the store atomically
+    on `commit`, or dropped on `rollback`. The template repository is built
+    once with the unit of work and only works on it, even when other units of
+    work are entered around or inside it.
+    """
+
+    def __init__(
+        self, store: InMemoryTemplateStore, ids: IdGenerator = DEFAULT_ID_GENERATOR
+    ):
+        self.store = store
+        # Source of the IDs of the templates and entities created.
+        self.ids = ids
+        # Working copies loaded or created in this unit of work, by ID.
+        self.identity_map: dict[UUID, TemplateAggregate] = {}
+        # Store version of each template when it was first loaded.
+        self.read_versions: dict[UUID, int] = {}
+        # Pending writes; `None` marks a deletion.
+        self.staged: dict[UUID, TemplateAggregate | None] = {}
+        self._committed = False
+        self._template = InMemoryTemplateRepository(self)
+
+    async def __aenter__(self) -> "InMemoryUnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            await self.rollback()
+        else:
+            await self.commit()
+
+    @profiled("commit")
+    async def commit(self) -> None:
+        if self.staged:
+            await self.store.commit(self.staged, self.read_versions)
+        self._clear()
+        self._committed = True
+
+    async def rollback(self) -> None:
+        self._clear()
+        self._committed = False
+
+    def _clear(self) -> None:
+        self.identity_map.clear()
+        self.read_versions.clear()
+        self.staged.clear()
+
+    @property
+    def template(self) -> TemplateRepository:
+        return self._template
@@ -0,0 +1,100 @@
+from functools import partial
+from uuid import UUID
+
+from app.application.profiling import profiled
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.identifiers import DEFAULT_ID_GENERATOR, IdGenerator
+from app.domain.repositories.template import TemplateRepository
+from app.domain.repositories.unit_of_work import AbstractUnitOfWork
+
+from .sqlite_database import SQLiteDatabase
+from .template_cache import TemplateCache
+from .template_repository_sqlite import SQLiteTemplateRepository, save_templates
+
+
+class SQLiteUnitOfWork(AbstractUnitOfWork):
+    """Transaction over a `SQLiteDatabase`.
+
+    Loads go through the reader pool; writes are staged and applied in a
+    single write transaction on `commit`, with the same optimistic version
+    checks as `InMemoryUnitOfWork`. A template loaded by `get_by_id` only
+    has its changed sections and questions written back.
+
+    With a `TemplateCache`, loads whose version is unchanged skip hydration;
+    committed templates are cached at their new version, and templates a
+    failed or rolled-back unit of work touched are dropped from the cache.
+    """
+
+    def __init__(
+        self,
+        database: SQLiteDatabase,
+        cache: TemplateCache | None = None,
+        ids: IdGenerator = DEFAULT_ID_GENERATOR,
+    ):
+        self.database = database
+        self.cache = cache
+        self.ids = ids
+        self.identity_map: dict[UUID, TemplateAggregate] = {}
+        self.read_versions: dict[UUID, int] = {}
+        self.snapshots: dict[UUID, TemplateAggregate] = {}
+        self.staged: dict[UUID, TemplateAggregate | None] = {}
+        self._committed = False
+        self._template = SQLiteTemplateRepository(self)
+
+    async def __aenter__(self) -> "SQLiteUnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            await self.rollback()
+        else:
+            await self.commit()
+
+    @profiled("commit")
+    async def commit(self) -> None:
+        if self.staged:
+            try:
+                await self.database.write(
+                    partial(
+                        save_templates,
+                        writes=dict(self.staged),
+                        read_versions=dict(self.read_versions),
+                        snapshots=dict(self.snapshots),
+                    )
+                )
+            except BaseException:
+                self._drop_from_cache()
+                raise
+            self._update_cache()
+        self._clear()
+        self._committed = True
+
+    async def rollback(self) -> None:
+        self._drop_from_cache()
+        self._clear()
+        self._committed = False
+
+    def _update_cache(self) -> None:
+        if self.cache is None:
+            return
+        for template_id, template in self.staged.items():
+            if template is None:
+                self.cache.invalidate(template_id)
+            else:
+                self.cache.put(template, self.read_versions.get(template_id, 0) + 1)
+
+    def _drop_from_cache(self) -> None:
+        if self.cache is None:
+            return
+        for template_id in {*self.identity_map, *self.staged}:
+            self.cache.invalidate(template_id)
+
+    def _clear(self) -> None:
+        self.identity_map.clear()
+        self.read_versions.clear()
+        self.snapshots.clear()
+        self.staged.clear()
+
+    @property
+    def template(self) -> TemplateRepository:
+        return self._template
@@ -0,0 +1,375 @@
+"""Write-ahead log with group commit and checkpoints for `InMemoryTemplateStore`.
+
+On disk, a log directory holds:
+
+    checkpoint.bin        full snapshot of the store as of some LSN
+    wal-<first LSN>.log   log segments; each record is
+                          u32 length | u32 crc32 | u64 LSN | u32 count |
+                          count x (u8 op | 16-byte ID | u64 version |
+                                   u32 size | encoded template)
+
+Committed writes are appended to the current segment by a single writer
+task. Commits arriving while a batch is being written and fsynced, or within
+`group_commit_window` seconds of the first one, share the next write and
+fsync. Every `checkpoint_interval` records the writer starts a new segment
+and a background checkpoint, after which segments fully covered by the
+checkpoint are deleted. Recovery loads the checkpoint, replays later
+records, and truncates a torn record at the tail of the last segment.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Callable, Mapping
+from uuid import UUID
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.infrastructure.serialization.template_codec import (
+    decode_template,
+    encode_template,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAGIC = b"TPLC"
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILE = "checkpoint.bin"
+
+_OP_PUT = 1
+_OP_DELETE = 2
+
+_RECORD_HEADER = struct.Struct("<II")  # length, crc32
+_RECORD_PREFIX = struct.Struct("<QI")  # LSN, entry count
+_ENTRY = struct.Struct("<B16sQI")  # op, ID, version, payload size
+_CHECKPOINT_HEADER = struct.Struct("<4sBQI")  # magic, version, LSN, count
+_CHECKPOINT_ENTRY = struct.Struct("<16sQI")  # ID, version, payload size
+
+# Writes of one commit: template ID -> (template or None if deleted, version).
+Writes = Mapping[UUID, tuple[TemplateAggregate | None, int]]
+Snapshot = dict[UUID, tuple[TemplateAggregate, int]]
+
+
+class WriteAheadLogError(Exception):
+    """Raised when the log cannot be written or recovered."""
+
+    pass
+
+
+def _segment_name(first_lsn: int) -> str:
+    return f"wal-{first_lsn:020d}.log"
+
+
+def _fsync_directory(directory: Path) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _encode_record(lsn: int, writes: Writes) -> bytes:
+    parts = [_RECORD_PREFIX.pack(lsn, len(writes))]
+    for template_id, (template, version) in writes.items():
+        if template is None:
+            parts.append(_ENTRY.pack(_OP_DELETE, template_id.bytes, version, 0))
+            continue
+        payload = encode_template(template)
+        parts.append(_ENTRY.pack(_OP_PUT, template_id.bytes, version, len(payload)))
+        parts.append(payload)
+    body = b"".join(parts)
+    return _RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def _decode_record(body: bytes) -> tuple[int, dict]:
+    lsn, count = _RECORD_PREFIX.unpack_from(body)
+    offset = _RECORD_PREFIX.size
+    writes = {}
+    for _ in range(count):
+        op, raw_id, version, size = _ENTRY.unpack_from(body, offset)
+        offset += _ENTRY.size
+        template = None
+        if op == _OP_PUT:
+            template = decode_template(body[offset : offset + size])
+            offset += size
+        writes[UUID(bytes=raw_id)] = (template, version)
+    return lsn, writes
+
+
+def _read_records(path: Path, truncate_torn_tail: bool):
+    """Yield (LSN, writes) from a segment, stopping at a torn or corrupt record."""
+    data = path.read_bytes()
+    offset = 0
+    while offset < len(data):
+        valid = offset + _RECORD_HEADER.size <= len(data)
+        if valid:
+            length, crc = _RECORD_HEADER.unpack_from(data, offset)
+            start = offset + _RECORD_HEADER.size
+            body = data[start : start + length]
+            valid = len(body) == length and zlib.crc32(body) == crc
+        if not valid:
+            if not truncate_torn_tail:
+                raise WriteAheadLogError(f"Corrupt record in {path} at {offset}")
+            logger.warning("Truncating torn log tail of %s at %d", path, offset)
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+                os.fsync(f.fileno())
+            return
+        yield _decode_record(body)
+        offset = start + length
+
+
+class WriteAheadLog:
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        group_commit_window: float = 0.0,
+        checkpoint_interval: int = 10_000,
+        fsync: bool = True,
+    ):
+        self.directory = Path(directory)
+        self.group_commit_window = group_commit_window
+        self.checkpoint_interval = checkpoint_interval
+        self.fsync = fsync
+
+        self.last_lsn = 0
+        self.durable_lsn = 0
+        self.checkpoint_lsn = 0
+        self.batches_written = 0
+
+        self._snapshot: Callable[[int], Snapshot] | None = None
+        self._pending: list[tuple[int, Writes]] = []
+        self._pending_future: asyncio.Future | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._writer: asyncio.Task | None = None
+        self._checkpoint_task: asyncio.Task | None = None
+        self._segments: list[int] = []
+        self._file = None
+        self._records_since_checkpoint = 0
+        self._failure: BaseException | None = None
+        self._closing = False
+
+    # Recovery
+
+    def recover(self) -> Snapshot:
+        """Rebuild the store contents from the checkpoint and log segments."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self._load_checkpoint()
+        self.last_lsn = self.checkpoint_lsn
+
+        segments = sorted(
+            int(path.stem.removeprefix("wal-"))
+            for path in self.directory.glob("wal-*.log")
+        )
+        for index, first_lsn in enumerate(segments):
+            path = self.directory / _segment_name(first_lsn)
+            is_last = index == len(segments) - 1
+            for lsn, writes in _read_records(path, truncate_torn_tail=is_last):
+                if lsn <= self.last_lsn:
+                    continue
+                for template_id, (template, version) in writes.items():
+                    if template is None:
+                        state.pop(template_id, None)
+                    else:
+                        state[template_id] = (template, version)
+                self.last_lsn = lsn
+                self._records_since_checkpoint += 1
+
+        self.durable_lsn = self.last_lsn
+        self._segments = segments
+        return state
+
+    def _load_checkpoint(self) -> Snapshot:
+        path = self.directory / CHECKPOINT_FILE
+        if not path.exists():
+            return {}
+        data = path.read_bytes()
+        body, (crc,) = data[:-4], struct.unpack("<I", data[-4:])
+        if zlib.crc32(body) != crc:
+            raise WriteAheadLogError(f"Corrupt checkpoint {path}")
+        magic, version, lsn, count = _CHECKPOINT_HEADER.unpack_from(body)
+        if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+            raise WriteAheadLogError(f"Unsupported checkpoint {path}")
+
+        state = {}
+        offset = _CHECKPOINT_HEADER.size
+        for _ in range(count):
+            raw_id, template_version, size = _CHECKPOINT_ENTRY.unpack_from(body, offset)
+            offset += _CHECKPOINT_ENTRY.size
+            template = decode_template(body[offset : offset + size])
+            offset += size
+            state[UUID(bytes=raw_id)] = (template, template_version)
+        self.checkpoint_lsn = lsn
+        return state
+
+    # Writing
+
+    async def start(self, snapshot: Callable[[int], Snapshot]) -> None:
+        """Start the writer; `snapshot(lsn)` returns the store contents as of
+        `lsn`, to checkpoint."""
+        self._snapshot = snapshot
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._open_segment, self.last_lsn + 1)
+        self._writer = asyncio.create_task(self._run())
+        if self._records_since_checkpoint:
+            self._start_checkpoint()
+
+    def check_writable(self) -> None:
+        """Raise `WriteAheadLogError` if commits cannot be logged."""
+        if self._failure is not None:
+            raise WriteAheadLogError("Write-ahead log failed") from self._failure
+        if self._writer is None or self._closing:
+            raise WriteAheadLogError("Write-ahead log is not running")
+
+    def append(self, writes: Writes) -> asyncio.Future:
+        """Log one commit; the returned future resolves once it is durable."""
+        self.check_writable()
+        self.last_lsn += 1
+        self._pending.append((self.last_lsn, writes))
+        if self._pending_future is None:
+            self._pending_future = asyncio.get_running_loop().create_future()
+            self._wakeup.set()
+        return self._pending_future
+
+    async def close(self) -> None:
+        """Flush pending commits, write a final checkpoint and stop."""
+        if self._writer is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._writer
+        self._writer = None
+        if self._checkpoint_task is not None:
+            await self._checkpoint_task
+        if self._failure is None and self._records_since_checkpoint:
+            self._start_checkpoint()
+            await self._checkpoint_task
+        await asyncio.to_thread(self._close_segment)
+
+    async def checkpoint(self) -> None:
+        """Write a checkpoint now and wait for it to complete."""
+        if self._checkpoint_task is not None:
+            await self._checkpoint_task
+        self._start_checkpoint()
+        await self._checkpoint_task
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if self._pending and self.group_commit_window > 0:
+                await asyncio.sleep(self.group_commit_window)
+            self._wakeup.clear()
+
+            if self._pending:
+                batch, self._pending = self._pending, []
+                future, self._pending_future = self._pending_future, None
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                except BaseException as e:
+                    self._failure = e
+                    logger.exception("Write-ahead log write failed")
+                    future.set_exception(WriteAheadLogError(str(e)))
+                    # Commits appended during the write are never written.
+                    if self._pending_future is not None:
+                        self._pending_future.set_exception(
+                            WriteAheadLogError(f"Write-ahead log failed: {e}")
+                        )
+                        self._pending_future = None
+                    self._pending = []
+                    return
+                self.durable_lsn = batch[-1][0]
+                self.batches_written += 1
+                self._records_since_checkpoint += len(batch)
+                future.set_result(self.durable_lsn)
+
+                if (
+                    self._records_since_checkpoint >= self.checkpoint_interval
+                    and self._checkpoint_task is None
+                ):
+                    await asyncio.to_thread(self._rotate_segment)
+                    self._start_checkpoint()
+
+            if self._closing and not self._pending:
+                return
+
+    def _write_batch(self, batch: list[tuple[int, Writes]]) -> None:
+        self._file.write(b"".join(_encode_record(lsn, w) for lsn, w in batch))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _open_segment(self, first_lsn: int) -> None:
+        self._file = open(self.directory / _segment_name(first_lsn), "ab")
+        if first_lsn not in self._segments:
+            self._segments.append(first_lsn)
+        if self.fsync:
+            _fsync_directory(self.directory)
+
+    def _close_segment(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _rotate_segment(self) -> None:
+        self._close_segment()
+        self._open_segment(self.durable_lsn + 1)
+
+    # Checkpoints
+
+    def _start_checkpoint(self) -> None:
+        # Only durable commits are checkpointed: a commit still waiting to be
+        # written may yet fail, and must then not be recovered.
+        lsn = self.durable_lsn
+        snapshot = self._snapshot(lsn)
+        self._records_since_checkpoint = 0
+        self._checkpoint_task = asyncio.create_task(self._checkpoint(lsn, snapshot))
+
+    async def _checkpoint(self, lsn: int, snapshot: Snapshot) -> None:
+        try:
+            await asyncio.to_thread(self._write_checkpoint, lsn, snapshot)
+            self.checkpoint_lsn = lsn
+            # A segment is obsolete once its successor starts after `lsn`.
+            obsolete = [
+                first
+                for first, following in zip(self._segments, self._segments[1:])
+                if following <= lsn + 1
+            ]
+            await asyncio.to_thread(self._delete_segments, obsolete)
+            for first_lsn in obsolete:
+                self._segments.remove(first_lsn)
+        except Exception:
+            logger.exception("Write-ahead log checkpoint failed")
+        finally:
+            self._checkpoint_task = None
+
+    def _write_checkpoint(self, lsn: int, snapshot: Snapshot) -> None:
+        parts = [
+            _CHECKPOINT_HEADER.pack(
+                CHECKPOINT_MAGIC, CHECKPOINT_VERSION, lsn, len(snapshot)
+            )
+        ]
+        for template_id, (template, version) in snapshot.items():
+            payload = encode_template(template)
+            parts.append(
+                _CHECKPOINT_ENTRY.pack(template_id.bytes, version, len(payload))
+            )
+            parts.append(payload)
+        body = b"".join(parts)
+
+        path = self.directory / CHECKPOINT_FILE
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as f:
+            f.write(body)
+            f.write(struct.pack("<I", zlib.crc32(body)))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(temporary, path)
+        if self.fsync:
+            _fsync_directory(self.directory)
+
+    def _delete_segments(self, segments: list[int]) -> None:
+        for first_lsn in segments:
+            (self.directory / _segment_name(first_lsn)).unlink(missing_ok=True)
@@ -0,0 +1,88 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: responses are then only gzipped
+    brotli = None
+
+# Content codings in order of preference, as sent in `Content-Encoding`.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Levels for bodies compressed once and cached, and for those compressed on
+# every request, where CPU matters more than the last percents of size.
+GZIP_LEVELS = {True: 9, False: 6}
+BROTLI_QUALITIES = {True: 9, False: 4}
+
+
+def negotiate(accept_encoding: str | None, encodings: tuple[str, ...]) -> str | None:
+    """Preferred coding among `encodings` that `Accept-Encoding` allows;
+    None for the body as it is.
+
+    The client's quality values rank the codings first, the order of
+    `encodings` breaks ties; `*` stands for the codings it does not name.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+    default = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class Compressor:
+    """Compresses response bodies with the codings available here: gzip, and
+    brotli when the `brotli` package is installed.
+
+    Bodies under `min_size` bytes are left as they are; compressing them
+    saves fewer bytes than it costs.
+    """
+
+    def __init__(self, min_size: int = 1024, encodings: tuple[str, ...] = ENCODINGS):
+        unavailable = set(encodings).difference(ENCODINGS)
+        if unavailable:
+            raise ValueError(f"Unavailable encodings: {', '.join(sorted(unavailable))}")
+        self.min_size = min_size
+        self.encodings = encodings
+
+    def negotiate(self, accept_encoding: str | None) -> str | None:
+        return negotiate(accept_encoding, self.encodings)
+
+    def should_compress(self, body: bytes) -> bool:
+        return len(body) >= self.min_size
+
+    def encode(self, body: bytes, encoding: str, best: bool = False) -> bytes:
+        """`body` in `encoding`; `best` trades CPU for size, for bodies
+        compressed once and served many times."""
+        if encoding == "gzip":
+            # No timestamp, so that equal bodies compress to equal bytes.
+            return gzip.compress(body, compresslevel=GZIP_LEVELS[best], mtime=0)
+        if encoding == "br":
+            return brotli.compress(body, quality=BROTLI_QUALITIES[best])
+        raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def encode_all(self, body: bytes) -> dict[str, bytes]:
+        """`body` in each coding, compressed for size; empty for small
+        bodies."""
+        if not self.should_compress(body):
+            return {}
+        return {
+            encoding: self.encode(body, encoding, best=True)
+            for encoding in self.encodings
+        }
@@ -0,0 +1,426 @@
+"""Compact, versioned binary codec for templates and their parts.
+
+Layout of an encoded payload::
+
+    magic "TPLB" | format version (u8) | kind (u8)
+    string table: varint count, then varint-length-prefixed UTF-8 strings
+    option lists: varint count, then per list a varint length followed by
+        (label string index, value string index, zigzag order) per option
+    body: the encoded template, section or question
+
+UUIDs are written as their 16 raw bytes, enums as one-byte codes, datetimes
+as signed 64-bit microseconds plus an optional UTC offset. Option labels are
+interned in the string table and whole option lists in the option list table,
+so a repeated answer scale is stored once per payload; decoded lists are
+interned in the process-wide `option_sets`, so they are shared across payloads.
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, SafeUUID
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.option_set import OptionSet, option_sets
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_status import TemplateStatus
+
+MAGIC = b"TPLB"
+FORMAT_VERSION = 3
+
+KIND_TEMPLATE = 1
+KIND_SECTION = 2
+KIND_QUESTION = 3
+
+# Codes are part of the format: never renumber, only append.
+QUESTION_TYPE_CODES = {
+    QuestionType.SINGLE_CHOICE: 1,
+    QuestionType.MULTIPLE_CHOICE: 2,
+    QuestionType.TEXT: 3,
+    QuestionType.NUMBER: 4,
+    QuestionType.DATE: 5,
+    QuestionType.TIME: 6,
+    QuestionType.DATETIME: 7,
+    QuestionType.BOOLEAN: 8,
+    QuestionType.DROPDOWN: 9,
+}
+TEMPLATE_STATUS_CODES = {
+    TemplateStatus.DRAFT: 1,
+    TemplateStatus.PUBLISHED: 2,
+    TemplateStatus.ARCHIVED: 3,
+}
+_QUESTION_TYPES = {code: value for value, code in QUESTION_TYPE_CODES.items()}
+_TEMPLATE_STATUSES = {code: value for value, code in TEMPLATE_STATUS_CODES.items()}
+
+_HAS_ID = 0x01
+_HAS_DESCRIPTION = 0x02
+_HAS_REVISION_OF = 0x04  # template flag, since version 2
+_HAS_ORDER_KEY = 0x08  # section and question flag, since version 3
+_IS_REQUIRED = 0x02
+_HAS_OPTIONS = 0x04
+
+_NAIVE = 0
+_AWARE = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_INT64 = struct.Struct("<q")
+_INT32 = struct.Struct("<i")
+_HEADER_SIZE = len(MAGIC) + 2
+_set = object.__setattr__
+
+
+class CodecError(ValueError):
+    """Raised when a payload is not a valid encoded template, section or question."""
+
+    pass
+
+
+def _construct(cls, values: dict):
+    """Build a model from trusted, complete field values without validation.
+
+    Cheaper than `model_construct`, which also resolves defaults and aliases;
+    every field is always present in decoded payloads.
+    """
+    instance = cls.__new__(cls)
+    _set(instance, "__dict__", values)
+    _set(instance, "__pydantic_fields_set__", set(values))
+    _set(instance, "__pydantic_extra__", None)
+    _set(instance, "__pydantic_private__", None)
+    if cls.__pydantic_post_init__:
+        # Initializes private attributes to their defaults.
+        instance.model_post_init(None)
+    return instance
+
+
+def _uuid(data: bytes) -> UUID:
+    """Build a UUID from 16 bytes, skipping `UUID.__init__` argument parsing."""
+    value = UUID.__new__(UUID)
+    _set(value, "int", int.from_bytes(data))
+    _set(value, "is_safe", SafeUUID.unknown)
+    return value
+
+
+class _Writer:
+    __slots__ = ("buffer", "_strings", "_option_lists", "_shared_lists")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._strings: dict[str, int] = {}
+        self._option_lists: dict[tuple[tuple[str, str, int], ...], int] = {}
+        # Indexes by the identity of shared option sets, which the template
+        # being written keeps alive.
+        self._shared_lists: dict[int, int] = {}
+
+    def varint(self, value: int) -> None:
+        buffer = self.buffer
+        while value >= 0x80:
+            buffer.append((value & 0x7F) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def signed(self, value: int) -> None:
+        self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+
+    def text(self, value: str) -> None:
+        data = value.encode()
+        self.varint(len(data))
+        self.buffer += data
+
+    def interned(self, value: str) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def option_list(self, options: OptionSet) -> int:
+        index = self._shared_lists.get(id(options))
+        if index is not None:
+            return index
+        key = tuple((option.label, option.value, option.order) for option in options)
+        index = self._option_lists.get(key)
+        if index is None:
+            index = self._option_lists[key] = len(self._option_lists)
+        self._shared_lists[id(options)] = index
+        return index
+
+    def uuid(self, value: UUID) -> None:
+        self.buffer += value.bytes
+
+    def datetime(self, value: datetime) -> None:
+        offset = value.utcoffset()
+        if offset is None:
+            self.buffer.append(_NAIVE)
+        else:
+            self.buffer.append(_AWARE)
+            self.buffer += _INT32.pack(int(offset.total_seconds()))
+            value = value.replace(tzinfo=None)
+        delta = value - _EPOCH
+        micros = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        self.buffer += _INT64.pack(micros)
+
+    def template(self, template: TemplateAggregate) -> None:
+        flags = 0
+        if template.id is not None:
+            flags |= _HAS_ID
+        if template.description is not None:
+            flags |= _HAS_DESCRIPTION
+        if template.revision_of is not None:
+            flags |= _HAS_REVISION_OF
+        self.buffer.append(flags)
+        if template.id is not None:
+            self.uuid(template.id)
+        self.text(template.title)
+        if template.description is not None:
+            self.text(template.description)
+        if template.revision_of is not None:
+            self.uuid(template.revision_of)
+        self.buffer.append(TEMPLATE_STATUS_CODES[template.status])
+        self.datetime(template.created_at)
+        self.datetime(template.updated_at)
+        self.varint(len(template.sections))
+        for section in template.sections:
+            self.section(section)
+
+    def section(self, section: SectionEntity) -> None:
+        flags = 0
+        if section.id is not None:
+            flags |= _HAS_ID
+        if section.description is not None:
+            flags |= _HAS_DESCRIPTION
+        if section.order_key is not None:
+            flags |= _HAS_ORDER_KEY
+        self.buffer.append(flags)
+        if section.id is not None:
+            self.uuid(section.id)
+        self.text(section.title)
+        if section.description is not None:
+            self.text(section.description)
+        if section.order_key is not None:
+            self.text(section.order_key)
+        self.varint(len(section.questions))
+        for question in section.questions:
+            self.question(question)
+
+    def question(self, question: QuestionEntity) -> None:
+        flags = 0
+        if question.id is not None:
+            flags |= _HAS_ID
+        if question.is_required:
+            flags |= _IS_REQUIRED
+        if question.options is not None:
+            flags |= _HAS_OPTIONS
+        if question.order_key is not None:
+            flags |= _HAS_ORDER_KEY
+        self.buffer.append(flags)
+        if question.id is not None:
+            self.uuid(question.id)
+        self.text(question.text)
+        if question.order_key is not None:
+            self.text(question.order_key)
+        self.buffer.append(QUESTION_TYPE_CODES[question.type])
+        if question.options is not None:
+            self.varint(self.option_list(question.options))
+
+    def getvalue(self, kind: int) -> bytes:
+        option_lists = _Writer()
+        option_lists.varint(len(self._option_lists))
+        for options in self._option_lists:
+            option_lists.varint(len(options))
+            for label, value, order in options:
+                option_lists.varint(self.interned(label))
+                option_lists.varint(self.interned(value))
+                option_lists.signed(order)
+
+        table = _Writer()
+        table.varint(len(self._strings))
+        for value in self._strings:
+            table.text(value)
+        table.buffer += option_lists.buffer
+        header = MAGIC + bytes((FORMAT_VERSION, kind))
+        return b"".join((header, table.buffer, self.buffer))
+
+
+class _Reader:
+    __slots__ = ("data", "pos", "version", "strings", "option_lists")
+
+    def __init__(self, data: bytes, kind: int):
+        if data[: len(MAGIC)] != MAGIC or len(data) < _HEADER_SIZE:
+            raise CodecError("Not an encoded template payload.")
+        self.version = data[len(MAGIC)]
+        if not 1 <= self.version <= FORMAT_VERSION:
+            raise CodecError(f"Unsupported payload version {self.version}.")
+        if data[len(MAGIC) + 1] != kind:
+            raise CodecError(f"Expected payload kind {kind}.")
+        self.data = data
+        self.pos = _HEADER_SIZE
+        self.strings = [self.text() for _ in range(self.varint())]
+        self.option_lists = [self.options() for _ in range(self.varint())]
+
+    def byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        result = byte & 0x7F
+        shift = 7
+        while byte & 0x80:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            shift += 7
+        self.pos = pos
+        return result
+
+    def signed(self) -> int:
+        value = self.varint()
+        return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+    def text(self) -> str:
+        size = self.varint()
+        start = self.pos
+        self.pos = start + size
+        if self.pos > len(self.data):
+            raise CodecError("Truncated payload.")
+        return str(self.data[start : self.pos], "utf-8")
+
+    def uuid(self) -> UUID:
+        start = self.pos
+        self.pos = start + 16
+        if self.pos > len(self.data):
+            raise CodecError("Truncated payload.")
+        return _uuid(self.data[start : self.pos])
+
+    def datetime(self) -> datetime:
+        tz = None
+        if self.byte() == _AWARE:
+            (offset,) = _INT32.unpack_from(self.data, self.pos)
+            self.pos += _INT32.size
+            tz = timezone(timedelta(seconds=offset))
+        (micros,) = _INT64.unpack_from(self.data, self.pos)
+        self.pos += _INT64.size
+        value = _EPOCH + timedelta(microseconds=micros)
+        return value.replace(tzinfo=tz) if tz is not None else value
+
+    def template(self) -> TemplateAggregate:
+        flags = self.byte()
+        template_id = self.uuid() if flags & _HAS_ID else None
+        title = self.text()
+        description = self.text() if flags & _HAS_DESCRIPTION else None
+        revision_of = self.uuid() if flags & _HAS_REVISION_OF else None
+        status = _TEMPLATE_STATUSES[self.byte()]
+        created_at = self.datetime()
+        updated_at = self.datetime()
+        sections = [self.section() for _ in range(self.varint())]
+        return _construct(
+            TemplateAggregate,
+            {
+                "id": template_id,
+                "title": title,
+                "description": description,
+                "status": status,
+                "sections": sections,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "revision_of": revision_of,
+            },
+        )
+
+    def section(self) -> SectionEntity:
+        flags = self.byte()
+        section_id = self.uuid() if flags & _HAS_ID else None
+        title = self.text()
+        description = self.text() if flags & _HAS_DESCRIPTION else None
+        order_key = self.text() if flags & _HAS_ORDER_KEY else None
+        questions = [self.question() for _ in range(self.varint())]
+        return _construct(
+            SectionEntity,
+            {
+                "id": section_id,
+                "title": title,
+                "description": description,
+                "questions": questions,
+                "order_key": order_key,
+            },
+        )
+
+    def question(self) -> QuestionEntity:
+        flags = self.byte()
+        question_id = self.uuid() if flags & _HAS_ID else None
+        text = self.text()
+        order_key = self.text() if flags & _HAS_ORDER_KEY else None
+        question_type = _QUESTION_TYPES[self.byte()]
+        options = None
+        if flags & _HAS_OPTIONS:
+            options = self.option_lists[self.varint()]
+        return _construct(
+            QuestionEntity,
+            {
+                "id": question_id,
+                "text": text,
+                "type": question_type,
+                "options": options,
+                "is_required": bool(flags & _IS_REQUIRED),
+                "order_key": order_key,
+            },
+        )
+
+    def options(self) -> OptionSet:
+        strings = self.strings
+        return option_sets.from_rows(
+            [
+                (strings[self.varint()], strings[self.varint()], self.signed())
+                for _ in range(self.varint())
+            ]
+        )
+
+    def finish(self) -> None:
+        if self.pos != len(self.data):
+            raise CodecError("Trailing bytes after payload.")
+
+
+def _decode(data: bytes, kind: int, read):
+    try:
+        reader = _Reader(memoryview(data), kind)
+        result = read(reader)
+        reader.finish()
+    except CodecError:
+        raise
+    except (IndexError, KeyError, UnicodeDecodeError, struct.error) as e:
+        raise CodecError(f"Corrupt payload: {e!r}") from e
+    return result
+
+
+def encode_template(template: TemplateAggregate) -> bytes:
+    writer = _Writer()
+    writer.template(template)
+    return writer.getvalue(KIND_TEMPLATE)
+
+
+def decode_template(data: bytes) -> TemplateAggregate:
+    return _decode(data, KIND_TEMPLATE, _Reader.template)
+
+
+def encode_section(section: SectionEntity) -> bytes:
+    writer = _Writer()
+    writer.section(section)
+    return writer.getvalue(KIND_SECTION)
+
+
+def decode_section(data: bytes) -> SectionEntity:
+    return _decode(data, KIND_SECTION, _Reader.section)
+
+
+def encode_question(question: QuestionEntity) -> bytes:
+    writer = _Writer()
+    writer.question(question)
+    return writer.getvalue(KIND_QUESTION)
+
+
+def decode_question(data: bytes) -> QuestionEntity:
+    return _decode(data, KIND_QUESTION, _Reader.question)
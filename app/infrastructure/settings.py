@@ -0,0 +1,107 @@
+import os
+from typing import Literal
+
+from dotenv import load_dotenv
+from pydantic import BaseModel, Field, model_validator
+
+
+class Settings(BaseModel):
+    """Deployment settings, read from the environment and an optional `.env`.
+
+    Each field is set by the environment variable of the same name in upper
+    case, e.g. `PERSISTENCE_BACKEND=sqlite`. Empty variables count as unset.
+    """
+
+    # Persistence
+    persistence_backend: Literal["memory", "sqlite"] = "memory"
+    sqlite_path: str = "templates.db"
+    sqlite_readers: int = Field(default=4, ge=1)
+    sqlite_statement_cache: int = Field(default=256, ge=0)
+    wal_directory: str | None = None
+    wal_group_commit_window: float = Field(default=0.002, ge=0)
+    wal_checkpoint_interval: int = Field(default=10_000, ge=1)
+
+    # Cache of hydrated templates in front of the sqlite backend; 0 disables it.
+    template_cache_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    template_cache_ttl: float | None = Field(default=None, gt=0)
+
+    # Compression of response bodies negotiated with `Accept-Encoding`;
+    # smaller bodies are sent as they are.
+    compression_min_size: int = Field(default=1024, ge=0)
+    # JSON documents of published templates with their compressed bodies,
+    # computed once per version; 0 disables it.
+    published_cache_bytes: int = Field(default=32 * 1024 * 1024, ge=0)
+
+    # Live feed of template changes, GET /templates/{id}/events: events
+    # queued per subscriber before it must read the template again, and
+    # seconds between keep-alive comments on idle connections.
+    feed_max_queued: int = Field(default=256, ge=1)
+    feed_keepalive: float = Field(default=15.0, gt=0)
+
+    # Version of the UUIDs given to new templates, sections and questions;
+    # time-ordered v7 keeps inserts into the ID indexes local.
+    id_version: Literal["uuid4", "uuid7"] = "uuid7"
+
+    # Structure limits of a template, see `TemplateLimits`.
+    template_max_sections: int = Field(default=200, ge=1)
+    template_max_questions_per_section: int = Field(default=500, ge=1)
+    template_max_options_per_question: int = Field(default=100, ge=1)
+    template_max_title_length: int = Field(default=500, ge=1)
+    template_max_text_length: int = Field(default=5_000, ge=1)
+
+    # Admission control of write commands: beyond the concurrent ones, writes
+    # queue up to the given number (429 beyond) and timeout (503 after).
+    write_max_concurrent: int = Field(default=64, ge=1)
+    write_max_queued: int = Field(default=1024, ge=0)
+    write_queue_timeout: float = Field(default=5.0, gt=0)
+
+    # Successful responses to POST and PUT requests carrying an
+    # `Idempotency-Key`, replayed to retries; 0 disables idempotency keys.
+    idempotency_max_keys: int = Field(default=100_000, ge=0)
+    idempotency_ttl: float = Field(default=24 * 3600, gt=0)
+
+    # Commands submitted with `Prefer: respond-async`, run by background
+    # workers from a journal that survives restarts; without a journal path
+    # the preference is ignored and commands run in the request.
+    command_workers: int = Field(default=4, ge=1)
+    command_max_queued: int = Field(default=1024, ge=0)
+    command_job_retention: int = Field(default=10_000, ge=0)
+    command_journal_path: str | None = None
+
+    # Server processes, as read by `uvicorn` for its default `--workers`.
+    web_concurrency: int = Field(default=1, ge=1)
+
+    # CPU-bound workers
+    process_pool_workers: int | None = Field(default=None, ge=1)
+    process_pool_max_pending: int | None = Field(default=None, ge=1)
+    process_pool_queue_timeout: float = Field(default=0.0, ge=0)
+
+    # Per-request profiling, reported in a `Server-Timing` header: requests
+    # sending `X-Profile: <profile_token>` and a sample of the others.
+    profile_token: str | None = None
+    profile_sample_rate: float = Field(default=0.0, ge=0, le=1)
+    profile_directory: str | None = None
+
+    @model_validator(mode="after")
+    def check_backend_is_shared(self) -> "Settings":
+        if self.web_concurrency > 1 and self.persistence_backend == "memory":
+            raise ValueError(
+                "The memory backend is private to each process; use "
+                "PERSISTENCE_BACKEND=sqlite with several workers"
+            )
+        return self
+
+    @classmethod
+    def from_env(cls, env_file: str | os.PathLike | None = ".env") -> "Settings":
+        """Build settings from the environment, after loading `env_file`.
+
+        Variables already set in the environment win over the file.
+        """
+        if env_file is not None:
+            load_dotenv(env_file, override=False)
+        values = {}
+        for name in cls.model_fields:
+            value = os.environ.get(name.upper())
+            if value:
+                values[name] = value
+        return cls(**values)
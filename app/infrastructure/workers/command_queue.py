@@ -0,0 +1,368 @@
+"""Queue of commands run in the background, with pollable job status.
+
+Clients submitting a heavy command get a job ID at once; a fixed number of
+worker tasks drain the queue in submission order and record each job's
+result or error. With a journal file, jobs survive a restart: every change
+of a job is appended and fsynced before it takes effect, queued jobs are
+queued again on start, and jobs that were running when the process stopped
+are marked failed, since their command may or may not have committed.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.application.commands.base import Command
+from app.domain.identifiers import new_id
+
+logger = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class CommandQueueFullError(Exception):
+    """Raised when the queue already holds its maximum of queued jobs."""
+
+    pass
+
+
+class JobNotFoundError(Exception):
+    """Raised when a job ID is unknown or its record has been evicted."""
+
+    def __init__(self, job_id: UUID):
+        super().__init__(f"Job with ID {job_id} not found.")
+
+
+class Job(BaseModel):
+    """Status of a submitted command."""
+
+    id: UUID
+    command: str
+    status: JobStatus = "queued"
+    submitted_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict | None = None
+    error: dict | None = None
+    # Set when the job's outcome could not be written to the journal.
+    journal_error: dict | None = None
+
+
+class JobJournal:
+    """Append-only file of job records, one JSON object per line.
+
+    A `job` record holds a job's full state, plus its command while queued;
+    `start` and `finish` records update it. A torn last line, left by a crash
+    mid-append, is ignored.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._file = None
+
+    def load(self) -> list[tuple[Job, dict | None]]:
+        """Jobs of the journal, in submission order, with queued commands."""
+        jobs: dict[UUID, Job] = {}
+        commands: dict[UUID, dict] = {}
+        if not self.path.exists():
+            return []
+        with open(self.path, "rb") as file:
+            lines = file.read().splitlines()
+        for number, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                if number == len(lines) - 1:
+                    logger.warning("Ignoring a torn record at the end of %s", self.path)
+                    break
+                raise
+            op = record.pop("op")
+            job_id = UUID(record["id"])
+            if op == "job":
+                command = record.pop("payload", None)
+                jobs[job_id] = Job(**record)
+                if command is not None:
+                    commands[job_id] = command
+            elif op == "start":
+                jobs[job_id].status = "running"
+                jobs[job_id].started_at = record["at"]
+                commands.pop(job_id, None)
+            elif op == "finish":
+                job = jobs[job_id]
+                job.status = record["status"]
+                job.finished_at = record["at"]
+                job.result = record.get("result")
+                job.error = record.get("error")
+                commands.pop(job_id, None)
+        return [(job, commands.get(job_id)) for job_id, job in jobs.items()]
+
+    def rewrite(self, jobs: Iterable[tuple[Job, dict | None]]) -> None:
+        """Replace the journal by one `job` record per job, then open it."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temporary, "wb") as file:
+            for job, command in jobs:
+                file.write(self._encode_job(job, command))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self._file = open(self.path, "ab")
+
+    def append_job(self, job: Job, command: dict | None) -> None:
+        self._append(self._encode_job(job, command))
+
+    def append(self, op: str, job_id: UUID, **fields: Any) -> None:
+        record = {"op": op, "id": str(job_id), **fields}
+        self._append(json.dumps(record).encode() + b"\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _append(self, line: bytes) -> None:
+        self._file.write(line)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    @staticmethod
+    def _encode_job(job: Job, command: dict | None) -> bytes:
+        record = {"op": "job", **job.model_dump(mode="json")}
+        if command is not None:
+            record["payload"] = command
+        return json.dumps(record).encode() + b"\n"
+
+
+def _journal_error(exc: Exception, consequence: str) -> dict:
+    return {
+        "type": "JobJournalError",
+        "detail": f"Could not write the job journal: {exc}. {consequence}",
+    }
+
+
+class CommandQueue:
+    """Background execution of commands by `workers` tasks.
+
+    `execute` runs one command to completion, e.g. through a command bus in
+    its own unit of work, and returns a JSON-serializable summary of its
+    result. At most `max_queued` jobs wait for a worker; submissions beyond
+    raise `CommandQueueFullError`. The last `retention` finished jobs are
+    kept for polling. `command_types` are the commands the journal may hold.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[Command], Awaitable[dict | None]],
+        command_types: Iterable[type[Command]],
+        workers: int = 4,
+        max_queued: int = 1024,
+        retention: int = 10_000,
+        journal: JobJournal | None = None,
+    ):
+        self.execute = execute
+        self.command_types = {t.__name__: t for t in command_types}
+        self.workers = workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.journal = journal
+        self._jobs: OrderedDict[UUID, Job] = OrderedDict()
+        self._commands: dict[UUID, Command] = {}
+        self._pending: deque[UUID] = deque()
+        self._ready = asyncio.Condition()
+        self._journal_lock = asyncio.Lock()
+        self._tasks: list[asyncio.Task] = []
+        self._closing = False
+        self._submitting = 0
+        self.running = 0
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """Recover the journal, if any, and start the workers."""
+        if self.journal is not None:
+            await asyncio.to_thread(self._recover)
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"command-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def close(self) -> None:
+        """Stop the workers once their current job is done.
+
+        Queued jobs stay in the journal for the next start; without one they
+        are lost.
+        """
+        self._closing = True
+        async with self._ready:
+            self._ready.notify_all()
+        await asyncio.gather(*self._tasks)
+        self._tasks = []
+        if self._pending and self.journal is None:
+            logger.warning("Dropping %d queued jobs at shutdown", len(self._pending))
+        if self.journal is not None:
+            self.journal.close()
+
+    async def submit(self, command: Command) -> Job:
+        """Queue `command`; its job is durable once this returns."""
+        if len(self._pending) + self._submitting >= self.max_queued:
+            self.rejected += 1
+            raise CommandQueueFullError(
+                f"Too many queued jobs ({len(self._pending)}); retry later"
+            )
+        job = Job(id=new_id(), command=type(command).__name__, submitted_at=time.time())
+        if self.journal is not None:
+            self._submitting += 1
+            try:
+                payload = command.model_dump(mode="json")
+                await self._log(self.journal.append_job, job, payload)
+            finally:
+                self._submitting -= 1
+        self._jobs[job.id] = job
+        self._commands[job.id] = command
+        self.submitted += 1
+        async with self._ready:
+            self._pending.append(job.id)
+            self._ready.notify()
+        return job
+
+    def get(self, job_id: UUID) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def stats(self) -> dict:
+        oldest = self._jobs[self._pending[0]].submitted_at if self._pending else None
+        return {
+            "workers": self.workers,
+            "queued": len(self._pending),
+            "running": self.running,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "oldest_queued_seconds": (
+                round(time.time() - oldest, 3) if oldest is not None else 0.0
+            ),
+        }
+
+    async def _work(self) -> None:
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self._pending or self._closing)
+                if self._closing:
+                    return
+                job_id = self._pending.popleft()
+            await self._run(self._jobs[job_id], self._commands.pop(job_id))
+
+    async def _run(self, job: Job, command: Command) -> None:
+        self.running += 1
+        try:
+            result, error = await self._execute(job, command)
+            status = "failed" if error else "succeeded"
+            finished_at = time.time()
+            if self.journal is not None:
+                try:
+                    await self._log(
+                        self.journal.append,
+                        "finish",
+                        job.id,
+                        at=finished_at,
+                        status=status,
+                        result=result,
+                        error=error,
+                    )
+                except Exception as exc:
+                    # The command ran: report its outcome, not a failure that
+                    # would make clients apply it again.
+                    logger.exception("Could not record the outcome of job %s", job.id)
+                    job.journal_error = _journal_error(
+                        exc, "The outcome is lost if the server restarts."
+                    )
+            job.status, job.finished_at = status, finished_at
+            job.result, job.error = result, error
+            if error:
+                self.failed += 1
+            else:
+                self.succeeded += 1
+        finally:
+            self.running -= 1
+        self._evict()
+
+    async def _execute(
+        self, job: Job, command: Command
+    ) -> tuple[dict | None, dict | None]:
+        """Result and error of the command, run once its start is recorded;
+        if the start cannot be recorded, the command is not run."""
+        started_at = time.time()
+        if self.journal is not None:
+            try:
+                await self._log(self.journal.append, "start", job.id, at=started_at)
+            except Exception as exc:
+                logger.exception("Could not record the start of job %s", job.id)
+                return None, _journal_error(exc, "The command was not run.")
+        job.status, job.started_at = "running", started_at
+        try:
+            return await self.execute(command), None
+        except Exception as exc:
+            logger.info("Job %s failed: %r", job.id, exc)
+            return None, {"type": type(exc).__name__, "detail": str(exc)}
+
+    async def _log(self, append: Callable[..., None], *args: Any, **kwargs) -> None:
+        """Append to the journal off the event loop, one record at a time."""
+        async with self._journal_lock:
+            await asyncio.to_thread(append, *args, **kwargs)
+
+    def _evict(self) -> None:
+        """Forget the oldest finished jobs beyond the retention."""
+        excess = len(self._jobs) - len(self._pending) - self.running - self.retention
+        if excess <= 0:
+            return
+        evicted = []
+        for job_id, job in self._jobs.items():
+            if job.status in ("succeeded", "failed"):
+                evicted.append(job_id)
+                if len(evicted) == excess:
+                    break
+        for job_id in evicted:
+            del self._jobs[job_id]
+
+    def _recover(self) -> None:
+        """Rebuild the jobs from the journal and compact it."""
+        recovered = []
+        for job, payload in self.journal.load():
+            if job.status == "running":
+                job.status, job.finished_at = "failed", time.time()
+                job.error = {
+                    "type": "JobInterruptedError",
+                    "detail": "The server stopped while the command ran; "
+                    "it may or may not have been applied.",
+                }
+            if job.status == "queued":
+                command_type = self.command_types[job.command]
+                self._commands[job.id] = command_type.model_validate(payload)
+                self._pending.append(job.id)
+            self._jobs[job.id] = job
+            recovered.append((job, payload if job.status == "queued" else None))
+        self._evict()
+        self.journal.rewrite(
+            (job, payload) for job, payload in recovered if job.id in self._jobs
+        )
+        if recovered:
+            logger.info(
+                "Recovered %d jobs, %d queued", len(recovered), len(self._pending)
+            )
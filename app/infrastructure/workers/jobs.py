@@ -0,0 +1,54 @@
+"""CPU-bound jobs executed by `ProcessPoolService`.
+
+Every job is a top-level function taking templates encoded with
+`app.infrastructure.serialization.template_codec` so that it can be pickled
+cheaply across the process boundary; aggregates are never sent as live
+pydantic graphs.
+"""
+
+from collections import Counter
+from typing import Iterable
+
+from app.infrastructure.serialization.template_codec import CodecError, decode_template
+
+
+def template_statistics(payload: bytes) -> dict:
+    """Compute analytics over a template's structure."""
+    template = decode_template(payload)
+    questions = [q for s in template.sections for q in s.questions]
+    types = Counter(q.type.value for q in questions)
+    option_counts = [len(q.options or ()) for q in questions]
+    text_lengths = [len(q.text) for q in questions]
+
+    return {
+        "template_id": str(template.id) if template.id else None,
+        "sections": len(template.sections),
+        "questions": len(questions),
+        "required_questions": sum(1 for q in questions if q.is_required),
+        "questions_by_type": dict(types),
+        "options_total": sum(option_counts),
+        "options_max": max(option_counts, default=0),
+        "text_length_avg": (
+            sum(text_lengths) / len(text_lengths) if text_lengths else 0.0
+        ),
+    }
+
+
+def validate_template_import(payloads: Iterable[bytes]) -> list[dict]:
+    """Validate a bulk import; returns one report per payload, in order."""
+    reports = []
+    for index, payload in enumerate(payloads):
+        try:
+            template = decode_template(payload)
+        except CodecError as e:
+            reports.append({"index": index, "valid": False, "errors": [str(e)]})
+            continue
+
+        errors = []
+        for section in template.sections:
+            for question in section.questions:
+                labels = [option.label for option in question.options or ()]
+                if len(labels) != len(set(labels)):
+                    errors.append(f"Question {question.id} has duplicate options.")
+        reports.append({"index": index, "valid": not errors, "errors": errors})
+    return reports
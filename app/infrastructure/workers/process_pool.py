@@ -0,0 +1,101 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class ProcessPoolSaturatedError(Exception):
+    """Raised when the process pool already holds its maximum of pending jobs."""
+
+    pass
+
+
+def _lower_worker_priority(niceness: int) -> None:
+    """Run in each worker so CPU-bound jobs yield to the event loop process."""
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class ProcessPoolService:
+    """Managed process pool for CPU-bound jobs kept off the event loop.
+
+    Jobs must be picklable top-level callables with picklable arguments (see
+    `app.infrastructure.workers.jobs`). At most `max_pending` jobs may be
+    queued or running at once; further submissions wait up to `queue_timeout`
+    seconds for a slot and then raise `ProcessPoolSaturatedError`.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        queue_timeout: float = 0.0,
+        worker_niceness: int = 5,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.queue_timeout = queue_timeout
+        self.worker_niceness = worker_niceness
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._pending = 0
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently queued or running."""
+        return self._pending
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_worker_priority,
+            initargs=(self.worker_niceness,),
+        )
+
+    async def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn(*args, **kwargs)` in a worker process and await its result."""
+        if self._executor is None:
+            raise RuntimeError("Process pool service is not started")
+
+        await self._acquire_slot()
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+        finally:
+            self._pending -= 1
+            self._slots.release()
+
+    async def _acquire_slot(self) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        if self.queue_timeout > 0:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+                return
+            except TimeoutError:
+                pass
+        self.rejected += 1
+        raise ProcessPoolSaturatedError(
+            f"Process pool is saturated ({self.max_pending} jobs pending)"
+        )
@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class WriteBacklogFullError(Exception):
+    """Raised when the queue of write commands waiting for a slot is full."""
+
+    pass
+
+
+class WriteQueueTimeoutError(Exception):
+    """Raised when a write command waited too long for a slot."""
+
+    pass
+
+
+class WriteLimiter:
+    """Admission control for write commands.
+
+    At most `max_concurrent` writes run at once; up to `max_queued` more wait
+    for a slot, each for at most `queue_timeout` seconds. A write arriving to
+    a full queue is rejected at once with `WriteBacklogFullError` (the client
+    should back off), one that waited too long with `WriteQueueTimeoutError`
+    (the service is overloaded). Rejecting early keeps the latency of the
+    admitted writes bounded instead of letting every request slow down.
+    """
+
+    def __init__(
+        self, max_concurrent: int, max_queued: int, queue_timeout: float = 5.0
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.running = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the write slots, waiting in the queue if need be."""
+        await self._acquire()
+        self.running += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    async def _acquire(self) -> None:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return
+        if self.queued >= self.max_queued:
+            self.rejected_full += 1
+            raise WriteBacklogFullError(
+                f"Too many pending writes ({self.queued} queued); retry later"
+            )
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except TimeoutError:
+            self.rejected_timeout += 1
+            raise WriteQueueTimeoutError(
+                f"No write slot within {self.queue_timeout}s; service overloaded"
+            ) from None
+        finally:
+            self.queued -= 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+        }
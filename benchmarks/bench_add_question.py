@@ -0,0 +1,90 @@
+"""Per-request CPU of adding a question with 20 options.
+
+Run with ``python -m benchmarks.bench_add_question``.
+"""
+
+import asyncio
+import json
+from uuid import UUID, uuid4
+
+import httpx
+
+from app.api.main import create_app
+from app.api.template import add_question_endpoint
+from app.application.dtos.question import CreateQuestionDTO
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.section import SectionEntity
+from app.infrastructure.dependencies import create_unit_of_work
+from app.infrastructure.settings import Settings
+from benchmarks.harness import Measurement, measure_async, print_table
+
+# Below the default limit of questions per section, which each round fills.
+NUMBER = 400
+BODY = {
+    "text": "Which of these features do you use most often?",
+    "type": "multiple_choice",
+    "options": [f"Feature {i}" for i in range(20)],
+    "required": True,
+}
+
+
+async def collect() -> list[Measurement]:
+    """Times a request through the in-process ASGI app; client, event loop and
+    server share one process, so the time per request is its CPU cost."""
+    app = create_app(Settings(process_pool_workers=1))
+    body = json.dumps(BODY).encode()
+    headers = {"Content-Type": "application/json"}
+    path = ""
+
+    async with app.router.lifespan_context(app):
+        store = app.state.storage
+
+        async def fresh_section() -> None:
+            nonlocal path
+            template = TemplateAggregate(id=uuid4(), title="Benchmark")
+            section = SectionEntity(id=uuid4(), title="Section")
+            template.sections.append(section)
+            store.put(template)
+            path = f"/templates/{template.id}/sections/{section.id}/questions"
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+
+            async def add_question() -> None:
+                response = await client.post(path, content=body, headers=headers)
+                assert response.status_code == 201, response.text
+
+            request = await measure_async(
+                "POST .../questions, 20 options",
+                add_question,
+                number=NUMBER,
+                setup=fresh_section,
+            )
+
+        async def without_http() -> None:
+            # What the endpoint does once routing has found it.
+            data = CreateQuestionDTO.model_validate_json(body)
+            _, _, template_id, _, section_id, _ = path.split("/")
+            await add_question_endpoint(
+                UUID(template_id),
+                UUID(section_id),
+                data,
+                create_unit_of_work(app.state),
+            )
+
+        pipeline = await measure_async(
+            "DTO parsing + endpoint, 20 options",
+            without_http,
+            number=NUMBER,
+            setup=fresh_section,
+        )
+    return [request, pipeline]
+
+
+async def main() -> None:
+    print_table("Add question request", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
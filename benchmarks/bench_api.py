@@ -0,0 +1,67 @@
+"""End-to-end endpoint throughput through an in-process ASGI client.
+
+Run with ``python -m benchmarks.bench_api``.
+"""
+
+import asyncio
+
+import httpx
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+from benchmarks.harness import Measurement, measure_concurrent, print_table
+
+CONCURRENCY = [1, 16]
+OPERATIONS = 2_000
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    """Requests per second per endpoint over the in-memory backend.
+
+    The client and server share the event loop, so figures include the
+    client's overhead; they track relative changes, not capacity.
+    """
+    operations = OPERATIONS // 4 if quick else OPERATIONS
+    app = create_app(Settings(process_pool_workers=1))
+    measurements = []
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            created = await client.post("/templates/create", json={"title": "Read"})
+            location = created.headers["location"]
+            for _ in range(10):
+                await client.post(f"{location}/sections", json={"title": "Section"})
+
+            async def create() -> None:
+                response = await client.post(
+                    "/templates/create", json={"title": "Benchmark"}
+                )
+                response.raise_for_status()
+
+            async def read() -> None:
+                response = await client.get(location)
+                response.raise_for_status()
+
+            for concurrency in CONCURRENCY:
+                for name, fn in [
+                    ("POST /templates/create", create),
+                    ("GET /templates/{id}", read),
+                ]:
+                    measurements.append(
+                        await measure_concurrent(
+                            f"api: {name}, concurrency={concurrency}",
+                            fn,
+                            operations=operations,
+                            concurrency=concurrency,
+                        )
+                    )
+    return measurements
+
+
+async def main() -> None:
+    print_table("Endpoint throughput", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
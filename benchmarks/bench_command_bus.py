@@ -0,0 +1,118 @@
+"""`SimpleCommandBus.execute` per command type, over the in-memory store.
+
+Run with ``python -m benchmarks.bench_command_bus``.
+"""
+
+import asyncio
+
+from app.application.commands.factory import create_command_bus
+from app.application.commands.template_commands import (
+    AddQuestionCommand,
+    AddSectionCommand,
+    CreateRevisionCommand,
+    CreateTemplateCommand,
+    EditQuestionCommand,
+    PublishTemplateCommand,
+)
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure_async, print_table
+
+SECTIONS, QUESTIONS_PER_SECTION = 10, 10
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    """One unit of work and command bus per command, as the endpoints do.
+
+    Commands that grow or consume their template get fresh templates before
+    each round, so every round starts from a 100 question template.
+    """
+    number = 100 if quick else 500
+    store = InMemoryTemplateStore()
+
+    def stored_template(publish: bool = False):
+        template = build_template(SECTIONS, QUESTIONS_PER_SECTION)
+        if publish:
+            template.publish()
+        store.put(template)
+        return template
+
+    draft = stored_template()
+    section = draft.sections[-1]
+    edited = stored_template()
+    edited_section = edited.sections[-1]
+    published = stored_template(publish=True)
+    drafts = []
+
+    async def refill_drafts() -> None:
+        drafts[:] = [stored_template().id for _ in range(number)]
+
+    async def fresh_draft() -> None:
+        nonlocal draft, section
+        draft = stored_template()
+        section = draft.sections[-1]
+
+    commands = {
+        "CreateTemplateCommand": (
+            lambda: CreateTemplateCommand(title="Benchmark", description="Synthetic"),
+            None,
+        ),
+        "AddSectionCommand": (
+            lambda: AddSectionCommand(template_id=draft.id, title="Section"),
+            fresh_draft,
+        ),
+        "AddQuestionCommand": (
+            lambda: AddQuestionCommand(
+                template_id=draft.id,
+                section_id=section.id,
+                question_text="Question",
+                question_type="single_choice",
+                options=["Yes", "No"],
+            ),
+            fresh_draft,
+        ),
+        "EditQuestionCommand": (
+            lambda: EditQuestionCommand(
+                template_id=edited.id,
+                section_id=edited_section.id,
+                question_id=edited_section.questions[-1].id,
+                question_text="Edited",
+                question_type="text",
+            ),
+            None,
+        ),
+        "PublishTemplateCommand": (
+            lambda: PublishTemplateCommand(template_id=drafts.pop()),
+            refill_drafts,
+        ),
+        "CreateRevisionCommand": (
+            lambda: CreateRevisionCommand(template_id=published.id),
+            None,
+        ),
+    }
+
+    measurements = []
+    for name, (make_command, setup) in commands.items():
+
+        async def execute() -> None:
+            async with InMemoryUnitOfWork(store) as uow:
+                await create_command_bus(uow).execute(make_command())
+
+        measurements.append(
+            await measure_async(
+                f"application: {name}", execute, number=number, setup=setup
+            )
+        )
+    return measurements
+
+
+async def main() -> None:
+    print_table(
+        f"Command bus, {SECTIONS * QUESTIONS_PER_SECTION} question templates",
+        await collect(),
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""Reads of a published template through the API: uncompressed, gzipped on
+every request, and served from the bodies compressed once per version.
+
+Run with ``python -m benchmarks.bench_compression``.
+
+Each configuration runs the app in-process over the in-memory backend and
+reads one published template of 20 sections of 50 Likert questions with
+`Accept-Encoding: gzip`; compression on every request is what the app does
+with `PUBLISHED_CACHE_BYTES=0`. Sizes are the bytes sent.
+"""
+
+import asyncio
+
+import httpx
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure_async, print_table
+
+SECTIONS = 20
+QUESTIONS = 50
+
+CONFIGURATIONS = {
+    "identity": ({"published_cache_bytes": 0}, "identity"),
+    "gzip per request": ({"published_cache_bytes": 0}, "gzip"),
+    "gzip cached per version": ({}, "gzip"),
+}
+
+
+async def run(label: str, settings: dict, encoding: str, number: int) -> Measurement:
+    template = build_template(SECTIONS, QUESTIONS)
+    template.publish()
+    app = create_app(Settings(process_pool_workers=1, **settings))
+    async with app.router.lifespan_context(app):
+        app.state.storage.put(template)
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            headers={"Accept-Encoding": encoding},
+        ) as client:
+            url = f"/templates/{template.id}"
+            response = await client.get(url)
+            response.raise_for_status()
+            return await measure_async(
+                label,
+                lambda: client.get(url),
+                number=number,
+                repeat=3,
+                sent_kib=round(response.num_bytes_downloaded / 1024, 1),
+            )
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    number = 20 if quick else 200
+    return [
+        await run(label, settings, encoding, number)
+        for label, (settings, encoding) in CONFIGURATIONS.items()
+    ]
+
+
+async def main() -> None:
+    print_table(
+        f"GET of a published template of {SECTIONS * QUESTIONS} questions",
+        await collect(),
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""`TemplateAggregate` operations at increasing template sizes.
+
+Run with ``python -m benchmarks.bench_domain``.
+"""
+
+from uuid import uuid4
+
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.question_type import QuestionType
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure, print_table
+
+SIZES = [(1, 10), (10, 10), (20, 50), (50, 100)]
+
+
+def collect(quick: bool = False) -> list[Measurement]:
+    """Each operation runs on a fresh copy-on-write copy of a stored draft,
+    as a unit of work would; `copy_on_write` alone is the baseline."""
+    measurements = []
+    for sections, per_section in SIZES[:2] if quick else SIZES:
+        draft = build_template(sections, per_section)
+        published = build_template(sections, per_section)
+        published.publish()
+        last_section = draft.sections[-1]
+        last_question = last_section.questions[-1]
+        section = SectionEntity(id=uuid4(), title="New section")
+        question = QuestionEntity(id=uuid4(), text="New", type=QuestionType.TEXT)
+        edited = QuestionEntity(
+            id=last_question.id, text="Edited", type=QuestionType.TEXT
+        )
+
+        def add_section():
+            draft.copy_on_write().add_section(section)
+
+        def add_question():
+            draft.copy_on_write().add_question(last_section.id, question)
+
+        def edit_question():
+            draft.copy_on_write().edit_question(
+                last_section.id, last_question.id, edited
+            )
+
+        def publish():
+            draft.copy_on_write().publish()
+
+        questions = sections * per_section
+        for name, fn in [
+            ("copy_on_write", draft.copy_on_write),
+            ("add_section", add_section),
+            ("add_question", add_question),
+            ("edit_question", edit_question),
+            ("publish", publish),
+            ("create_revision", published.create_revision),
+        ]:
+            measurements.append(measure(f"domain: {name}, {questions} questions", fn))
+    return measurements
+
+
+def main() -> None:
+    print_table("TemplateAggregate operations", collect())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Bulk insert throughput into SQLite with random (v4) and time-ordered (v7) IDs.
+
+Run with ``python -m benchmarks.bench_ids``.
+
+Templates are inserted in transactions of `BATCH`, with a page cache smaller
+than the indexes so that, as with a production database larger than memory,
+inserts at random places of an index fault pages in. The size of the file at
+the end shows how full the index pages were left.
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from app.domain.identifiers import IdGenerator, UUID4Generator, UUID7Generator
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_repository_sqlite import save_templates
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, print_table
+
+TEMPLATES = 50_000
+BATCH = 500
+CACHE_KIB = 2_048
+
+
+def _set_cache(connection) -> None:
+    connection.execute(f"PRAGMA cache_size = -{CACHE_KIB}")
+
+
+async def run(name: str, generator: IdGenerator, total: int) -> Measurement:
+    template = build_template(2, 5)
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "templates.db"
+        database = SQLiteDatabase(str(path))
+        await database.open()
+        try:
+            await database.write(_set_cache)
+            elapsed = 0.0
+            last_quarter = 0.0
+            for done in range(0, total, BATCH):
+                writes = {}
+                for template_id in generator.batch(BATCH):
+                    copy = template.copy_on_write()
+                    copy.id = template_id
+                    writes[template_id] = copy
+                start = time.perf_counter()
+                await database.write(
+                    partial(save_templates, writes=writes, read_versions={})
+                )
+                batch_time = time.perf_counter() - start
+                elapsed += batch_time
+                if done >= total * 3 // 4:
+                    last_quarter += batch_time
+        finally:
+            await database.close()
+        size = sum(os.path.getsize(p) for p in path.parent.iterdir())
+    return Measurement(
+        name=name,
+        seconds_per_op=elapsed / total,
+        extra={
+            "last_quarter_per_s": round(total / 4 / last_quarter),
+            "file_mib": round(size / 2**20, 1),
+        },
+    )
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    total = TEMPLATES // 5 if quick else TEMPLATES
+    return [
+        await run(f"insert {total} templates, uuid4 keys", UUID4Generator(), total),
+        await run(f"insert {total} templates, uuid7 keys", UUID7Generator(), total),
+    ]
+
+
+async def main() -> None:
+    print_table("Bulk insert by ID version", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
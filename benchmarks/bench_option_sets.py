@@ -0,0 +1,197 @@
+"""Memory and storage of repeated answer scales: one option list per question
+versus interned option sets.
+
+Run with ``python -m benchmarks.bench_option_sets``.
+
+Every question of the templates uses the same five-point Likert scale, as
+most questions of real surveys reuse a few scales. In memory, the template
+either holds a fresh list of options per question, as questions were built
+before option sets, or one interned set. On disk, the option rows of the
+`option_sets` table are compared with the per-question rows stored before,
+recreated here in a table of the old layout; sizes come from SQLite's
+`dbstat` virtual table.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from uuid import uuid4
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.option_set import option_sets
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_repository_sqlite import (
+    load_templates,
+    save_templates,
+)
+from app.infrastructure.serialization.template_codec import encode_template
+from benchmarks.fixtures import LIKERT
+from benchmarks.harness import Measurement, measure, print_table
+
+QUESTIONS = 1000
+TEMPLATES = 20
+
+_OPTIONS_PER_QUESTION = """
+CREATE TABLE options (
+    template_id BLOB NOT NULL,
+    question_id BLOB NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    value TEXT NOT NULL,
+    "order" INTEGER NOT NULL,
+    PRIMARY KEY (template_id, question_id, position)
+) WITHOUT ROWID
+"""
+
+
+def per_question_options() -> list[QuestionOption]:
+    return [
+        QuestionOption(label=label, value=label, order=i)
+        for i, label in enumerate(LIKERT)
+    ]
+
+
+def build(shared: bool) -> TemplateAggregate:
+    """A template of `QUESTIONS` Likert questions, built without validation."""
+    section = SectionEntity.model_construct(
+        id=uuid4(), title="Section", description=None, order_key="a0", questions=[]
+    )
+    for i in range(QUESTIONS):
+        options = option_sets.from_labels(LIKERT) if shared else per_question_options()
+        section.questions.append(
+            QuestionEntity.model_construct(
+                id=uuid4(),
+                text=f"How much do you agree with statement {i}?",
+                type=QuestionType.SINGLE_CHOICE,
+                options=options,
+                is_required=True,
+                order_key=f"a{i}",
+            )
+        )
+    return TemplateAggregate(id=uuid4(), title="Likert", sections=[section])
+
+
+def retained_bytes(make) -> int:
+    """Memory still allocated while the object built by `make` is alive."""
+    tracemalloc.start()
+    try:
+        kept = make()
+        size = tracemalloc.get_traced_memory()[0]
+        del kept
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def _table_bytes(connection: sqlite3.Connection, table: str) -> int:
+    row = connection.execute(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name = ?", (table,)
+    ).fetchone()
+    return row[0] or 0
+
+
+def _store_per_question(connection: sqlite3.Connection, templates) -> None:
+    connection.execute(_OPTIONS_PER_QUESTION)
+    connection.executemany(
+        "INSERT INTO options VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (
+                template.id.bytes,
+                question.id.bytes,
+                position,
+                option.label,
+                option.value,
+                option.order,
+            )
+            for template in templates
+            for question in template.sections[0].questions
+            for position, option in enumerate(question.options)
+        ],
+    )
+    connection.commit()
+
+
+async def storage(count: int) -> list[Measurement]:
+    templates = [build(shared=True) for _ in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "templates.db"
+        database = SQLiteDatabase(str(path), readers=1)
+        await database.open()
+        try:
+            start = time.perf_counter()
+            await database.write(
+                partial(
+                    save_templates,
+                    writes={template.id: template for template in templates},
+                    read_versions={},
+                )
+            )
+            save = time.perf_counter() - start
+            start = time.perf_counter()
+            await database.read(load_templates)
+            load = time.perf_counter() - start
+        finally:
+            await database.close()
+
+        connection = sqlite3.connect(path)
+        shared = _table_bytes(connection, "option_sets")
+        connection.close()
+        legacy_path = Path(directory) / "per_question.db"
+        connection = sqlite3.connect(legacy_path)
+        _store_per_question(connection, templates)
+        per_question = _table_bytes(connection, "options")
+        connection.close()
+        file_size = os.path.getsize(path)
+
+    return [
+        Measurement(
+            name=f"save {count} templates of {QUESTIONS} questions",
+            seconds_per_op=save / count,
+            extra={
+                "file_kib": file_size // 1024,
+                "option_sets_kib": shared // 1024,
+                "per_question_options_kib": per_question // 1024,
+            },
+        ),
+        Measurement(
+            name=f"load {count} templates of {QUESTIONS} questions",
+            seconds_per_op=load / count,
+        ),
+    ]
+
+
+def memory() -> list[Measurement]:
+    results = []
+    for shared, label in [(False, "per-question lists"), (True, "interned sets")]:
+        template = build(shared)
+        results.append(
+            measure(
+                f"build {QUESTIONS} Likert questions, {label}",
+                partial(build, shared),
+                repeat=3,
+                retained_bytes=retained_bytes(partial(build, shared)),
+                payload_bytes=len(encode_template(template)),
+            )
+        )
+    return results
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    return memory() + await storage(TEMPLATES // 4 if quick else TEMPLATES)
+
+
+async def main() -> None:
+    print_table("Repeated answer scales", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
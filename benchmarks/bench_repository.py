@@ -0,0 +1,89 @@
+"""Template lookups by ID at increasing store sizes, in memory and in SQLite.
+
+Run with ``python -m benchmarks.bench_repository``.
+"""
+
+import asyncio
+import itertools
+import random
+import tempfile
+from functools import partial
+from pathlib import Path
+from uuid import uuid4
+
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_repository_sqlite import save_templates
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure_async, print_table
+
+MEMORY_SIZES = [1_000, 10_000, 100_000]
+SQLITE_SIZES = [1_000, 10_000]
+LOOKUPS = 2_000
+
+
+def _templates(count: int) -> dict:
+    """`count` small templates sharing their sections, under distinct IDs."""
+    template = build_template(2, 5)
+    templates = {}
+    for _ in range(count):
+        copy = template.copy_on_write()
+        copy.id = uuid4()
+        templates[copy.id] = copy
+    return templates
+
+
+async def _lookups(name: str, make_uow, template_ids: list) -> Measurement:
+    shuffled = random.Random(0).sample(template_ids, len(template_ids))
+    ids = itertools.cycle(shuffled)
+
+    async def lookup() -> None:
+        async with make_uow() as uow:
+            await uow.template.get_by_id(next(ids))
+
+    return await measure_async(name, lookup, number=LOOKUPS)
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    measurements = []
+    for size in MEMORY_SIZES[:2] if quick else MEMORY_SIZES:
+        store = InMemoryTemplateStore()
+        templates = _templates(size)
+        store.apply(templates, {})
+        measurements.append(
+            await _lookups(
+                f"repository: memory get_by_id, {size} templates",
+                lambda: InMemoryUnitOfWork(store),
+                list(templates),
+            )
+        )
+
+    for size in SQLITE_SIZES[:1] if quick else SQLITE_SIZES:
+        with tempfile.TemporaryDirectory() as directory:
+            database = SQLiteDatabase(str(Path(directory) / "templates.db"))
+            await database.open()
+            try:
+                templates = _templates(size)
+                await database.write(
+                    partial(save_templates, writes=templates, read_versions={})
+                )
+                measurements.append(
+                    await _lookups(
+                        f"repository: sqlite get_by_id, {size} templates",
+                        lambda: SQLiteUnitOfWork(database),
+                        list(templates),
+                    )
+                )
+            finally:
+                await database.close()
+    return measurements
+
+
+async def main() -> None:
+    print_table("Repository lookups", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
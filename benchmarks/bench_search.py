@@ -0,0 +1,181 @@
+"""Full-text search latency over a large template library.
+
+Run with ``python -m benchmarks.bench_search``.
+
+Templates are built from a vocabulary whose word frequencies follow Zipf's
+law, as in natural text: a few words occur in most templates and most words
+in few. Queries cover a rare word, a common word, two words that must both
+match, and a prefix as typed by a user; updates reindex one template after
+a question is added to it, and a template of 2,000 questions after one of
+them is edited.
+"""
+
+import asyncio
+import itertools
+import random
+import resource
+import time
+from uuid import uuid4
+
+from app.application.queries.search_index import SearchIndex
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.question_type import QuestionType
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure, print_table
+
+TEMPLATES = 100_000
+VOCABULARY = 20_000
+SECTIONS = 2
+QUESTIONS = 4
+SEED = 46
+
+
+def _vocabulary(rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 10))))
+    return sorted(words)
+
+
+class _Text:
+    """Sentences of Zipf-distributed words."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.words = _vocabulary(rng)
+        weights = [1 / rank for rank in range(1, VOCABULARY + 1)]
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def sentence(self, low: int, high: int) -> str:
+        count = self.rng.randint(low, high)
+        words = self.rng.choices(self.words, cum_weights=self.cumulative, k=count)
+        return " ".join(words).capitalize()
+
+
+def build_library(count: int, text: _Text) -> list[TemplateAggregate]:
+    templates = []
+    for _ in range(count):
+        sections = [
+            SectionEntity.model_construct(
+                id=uuid4(),
+                title=text.sentence(1, 3),
+                description=None,
+                order_key=None,
+                questions=[
+                    QuestionEntity.model_construct(
+                        id=uuid4(),
+                        text=text.sentence(5, 10),
+                        type=QuestionType.TEXT,
+                        options=None,
+                        is_required=True,
+                        order_key=None,
+                    )
+                    for _ in range(QUESTIONS)
+                ],
+            )
+            for _ in range(SECTIONS)
+        ]
+        templates.append(
+            TemplateAggregate(
+                id=uuid4(),
+                title=text.sentence(2, 5),
+                description=text.sentence(5, 12),
+                sections=sections,
+            )
+        )
+    return templates
+
+
+def _max_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def collect(quick: bool = False) -> list[Measurement]:
+    count = TEMPLATES // 10 if quick else TEMPLATES
+    rng = random.Random(SEED)
+    text = _Text(rng)
+    library = build_library(count, text)
+
+    rss_before = _max_rss_mib()
+    index = SearchIndex()
+    start = time.perf_counter()
+    for template in library:
+        index.add(template, 1)
+    build = time.perf_counter() - start
+    index.search("warm")  # sorts the vocabulary
+    memory = round(_max_rss_mib() - rss_before)
+
+    common = text.words[0]
+    rare = text.words[VOCABULARY // 2]
+    second = text.words[50]
+    prefix = text.words[200][:3]
+    queries = {
+        "rare word": rare,
+        "common word": common,
+        "two words": f"{common} {second}",
+        "prefix": prefix,
+    }
+    measurements = [
+        Measurement(
+            name=f"build index, {count} templates",
+            seconds_per_op=build / count,
+            extra={"total_s": round(build, 1), "max_rss_growth_mib": memory},
+        )
+    ]
+    for label, query in queries.items():
+        hits = len(index.search(query, limit=count))
+        measurements.append(
+            measure(
+                f"search {label}, {count} templates",
+                lambda query=query: index.search(query),
+                repeat=3,
+                matches=hits,
+            )
+        )
+
+    versions = itertools.count(2)
+    template = library[0]
+
+    def reindex() -> None:
+        section = template.sections[0]
+        section.questions.append(
+            QuestionEntity.model_construct(
+                id=uuid4(),
+                text=text.sentence(5, 10),
+                type=QuestionType.TEXT,
+                options=None,
+                is_required=True,
+                order_key=None,
+            )
+        )
+        del section.questions[0]
+        index.add(template, next(versions))
+
+    measurements.append(measure(f"reindex one template, {count} templates", reindex))
+
+    large = build_template(40, 50)
+    index.add(large, 1)
+    edits = itertools.count()
+
+    def reindex_edited() -> None:
+        section = large.sections[0]
+        section.questions[0] = section.questions[0].model_copy(
+            update={"text": text.sentence(5, 10) + f" {next(edits)}"}
+        )
+        index.add(large, next(versions))
+
+    measurements.append(
+        measure("reindex a template of 2000 questions after one edit", reindex_edited)
+    )
+    return measurements
+
+
+async def main() -> None:
+    print_table("Template search", collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
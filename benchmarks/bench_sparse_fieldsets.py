@@ -0,0 +1,90 @@
+"""Partial reads of a large template: payload size and latency per projection.
+
+Run with ``python -m benchmarks.bench_sparse_fieldsets``.
+
+A template of 50 sections of 100 Likert questions is read through the
+`TemplateReader`, over SQLite without a cache, so that each read loads what
+its projection selects, and over the in-memory backend, where every read
+projects the loaded template. Projections are the whole template, questions
+without their options, an editor sidebar (title and sections with their
+question counts) and a single section.
+"""
+
+import asyncio
+import tempfile
+from functools import partial
+from pathlib import Path
+
+from app.application.queries.template_reader import TemplateReader
+from app.domain.value_objects.template_projection import TemplateProjection
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_repository_sqlite import save_templates
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure_async, print_table
+
+SECTIONS = 50
+QUESTIONS = 100
+
+
+def projections(section_id) -> dict[str, TemplateProjection]:
+    return {
+        "whole template": TemplateProjection(),
+        "without options": TemplateProjection(include={"sections", "questions"}),
+        "sidebar": TemplateProjection(fields={"title"}, include={"sections"}),
+        "one section": TemplateProjection(section_id=section_id),
+    }
+
+
+async def run(name: str, reader: TemplateReader, template, number: int) -> list:
+    measurements = []
+    for label, projection in projections(template.sections[0].id).items():
+        payload = await reader.get_json(template.id, projection)
+        measurements.append(
+            await measure_async(
+                f"{name}: {label}",
+                partial(reader.get_json, template.id, projection),
+                number=number,
+                repeat=3,
+                payload_kib=round(len(payload) / 1024, 1),
+            )
+        )
+    return measurements
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    sections = SECTIONS // 5 if quick else SECTIONS
+    template = build_template(sections, QUESTIONS)
+    number = 20 if quick else 50
+
+    store = InMemoryTemplateStore()
+    store.put(template)
+    memory_reader = TemplateReader(lambda: InMemoryUnitOfWork(store))
+    measurements = await run("memory", memory_reader, template, number)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(str(Path(directory) / "templates.db"))
+        await database.open()
+        try:
+            await database.write(
+                partial(
+                    save_templates, writes={template.id: template}, read_versions={}
+                )
+            )
+            sqlite_reader = TemplateReader(lambda: SQLiteUnitOfWork(database))
+            measurements += await run("sqlite", sqlite_reader, template, number)
+        finally:
+            await database.close()
+    return measurements
+
+
+async def main() -> None:
+    print_table(
+        f"Reads of a template of {SECTIONS * QUESTIONS} questions", await collect()
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Commands and reads per second: SQLite unit of work, cached or not, versus
+in-memory.
+
+Run with ``python -m benchmarks.bench_sqlite_unit_of_work``.
+"""
+
+import asyncio
+import tempfile
+from pathlib import Path
+
+from app.application.commands.factory import create_command_bus
+from app.application.commands.template_commands import (
+    AddQuestionCommand,
+    AddSectionCommand,
+    CreateTemplateCommand,
+)
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_cache import TemplateCache
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+from benchmarks.fixtures import build_template
+from benchmarks.harness import measure_concurrent, print_table
+
+CONCURRENCY = [1, 16]
+OPERATIONS = 2000
+
+
+async def run(name: str, make_uow) -> list:
+    async with make_uow() as uow:
+        template = await uow.template.create(build_template(10, 10))
+    template_id = template.id
+
+    async def command() -> None:
+        async with make_uow() as uow:
+            bus = create_command_bus(uow)
+            created = await bus.execute(CreateTemplateCommand(title="Benchmark"))
+            section = await bus.execute(
+                AddSectionCommand(template_id=created.id, title="Section")
+            )
+            await bus.execute(
+                AddQuestionCommand(
+                    template_id=created.id,
+                    section_id=section.sections[0].id,
+                    question_text="Question",
+                    question_type="text",
+                )
+            )
+
+    async def read() -> None:
+        async with make_uow() as uow:
+            await uow.template.get_by_id(template_id)
+
+    measurements = []
+    for concurrency in CONCURRENCY:
+        measurements.append(
+            await measure_concurrent(
+                f"{name}: 3 commands, concurrency={concurrency}",
+                command,
+                operations=OPERATIONS // 4,
+                concurrency=concurrency,
+            )
+        )
+        measurements.append(
+            await measure_concurrent(
+                f"{name}: read 100 questions, concurrency={concurrency}",
+                read,
+                operations=OPERATIONS,
+                concurrency=concurrency,
+            )
+        )
+    return measurements
+
+
+async def main() -> None:
+    store = InMemoryTemplateStore()
+    measurements = await run("memory", lambda: InMemoryUnitOfWork(store))
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = SQLiteDatabase(str(Path(directory) / "templates.db"))
+        await database.open()
+        try:
+            measurements += await run("sqlite", lambda: SQLiteUnitOfWork(database))
+            cache = TemplateCache(max_bytes=64 * 1024 * 1024)
+            measurements += await run(
+                "sqlite+cache", lambda: SQLiteUnitOfWork(database, cache)
+            )
+        finally:
+            await database.close()
+
+    print_table("Unit of work throughput", measurements)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""Encode/decode speed and payload size of the binary codec versus JSON.
+
+Run with ``python -m benchmarks.bench_template_codec``.
+"""
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.infrastructure.serialization.template_codec import (
+    decode_template,
+    encode_template,
+)
+from benchmarks.fixtures import build_template
+from benchmarks.harness import measure, print_table
+
+SIZES = [(1, 10), (10, 10), (20, 50), (40, 50)]
+
+
+def main() -> None:
+    for sections, per_section in SIZES:
+        template = build_template(sections, per_section)
+        payload = encode_template(template)
+        json_payload = template.model_dump_json()
+        questions = sections * per_section
+
+        print_table(
+            f"{questions} questions",
+            [
+                measure("encode_template", lambda: encode_template(template)),
+                measure("model_dump_json", lambda: template.model_dump_json()),
+                measure("decode_template", lambda: decode_template(payload)),
+                measure(
+                    "model_validate_json",
+                    lambda: TemplateAggregate.model_validate_json(json_payload),
+                ),
+            ],
+        )
+        print(
+            f"size: binary={len(payload)} B  json={len(json_payload.encode())} B"
+            f"  ratio={len(json_payload.encode()) / len(payload):.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
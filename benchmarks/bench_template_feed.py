@@ -0,0 +1,110 @@
+"""Fan-out of template deltas to the editors of one template.
+
+Run with ``python -m benchmarks.bench_template_feed``.
+
+A `question_added` delta, as a handler sends it, is published to 1,000
+subscribers, either serialized once for all of them as `TemplateFeed` does or
+serialized for each subscriber. Delivery also times the subscribers' tasks,
+one per connection, reading the event from their queues.
+"""
+
+import asyncio
+from uuid import uuid4
+
+from app.application.queries.template_feed import TemplateFeed, encode_event
+from benchmarks.fixtures import build_template
+from benchmarks.harness import Measurement, measure_async, print_table
+
+SUBSCRIBERS = 1000
+
+
+def question_delta() -> dict:
+    template = build_template(1, 1)
+    section = template.sections[0]
+    return {
+        "type": "question_added",
+        "section_id": str(section.id),
+        "question": section.questions[0].model_dump(mode="json"),
+    }
+
+
+def publish_per_subscriber(feed: TemplateFeed, template_id, delta: dict) -> None:
+    for subscription in feed._subscribers[template_id]:
+        subscription.push(encode_event(delta["type"], {**delta, "version": 2}, 2))
+
+
+async def delivery(subscribers: int, number: int) -> Measurement:
+    """Publish, then wait until every subscriber task has read the event."""
+    feed = TemplateFeed(max_queued=number + 1, keepalive=None)
+    template_id = uuid4()
+    delta = question_delta()
+    subscriptions = [feed.subscribe(template_id) for _ in range(subscribers)]
+    read = asyncio.Queue()
+
+    async def reader(subscription):
+        async for _ in subscription.events():
+            read.put_nowait(None)
+
+    tasks = [asyncio.create_task(reader(s)) for s in subscriptions]
+    await asyncio.sleep(0)
+
+    async def publish_and_deliver():
+        feed.publish(template_id, 2, delta)
+        for _ in range(subscribers):
+            await read.get()
+
+    try:
+        return await measure_async(
+            f"publish and deliver to {subscribers} tasks",
+            publish_and_deliver,
+            number=number,
+            repeat=3,
+        )
+    finally:
+        feed.close()
+        await asyncio.gather(*tasks)
+
+
+async def publishing(subscribers: int, number: int) -> list[Measurement]:
+    """Publish `number` deltas per round into queues emptied between rounds."""
+    template_id = uuid4()
+    delta = question_delta()
+    feed = TemplateFeed(max_queued=number + 1, keepalive=None)
+    subscriptions = [feed.subscribe(template_id) for _ in range(subscribers)]
+
+    async def empty_queues():
+        for subscription in subscriptions:
+            subscription._events.clear()
+
+    async def once():
+        feed.publish(template_id, 2, delta)
+
+    async def per_subscriber():
+        publish_per_subscriber(feed, template_id, delta)
+
+    return [
+        await measure_async(
+            f"publish to {subscribers}, {label}",
+            fn,
+            number=number,
+            setup=empty_queues,
+        )
+        for label, fn in [
+            ("serialized once", once),
+            ("serialized per subscriber", per_subscriber),
+        ]
+    ]
+
+
+async def collect(quick: bool = False) -> list[Measurement]:
+    subscribers = SUBSCRIBERS // 10 if quick else SUBSCRIBERS
+    number = 20 if quick else 100
+    return await publishing(subscribers, number) + [await delivery(subscribers, number)]
+
+
+async def main() -> None:
+    print_table("Template delta fan-out", await collect())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Clone-then-edit-one-question: copy-on-write revision versus deep copy.
+
+Run with ``python -m benchmarks.bench_template_revision``.
+"""
+
+import tracemalloc
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_status import TemplateStatus
+from benchmarks.fixtures import build_template
+from benchmarks.harness import measure, print_table
+
+SIZES = [(10, 20), (40, 50), (100, 100)]
+
+
+def deep_copy_revision(template: TemplateAggregate) -> TemplateAggregate:
+    revision = template.model_copy(deep=True)
+    revision.id = None
+    revision.status = TemplateStatus.DRAFT
+    return revision
+
+
+def edit_first_question(revision: TemplateAggregate) -> TemplateAggregate:
+    section = revision.sections[0]
+    question = section.questions[0]
+    revision.edit_question(
+        section.id,
+        question.id,
+        QuestionEntity(id=question.id, text="Edited", type=QuestionType.TEXT),
+    )
+    return revision
+
+
+def retained_bytes(make) -> int:
+    """Memory still allocated while the object built by `make` is alive."""
+    tracemalloc.start()
+    try:
+        kept = make()
+        size = tracemalloc.get_traced_memory()[0]
+        del kept
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    for sections, per_section in SIZES:
+        template = build_template(sections, per_section)
+        template.publish()
+
+        def cow():
+            return edit_first_question(template.create_revision())
+
+        def deep():
+            return edit_first_question(deep_copy_revision(template))
+
+        print_table(
+            f"{sections * per_section} questions, clone then edit one question",
+            [
+                measure(
+                    "create_revision (copy-on-write)",
+                    cow,
+                    retained_bytes=retained_bytes(cow),
+                ),
+                measure(
+                    "model_copy(deep=True)",
+                    deep,
+                    repeat=3,
+                    retained_bytes=retained_bytes(deep),
+                ),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    main()
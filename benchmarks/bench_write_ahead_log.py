@@ -0,0 +1,67 @@
+"""Commits per second through the write-ahead log at several group commit windows.
+
+Run with ``python -m benchmarks.bench_write_ahead_log``.
+"""
+
+import asyncio
+import tempfile
+import time
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.write_ahead_log import WriteAheadLog
+from benchmarks.harness import Measurement, print_table
+
+WINDOWS = [0.0, 0.0005, 0.002, 0.005]
+CONCURRENCY = [1, 16, 128]
+COMMITS = 2000
+
+
+async def run(
+    concurrency: int, window: float | None, fsync: bool = True
+) -> Measurement:
+    with tempfile.TemporaryDirectory() as directory:
+        wal = None
+        if window is not None:
+            wal = WriteAheadLog(directory, group_commit_window=window, fsync=fsync)
+        store = InMemoryTemplateStore(wal=wal)
+        await store.open()
+
+        async def client(commits: int) -> None:
+            for i in range(commits):
+                uow = InMemoryUnitOfWork(store)
+                async with uow:
+                    await uow.template.create(TemplateAggregate(title=f"T{i}"))
+
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(client(COMMITS // concurrency) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+        commits = COMMITS // concurrency * concurrency
+        batches = wal.batches_written if wal else 0
+        await store.close()
+
+    if window is None:
+        name = "no log"
+    else:
+        name = f"window={window * 1000:g}ms" + ("" if fsync else " (no fsync)")
+    return Measurement(
+        name=name,
+        seconds_per_op=elapsed / commits,
+        extra={"commits_per_fsync": round(commits / batches, 1) if batches else "-"},
+    )
+
+
+async def main() -> None:
+    for concurrency in CONCURRENCY:
+        measurements = [await run(concurrency, None)]
+        measurements.append(await run(concurrency, 0.0, fsync=False))
+        for window in WINDOWS:
+            measurements.append(await run(concurrency, window))
+        print_table(f"{concurrency} concurrent committers", measurements)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
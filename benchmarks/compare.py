@@ -0,0 +1,67 @@
+"""Compare two benchmark result files and flag regressions.
+
+Run with ``python -m benchmarks.compare baseline.json current.json``; exits
+with status 1 if any benchmark got slower than the threshold allows.
+"""
+
+import argparse
+import sys
+
+from benchmarks.harness import Measurement, read_results
+
+
+def compare(
+    baseline: dict[str, Measurement],
+    current: dict[str, Measurement],
+    threshold: float,
+) -> list[str]:
+    """Print each benchmark's change and return the names that regressed.
+
+    A benchmark regresses when its time per operation grew by more than
+    `threshold`, e.g. 0.1 for 10%. Benchmarks missing from either side are
+    listed but never count as regressions.
+    """
+    regressions = []
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in current:
+            print(f"{'removed':>10}  {name}")
+            continue
+        if name not in baseline:
+            print(f"{'new':>10}  {name}")
+            continue
+        change = current[name].seconds_per_op / baseline[name].seconds_per_op - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(
+            f"{change:>+10.1%}  {name}  "
+            f"{baseline[name].seconds_per_op * 1e6:.1f} -> "
+            f"{current[name].seconds_per_op * 1e6:.1f} us/op{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed slowdown before flagging, as a fraction (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    regressions = compare(
+        read_results(args.baseline), read_results(args.current), args.threshold
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from uuid import uuid4
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.order_key import keys_between
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+
+LIKERT = ["Strongly disagree", "Disagree", "Neutral", "Agree", "Strongly agree"]
+
+
+def build_template(
+    sections: int, questions_per_section: int, options: int = 5
+) -> TemplateAggregate:
+    """Build a draft template with identified sections and choice questions."""
+    labels = (LIKERT * (options // len(LIKERT) + 1))[:options]
+    template = TemplateAggregate(
+        id=uuid4(), title="Benchmark Template", description="Synthetic"
+    )
+    section_keys = keys_between(None, None, sections)
+    question_keys = keys_between(None, None, questions_per_section)
+    for s in range(sections):
+        section = SectionEntity(
+            id=uuid4(), title=f"Section {s}", order_key=section_keys[s]
+        )
+        for q in range(questions_per_section):
+            section.questions.append(
+                QuestionEntity(
+                    id=uuid4(),
+                    order_key=question_keys[q],
+                    text=f"How much do you agree with statement {s}.{q}?",
+                    type=QuestionType.SINGLE_CHOICE,
+                    options=[
+                        QuestionOption(label=label, value=str(i), order=i)
+                        for i, label in enumerate(labels)
+                    ],
+                )
+            )
+        template.sections.append(section)
+    return template
@@ -0,0 +1,164 @@
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+
+@dataclass
+class Measurement:
+    name: str
+    seconds_per_op: float
+    extra: dict = field(default_factory=dict)
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.seconds_per_op if self.seconds_per_op else float("inf")
+
+
+def measure(
+    name: str,
+    fn: Callable[[], object],
+    *,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    **extra,
+) -> Measurement:
+    """Time `fn`, returning the best per-call time over `repeat` rounds.
+
+    Each round calls `fn` enough times to run for at least `min_time`. The
+    garbage collector is paused while timing, as `timeit` does.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(name, fn, repeat, min_time, extra)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _measure(name, fn, repeat, min_time, extra) -> Measurement:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or number >= 1_000_000:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return Measurement(name=name, seconds_per_op=best, extra=extra)
+
+
+async def measure_async(
+    name: str,
+    fn: Callable[[], Awaitable[object]],
+    *,
+    number: int,
+    repeat: int = 5,
+    setup: Callable[[], Awaitable[object]] | None = None,
+    **extra,
+) -> Measurement:
+    """Time `number` sequential awaits of `fn`, best of `repeat` rounds.
+
+    `setup` is awaited, untimed, before each round, e.g. to provide fresh
+    drafts to a command that can only run once per template.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            await setup()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                await fn()
+            best = min(best, (time.perf_counter() - start) / number)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    return Measurement(name=name, seconds_per_op=best, extra=extra)
+
+
+async def measure_concurrent(
+    name: str,
+    fn: Callable[[], Awaitable[object]],
+    *,
+    operations: int,
+    concurrency: int = 1,
+    **extra,
+) -> Measurement:
+    """Time `operations` awaits of `fn` spread over `concurrency` tasks.
+
+    Reports wall-clock time per operation, i.e. the inverse of throughput.
+    """
+    per_task = operations // concurrency
+
+    async def worker() -> None:
+        for _ in range(per_task):
+            await fn()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return Measurement(
+        name=name, seconds_per_op=elapsed / (per_task * concurrency), extra=extra
+    )
+
+
+def print_table(title: str, measurements: list[Measurement]) -> None:
+    print(f"\n{title}")
+    print("-" * len(title))
+    for m in measurements:
+        extra = "  ".join(f"{k}={v}" for k, v in m.extra.items())
+        print(
+            f"{m.name:<48} {m.seconds_per_op * 1e6:>12.1f} us/op"
+            f" {m.ops_per_second:>12.0f} ops/s  {extra}"
+        )
+
+
+def write_results(path: str | Path, measurements: list[Measurement]) -> None:
+    """Save measurements as JSON, with the machine and commit they ran on."""
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "commit": _git_commit(),
+        },
+        "results": [asdict(m) for m in measurements],
+    }
+    Path(path).write_text(json.dumps(results, indent=2) + "\n")
+
+
+def read_results(path: str | Path) -> dict[str, Measurement]:
+    """Measurements saved by `write_results`, by name."""
+    results = json.loads(Path(path).read_text())["results"]
+    return {r["name"]: Measurement(**r) for r in results}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
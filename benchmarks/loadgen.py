@@ -0,0 +1,392 @@
+"""Synthetic survey-authoring traffic against the API, with latency percentiles
+per endpoint.
+
+Run in-process, with the settings of the environment and `.env`::
+
+    python -m benchmarks.loadgen --duration 30 --concurrency 32
+
+or against a running server::
+
+    python -m benchmarks.loadgen --url http://localhost:8000
+
+Each virtual user authors templates the way an editor would: it creates a
+template, adds sections and questions until the template reaches a size drawn
+from realistic distributions, edits questions, publishes it, and sometimes
+starts a revision of a published template; it reads templates back between
+edits. `--mix` weights the operations. The API has no endpoint for survey
+responses yet, so there is no submission traffic.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+OPERATIONS = ["create", "section", "question", "edit", "publish", "revise", "read"]
+DEFAULT_MIX = "create=1,section=3,question=15,edit=5,publish=1,revise=0.3,read=20"
+
+# Question types as editors use them, weighted; choice types carry options.
+QUESTION_TYPES = {
+    "single_choice": 35,
+    "multiple_choice": 15,
+    "dropdown": 5,
+    "text": 20,
+    "number": 8,
+    "boolean": 8,
+    "date": 5,
+    "datetime": 2,
+    "time": 2,
+}
+CHOICE_TYPES = {"single_choice", "multiple_choice", "dropdown"}
+LIKERT = ["Strongly disagree", "Disagree", "Neutral", "Agree", "Strongly agree"]
+
+
+def draw_sections(rng: random.Random) -> int:
+    """Sections per template: median 3, a long tail up to 30."""
+    return min(30, max(1, round(rng.lognormvariate(1.1, 0.6))))
+
+
+def draw_questions(rng: random.Random) -> int:
+    """Questions per section: median 6, a long tail up to 60."""
+    return min(60, max(1, round(rng.lognormvariate(1.8, 0.7))))
+
+
+def draw_question(rng: random.Random) -> dict:
+    """Body of a question, with a Likert scale or 2-12 options for choices."""
+    question_type = rng.choices(*zip(*QUESTION_TYPES.items()))[0]
+    text = f"Question {rng.randrange(10**6)}: how would you rate this aspect?"
+    options = None
+    if question_type in CHOICE_TYPES:
+        if rng.random() < 0.4:
+            options = list(LIKERT)
+        else:
+            count = min(12, max(2, round(rng.lognormvariate(1.4, 0.4))))
+            options = [f"Option {i + 1}" for i in range(count)]
+    return {
+        "text": text,
+        "type": question_type,
+        "options": options,
+        "required": rng.random() < 0.7,
+    }
+
+
+@dataclass
+class Draft:
+    """What a virtual user knows of one of its templates."""
+
+    template_id: str
+    target_sections: int
+    target_questions: dict[str, int] = field(default_factory=dict)
+    # Question IDs by section ID, as of the last read.
+    questions: dict[str, list[str]] = field(default_factory=dict)
+    sections_added: int = 0
+    pending_reads: bool = False
+
+    def complete(self) -> bool:
+        return self.sections_added >= self.target_sections and all(
+            len(self.questions.get(s, ())) >= n
+            for s, n in self.target_questions.items()
+        )
+
+
+@dataclass
+class Stats:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class VirtualUser:
+    """One editor issuing requests one after the other."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        stats: Stats,
+        mix: dict[str, float],
+        rng: random.Random,
+        published: list[str],
+    ):
+        self.client = client
+        self.stats = stats
+        self.mix = mix
+        self.rng = rng
+        self.published = published  # shared by all users
+        self.drafts: list[Draft] = []
+
+    async def request(
+        self, endpoint: str, method: str, path: str, body: dict | None = None
+    ) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, json=body)
+        except httpx.HTTPError:
+            self.stats.errors[endpoint] += 1
+            return None
+        self.stats.latencies[endpoint].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.stats.errors[endpoint] += 1
+            return None
+        return response
+
+    async def step(self) -> None:
+        operation = self.rng.choices(*zip(*self.mix.items()))[0]
+        if not await getattr(self, operation)():
+            await self.create()
+
+    async def create(self) -> bool:
+        response = await self.request(
+            "POST /templates/create",
+            "POST",
+            "/templates/create",
+            {"title": "Load test survey", "description": "Synthetic"},
+        )
+        if response is not None:
+            self.drafts.append(
+                Draft(response.json()["template_id"], draw_sections(self.rng))
+            )
+        return True
+
+    async def section(self) -> bool:
+        drafts = [d for d in self.drafts if d.sections_added < d.target_sections]
+        if not drafts:
+            return False
+        draft = self.rng.choice(drafts)
+        response = await self.request(
+            "POST /templates/{id}/sections",
+            "POST",
+            f"/templates/{draft.template_id}/sections",
+            {"title": "Section", "description": "About this part"},
+        )
+        if response is not None:
+            draft.sections_added += 1
+            draft.pending_reads = True
+        return True
+
+    async def question(self) -> bool:
+        candidates = [
+            (draft, section_id)
+            for draft in self.drafts
+            for section_id, target in draft.target_questions.items()
+            if len(draft.questions.get(section_id, ())) < target
+        ]
+        if not candidates:
+            return await self.refresh_one()
+        draft, section_id = self.rng.choice(candidates)
+        response = await self.request(
+            "POST /templates/{id}/sections/{id}/questions",
+            "POST",
+            f"/templates/{draft.template_id}/sections/{section_id}/questions",
+            draw_question(self.rng),
+        )
+        if response is not None:
+            # The ID is not returned; count it until the next read finds it.
+            draft.questions.setdefault(section_id, []).append("")
+            draft.pending_reads = True
+        return True
+
+    async def edit(self) -> bool:
+        candidates = [
+            (draft, section_id, question_id)
+            for draft in self.drafts
+            for section_id, question_ids in draft.questions.items()
+            for question_id in question_ids
+            if question_id
+        ]
+        if not candidates:
+            return await self.refresh_one()
+        draft, section_id, question_id = self.rng.choice(candidates)
+        await self.request(
+            "PUT /templates/{id}/sections/{id}/questions/{id}",
+            "PUT",
+            f"/templates/{draft.template_id}/sections/{section_id}"
+            f"/questions/{question_id}",
+            draw_question(self.rng),
+        )
+        return True
+
+    async def publish(self) -> bool:
+        drafts = [d for d in self.drafts if d.complete() and d.questions]
+        if not drafts:
+            return False
+        draft = self.rng.choice(drafts)
+        response = await self.request(
+            "POST /templates/{id}/publish",
+            "POST",
+            f"/templates/{draft.template_id}/publish",
+        )
+        self.drafts.remove(draft)
+        if response is not None:
+            self.published.append(draft.template_id)
+        return True
+
+    async def revise(self) -> bool:
+        if not self.published:
+            return False
+        template_id = self.rng.choice(self.published)
+        response = await self.request(
+            "POST /templates/{id}/revisions",
+            "POST",
+            f"/templates/{template_id}/revisions",
+        )
+        if response is not None:
+            draft = Draft(response.json()["template_id"], target_sections=0)
+            await self.read(draft)
+            self.drafts.append(draft)
+        return True
+
+    async def read(self, draft: Draft | None = None) -> bool:
+        if draft is None:
+            ids = [d.template_id for d in self.drafts] + self.published[-100:]
+            if not ids:
+                return False
+            template_id = self.rng.choice(ids)
+            draft = next((d for d in self.drafts if d.template_id == template_id), None)
+        else:
+            template_id = draft.template_id
+        response = await self.request(
+            "GET /templates/{id}", "GET", f"/templates/{template_id}"
+        )
+        if response is not None and draft is not None:
+            self._learn(draft, response.json())
+        return True
+
+    async def refresh_one(self) -> bool:
+        drafts = [d for d in self.drafts if d.pending_reads]
+        if not drafts:
+            return False
+        return await self.read(self.rng.choice(drafts))
+
+    def _learn(self, draft: Draft, template: dict) -> None:
+        """Record section and question IDs; new sections get a target size."""
+        draft.pending_reads = False
+        draft.sections_added = max(draft.sections_added, len(template["sections"]))
+        for section in template["sections"]:
+            section_id = str(section["id"])
+            draft.questions[section_id] = [str(q["id"]) for q in section["questions"]]
+            if section_id not in draft.target_questions:
+                draft.target_questions[section_id] = max(
+                    len(section["questions"]), draw_questions(self.rng)
+                )
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = float(weight)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(ordered: list[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(stats: Stats, elapsed: float) -> dict:
+    """Throughput and latency percentiles (ms) per endpoint."""
+    rows = {}
+    for endpoint in sorted(stats.latencies.keys() | stats.errors.keys()):
+        ordered = sorted(stats.latencies.get(endpoint, ()))
+        row = {"requests": len(ordered), "errors": stats.errors.get(endpoint, 0)}
+        row["throughput"] = len(ordered) / elapsed
+        if ordered:
+            for name, fraction in [("p50", 0.5), ("p90", 0.9), ("p99", 0.99)]:
+                row[name] = percentile(ordered, fraction) * 1000
+            row["max"] = ordered[-1] * 1000
+        rows[endpoint] = row
+    return rows
+
+
+def print_report(rows: dict, elapsed: float) -> None:
+    total = sum(row["requests"] for row in rows.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s)")
+    print(
+        f"{'endpoint':<50} {'req/s':>8} {'errors':>7}"
+        f" {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for endpoint, row in rows.items():
+        latencies = "".join(
+            f" {row.get(name, float('nan')):>8.2f}"
+            for name in ("p50", "p90", "p99", "max")
+        )
+        print(f"{endpoint:<50} {row['throughput']:>8.1f} {row['errors']:>7}{latencies}")
+
+
+@contextlib.asynccontextmanager
+async def open_client(url: str | None):
+    """Client for a server at `url`, or for the app run in this process."""
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+            yield client
+        return
+
+    from app.api.main import create_app
+
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadgen"
+        ) as client:
+            yield client
+
+
+async def run(
+    url: str | None,
+    duration: float,
+    concurrency: int,
+    mix: dict[str, float],
+    seed: int,
+) -> tuple[Stats, float]:
+    stats = Stats()
+    published: list[str] = []
+    async with open_client(url) as client:
+        users = [
+            VirtualUser(client, stats, mix, random.Random(seed + i), published)
+            for i in range(concurrency)
+        ]
+        deadline = time.perf_counter() + duration
+
+        async def drive(user: VirtualUser) -> None:
+            while time.perf_counter() < deadline:
+                await user.step()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(drive(user) for user in users))
+        elapsed = time.perf_counter() - start
+    return stats, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="server to load (default: run the app here)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help=f"operation weights (default: {DEFAULT_MIX})",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    args = parser.parse_args()
+
+    stats, elapsed = asyncio.run(
+        run(args.url, args.duration, args.concurrency, args.mix, args.seed)
+    )
+    rows = report(stats, elapsed)
+    print_report(rows, elapsed)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"elapsed": elapsed, "endpoints": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Run the domain, application, repository and API benchmarks, optionally
+saving the results as JSON for `benchmarks.compare`.
+
+Run with ``python -m benchmarks.suite [--quick] [--output results.json]``.
+"""
+
+import argparse
+import asyncio
+import inspect
+
+from benchmarks import bench_api, bench_command_bus, bench_domain, bench_repository
+from benchmarks.harness import Measurement, print_table, write_results
+
+GROUPS = {
+    "domain": bench_domain,
+    "application": bench_command_bus,
+    "repository": bench_repository,
+    "api": bench_api,
+}
+
+
+async def run(groups: list[str], quick: bool) -> list[Measurement]:
+    measurements = []
+    for group in groups:
+        results = GROUPS[group].collect(quick=quick)
+        if inspect.isawaitable(results):
+            results = await results
+        print_table(group, results)
+        measurements += results
+    return measurements
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "groups", nargs="*", help=f"any of {', '.join(GROUPS)} (default: all)"
+    )
+    parser.add_argument("--quick", action="store_true", help="smaller sizes only")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+    unknown = set(args.groups) - GROUPS.keys()
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(sorted(unknown))}")
+
+    measurements = asyncio.run(run(args.groups or list(GROUPS), args.quick))
+    if args.output:
+        write_results(args.output, measurements)
+        print(f"\nSaved {len(measurements)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
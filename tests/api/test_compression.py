@@ -0,0 +1,135 @@
+import gzip
+from uuid import UUID
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+
+async def _get_raw(client: httpx.AsyncClient, url: str, **kwargs) -> tuple:
+    """Response to a GET and its body as sent, without content decoding."""
+    async with client.stream("GET", url, **kwargs) as response:
+        return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+class TestCompressionAPI:
+    """Test cases for compressed template reads and their entity tags."""
+
+    @pytest_asyncio.fixture
+    async def app(self):
+        """Fixture for a started app compressing bodies of 200 bytes or more."""
+        app = create_app(Settings(process_pool_workers=1, compression_min_size=200))
+        async with app.router.lifespan_context(app):
+            yield app
+
+    @pytest_asyncio.fixture
+    async def client(self, app):
+        """Fixture for a client asking for uncompressed bodies by default."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://test",
+            headers={"Accept-Encoding": "identity"},
+        ) as client:
+            yield client
+
+    @pytest_asyncio.fixture
+    async def template_id(self, client):
+        """Fixture for a published template of ten questions."""
+        created = await client.post("/templates/create", json={"title": "Survey"})
+        template_id = created.json()["template_id"]
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        section_id = (await client.get(f"/templates/{template_id}")).json()["sections"][
+            0
+        ]["id"]
+        for i in range(10):
+            await client.post(
+                f"/templates/{template_id}/sections/{section_id}/questions",
+                json={"text": f"Question {i}", "type": "text"},
+            )
+        await client.post(f"/templates/{template_id}/publish")
+        return template_id
+
+    @pytest.mark.asyncio
+    async def test_gzip_is_negotiated(self, client, template_id):
+        """Test that a client accepting gzip gets a gzipped body."""
+        plain = await client.get(f"/templates/{template_id}")
+        response, body = await _get_raw(
+            client, f"/templates/{template_id}", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert "content-encoding" not in plain.headers
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert gzip.decompress(body) == plain.content
+        assert len(body) < len(plain.content)
+
+    @pytest.mark.asyncio
+    async def test_published_body_is_compressed_once(self, app, client, template_id):
+        """Test that repeated reads serve the bytes cached for the version."""
+        bodies = [
+            (
+                await _get_raw(
+                    client,
+                    f"/templates/{template_id}",
+                    headers={"Accept-Encoding": "gzip"},
+                )
+            )[1]
+            for _ in range(5)
+        ]
+
+        cached = await app.state.template_reader.get(UUID(template_id))
+        assert all(body == cached.encoded["gzip"] for body in bodies)
+        assert app.state.template_reader.hits >= 5
+
+    @pytest.mark.asyncio
+    async def test_small_bodies_are_not_compressed(self, client, template_id):
+        """Test that bodies under the threshold are sent as they are."""
+        response = await client.get(
+            f"/templates/{template_id}",
+            params={"fields": "title", "include": ""},
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"title": "Survey"}
+
+    @pytest.mark.asyncio
+    async def test_if_none_match_returns_not_modified(self, client, template_id):
+        """Test that a current entity tag, in any coding, gets a 304."""
+        plain = await client.get(f"/templates/{template_id}")
+        gzipped = await client.get(
+            f"/templates/{template_id}", headers={"Accept-Encoding": "gzip"}
+        )
+        revalidated = await client.get(
+            f"/templates/{template_id}",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]},
+        )
+        stale = await client.get(
+            f"/templates/{template_id}", headers={"If-None-Match": '"1"'}
+        )
+
+        assert plain.headers["etag"] != gzipped.headers["etag"]
+        assert gzipped.headers["etag"].endswith('-gzip"')
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == gzipped.headers["etag"]
+        assert stale.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_draft_is_compressed_per_request(self, client):
+        """Test that drafts are compressed but get a new tag on each change."""
+        created = await client.post("/templates/create", json={"title": "D" * 300})
+        template_id = created.json()["template_id"]
+        first = await client.get(
+            f"/templates/{template_id}", headers={"Accept-Encoding": "gzip"}
+        )
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        second = await client.get(
+            f"/templates/{template_id}", headers={"Accept-Encoding": "gzip"}
+        )
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"] != second.headers["etag"]
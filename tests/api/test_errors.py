@@ -0,0 +1,208 @@
+import logging
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from app.api.errors import (
+    ErrorLogLimiter,
+    UnexpectedErrorMiddleware,
+    register_exception_handlers,
+)
+from app.api.main import create_app
+from app.application.commands.command_bus import HandlerNotFoundError, SimpleCommandBus
+from app.application.commands.template_commands import CreateTemplateCommand
+from app.infrastructure.settings import Settings
+
+
+class TestExceptionHandlers:
+    """Test cases for mapping domain errors to HTTP responses."""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """Fixture for a client of the app over the in-memory backend."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                yield client
+
+    @pytest_asyncio.fixture
+    async def template_id(self, client):
+        """Fixture for a draft template with one section."""
+        response = await client.post("/templates/create", json={"title": "T"})
+        template_id = response.json()["template_id"]
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        return template_id
+
+    async def _section_id(self, client, template_id) -> str:
+        template = (await client.get(f"/templates/{template_id}")).json()
+        return template["sections"][0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_missing_section_is_404(self, client, template_id):
+        """Test that an unknown section ID is reported as not found."""
+        response = await client.post(
+            f"/templates/{template_id}/sections/{uuid4()}/questions",
+            json={"text": "Q", "type": "text"},
+        )
+
+        assert response.status_code == 404
+        assert "Section" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_missing_question_is_404(self, client, template_id):
+        """Test that editing an unknown question is reported as not found."""
+        section_id = await self._section_id(client, template_id)
+
+        response = await client.put(
+            f"/templates/{template_id}/sections/{section_id}/questions/{uuid4()}",
+            json={"text": "Q", "type": "text"},
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_invalid_state_transition_is_409(self, client, template_id):
+        """Test that publishing an empty template conflicts with its state."""
+        response = await client.post(f"/templates/{template_id}/publish")
+
+        assert response.status_code == 409
+        assert response.json() == {"detail": "Cannot publish an empty survey template."}
+
+    @pytest.mark.asyncio
+    async def test_unknown_question_type_is_422(self, client, template_id):
+        """Test that the DTO rejects a question type outside the enumeration."""
+        section_id = await self._section_id(client, template_id)
+
+        response = await client.post(
+            f"/templates/{template_id}/sections/{section_id}/questions",
+            json={"text": "Q", "type": "essay"},
+        )
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "type"]
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_is_422(self, client, template_id):
+        """Test that handlers reject options beyond the structure limits."""
+        section_id = await self._section_id(client, template_id)
+
+        response = await client.post(
+            f"/templates/{template_id}/sections/{section_id}/questions",
+            json={"text": "Q", "type": "dropdown", "options": ["o"] * 50_000},
+        )
+
+        assert response.status_code == 422
+        assert "more than 100 options" in response.text
+
+
+class TestConfiguredLimits:
+    """Test cases for structure limits configured per app."""
+
+    @pytest.mark.asyncio
+    async def test_apps_keep_their_own_limits(self):
+        """Test that two apps of one process each enforce their settings."""
+        strict = create_app(
+            Settings(process_pool_workers=1, template_max_title_length=5)
+        )
+        lenient = create_app(Settings(process_pool_workers=1))
+        async with (
+            strict.router.lifespan_context(strict),
+            lenient.router.lifespan_context(lenient),
+        ):
+            responses = []
+            for app in (strict, lenient):
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    responses.append(
+                        await client.post("/templates/create", json={"title": "Survey"})
+                    )
+
+        assert [r.status_code for r in responses] == [422, 201]
+        assert "longer than 5 characters" in responses[0].text
+
+
+class TestUnexpectedErrors:
+    """Test cases for 500 responses and their rate-limited logging."""
+
+    @pytest.fixture
+    def limiter(self):
+        """Fixture for a limiter logging two tracebacks per minute."""
+        return ErrorLogLimiter(burst=2, interval=60)
+
+    @pytest.fixture
+    def app(self, limiter):
+        """Fixture for an app whose endpoints fail."""
+        app = FastAPI()
+        register_exception_handlers(app)
+        app.add_middleware(UnexpectedErrorMiddleware, limiter=limiter)
+
+        @app.get("/boom")
+        async def boom():
+            raise KeyError("boom")
+
+        @app.get("/validation")
+        async def validation():
+            # A pydantic error deep inside is a bug, not a bad request.
+            Settings(sqlite_readers=0)
+
+        @app.get("/unwired")
+        async def unwired():
+            await SimpleCommandBus().execute(CreateTemplateCommand(title="T"))
+
+        return app
+
+    @pytest.mark.asyncio
+    async def test_error_storm_logs_few_tracebacks(self, app, caplog):
+        """Test that tracebacks beyond the burst are counted, not logged."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            with caplog.at_level(logging.ERROR, logger="app.api.errors"):
+                responses = [await client.get("/boom") for _ in range(50)]
+
+        assert {r.status_code for r in responses} == {500}
+        assert responses[0].json() == {"detail": "Internal server error"}
+        assert len(caplog.records) == 2
+        assert caplog.records[0].exc_info is not None
+
+    @pytest.mark.asyncio
+    async def test_validation_error_inside_endpoint_is_500(self, app):
+        """Test that pydantic errors are no longer reported as bad requests."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/validation")
+
+        assert response.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_unregistered_command_is_500(self, app, caplog):
+        """Test that a command without a handler is logged as a bug."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            with caplog.at_level(logging.ERROR, logger="app.api.errors"):
+                response = await client.get("/unwired")
+
+        assert response.status_code == 500
+        assert isinstance(caplog.records[0].exc_info[1], HandlerNotFoundError)
+
+    def test_next_traceback_reports_suppressed_errors(self, caplog, monkeypatch):
+        """Test that suppressed errors are summarized once tokens refill."""
+        clock = iter([0.0] * 5 + [60.0])
+        monkeypatch.setattr("app.api.errors.time.monotonic", lambda: next(clock))
+        limiter = ErrorLogLimiter(burst=2, interval=60)
+
+        with caplog.at_level(logging.ERROR, logger="app.api.errors"):
+            for _ in range(4):
+                limiter.log(KeyError("k"), "GET", "/")
+            limiter.log(KeyError("k"), "GET", "/")
+
+        assert len(caplog.records) == 3
+        assert "2 KeyError suppressed" in caplog.records[-1].getMessage()
@@ -0,0 +1,168 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.idempotency import IdempotencyStore, StoredResponse
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+
+class TestIdempotencyKeys:
+    """Test cases for retried writes carrying an `Idempotency-Key`."""
+
+    @pytest_asyncio.fixture
+    async def app(self):
+        """Fixture for a started app over the in-memory backend."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            yield app
+
+    @pytest_asyncio.fixture
+    async def client(self, app):
+        """Fixture for a client of the app."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_retry_is_replayed(self, app, client):
+        """Test a retried create answers the first response without creating
+        another template."""
+        headers = {"Idempotency-Key": "create-1"}
+
+        first = await client.post(
+            "/templates/create", json={"title": "T"}, headers=headers
+        )
+        retry = await client.post(
+            "/templates/create", json={"title": "T"}, headers=headers
+        )
+
+        assert first.status_code == retry.status_code == 201
+        assert retry.json() == first.json()
+        assert retry.headers["location"] == first.headers["location"]
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+        assert len(app.state.storage) == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_run_once(self, app, client):
+        """Test duplicates sent together share the original execution."""
+        headers = {"Idempotency-Key": "create-2"}
+
+        responses = await asyncio.gather(
+            *(
+                client.post("/templates/create", json={"title": "T"}, headers=headers)
+                for _ in range(5)
+            )
+        )
+
+        assert len({r.json()["template_id"] for r in responses}) == 1
+        assert len(app.state.storage) == 1
+
+    @pytest.mark.asyncio
+    async def test_key_reused_for_another_body_is_422(self, client):
+        """Test a key cannot be replayed for a different request."""
+        headers = {"Idempotency-Key": "create-3"}
+        await client.post("/templates/create", json={"title": "T"}, headers=headers)
+
+        response = await client.post(
+            "/templates/create", json={"title": "Other"}, headers=headers
+        )
+
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_oversize_body_is_413(self, app, client):
+        """Test a body longer than the largest allowed write is refused,
+        whether or not it declares its length."""
+        limit = app.state.template_limits.max_request_bytes
+        body = b" " * (limit + 1)
+
+        async def chunks():
+            for start in range(0, len(body), 65536):
+                yield body[start : start + 65536]
+
+        declared = await client.post(
+            "/templates/create", content=body, headers={"Idempotency-Key": "big-1"}
+        )
+        streamed = await client.post(
+            "/templates/create", content=chunks(), headers={"Idempotency-Key": "big-2"}
+        )
+
+        assert declared.status_code == streamed.status_code == 413
+        assert len(app.state.storage) == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_not_stored(self, app, client):
+        """Test an error response is not replayed, so a retry runs again."""
+        template_id = (
+            await client.post("/templates/create", json={"title": "T"})
+        ).json()["template_id"]
+        headers = {"Idempotency-Key": "publish-1"}
+
+        first = await client.post(f"/templates/{template_id}/publish", headers=headers)
+        retry = await client.post(f"/templates/{template_id}/publish", headers=headers)
+
+        assert first.status_code == retry.status_code == 409
+        assert "idempotent-replayed" not in retry.headers
+        assert len(app.state.idempotency_store) == 0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_by_path(self, app, client):
+        """Test the same key on two endpoints runs both requests."""
+        headers = {"Idempotency-Key": "same"}
+        created = await client.post(
+            "/templates/create", json={"title": "T"}, headers=headers
+        )
+        template_id = created.json()["template_id"]
+
+        response = await client.post(
+            f"/templates/{template_id}/sections", json={"title": "S"}, headers=headers
+        )
+
+        assert response.status_code == 201
+        assert "idempotent-replayed" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_without_key_runs_every_time(self, app, client):
+        """Test requests without a key are not deduplicated."""
+        await client.post("/templates/create", json={"title": "T"})
+        await client.post("/templates/create", json={"title": "T"})
+
+        assert len(app.state.storage) == 2
+
+
+class TestIdempotencyStore:
+    """Test cases for the bounds of stored responses."""
+
+    def _response(self, stored_at: float | None = None) -> StoredResponse:
+        return StoredResponse(
+            fingerprint=b"",
+            status=201,
+            headers=[],
+            body=b"{}",
+            stored_at=time.monotonic() if stored_at is None else stored_at,
+        )
+
+    def test_evicts_least_recently_stored(self):
+        """Test the store keeps at most `max_keys` responses."""
+        store = IdempotencyStore(max_keys=2, ttl=60)
+        for key in ("a", "b", "c"):
+            store.put(("POST", "/", key.encode()), self._response())
+
+        assert store.get(("POST", "/", b"a")) is None
+        assert store.get(("POST", "/", b"c")) is not None
+        assert store.evictions == 1
+
+    def test_expires_after_ttl(self):
+        """Test a response older than the TTL is not replayed."""
+        store = IdempotencyStore(max_keys=10, ttl=60)
+        key = ("POST", "/", b"a")
+        store.put(key, self._response(stored_at=time.monotonic() - 61))
+
+        assert store.get(key) is None
+        assert len(store) == 0
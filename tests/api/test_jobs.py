@@ -0,0 +1,116 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+RESPOND_ASYNC = {"Prefer": "respond-async"}
+
+
+class TestAsyncCommands:
+    """Test cases for commands submitted with `Prefer: respond-async`."""
+
+    @pytest_asyncio.fixture
+    async def client(self, tmp_path):
+        """Fixture for a client of the app over the in-memory backend, with a
+        job journal."""
+        settings = Settings(
+            process_pool_workers=1, command_journal_path=str(tmp_path / "jobs.log")
+        )
+        app = create_app(settings)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                yield client
+
+    async def _poll(self, client, location: str) -> dict:
+        for _ in range(1000):
+            job = (await client.get(location)).json()
+            if job["status"] in ("succeeded", "failed"):
+                return job
+            await asyncio.sleep(0.001)
+        raise AssertionError(f"{location} did not finish")
+
+    @pytest.mark.asyncio
+    async def test_create_is_accepted_and_polled(self, client):
+        """Test an async create answers 202 and its job reports the template."""
+        response = await client.post(
+            "/templates/create", json={"title": "T"}, headers=RESPOND_ASYNC
+        )
+
+        assert response.status_code == 202
+        assert response.headers["preference-applied"] == "respond-async"
+        location = response.headers["location"]
+        assert location == f"/jobs/{response.json()['job_id']}"
+
+        job = await self._poll(client, location)
+        assert job["status"] == "succeeded"
+        assert job["command"] == "CreateTemplateCommand"
+        template_id = job["result"]["template_id"]
+        assert (await client.get(f"/templates/{template_id}")).json()["title"] == "T"
+
+    @pytest.mark.asyncio
+    async def test_failed_command_reports_error(self, client):
+        """Test a command rejected by the domain fails its job."""
+        response = await client.post("/templates/create", json={"title": "T"})
+        template_id = response.json()["template_id"]
+
+        response = await client.post(
+            f"/templates/{template_id}/publish", headers=RESPOND_ASYNC
+        )
+        job = await self._poll(client, response.headers["location"])
+
+        assert job["status"] == "failed"
+        assert job["error"] == {
+            "type": "InvalidTemplateStateError",
+            "detail": "Cannot publish an empty survey template.",
+        }
+
+    @pytest.mark.asyncio
+    async def test_without_preference_runs_synchronously(self, client):
+        """Test commands without the preference still answer with their result."""
+        response = await client.post("/templates/create", json={"title": "T"})
+
+        assert response.status_code == 201
+        assert "preference-applied" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_preference_is_ignored_without_journal(self):
+        """Test that no job is accepted when it could be lost at shutdown."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/templates/create", json={"title": "T"}, headers=RESPOND_ASYNC
+                )
+
+            assert response.status_code == 201
+            assert "preference-applied" not in response.headers
+            assert app.state.command_queue.submitted == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_is_404(self, client):
+        """Test polling an unknown job is reported as not found."""
+        response = await client.get(f"/jobs/{uuid4()}")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_stats(self, client):
+        """Test the queue reports its depth and counters."""
+        response = await client.post(
+            "/templates/create", json={"title": "T"}, headers=RESPOND_ASYNC
+        )
+        await self._poll(client, response.headers["location"])
+
+        stats = (await client.get("/jobs/stats")).json()
+        assert stats["workers"] == 4
+        assert stats["queued"] == 0
+        assert stats["submitted"] == stats["succeeded"] == 1
@@ -0,0 +1,78 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+WORKERS = 3
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestMultiWorkerDeployment:
+    """Integration tests running uvicorn with several worker processes."""
+
+    @pytest.fixture
+    def server(self, tmp_path):
+        """Fixture for a uvicorn server with workers sharing a SQLite file."""
+        port = free_port()
+        log = open(tmp_path / "server.log", "w+")
+        env = {
+            **os.environ,
+            "PERSISTENCE_BACKEND": "sqlite",
+            "SQLITE_PATH": str(tmp_path / "templates.db"),
+            "WEB_CONCURRENCY": str(WORKERS),
+            "PROCESS_POOL_WORKERS": "1",
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.api.main:app", "--port", str(port)],
+            cwd=ROOT,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                log.seek(0)
+                started = log.read().count("Application startup complete")
+                if started == WORKERS:
+                    break
+                assert process.poll() is None, log.read()
+                assert time.monotonic() < deadline, "workers did not start"
+                time.sleep(0.1)
+            yield base_url
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            log.close()
+
+    def test_writes_are_visible_from_every_worker(self, server):
+        """Test read-your-writes when requests land on different workers."""
+        for i in range(30):
+            # A fresh connection per request lets the kernel pick any worker.
+            created = httpx.post(
+                f"{server}/templates/create", json={"title": f"Template {i}"}
+            )
+            assert created.status_code == 201
+            template_id = created.json()["template_id"]
+
+            added = httpx.post(
+                f"{server}/templates/{template_id}/sections", json={"title": "S"}
+            )
+            assert added.status_code == 201
+
+            fetched = httpx.get(f"{server}/templates/{template_id}")
+            assert fetched.status_code == 200
+            assert fetched.json()["title"] == f"Template {i}"
+            assert len(fetched.json()["sections"]) == 1
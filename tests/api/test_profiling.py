@@ -0,0 +1,86 @@
+import pstats
+
+import httpx
+import pytest
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+
+def _metrics(response: httpx.Response) -> dict[str, str]:
+    metrics = {}
+    for metric in response.headers["server-timing"].split(", "):
+        name, _, params = metric.partition(";")
+        metrics[name] = params
+    return metrics
+
+
+class TestProfilingMiddleware:
+    """Test cases for opt-in request profiling."""
+
+    async def _post(self, settings: Settings, headers: dict) -> httpx.Response:
+        app = create_app(settings)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                return await client.post(
+                    "/templates/create", json={"title": "T"}, headers=headers
+                )
+
+    @pytest.mark.asyncio
+    async def test_header_reports_phase_breakdown(self):
+        """Test that a request with the token gets every phase and allocations."""
+        settings = Settings(profile_token="secret", process_pool_workers=1)
+
+        response = await self._post(settings, {"X-Profile": "secret"})
+
+        assert response.status_code == 201
+        metrics = _metrics(response)
+        for name in ("parse", "endpoint", "bus", "handler", "repository", "commit"):
+            assert metrics[name].startswith("dur=")
+        assert "blocks=" in metrics["alloc"]
+        assert "total" in metrics
+
+    @pytest.mark.asyncio
+    async def test_phases_add_up_to_total(self):
+        """Test that middleware and routing are reported as `app`, apart from
+        `parse`, and that the phases cover the whole request."""
+        settings = Settings(profile_token="secret", process_pool_workers=1)
+
+        response = await self._post(settings, {"X-Profile": "secret"})
+
+        durations = {
+            name: float(params.split("dur=")[1].split(";")[0])
+            for name, params in _metrics(response).items()
+            if params.startswith("dur=")
+        }
+        total = durations.pop("total")
+        assert {"app", "parse", "admission"} <= durations.keys()
+        assert sum(durations.values()) == pytest.approx(total, abs=0.01)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("header", [{}, {"X-Profile": "wrong"}])
+    async def test_unprofiled_requests_have_no_header(self, header):
+        """Test that profiling needs the right token when not sampled."""
+        settings = Settings(profile_token="secret", process_pool_workers=1)
+
+        response = await self._post(settings, header)
+
+        assert "server-timing" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_sampled_request_dumps_cprofile(self, tmp_path):
+        """Test that a sampled request writes a readable pstats file."""
+        settings = Settings(
+            profile_sample_rate=1.0,
+            profile_directory=str(tmp_path),
+            process_pool_workers=1,
+        )
+
+        response = await self._post(settings, {})
+
+        dumps = list(tmp_path.glob("*.pstats"))
+        assert len(dumps) == 1
+        assert _metrics(response)["cprofile"] == f'desc="{dumps[0].name}"'
+        assert pstats.Stats(str(dumps[0])).total_calls > 0
@@ -0,0 +1,63 @@
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+
+class TestSearchEndpoint:
+    """Test cases for full-text search over templates."""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """Fixture for a client of the app over the in-memory backend."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                yield client
+
+    @pytest.mark.asyncio
+    async def test_finds_words_of_committed_questions(self, client):
+        """Test a question added to a template makes it searchable."""
+        response = await client.post("/templates/create", json={"title": "Climat"})
+        template_id = response.json()["template_id"]
+        await client.post("/templates/create", json={"title": "Autre"})
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        template = (await client.get(f"/templates/{template_id}")).json()
+        await client.post(
+            f"/templates/{template_id}/sections/{template['sections'][0]['id']}"
+            "/questions",
+            json={"text": "Comment jugez-vous l'ambiance ?", "type": "text"},
+        )
+
+        # Commits are indexed in the background, shortly after them.
+        for _ in range(100):
+            response = await client.get("/templates/search", params={"q": "ambi"})
+            results = response.json()["results"]
+            if results:
+                break
+            await asyncio.sleep(0.01)
+
+        assert response.status_code == 200
+        assert [r["template_id"] for r in results] == [template_id]
+        assert results[0]["title"] == "Climat"
+        assert results[0]["status"] == "draft"
+
+    @pytest.mark.asyncio
+    async def test_no_match(self, client):
+        """Test a query matching nothing returns no results."""
+        response = await client.get("/templates/search", params={"q": "absent"})
+
+        assert response.json() == {"query": "absent", "results": []}
+
+    @pytest.mark.asyncio
+    async def test_query_is_required(self, client):
+        """Test a missing query is rejected."""
+        response = await client.get("/templates/search")
+
+        assert response.status_code == 422
@@ -0,0 +1,157 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+from tests.application.queries.test_template_feed import parse_event
+
+
+class EventStreamClient:
+    """Raw ASGI client of an event stream, reading events as they are sent
+    until it disconnects; httpx's ASGI transport only returns whole bodies."""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+        self.status = None
+        self.headers = {}
+        self.events: list[tuple[str, dict]] = []
+        self._buffer = b""
+        self._received = asyncio.Event()
+        self._disconnected = asyncio.Event()
+        self._task = None
+
+    def connect(self) -> None:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"test")],
+            "client": ("test", 1234),
+            "server": ("test", 80),
+        }
+        self._task = asyncio.create_task(self.app(scope, self._receive, self._send))
+
+    async def wait_for(self, count: int) -> list[tuple[str, dict]]:
+        """Wait until `count` events have been received."""
+        while len(self.events) < count and not self._task.done():
+            self._received.clear()
+            await asyncio.wait_for(self._received.wait(), 5)
+        return self.events
+
+    async def disconnect(self) -> None:
+        self._disconnected.set()
+        await asyncio.wait_for(self._task, 5)
+
+    async def _receive(self) -> dict:
+        await self._disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            self._buffer += message.get("body", b"")
+            *frames, self._buffer = self._buffer.split(b"\n\n")
+            for frame in frames:
+                if not frame.startswith(b":"):
+                    self.events.append(parse_event(frame))
+        self._received.set()
+
+
+class TestTemplateEventsAPI:
+    """Test cases for the live feed of template changes."""
+
+    @pytest_asyncio.fixture
+    async def app(self):
+        """Fixture for a started app over the in-memory backend."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            yield app
+
+    @pytest_asyncio.fixture
+    async def client(self, app):
+        """Fixture for a client sending commands to the app."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+
+    @pytest_asyncio.fixture
+    async def template_id(self, client):
+        """Fixture for a draft template with one section."""
+        created = await client.post("/templates/create", json={"title": "Shared"})
+        template_id = created.json()["template_id"]
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        return template_id
+
+    @pytest.mark.asyncio
+    async def test_1000_subscribers_receive_every_delta(self, app, client, template_id):
+        """Test that 1,000 connected editors each get the deltas of three
+        commands, in order, and are unsubscribed on disconnect."""
+        subscribers = [
+            EventStreamClient(app, f"/templates/{template_id}/events")
+            for _ in range(1000)
+        ]
+        for subscriber in subscribers:
+            subscriber.connect()
+        await asyncio.gather(*(s.wait_for(1) for s in subscribers))
+        feed = app.state.template_feed
+        assert len(feed) == 1000
+
+        section_id = (await client.get(f"/templates/{template_id}")).json()["sections"][
+            0
+        ]["id"]
+        await client.post(
+            f"/templates/{template_id}/sections/{section_id}/questions",
+            json={"text": "Why?", "type": "text"},
+        )
+        await client.post(f"/templates/{template_id}/sections", json={"title": "T"})
+        await client.post(f"/templates/{template_id}/publish")
+
+        received = await asyncio.gather(*(s.wait_for(4) for s in subscribers))
+        await asyncio.gather(*(s.disconnect() for s in subscribers))
+
+        assert subscribers[0].status == 200
+        assert subscribers[0].headers["content-type"].startswith("text/event-stream")
+        assert all(events == received[0] for events in received)
+        assert [name for name, _ in received[0]] == [
+            "ready",
+            "question_added",
+            "section_added",
+            "status_changed",
+        ]
+        assert [data["version"] for _, data in received[0]] == [2, 3, 4, 5]
+        assert feed.published == 3
+        assert len(feed) == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_template_is_not_found(self, app, client):
+        """Test that subscribing to an unknown template answers 404."""
+        response = await client.get(f"/templates/{uuid4()}/events")
+
+        assert response.status_code == 404
+        assert len(app.state.template_feed) == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_ends_the_streams(self, app, template_id):
+        """Test that closing the feed ends open streams."""
+        subscriber = EventStreamClient(app, f"/templates/{template_id}/events")
+        subscriber.connect()
+        await subscriber.wait_for(1)
+
+        app.state.template_feed.close()
+
+        await asyncio.wait_for(subscriber._task, 5)
+        assert subscriber.events == [("ready", {"version": 2})]
@@ -0,0 +1,91 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+
+
+class TestTemplateProjectionAPI:
+    """Test cases for partial template reads through `fields` and `include`."""
+
+    @pytest_asyncio.fixture
+    async def client(self):
+        """Fixture for a client of a started app over the in-memory backend."""
+        app = create_app(Settings(process_pool_workers=1))
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                yield client
+
+    @pytest_asyncio.fixture
+    async def template_id(self, client):
+        """Fixture for a template with a section of two choice questions."""
+        created = await client.post("/templates/create", json={"title": "Survey"})
+        template_id = created.json()["template_id"]
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        section_id = (await client.get(f"/templates/{template_id}")).json()["sections"][
+            0
+        ]["id"]
+        for text in ["Q1", "Q2"]:
+            await client.post(
+                f"/templates/{template_id}/sections/{section_id}/questions",
+                json={"text": text, "type": "single_choice", "options": ["Yes", "No"]},
+            )
+        return template_id
+
+    @pytest.mark.asyncio
+    async def test_sidebar_view(self, client, template_id):
+        """Test reading only the title and the sections with question counts."""
+        response = await client.get(
+            f"/templates/{template_id}",
+            params={"fields": "title", "include": "sections"},
+        )
+
+        assert response.status_code == 200
+        document = response.json()
+        assert set(document) == {"title", "sections"}
+        assert document["sections"][0]["title"] == "S"
+        assert document["sections"][0]["question_count"] == 2
+        assert "questions" not in document["sections"][0]
+
+    @pytest.mark.asyncio
+    async def test_without_options(self, client, template_id):
+        """Test reading questions without their options."""
+        response = await client.get(
+            f"/templates/{template_id}", params={"include": "sections,questions"}
+        )
+
+        questions = response.json()["sections"][0]["questions"]
+        assert [q["text"] for q in questions] == ["Q1", "Q2"]
+        assert all("options" not in q for q in questions)
+
+    @pytest.mark.asyncio
+    async def test_default_is_the_whole_template(self, client, template_id):
+        """Test that a read without selection returns every part."""
+        response = await client.get(f"/templates/{template_id}")
+
+        question = response.json()["sections"][0]["questions"][0]
+        assert [o["label"] for o in question["options"]] == ["Yes", "No"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_section_is_404(self, client, template_id):
+        """Test that selecting a section the template lacks is not found."""
+        response = await client.get(
+            f"/templates/{template_id}",
+            params={"section": "00000000-0000-0000-0000-000000000000"},
+        )
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "params",
+        [{"fields": "title,secret"}, {"include": "options"}, {"include": "answers"}],
+    )
+    async def test_invalid_selection_is_422(self, client, template_id, params):
+        """Test that unknown fields and parts are rejected."""
+        response = await client.get(f"/templates/{template_id}", params=params)
+
+        assert response.status_code == 422
@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+from app.infrastructure.workers.process_pool import ProcessPoolSaturatedError
+
+
+def wait_until_stopped(started, stop) -> None:
+    """Hold a worker until `stop` is set."""
+    started.put(None)
+    stop.wait()
+
+
+class TestTemplateStatisticsEndpoint:
+    """Test cases for template analytics computed in the process pool."""
+
+    @pytest_asyncio.fixture
+    async def app(self):
+        """Fixture for a started app with one worker process and one slot."""
+        app = create_app(Settings(process_pool_workers=1, process_pool_max_pending=1))
+        async with app.router.lifespan_context(app):
+            yield app
+
+    @pytest_asyncio.fixture
+    async def client(self, app):
+        """Fixture for a client of the app."""
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+
+    @pytest_asyncio.fixture
+    async def template_id(self, client):
+        """Fixture for a template with one section of two questions."""
+        created = await client.post("/templates/create", json={"title": "Climat"})
+        template_id = created.json()["template_id"]
+        await client.post(f"/templates/{template_id}/sections", json={"title": "S"})
+        template = (await client.get(f"/templates/{template_id}")).json()
+        section_id = template["sections"][0]["id"]
+        questions = f"/templates/{template_id}/sections/{section_id}/questions"
+        await client.post(questions, json={"text": "Pourquoi ?", "type": "text"})
+        await client.post(
+            questions,
+            json={"text": "Ok ?", "type": "single_choice", "options": ["Oui", "Non"]},
+        )
+        return template_id
+
+    @pytest.mark.asyncio
+    async def test_statistics_are_computed_in_a_worker(self, client, template_id):
+        """Test that the analytics of a template are returned."""
+        response = await client.get(f"/templates/{template_id}/statistics")
+
+        assert response.status_code == 200
+        statistics = response.json()
+        assert statistics["template_id"] == template_id
+        assert statistics["sections"] == 1
+        assert statistics["questions"] == 2
+        assert statistics["questions_by_type"] == {"text": 1, "single_choice": 1}
+        assert statistics["options_total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_template_is_not_found(self, client):
+        """Test that no job is submitted for an unknown template."""
+        response = await client.get(f"/templates/{uuid4()}/statistics")
+
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_saturated_pool_answers_503(self, app, client, template_id):
+        """Test that a job beyond the pending limit is rejected with 503."""
+        pool = app.state.process_pool
+        with multiprocessing.Manager() as manager:
+            started, stop = manager.Queue(), manager.Event()
+            jobs = [
+                asyncio.create_task(pool.submit(wait_until_stopped, started, stop))
+                for _ in range(pool.max_pending)
+            ]
+            await asyncio.to_thread(started.get, timeout=30)
+            try:
+                with pytest.raises(ProcessPoolSaturatedError):
+                    await pool.submit(wait_until_stopped, started, stop)
+                response = await client.get(f"/templates/{template_id}/statistics")
+            finally:
+                stop.set()
+                await asyncio.gather(*jobs)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert pool.rejected == 2
@@ -1,9 +1,10 @@
 import pytest
 
-from app.application.commands.command_bus import SimpleCommandBus
+from app.application.commands.command_bus import HandlerNotFoundError, SimpleCommandBus
 from app.application.commands.handlers import CreateTemplateHandler
 from app.application.commands.template_commands import CreateTemplateCommand
-from app.infrastructure.persistence.unit_of_work_mock import UnitOfWorkMock
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
 
 
 class TestCommandBus:
@@ -11,8 +12,8 @@ class TestCommandBus:
 
     @pytest.fixture
     def uow(self):
-        """Fixture for unit of work mock."""
-        return UnitOfWorkMock()
+        """Fixture for an in-memory unit of work."""
+        return InMemoryUnitOfWork(InMemoryTemplateStore())
 
     @pytest.fixture
     def command_bus(self, uow):
@@ -45,7 +46,7 @@ class TestCommandBus:
 
         async with uow:
             with pytest.raises(
-                ValueError, match="No handler registered for command type"
+                HandlerNotFoundError, match="No handler registered for command type"
             ):
                 await bus.execute(command)
 
@@ -5,7 +5,8 @@ from app.application.commands.template_commands import (
     CreateTemplateCommand,
     PublishTemplateCommand,
 )
-from app.infrastructure.persistence.unit_of_work_mock import UnitOfWorkMock
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
 
 
 class TestCommandBusFactory:
@@ -13,8 +14,8 @@ class TestCommandBusFactory:
 
     @pytest.fixture
     def uow(self):
-        """Fixture for unit of work mock."""
-        return UnitOfWorkMock()
+        """Fixture for an in-memory unit of work."""
+        return InMemoryUnitOfWork(InMemoryTemplateStore())
 
     @pytest.mark.asyncio
     async def test_create_command_bus_has_all_handlers(self, uow):
@@ -2,35 +2,57 @@ from datetime import datetime
 from uuid import uuid4
 
 import pytest
+from pydantic import ValidationError
 
 from app.application.commands.handlers import (
     AddQuestionHandler,
     AddSectionHandler,
+    CreateRevisionHandler,
     CreateTemplateHandler,
     EditQuestionHandler,
+    MoveQuestionHandler,
+    MoveSectionHandler,
     PublishTemplateHandler,
 )
 from app.application.commands.template_commands import (
     AddQuestionCommand,
     AddSectionCommand,
+    CreateRevisionCommand,
     CreateTemplateCommand,
     EditQuestionCommand,
+    MoveQuestionCommand,
+    MoveSectionCommand,
     PublishTemplateCommand,
 )
+from app.application.queries.template_feed import TemplateFeed
 from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
 from app.domain.entities.section import SectionEntity
-from app.domain.exceptions.template import TemplateNotFoundError
+from app.domain.exceptions.template import (
+    SectionNotFoundError,
+    TemplateLimitExceededError,
+    TemplateNotFoundError,
+)
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_limits import TemplateLimits
 from app.domain.value_objects.template_status import TemplateStatus
-from app.infrastructure.persistence.unit_of_work_mock import UnitOfWorkMock
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from tests.application.queries.test_template_feed import read_events
 
 
 class TestTemplateHandlers:
     """Test cases for template command handlers."""
 
     @pytest.fixture
-    def uow(self):
-        """Fixture for unit of work mock."""
-        yield UnitOfWorkMock()
+    def store(self):
+        """Fixture for an empty in-memory template store."""
+        return InMemoryTemplateStore()
+
+    @pytest.fixture
+    def uow(self, store):
+        """Fixture for an in-memory unit of work."""
+        yield InMemoryUnitOfWork(store)
 
     @pytest.fixture
     def template_id(self):
@@ -71,6 +93,7 @@ class TestTemplateHandlers:
             id=section_id,
             title="Test Section",
             description="A test section",
+            order_key="a0",
         )
         from app.domain.entities.question import QuestionEntity
         from app.domain.value_objects.question_type import QuestionType
@@ -80,6 +103,7 @@ class TestTemplateHandlers:
             text="Test question",
             type=QuestionType.TEXT,
             is_required=True,
+            order_key="a0",
         )
         section.questions.append(question)
         template.sections.append(section)
@@ -94,13 +118,13 @@ class TestTemplateHandlers:
     @pytest.mark.asyncio
     async def test_create_template_handler_success(self, uow):
         """Test successful template creation."""
-        async with uow:
-            handler = CreateTemplateHandler(uow)
+        handler = CreateTemplateHandler(uow)
         command = CreateTemplateCommand(
             title="New Template", description="A new template description"
         )
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         assert template.title == "New Template"
         assert template.description == "A new template description"
@@ -113,11 +137,11 @@ class TestTemplateHandlers:
     @pytest.mark.asyncio
     async def test_create_template_handler_without_description(self, uow):
         """Test template creation without description."""
-        async with uow:
-            handler = CreateTemplateHandler(uow)
+        handler = CreateTemplateHandler(uow)
         command = CreateTemplateCommand(title="Template Without Description")
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         assert template.title == "Template Without Description"
         assert template.description is None
@@ -126,17 +150,48 @@ class TestTemplateHandlers:
         assert uow._committed is True
 
     @pytest.mark.asyncio
-    async def test_publish_template_handler_success(self, uow, draft_template):
-        """Test successful template publishing."""
+    async def test_handlers_enforce_their_limits(
+        self, uow, store, sample_template, section_id
+    ):
+        """Test that handlers check input against the limits they were given,
+        rejecting options before any is built."""
+        limits = TemplateLimits(max_title_length=10, max_options_per_question=2)
+        sample_template.sections.append(SectionEntity(id=section_id, title="S"))
+        store.put(sample_template)
+
         async with uow:
-            handler = PublishTemplateHandler(uow)
+            with pytest.raises(TemplateLimitExceededError, match="10 characters"):
+                await CreateTemplateHandler(uow, limits=limits).handle(
+                    CreateTemplateCommand(title="A long template title")
+                )
+            with pytest.raises(TemplateLimitExceededError, match="2 options"):
+                await AddQuestionHandler(uow, limits=limits).handle(
+                    AddQuestionCommand(
+                        template_id=sample_template.id,
+                        section_id=section_id,
+                        question_text="Q",
+                        question_type=QuestionType.DROPDOWN,
+                        options=["a", "b", "c"],
+                    )
+                )
+            created = await CreateTemplateHandler(uow).handle(
+                CreateTemplateCommand(title="A long template title")
+            )
+
+        assert created.title == "A long template title"
+
+    @pytest.mark.asyncio
+    async def test_publish_template_handler_success(self, uow, store, draft_template):
+        """Test successful template publishing."""
+        handler = PublishTemplateHandler(uow)
         command = PublishTemplateCommand(template_id=draft_template.id)
 
-        # Add template to mock repository
-        uow.template.data.append(draft_template)
+        # Add template to the store
+        store.put(draft_template)
         original_updated_at = draft_template.updated_at
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         assert template.status == TemplateStatus.PUBLISHED
         assert template.updated_at >= original_updated_at
@@ -145,60 +200,96 @@ class TestTemplateHandlers:
     @pytest.mark.asyncio
     async def test_publish_template_handler_not_found(self, uow):
         """Test publishing a non-existent template."""
-        async with uow:
-            handler = PublishTemplateHandler(uow)
+        handler = PublishTemplateHandler(uow)
         command = PublishTemplateCommand(template_id=uuid4())
 
-        with pytest.raises(TemplateNotFoundError):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
-    async def test_publish_empty_template_should_fail(self, uow, sample_template):
+    async def test_publish_empty_template_should_fail(
+        self, uow, store, sample_template
+    ):
         """Test publishing an empty template should fail."""
-        async with uow:
-            handler = PublishTemplateHandler(uow)
+        handler = PublishTemplateHandler(uow)
         command = PublishTemplateCommand(template_id=sample_template.id)
 
-        # Add template to mock repository
-        uow.template.data.append(sample_template)
+        # Add template to the store
+        store.put(sample_template)
 
         # This should raise a ValueError because the template has no questions
-        with pytest.raises(ValueError, match="Cannot publish an empty survey template"):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(
+                ValueError, match="Cannot publish an empty survey template"
+            ):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
     async def test_publish_already_published_template_should_fail(
-        self, uow, published_template
+        self, uow, store, published_template
     ):
         """Test publishing an already published template should fail."""
-        async with uow:
-            handler = PublishTemplateHandler(uow)
+        handler = PublishTemplateHandler(uow)
         command = PublishTemplateCommand(template_id=published_template.id)
 
-        # Add template to mock repository
-        uow.template.data.append(published_template)
+        # Add template to the store
+        store.put(published_template)
 
         # This should raise a ValueError because the template is already published
-        with pytest.raises(ValueError, match="Template is already published"):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(ValueError, match="Template is already published"):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
-    async def test_add_section_handler_success(self, uow, sample_template):
-        """Test successfully adding a section to a template."""
+    async def test_create_revision_handler_success(
+        self, uow, store, published_template
+    ):
+        """Test creating a draft revision of a published template."""
+        handler = CreateRevisionHandler(uow)
+        command = CreateRevisionCommand(template_id=published_template.id)
+
+        # Add template to the store
+        store.put(published_template)
+
         async with uow:
-            handler = AddSectionHandler(uow)
+            revision = await handler.handle(command)
+
+        assert revision.id is not None
+        assert revision.id != published_template.id
+        assert revision.revision_of == published_template.id
+        assert revision.status == TemplateStatus.DRAFT
+        assert revision.sections[0] is published_template.sections[0]
+        assert revision.id in store
+        assert uow._committed is True
+
+    @pytest.mark.asyncio
+    async def test_create_revision_handler_template_not_found(self, uow):
+        """Test revising a non-existent template."""
+        handler = CreateRevisionHandler(uow)
+        command = CreateRevisionCommand(template_id=uuid4())
+
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
+
+    @pytest.mark.asyncio
+    async def test_add_section_handler_success(self, uow, store, sample_template):
+        """Test successfully adding a section to a template."""
+        handler = AddSectionHandler(uow)
         command = AddSectionCommand(
             template_id=sample_template.id,
             title="New Section",
             description="A new section description",
         )
 
-        # Add template to mock repository
-        uow.template.data.append(sample_template)
+        # Add template to the store
+        store.put(sample_template)
         original_section_count = len(sample_template.sections)
         original_updated_at = sample_template.updated_at
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         assert len(template.sections) == original_section_count + 1
         new_section = template.sections[-1]
@@ -210,42 +301,43 @@ class TestTemplateHandlers:
     @pytest.mark.asyncio
     async def test_add_section_handler_template_not_found(self, uow):
         """Test adding a section to a non-existent template."""
-        async with uow:
-            handler = AddSectionHandler(uow)
+        handler = AddSectionHandler(uow)
         command = AddSectionCommand(
             template_id=uuid4(),
             title="New Section",
             description="A new section description",
         )
 
-        with pytest.raises(TemplateNotFoundError):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
     async def test_add_section_to_published_template_should_fail(
-        self, uow, published_template
+        self, uow, store, published_template
     ):
         """Test adding a section to a published template should fail."""
-        async with uow:
-            handler = AddSectionHandler(uow)
+        handler = AddSectionHandler(uow)
         command = AddSectionCommand(
             template_id=published_template.id,
             title="New Section",
             description="A new section description",
         )
 
-        # Add template to mock repository
-        uow.template.data.append(published_template)
+        # Add template to the store
+        store.put(published_template)
 
         # Should raise a ValueError because published templates cannot be edited
-        with pytest.raises(ValueError, match="Cannot edit a published template"):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(ValueError, match="Cannot edit a published template"):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
-    async def test_add_question_handler_success(self, uow, sample_template, section_id):
+    async def test_add_question_handler_success(
+        self, uow, store, sample_template, section_id
+    ):
         """Test successfully adding a question to a section."""
-        async with uow:
-            handler = AddQuestionHandler(uow)
+        handler = AddQuestionHandler(uow)
         command = AddQuestionCommand(
             template_id=sample_template.id,
             section_id=section_id,
@@ -258,9 +350,10 @@ class TestTemplateHandlers:
         # Add a section to the template
         section = SectionEntity(id=section_id, title="Test Section")
         sample_template.sections.append(section)
-        uow.template.data.append(sample_template)
+        store.put(sample_template)
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         # Verify the question was added
         section = template.sections[0]
@@ -272,11 +365,35 @@ class TestTemplateHandlers:
         assert question.is_required is True
         assert uow._committed is True
 
+    @pytest.mark.asyncio
+    async def test_add_question_handler_shares_equal_options(
+        self, uow, store, sample_template, section_id
+    ):
+        """Test questions added with the same options share one option set."""
+        handler = AddQuestionHandler(uow)
+        sample_template.sections.append(SectionEntity(id=section_id, title="S"))
+        store.put(sample_template)
+
+        for text in ["First", "Second"]:
+            async with uow:
+                template = await handler.handle(
+                    AddQuestionCommand(
+                        template_id=sample_template.id,
+                        section_id=section_id,
+                        question_text=text,
+                        question_type="single_choice",
+                        options=["Yes", "No", "Maybe"],
+                    )
+                )
+
+        first, second = template.sections[0].questions
+        assert first.options is second.options
+        assert isinstance(first.options, tuple)
+
     @pytest.mark.asyncio
     async def test_add_question_handler_template_not_found(self, uow, section_id):
         """Test adding a question to a non-existent template."""
-        async with uow:
-            handler = AddQuestionHandler(uow)
+        handler = AddQuestionHandler(uow)
         command = AddQuestionCommand(
             template_id=uuid4(),
             section_id=section_id,
@@ -285,16 +402,16 @@ class TestTemplateHandlers:
             required=True,
         )
 
-        with pytest.raises(TemplateNotFoundError):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
     async def test_add_question_handler_without_options(
-        self, uow, sample_template, section_id
+        self, uow, store, sample_template, section_id
     ):
         """Test adding a question without options."""
-        async with uow:
-            handler = AddQuestionHandler(uow)
+        handler = AddQuestionHandler(uow)
         command = AddQuestionCommand(
             template_id=sample_template.id,
             section_id=section_id,
@@ -306,9 +423,10 @@ class TestTemplateHandlers:
         # Add a section to the template
         section = SectionEntity(id=section_id, title="Test Section")
         sample_template.sections.append(section)
-        uow.template.data.append(sample_template)
+        store.put(sample_template)
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         # Verify the question was added
         section = template.sections[0]
@@ -320,13 +438,31 @@ class TestTemplateHandlers:
         assert question.is_required is False
         assert uow._committed is True
 
+    def test_question_commands_reject_unknown_types(self, section_id):
+        """Test that question commands only accept question types."""
+        command = AddQuestionCommand(
+            template_id=uuid4(),
+            section_id=section_id,
+            question_text="Q",
+            question_type="text",
+        )
+
+        assert command.question_type is QuestionType.TEXT
+        with pytest.raises(ValidationError):
+            EditQuestionCommand(
+                template_id=uuid4(),
+                section_id=section_id,
+                question_id=uuid4(),
+                question_text="Q",
+                question_type="essay",
+            )
+
     @pytest.mark.asyncio
     async def test_edit_question_handler_success(
-        self, uow, sample_template, section_id, question_id
+        self, uow, store, sample_template, section_id, question_id
     ):
         """Test successfully editing a question."""
-        async with uow:
-            handler = EditQuestionHandler(uow)
+        handler = EditQuestionHandler(uow)
         command = EditQuestionCommand(
             template_id=sample_template.id,
             section_id=section_id,
@@ -350,9 +486,10 @@ class TestTemplateHandlers:
         )
         section.questions.append(question)
         sample_template.sections.append(section)
-        uow.template.data.append(sample_template)
+        store.put(sample_template)
 
-        template = await handler.handle(command)
+        async with uow:
+            template = await handler.handle(command)
 
         # Verify the question was updated
         section = template.sections[0]
@@ -369,8 +506,7 @@ class TestTemplateHandlers:
         self, uow, section_id, question_id
     ):
         """Test editing a question in a non-existent template."""
-        async with uow:
-            handler = EditQuestionHandler(uow)
+        handler = EditQuestionHandler(uow)
         command = EditQuestionCommand(
             template_id=uuid4(),
             section_id=section_id,
@@ -380,8 +516,70 @@ class TestTemplateHandlers:
             required=True,
         )
 
-        with pytest.raises(TemplateNotFoundError):
-            await handler.handle(command)
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
+
+    @pytest.mark.asyncio
+    async def test_move_section_handler_success(self, uow, store, draft_template):
+        """Test moving a section to the front of its template."""
+        second = SectionEntity(id=uuid4(), title="Second")
+        draft_template.add_section(second)
+        store.put(draft_template)
+        handler = MoveSectionHandler(uow)
+        command = MoveSectionCommand(
+            template_id=draft_template.id, section_id=second.id, position=0
+        )
+
+        async with uow:
+            template = await handler.handle(command)
+
+        assert [s.title for s in template.sections] == ["Second", "Test Section"]
+        stored, _ = store.get(draft_template.id)
+        assert [s.id for s in stored.sections] == [s.id for s in template.sections]
+        assert uow._committed is True
+
+    @pytest.mark.asyncio
+    async def test_move_question_handler_success(self, uow, store, draft_template):
+        """Test moving a question to the end of its section."""
+        from app.domain.entities.question import QuestionEntity
+        from app.domain.value_objects.question_type import QuestionType
+
+        section = draft_template.sections[0]
+        draft_template.add_question(
+            section.id,
+            QuestionEntity(id=uuid4(), text="Second", type=QuestionType.TEXT),
+        )
+        store.put(draft_template)
+        first = section.questions[0]
+        handler = MoveQuestionHandler(uow)
+        command = MoveQuestionCommand(
+            template_id=draft_template.id,
+            section_id=section.id,
+            question_id=first.id,
+            position=1,
+        )
+
+        async with uow:
+            template = await handler.handle(command)
+
+        assert [q.text for q in template.sections[0].questions] == [
+            "Second",
+            "Test question",
+        ]
+        assert uow._committed is True
+
+    @pytest.mark.asyncio
+    async def test_move_section_handler_template_not_found(self, uow, section_id):
+        """Test moving a section of a non-existent template."""
+        handler = MoveSectionHandler(uow)
+        command = MoveSectionCommand(
+            template_id=uuid4(), section_id=section_id, position=0
+        )
+
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await handler.handle(command)
 
     @pytest.mark.asyncio
     async def test_handler_integration_workflow(self, uow):
@@ -458,11 +656,11 @@ class TestTemplateHandlers:
                 await add_question_handler.handle(add_question_command)
 
     @pytest.mark.asyncio
-    async def test_handler_data_consistency(self, uow, sample_template):
+    async def test_handler_data_consistency(self, uow, store, sample_template):
         """Test that handlers maintain data consistency."""
-        # Add template to mock repository
+        # Add template to the store
         async with uow:
-            uow.template.data.append(sample_template)
+            store.put(sample_template)
 
             # Verify template exists
             retrieved_template = await uow.template.get_by_id(sample_template.id)
@@ -481,3 +679,98 @@ class TestTemplateHandlers:
             # Verify the template was updated correctly
             assert len(updated_template.sections) == 1
             assert updated_template.sections[0].title == "Consistency Test"
+
+
+class TestTemplateHandlerDeltas:
+    """Test cases for the deltas handlers send to a template's editors."""
+
+    @pytest.fixture
+    def store(self):
+        """Fixture for an empty in-memory template store."""
+        return InMemoryTemplateStore()
+
+    @pytest.fixture
+    def feed(self):
+        """Fixture for an empty template feed."""
+        return TemplateFeed()
+
+    @pytest.fixture
+    def template(self, store):
+        """Fixture for a stored draft with a section of two questions."""
+        section = SectionEntity(id=uuid4(), title="Section", order_key="a0")
+        for key in ["a0", "a1"]:
+            section.questions.append(
+                QuestionEntity(
+                    id=uuid4(), text=f"Q{key}", type=QuestionType.TEXT, order_key=key
+                )
+            )
+        template = TemplateAggregate(id=uuid4(), title="Draft", sections=[section])
+        store.put(template)
+        return template
+
+    @pytest.mark.asyncio
+    async def test_deltas_follow_commits(self, store, feed, template):
+        """Test that each committed change reaches subscribers, versioned."""
+        subscription = feed.subscribe(template.id)
+        section_id = template.sections[0].id
+        moved_id = template.sections[0].questions[1].id
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            await AddSectionHandler(uow, feed).handle(
+                AddSectionCommand(template_id=template.id, title="Second")
+            )
+        async with uow:
+            await AddQuestionHandler(uow, feed).handle(
+                AddQuestionCommand(
+                    template_id=template.id,
+                    section_id=section_id,
+                    question_text="Pick one",
+                    question_type="single_choice",
+                    options=["Yes", "No"],
+                )
+            )
+        async with uow:
+            await MoveQuestionHandler(uow, feed).handle(
+                MoveQuestionCommand(
+                    template_id=template.id,
+                    section_id=section_id,
+                    question_id=moved_id,
+                    position=0,
+                )
+            )
+        async with uow:
+            await PublishTemplateHandler(uow, feed).handle(
+                PublishTemplateCommand(template_id=template.id)
+            )
+
+        events = await read_events(subscription, 4)
+        assert [name for name, _ in events] == [
+            "section_added",
+            "question_added",
+            "question_moved",
+            "status_changed",
+        ]
+        assert [data["version"] for _, data in events] == [2, 3, 4, 5]
+        assert store.version(template.id) == 5
+        assert events[0][1]["section"]["title"] == "Second"
+        question = events[1][1]["question"]
+        assert question["options"][1] == {"label": "No", "value": "No", "order": 1}
+        assert list(events[2][1]["order_keys"]) == [str(moved_id)]
+        assert events[3][1]["status"] == "published"
+
+    @pytest.mark.asyncio
+    async def test_failed_command_sends_nothing(self, store, feed, template):
+        """Test that a command that does not commit sends no delta."""
+        subscription = feed.subscribe(template.id)
+        uow = InMemoryUnitOfWork(store)
+
+        with pytest.raises(SectionNotFoundError):
+            async with uow:
+                await MoveSectionHandler(uow, feed).handle(
+                    MoveSectionCommand(
+                        template_id=template.id, section_id=uuid4(), position=0
+                    )
+                )
+
+        assert feed.published == 0
+        assert not subscription._events
@@ -0,0 +1,163 @@
+from uuid import uuid4
+
+import pytest
+
+from app.application.queries import search_index
+from app.application.queries.search_index import (
+    MAX_EXPANSIONS,
+    SearchIndex,
+    tokenize,
+)
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.question_type import QuestionType
+
+
+def make_template(title: str, *questions: str, section: str = "Section"):
+    return TemplateAggregate(
+        id=uuid4(),
+        title=title,
+        sections=[
+            SectionEntity(
+                id=uuid4(),
+                title=section,
+                questions=[
+                    QuestionEntity(id=uuid4(), text=text, type=QuestionType.TEXT)
+                    for text in questions
+                ],
+            )
+        ],
+    )
+
+
+class TestTokenize:
+    """Test cases for splitting text into index terms."""
+
+    def test_lower_cases_and_strips_accents(self):
+        """Test words are compared without case or accents."""
+        assert tokenize("Équipe, SATISFACTION client!") == [
+            "equipe",
+            "satisfaction",
+            "client",
+        ]
+
+    def test_empty(self):
+        """Test missing text has no words."""
+        assert tokenize(None) == []
+
+
+class TestSearchIndex:
+    """Test cases for the BM25 template index."""
+
+    @pytest.fixture
+    def index(self):
+        """Fixture for an index of three templates."""
+        index = SearchIndex()
+        self.satisfaction = make_template(
+            "Satisfaction client", "Recommanderiez-vous notre service ?"
+        )
+        self.onboarding = make_template(
+            "Onboarding", "Votre satisfaction avec la formation ?"
+        )
+        self.events = make_template("Événement annuel", "Quel atelier préférez-vous ?")
+        for template in (self.satisfaction, self.onboarding, self.events):
+            index.add(template, 1)
+        return index
+
+    def test_title_match_ranks_first(self, index):
+        """Test a word in the title outweighs the same word in a question."""
+        hits = index.search("satisfaction")
+
+        assert [hit.template_id for hit in hits] == [
+            self.satisfaction.id,
+            self.onboarding.id,
+        ]
+        assert hits[0].title == "Satisfaction client"
+        assert hits[0].status == "draft"
+        assert hits[0].score > hits[1].score
+
+    def test_every_word_must_match(self, index):
+        """Test templates missing a query word are not returned."""
+        hits = index.search("satisfaction formation")
+
+        assert [hit.template_id for hit in hits] == [self.onboarding.id]
+
+    def test_prefix_matches(self, index):
+        """Test a word prefix matches, an exact word ranking higher."""
+        assert [hit.template_id for hit in index.search("evene")] == [self.events.id]
+        assert index.search("sa") == []
+
+    def test_accents_are_ignored(self, index):
+        """Test a query without accents finds accented words."""
+        assert [hit.template_id for hit in index.search("evenement")] == [
+            self.events.id
+        ]
+
+    def test_update_replaces_document(self, index):
+        """Test a newer version replaces the words of a template."""
+        self.events.title = "Séminaire"
+        index.add(self.events, 2)
+
+        assert index.search("evenement") == []
+        assert [hit.template_id for hit in index.search("seminaire")] == [
+            self.events.id
+        ]
+        assert index.version(self.events.id) == 2
+
+    def test_only_new_texts_are_tokenized_again(self, index, monkeypatch):
+        """Test that reindexing an edited template reuses the words of its
+        unchanged texts."""
+        section = self.satisfaction.sections[0]
+        section.questions[0] = section.questions[0].model_copy(
+            update={"text": "Reviendriez-vous chez nous ?"}
+        )
+        tokenized = []
+
+        def counting_tokenize(text):
+            tokenized.append(text)
+            return tokenize(text)
+
+        monkeypatch.setattr(search_index, "tokenize", counting_tokenize)
+        index.add(self.satisfaction, 2)
+
+        assert tokenized == ["Reviendriez-vous chez nous ?"]
+        assert index.search("recommanderiez") == []
+        assert [hit.template_id for hit in index.search("reviendriez")] == [
+            self.satisfaction.id
+        ]
+
+    def test_older_version_is_ignored(self, index):
+        """Test an update arriving after a newer one does not undo it."""
+        renamed = self.events.model_copy(update={"title": "Séminaire"})
+        index.add(renamed, 3)
+        index.add(self.events, 2)
+
+        assert index.search("evenement") == []
+        assert index.version(self.events.id) == 3
+
+    def test_remove(self, index):
+        """Test a removed template is no longer found."""
+        index.remove(self.satisfaction.id)
+
+        assert [hit.template_id for hit in index.search("satisfaction")] == [
+            self.onboarding.id
+        ]
+        assert self.satisfaction.id not in index
+        assert len(index) == 2
+
+    def test_limit(self, index):
+        """Test at most `limit` hits are returned."""
+        assert len(index.search("vous", limit=1)) == 1
+
+    def test_prefix_of_many_terms(self):
+        """Test prefixes still match once new terms have been sorted, and
+        expand to at most `MAX_EXPANSIONS` terms."""
+        index = SearchIndex()
+        templates = [make_template(f"Survey term{i:04d}") for i in range(2000)]
+        for template in templates:
+            index.add(template, 1)
+
+        hits = index.search("term1999")
+        assert [hit.template_id for hit in hits] == [templates[1999].id]
+        assert len(index.search("term19", limit=100)) == MAX_EXPANSIONS
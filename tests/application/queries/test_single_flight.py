@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.application.queries.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for request coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test that callers of one key all get the first caller's result."""
+        flight = SingleFlight[int]()
+        started = 0
+
+        async def load() -> int:
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0)
+            return 42
+
+        results = await asyncio.gather(*(flight.run("k", load) for _ in range(100)))
+
+        assert results == [42] * 100
+        assert started == 1
+        assert flight.stats() == {
+            "calls": 100,
+            "executions": 1,
+            "collapsed": 99,
+            "in_flight": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_distinct_keys_and_later_calls_execute_again(self):
+        """Test that only calls overlapping on the same key are collapsed."""
+        flight = SingleFlight[str]()
+
+        async def load(key: str) -> str:
+            return key
+
+        await asyncio.gather(
+            flight.run("a", lambda: load("a")), flight.run("b", lambda: load("b"))
+        )
+        await flight.run("a", lambda: load("a"))
+
+        assert flight.executions == 3
+        assert flight.collapsed == 0
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_waiter(self):
+        """Test that a failed execution is raised to all collapsed callers."""
+        flight = SingleFlight[int]()
+
+        async def fail() -> int:
+            await asyncio.sleep(0)
+            raise LookupError("missing")
+
+        results = await asyncio.gather(
+            *(flight.run("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, LookupError) for r in results)
+        assert flight.executions == 1
+        assert flight.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that the shared execution outlives a cancelled caller."""
+        flight = SingleFlight[int]()
+        release = asyncio.Event()
+
+        async def load() -> int:
+            await release.wait()
+            return 1
+
+        first = asyncio.ensure_future(flight.run("k", load))
+        second = asyncio.ensure_future(flight.run("k", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == 1
+        assert first.cancelled()
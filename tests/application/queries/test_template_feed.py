@@ -0,0 +1,134 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.application.queries.template_feed import (
+    KEEPALIVE,
+    Subscription,
+    TemplateFeed,
+    encode_event,
+)
+
+
+def parse_event(frame: bytes) -> tuple[str, dict]:
+    """Name and data of a Server-Sent Events frame."""
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+async def read_events(subscription: Subscription, count: int) -> list[tuple]:
+    """The next `count` events of a subscription, parsed."""
+    events = subscription.events()
+    frames = [await asyncio.wait_for(anext(events), 1) for _ in range(count)]
+    return [parse_event(frame) for frame in frames]
+
+
+class TestTemplateFeed:
+    """Test cases for the fan-out of template deltas."""
+
+    @pytest.fixture
+    def feed(self):
+        """Fixture for a feed queueing at most 4 events per subscriber."""
+        return TemplateFeed(max_queued=4)
+
+    def test_encode_event(self):
+        """Test the Server-Sent Events framing."""
+        frame = encode_event("section_added", {"title": "Été"}, 3)
+
+        assert (
+            frame == 'id: 3\nevent: section_added\ndata: {"title":"Été"}\n\n'.encode()
+        )
+
+    @pytest.mark.asyncio
+    async def test_ready_comes_first(self, feed):
+        """Test that `ready` precedes the deltas queued while subscribing."""
+        template_id = uuid4()
+        subscription = feed.subscribe(template_id)
+        feed.publish(template_id, 5, {"type": "status_changed", "status": "published"})
+        subscription.ready(5)
+
+        events = await read_events(subscription, 2)
+
+        assert events == [
+            ("ready", {"version": 5}),
+            (
+                "status_changed",
+                {"type": "status_changed", "status": "published", "version": 5},
+            ),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_delta_is_serialized_once_for_1000_subscribers(self, feed):
+        """Test that every subscriber is queued the same encoded frame."""
+        template_id = uuid4()
+        subscriptions = [feed.subscribe(template_id) for _ in range(1000)]
+
+        reached = feed.publish(template_id, 2, {"type": "section_added"})
+
+        frames = [s._events[0] for s in subscriptions]
+        assert reached == 1000
+        assert all(frame is frames[0] for frame in frames)
+        assert feed.publish(uuid4(), 1, {"type": "section_added"}) == 0
+        assert feed.stats() == {"templates": 1, "subscriptions": 1000, "published": 1}
+
+    @pytest.mark.asyncio
+    async def test_lagging_subscriber_is_told_to_resync(self, feed):
+        """Test that a full queue is replaced by one `resync` event."""
+        template_id = uuid4()
+        subscription = feed.subscribe(template_id)
+        for version in range(1, 7):
+            feed.publish(template_id, version, {"type": "section_added"})
+
+        events = await read_events(subscription, 2)
+
+        assert events[0] == ("resync", {"version": 5})
+        assert events[1] == ("section_added", {"type": "section_added", "version": 6})
+
+    @pytest.mark.asyncio
+    async def test_closing_ends_the_stream_and_unsubscribes(self, feed):
+        """Test that a closed subscription yields what was queued, then stops."""
+        template_id = uuid4()
+        subscription = feed.subscribe(template_id)
+        subscription.ready(1)
+        feed.close()
+
+        frames = [frame async for frame in subscription.events()]
+
+        assert [parse_event(frame)[0] for frame in frames] == ["ready"]
+        assert len(feed) == 0
+        assert feed.publish(template_id, 2, {"type": "section_added"}) == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_stream_sends_keepalives(self, feed):
+        """Test that a comment is sent when no event came for a while."""
+        subscription = feed.subscribe(uuid4())
+        events = subscription.events(keepalive=0.01)
+
+        assert await asyncio.wait_for(anext(events), 1) == KEEPALIVE
+        await events.aclose()
+        assert subscription.closed
+        assert len(feed) == 0
+
+    @pytest.mark.asyncio
+    async def test_changes_of_other_processes_are_announced(self, feed):
+        """Test that the change feed announces versions no delta described."""
+        template_id = uuid4()
+        subscription = feed.subscribe(template_id)
+        subscription.ready(3)
+        feed.publish(template_id, 4, {"type": "section_added"})
+
+        feed.on_changes([(template_id, 4), (template_id, 5), (uuid4(), 9)])
+        feed.on_changes([(template_id, 0)])
+
+        events = await read_events(subscription, 4)
+        assert [name for name, _ in events] == [
+            "ready",
+            "section_added",
+            "template_changed",
+            "template_deleted",
+        ]
+        assert events[2][1]["version"] == 5
+        assert subscription.closed
+        assert [frame async for frame in subscription.events()] == []
@@ -0,0 +1,182 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import create_app
+from app.application.queries.template_reader import TemplateReader
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import TemplateNotFoundError
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.settings import Settings
+
+
+def _survey(title: str) -> TemplateAggregate:
+    """A template with one question, so that it can be published."""
+    question = QuestionEntity(text="Why?", type=QuestionType.TEXT)
+    return TemplateAggregate(
+        title=title, sections=[SectionEntity(title="S", questions=[question])]
+    )
+
+
+class CountingStore(InMemoryTemplateStore):
+    """In-memory store counting repository loads."""
+
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def get(self, template_id):
+        self.loads += 1
+        return super().get(template_id)
+
+
+class TestTemplateReader:
+    """Test cases for the coalescing template reader."""
+
+    @pytest.fixture
+    def store(self):
+        """Fixture for a store that counts loads."""
+        return CountingStore()
+
+    @pytest.fixture
+    def reader(self, store):
+        """Fixture for a reader over the counting store."""
+        return TemplateReader(lambda: InMemoryUnitOfWork(store))
+
+    @pytest_asyncio.fixture
+    async def template(self, store):
+        """Fixture for a stored template."""
+        async with InMemoryUnitOfWork(store) as uow:
+            template = await uow.template.create(_survey("Popular"))
+        store.loads = 0
+        return template
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_hit_repository_once(self, reader, store, template):
+        """Test that 10,000 concurrent reads share a single load."""
+        results = await asyncio.gather(
+            *(reader.get_json(template.id) for _ in range(10_000))
+        )
+
+        assert store.loads == 1
+        assert len(set(results)) == 1
+        assert json.loads(results[0])["title"] == "Popular"
+        assert reader.loads.collapsed == 9_999
+
+    @pytest.mark.asyncio
+    async def test_sequential_reads_see_updates(self, reader, store, template):
+        """Test that nothing is cached once the shared load has finished."""
+        await reader.get_json(template.id)
+        async with InMemoryUnitOfWork(store) as uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.title = "Renamed"
+            await uow.template.update(loaded)
+
+        assert json.loads(await reader.get_json(template.id))["title"] == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_missing_template_raises_for_every_caller(self, reader):
+        """Test that a not-found error reaches each collapsed caller."""
+        template_id = uuid4()
+
+        results = await asyncio.gather(
+            *(reader.get_json(template_id) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(r, TemplateNotFoundError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_published_template_is_compressed_once(self, store, template):
+        """Test that a published version is loaded and compressed once."""
+        compressed = []
+
+        def compress(body):
+            compressed.append(body)
+            return {"gzip": b"compressed"}
+
+        reader = TemplateReader(
+            lambda: InMemoryUnitOfWork(store), compress=compress, max_bytes=1 << 20
+        )
+        draft = await reader.get(template.id)
+        async with InMemoryUnitOfWork(store) as uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.publish()
+            await uow.template.update(loaded)
+        store.loads = 0
+
+        results = [await reader.get(template.id) for _ in range(100)]
+
+        assert draft.version == 1 and draft.encoded == {}
+        with pytest.raises(TypeError):
+            draft.encoded["gzip"] = b"shared by every uncompressed document"
+        assert compressed == [results[0].body]
+        assert store.loads == 1
+        assert reader.hits == 99
+        assert all(r is results[0] for r in results)
+        assert results[0].version == 2
+        assert results[0].encoded == {"gzip": b"compressed"}
+        assert reader.size_bytes == len(results[0].body) + len(b"compressed")
+
+    @pytest.mark.asyncio
+    async def test_kept_document_is_checked_against_current_version(
+        self, store, template
+    ):
+        """Test that a kept document is dropped once its template is deleted."""
+        reader = TemplateReader(lambda: InMemoryUnitOfWork(store), max_bytes=1 << 20)
+        async with InMemoryUnitOfWork(store) as uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.publish()
+            await uow.template.update(loaded)
+        await reader.get(template.id)
+        async with InMemoryUnitOfWork(store) as uow:
+            await uow.template.delete(template.id)
+
+        with pytest.raises(TemplateNotFoundError):
+            await reader.get(template.id)
+        assert reader.stats() == {"published": 0, "size_bytes": 0, "hits": 0}
+
+    @pytest.mark.asyncio
+    async def test_published_documents_are_bounded(self, store):
+        """Test that the least recently read documents are evicted."""
+        reader = TemplateReader(lambda: InMemoryUnitOfWork(store), max_bytes=600)
+        ids = []
+        for i in range(3):
+            async with InMemoryUnitOfWork(store) as uow:
+                created = await uow.template.create(_survey(f"T{i}"))
+                created.publish()
+            ids.append(created.id)
+
+        sizes = [len((await reader.get(template_id)).body) for template_id in ids]
+
+        assert sum(sizes) > 600
+        assert reader.size_bytes <= 600
+        assert reader.stats()["published"] < 3
+
+    @pytest.mark.asyncio
+    async def test_endpoint_serves_reader_json(self):
+        """Test that GET /templates/{id} returns the serialized template."""
+        app = create_app(Settings(process_pool_workers=1))
+
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                created = await client.post(
+                    "/templates/create", json={"title": "Served"}
+                )
+                template_id = created.json()["template_id"]
+                response = await client.get(f"/templates/{template_id}")
+                missing = await client.get(f"/templates/{uuid4()}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["title"] == "Served"
+        assert missing.status_code == 404
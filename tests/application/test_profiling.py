@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.application.profiling import RequestProfile, current_profile, phase, profiled
+
+
+class TestRequestProfile:
+    """Test cases for per-request phase timings."""
+
+    @pytest.fixture
+    def profile(self):
+        """Fixture for a profile active in the current context."""
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        yield profile
+        current_profile.reset(token)
+
+    def test_nested_phases_record_exclusive_time(self, profile, monkeypatch):
+        """Test that an outer phase excludes the time of its nested phases."""
+        clock = iter([0.0, 1.0, 4.0, 6.0])
+        monkeypatch.setattr(
+            "app.application.profiling.time.perf_counter", lambda: next(clock)
+        )
+
+        with phase("handler"):
+            with phase("repository"):
+                pass
+
+        assert profile.durations == {"repository": 3.0, "handler": 3.0}
+
+    @pytest.mark.asyncio
+    async def test_profiled_counts_calls(self, profile):
+        """Test that repeated phases are summed and counted."""
+
+        @profiled("repository")
+        async def load():
+            await asyncio.sleep(0)
+
+        await load()
+        await load()
+
+        assert profile.calls["repository"] == 2
+        assert "repository;dur=" in profile.server_timing()
+        assert 'desc="2 calls"' in profile.server_timing()
+
+    def test_unprofiled_context_records_nothing(self):
+        """Test that phases outside a profiled request are no-ops."""
+        with phase("handler"):
+            pass
+
+        assert current_profile.get() is None
+
+    def test_server_timing_lists_extras_and_total(self, profile):
+        """Test the header value format."""
+        profile.record("commit", 0.0015)
+        profile.extras["alloc"] = "bytes=10 peak=20"
+
+        assert profile.server_timing(total=0.002) == (
+            'commit;dur=1.500, alloc;desc="bytes=10 peak=20", total;dur=2.000'
+        )
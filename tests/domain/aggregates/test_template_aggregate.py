@@ -6,8 +6,19 @@ import pytest
 from app.domain.aggregates.template import TemplateAggregate
 from app.domain.entities.question import QuestionEntity
 from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import (
+    InvalidTemplateStateError,
+    QuestionNotFoundError,
+    SectionNotFoundError,
+    TemplateLimitExceededError,
+)
+from app.domain.value_objects.order_key import MAX_KEY_LENGTH
 from app.domain.value_objects.question_options import QuestionOption
 from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_limits import (
+    DEFAULT_TEMPLATE_LIMITS,
+    TemplateLimits,
+)
 from app.domain.value_objects.template_status import TemplateStatus
 
 
@@ -65,7 +76,10 @@ class TestTemplateAggregate:
     def published_template(self, template_id, section_id, question_id):
         """Fixture for a published template with questions."""
         section = SectionEntity(
-            id=section_id, title="Test Section", description="A test section"
+            id=section_id,
+            title="Test Section",
+            description="A test section",
+            order_key="a0",
         )
         question = QuestionEntity(
             id=question_id,
@@ -76,6 +90,7 @@ class TestTemplateAggregate:
                 QuestionOption(label="Blue", value="blue", order=2),
             ],
             is_required=True,
+            order_key="a0",
         )
         section.questions.append(question)
 
@@ -470,3 +485,310 @@ class TestTemplateAggregate:
         # Publish template
         template.publish()
         assert template.status == TemplateStatus.PUBLISHED
+
+    def test_create_revision_shares_sections(self, published_template):
+        """Test that a revision is a draft sharing the published sections."""
+        revision = published_template.create_revision()
+
+        assert revision.id is None
+        assert revision.revision_of == published_template.id
+        assert revision.status == TemplateStatus.DRAFT
+        assert revision.title == published_template.title
+        assert revision.sections is not published_template.sections
+        assert revision.sections[0] is published_template.sections[0]
+
+    def test_create_revision_of_draft_template(self, sample_template):
+        """Test that drafts cannot be revised."""
+        with pytest.raises(ValueError, match="Cannot revise a draft template"):
+            sample_template.create_revision()
+
+    def test_revision_copies_section_on_add_question(self, published_template):
+        """Test that adding a question copies only the touched section."""
+        original_section = published_template.sections[0]
+        original_questions = list(original_section.questions)
+        revision = published_template.create_revision()
+        new_question = QuestionEntity(
+            id=uuid4(), text="New Question", type=QuestionType.TEXT
+        )
+
+        revision.add_question(original_section.id, new_question)
+
+        assert revision.sections[0] is not original_section
+        assert revision.sections[0].id == original_section.id
+        assert revision.sections[0].questions[-1] == new_question
+        assert original_section.questions == original_questions
+        assert revision.sections[0].questions[0] is original_questions[0]
+
+    def test_revision_copies_section_on_edit_question(self, published_template):
+        """Test that editing a question leaves the published version intact."""
+        section = published_template.sections[0]
+        question = section.questions[0]
+        revision = published_template.create_revision()
+        edited = QuestionEntity(id=question.id, text="Edited", type=QuestionType.TEXT)
+
+        revision.edit_question(section.id, question.id, edited)
+        revision.edit_question(section.id, question.id, edited)
+
+        assert revision.sections[0].questions[0].text == "Edited"
+        assert published_template.sections[0] is section
+        assert section.questions[0] is question
+        assert question.text == "What is your favorite color?"
+
+    def test_revision_add_section_leaves_published_version_intact(
+        self, published_template, sample_section
+    ):
+        """Test that adding a section to a revision does not touch the original."""
+        revision = published_template.create_revision()
+
+        revision.add_section(sample_section)
+
+        assert len(revision.sections) == 2
+        assert len(published_template.sections) == 1
+
+    def test_copy_on_write_isolates_both_copies(self, sample_template, sample_section):
+        """Test that edits on either copy never reach the other one."""
+        sample_template.sections.append(sample_section)
+        copy = sample_template.copy_on_write()
+        question = QuestionEntity(id=uuid4(), text="Q", type=QuestionType.TEXT)
+
+        copy.add_question(sample_section.id, question)
+        sample_template.add_question(sample_section.id, question)
+        copy.title = "Copy"
+
+        assert copy.sections[0].questions == [question]
+        assert sample_template.sections[0].questions == [question]
+        assert copy.sections[0] is not sample_template.sections[0]
+        assert sample_section.questions == []
+
+    def test_errors_are_typed(
+        self, sample_template, sample_section, sample_question, published_template
+    ):
+        """Test that each broken rule raises its own domain error."""
+        sample_template.add_section(sample_section)
+
+        with pytest.raises(SectionNotFoundError):
+            sample_template.add_question(uuid4(), sample_question)
+        with pytest.raises(QuestionNotFoundError):
+            sample_template.edit_question(sample_section.id, uuid4(), sample_question)
+        with pytest.raises(InvalidTemplateStateError):
+            sample_template.create_revision()
+        with pytest.raises(InvalidTemplateStateError):
+            published_template.add_section(sample_section)
+
+    @pytest.fixture
+    def small_limits(self):
+        """Fixture for tight structure limits."""
+        return TemplateLimits(
+            max_sections=1,
+            max_questions_per_section=1,
+            max_options_per_question=2,
+            max_title_length=20,
+            max_text_length=40,
+        )
+
+    def test_structure_limits_are_enforced(
+        self, small_limits, sample_template, sample_section, sample_question
+    ):
+        """Test that sections, questions and options are bounded."""
+        sample_template.add_section(sample_section, small_limits)
+        with pytest.raises(TemplateLimitExceededError, match="1 sections"):
+            sample_template.add_section(
+                SectionEntity(id=uuid4(), title="Two"), small_limits
+            )
+
+        with pytest.raises(TemplateLimitExceededError, match="2 options"):
+            sample_template.add_question(
+                sample_section.id, sample_question, small_limits
+            )
+
+        question = QuestionEntity(id=uuid4(), text="Short", type=QuestionType.TEXT)
+        sample_template.add_question(sample_section.id, question, small_limits)
+        with pytest.raises(TemplateLimitExceededError, match="1 questions"):
+            sample_template.add_question(sample_section.id, question, small_limits)
+
+    def test_text_limits_are_enforced(
+        self, small_limits, sample_template, sample_section, question_id
+    ):
+        """Test that oversized titles and question texts are rejected."""
+        with pytest.raises(TemplateLimitExceededError, match="Section title"):
+            sample_template.add_section(
+                SectionEntity(id=uuid4(), title="x" * 21), small_limits
+            )
+
+        sample_template.add_section(sample_section, small_limits)
+        sample_template.add_question(
+            sample_section.id,
+            QuestionEntity(id=question_id, text="Q", type=QuestionType.TEXT),
+            small_limits,
+        )
+        with pytest.raises(TemplateLimitExceededError, match="Question text"):
+            sample_template.edit_question(
+                sample_section.id,
+                question_id,
+                QuestionEntity(id=question_id, text="x" * 41, type=QuestionType.TEXT),
+                small_limits,
+            )
+
+    def test_default_limits_apply_without_configuration(self, sample_template):
+        """Test that the default limits bound a template when none are given."""
+        for i in range(DEFAULT_TEMPLATE_LIMITS.max_sections):
+            sample_template.add_section(SectionEntity(id=uuid4(), title=f"S{i}"))
+
+        with pytest.raises(TemplateLimitExceededError, match="200 sections"):
+            sample_template.add_section(SectionEntity(id=uuid4(), title="One more"))
+
+
+class TestTemplateOrdering:
+    """Test cases for moving sections and questions by order keys."""
+
+    SIBLINGS = 10_000
+
+    @pytest.fixture
+    def large_limits(self):
+        """Fixture for limits allowing 10k questions in a section."""
+        return TemplateLimits(max_questions_per_section=self.SIBLINGS)
+
+    @pytest.fixture
+    def large_template(self, large_limits):
+        """Fixture for a draft template with one section of 10k questions."""
+        template = TemplateAggregate(id=uuid4(), title="Large")
+        template.add_section(SectionEntity(id=uuid4(), title="Section"))
+        section_id = template.sections[0].id
+        for i in range(self.SIBLINGS):
+            template.add_question(
+                section_id,
+                QuestionEntity(id=uuid4(), text=f"Q{i}", type=QuestionType.TEXT),
+                large_limits,
+            )
+        return template
+
+    @staticmethod
+    def _keys(entities) -> list:
+        return [entity.order_key for entity in entities]
+
+    def test_added_entities_get_increasing_keys(self, large_template):
+        """Test that appended questions get short, increasing keys."""
+        keys = self._keys(large_template.sections[0].questions)
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == self.SIBLINGS
+        assert max(len(key) for key in keys) <= 4
+
+    def test_move_question_changes_only_that_question(self, large_template):
+        """Test that a move among 10k questions replaces only the moved one."""
+        section = large_template.sections[0]
+        before = list(section.questions)
+        moved = before[-1]
+
+        large_template.move_question(section.id, moved.id, 5_000)
+
+        questions = section.questions
+        assert questions[5_000].id == moved.id
+        assert questions[5_000].order_key != moved.order_key
+        assert self._keys(questions) == sorted(self._keys(questions))
+        unchanged = questions[:5_000] + questions[5_001:]
+        assert all(a is b for a, b in zip(unchanged, before[:-1]))
+
+    def test_repeated_moves_to_one_place_rebalance(self, large_template):
+        """Test that keys stay short and ordered when moves keep splitting
+        the same gap among 10k questions."""
+        section = large_template.sections[0]
+        expected = [q.id for q in section.questions]
+
+        for i in range(500):
+            question_id = expected[-1 - i % 2]
+            large_template.move_question(section.id, question_id, 1)
+            expected.remove(question_id)
+            expected.insert(1, question_id)
+
+        keys = self._keys(section.questions)
+        assert [q.id for q in section.questions] == expected
+        assert keys == sorted(keys) and len(set(keys)) == self.SIBLINGS
+        assert max(len(key) for key in keys) <= MAX_KEY_LENGTH
+
+    def test_move_section(self):
+        """Test moving sections, past the end included."""
+        template = TemplateAggregate(id=uuid4(), title="T")
+        for title in "ABC":
+            template.add_section(SectionEntity(id=uuid4(), title=title))
+        first = template.sections[0]
+
+        template.move_section(first.id, 1)
+        assert [s.title for s in template.sections] == ["B", "A", "C"]
+
+        template.move_section(first.id, 99)
+        assert [s.title for s in template.sections] == ["B", "C", "A"]
+        assert self._keys(template.sections) == sorted(self._keys(template.sections))
+
+    def test_move_errors(self):
+        """Test moving unknown entities and in a published template."""
+        template = TemplateAggregate(id=uuid4(), title="T")
+        template.add_section(SectionEntity(id=uuid4(), title="S"))
+        section = template.sections[0]
+        template.add_question(
+            section.id, QuestionEntity(id=uuid4(), text="Q", type=QuestionType.TEXT)
+        )
+
+        with pytest.raises(SectionNotFoundError):
+            template.move_section(uuid4(), 0)
+        with pytest.raises(QuestionNotFoundError):
+            template.move_question(section.id, uuid4(), 0)
+
+        template.publish()
+        with pytest.raises(InvalidTemplateStateError):
+            template.move_section(section.id, 0)
+
+    def test_move_in_revision_leaves_published_intact(self):
+        """Test that moving in a revision does not reorder the published one."""
+        template = TemplateAggregate(id=uuid4(), title="T")
+        template.add_section(SectionEntity(id=uuid4(), title="S"))
+        section = template.sections[0]
+        for text in "AB":
+            template.add_question(
+                section.id,
+                QuestionEntity(id=uuid4(), text=text, type=QuestionType.TEXT),
+            )
+        template.publish()
+        original = [(q.text, q.order_key) for q in section.questions]
+
+        revision = template.create_revision()
+        revision.move_question(section.id, section.questions[1].id, 0)
+
+        assert [q.text for q in revision.sections[0].questions] == ["B", "A"]
+        assert [(q.text, q.order_key) for q in section.questions] == original
+
+    def test_edit_question_keeps_its_key(self):
+        """Test that an edited question stays in place."""
+        template = TemplateAggregate(id=uuid4(), title="T")
+        template.add_section(SectionEntity(id=uuid4(), title="S"))
+        section = template.sections[0]
+        question = QuestionEntity(id=uuid4(), text="Q", type=QuestionType.TEXT)
+        template.add_question(section.id, question)
+        key = question.order_key
+
+        template.edit_question(
+            section.id,
+            question.id,
+            QuestionEntity(id=question.id, text="Edited", type=QuestionType.TEXT),
+        )
+
+        assert section.questions[0].order_key == key
+
+    def test_entities_without_keys_get_them(self):
+        """Test that siblings stored before order keys get keys on first use."""
+        section = SectionEntity(
+            id=uuid4(),
+            title="S",
+            questions=[
+                QuestionEntity(id=uuid4(), text=text, type=QuestionType.TEXT)
+                for text in "ABC"
+            ],
+        )
+        template = TemplateAggregate(id=uuid4(), title="T", sections=[section])
+
+        template.move_question(section.id, section.questions[2].id, 0)
+
+        questions = template.sections[0].questions
+        assert [q.text for q in questions] == ["C", "A", "B"]
+        assert None not in self._keys(questions)
+        assert self._keys(questions) == sorted(self._keys(questions))
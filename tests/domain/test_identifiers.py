@@ -0,0 +1,83 @@
+import pytest
+
+from app.domain import identifiers
+from app.domain.identifiers import UUID7Generator, new_id, new_ids
+
+
+class TestUUID7Generator:
+    """Test cases for time-ordered UUIDv7 generation."""
+
+    @pytest.fixture
+    def clock(self):
+        """Fixture for a settable clock in nanoseconds."""
+
+        class Clock:
+            now = 1_700_000_000_000 * 1_000_000
+
+            def __call__(self):
+                return self.now
+
+        return Clock()
+
+    def test_version_variant_and_timestamp(self, clock):
+        """Test IDs are RFC 9562 version 7 UUIDs carrying the time in ms."""
+        uid = UUID7Generator(clock).new()
+
+        assert uid.version == 7
+        assert uid.variant == "specified in RFC 4122"
+        assert uid.int >> 80 == 1_700_000_000_000
+
+    def test_increasing_within_millisecond(self, clock):
+        """Test IDs of the same millisecond are distinct and increasing."""
+        generator = UUID7Generator(clock)
+        ids = [generator.new() for _ in range(1000)]
+
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 1000
+
+    def test_increasing_when_clock_steps_back(self, clock):
+        """Test IDs keep increasing after the clock moves backwards."""
+        generator = UUID7Generator(clock)
+        first = generator.new()
+        clock.now -= 5_000_000_000
+
+        assert generator.new() > first
+
+    def test_increasing_across_milliseconds(self, clock):
+        """Test a later millisecond gives greater IDs."""
+        generator = UUID7Generator(clock)
+        first = generator.batch(10)
+        clock.now += 1_000_000
+
+        assert generator.new() > first[-1]
+
+    def test_batch(self, clock):
+        """Test a batch gives increasing IDs that follow the previous ones."""
+        generator = UUID7Generator(clock)
+        before = generator.new()
+        batch = generator.batch(500)
+
+        assert len(batch) == 500
+        assert [before] + batch == sorted([before] + batch)
+        assert generator.new() > batch[-1]
+        assert generator.batch(0) == []
+
+    def test_counter_overflow_carries_into_timestamp(self, clock):
+        """Test exhausting a millisecond's counter moves to the next one."""
+        generator = UUID7Generator(clock)
+        generator.new()
+        generator._counter = identifiers._COUNTER_MAX - 1
+
+        ids = generator.batch(3)
+
+        assert ids == sorted(ids)
+        assert ids[-1].int >> 80 == 1_700_000_000_001
+
+
+class TestIdGenerator:
+    """Test cases for the default ID generator."""
+
+    def test_default_is_uuid7(self):
+        """Test new IDs are UUIDv7 by default."""
+        assert new_id().version == 7
+        assert {uid.version for uid in new_ids(3)} == {7}
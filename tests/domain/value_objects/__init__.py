@@ -0,0 +1 @@
+# Value objects tests package
@@ -0,0 +1,96 @@
+from app.domain.entities.question import QuestionEntity
+from app.domain.value_objects.option_set import (
+    OptionSetRegistry,
+    option_set_id,
+    option_sets,
+)
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+
+
+class TestOptionSetRegistry:
+    """Test cases for interned option sets."""
+
+    def test_equal_labels_share_one_set(self):
+        """Test that equal option lists resolve to the same tuple."""
+        registry = OptionSetRegistry()
+
+        first = registry.from_labels(["Yes", "No"])
+        second = registry.from_labels(["Yes", "No"])
+
+        assert first is second
+        assert [(o.label, o.value, o.order) for o in first] == [
+            ("Yes", "Yes", 0),
+            ("No", "No", 1),
+        ]
+        assert registry.stats() == {"sets": 1, "hits": 1, "misses": 1}
+
+    def test_sources_of_equal_content_share_one_set(self):
+        """Test that options, labels and stored rows intern to one set."""
+        registry = OptionSetRegistry()
+
+        from_labels = registry.from_labels(["A"])
+        from_rows = registry.from_rows([("A", "A", 0)])
+        from_options = registry.intern([QuestionOption(label="A", value="A", order=0)])
+
+        assert from_labels is from_rows is from_options
+
+    def test_order_distinguishes_sets(self):
+        """Test that the same labels in another order are another set."""
+        registry = OptionSetRegistry()
+
+        assert registry.from_labels(["A", "B"]) is not registry.from_labels(["B", "A"])
+
+    def test_evicts_least_recently_interned(self):
+        """Test the registry keeps at most `max_sets` sets."""
+        registry = OptionSetRegistry(max_sets=2)
+        first = registry.from_labels(["1"])
+        registry.from_labels(["2"])
+        registry.from_labels(["3"])
+
+        assert len(registry) == 2
+        again = registry.from_labels(["1"])
+        assert again == first and again is not first
+
+    def test_validated_questions_share_options(self):
+        """Test that questions built with equal options share the process set."""
+        questions = [
+            QuestionEntity(
+                text="Q",
+                type=QuestionType.SINGLE_CHOICE,
+                options=[{"label": "Yes", "value": "y", "order": 0}],
+            )
+            for _ in range(3)
+        ]
+
+        assert questions[0].options is questions[1].options is questions[2].options
+        assert questions[0].options is option_sets.from_rows([("Yes", "y", 0)])
+
+
+class TestOptionSetId:
+    """Test cases for content-derived option set IDs."""
+
+    def test_depends_only_on_content(self):
+        """Test that equal sets from separate registries have the same ID."""
+        first = OptionSetRegistry().from_labels(["Yes", "No"])
+        second = OptionSetRegistry().from_labels(["Yes", "No"])
+
+        assert first is not second
+        assert option_set_id(first) == option_set_id(second)
+        assert len(option_set_id(first)) == 16
+
+    def test_differs_by_label_value_and_order(self):
+        """Test that changing any field of an option changes the ID."""
+        registry = OptionSetRegistry()
+        ids = {
+            option_set_id(registry.from_rows(rows))
+            for rows in [
+                [("A", "a", 0)],
+                [("B", "a", 0)],
+                [("A", "b", 0)],
+                [("A", "a", 1)],
+                [],
+            ]
+        }
+
+        assert len(ids) == 5
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from app.domain.exceptions.template import InvalidOrderKeyError
+from app.domain.value_objects.order_key import (
+    MAX_KEY_LENGTH,
+    key_between,
+    keys_between,
+    needs_rebalance,
+)
+
+
+class TestOrderKey:
+    """Test cases for fractional order keys."""
+
+    def test_first_key(self):
+        """Test the key of a first sibling."""
+        assert key_between(None, None) == "a0"
+
+    def test_appends_grow_logarithmically(self):
+        """Test 10k appends give increasing keys of at most four characters."""
+        keys = [key_between(None, None)]
+        for _ in range(10_000):
+            keys.append(key_between(keys[-1], None))
+
+        assert keys == sorted(keys)
+        assert max(len(key) for key in keys) <= 4
+
+    def test_prepends_grow_logarithmically(self):
+        """Test 10k prepends give decreasing keys of at most four characters."""
+        keys = [key_between(None, None)]
+        for _ in range(10_000):
+            keys.append(key_between(None, keys[-1]))
+
+        assert keys == sorted(keys, reverse=True)
+        assert max(len(key) for key in keys) <= 4
+
+    def test_random_inserts_stay_ordered(self):
+        """Property: keys inserted at random places keep the list sorted."""
+        rng = random.Random(0)
+        keys = []
+        for _ in range(10_000):
+            position = rng.randint(0, len(keys))
+            before = keys[position - 1] if position > 0 else None
+            after = keys[position] if position < len(keys) else None
+            keys.insert(position, key_between(before, after))
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_repeated_inserts_at_one_place_need_rebalance(self):
+        """Test keys inserted again and again at one place grow until too long."""
+        before, after = "a0", "a1"
+        for inserts in range(1, 1000):
+            after = key_between(before, after)
+            assert before < after
+            if needs_rebalance(after):
+                break
+
+        assert len(after) == MAX_KEY_LENGTH + 1
+        assert inserts > 100
+
+    @pytest.mark.parametrize(
+        "before, after", [(None, None), ("a0", None), (None, "a0"), ("a0", "a1")]
+    )
+    def test_keys_between(self, before, after):
+        """Test many keys at once are increasing and within the bounds."""
+        keys = keys_between(before, after, 1000)
+
+        assert keys == sorted(keys) and len(set(keys)) == 1000
+        assert before is None or keys[0] > before
+        assert after is None or keys[-1] < after
+
+    @pytest.mark.parametrize(
+        "before, after", [("a1", "a0"), ("a0", "a0"), ("", None), ("a10", None)]
+    )
+    def test_invalid_keys_are_rejected(self, before, after):
+        """Test unordered, empty and trailing-zero keys are rejected."""
+        with pytest.raises(InvalidOrderKeyError):
+            key_between(before, after)
@@ -0,0 +1,128 @@
+import json
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import SectionNotFoundError
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_projection import (
+    FULL_PROJECTION,
+    TemplateProjection,
+)
+
+
+class TestTemplateProjection:
+    """Test cases for selecting parts of a template document."""
+
+    @pytest.fixture
+    def template(self):
+        """Fixture for a template with two sections of choice questions."""
+        return TemplateAggregate(
+            id=uuid4(),
+            title="Survey",
+            description="About us",
+            sections=[
+                SectionEntity(
+                    id=uuid4(),
+                    title=title,
+                    order_key=key,
+                    questions=[
+                        QuestionEntity(
+                            id=uuid4(),
+                            text=f"{title} {i}",
+                            type=QuestionType.SINGLE_CHOICE,
+                            options=[{"label": "Yes", "value": "y", "order": 0}],
+                            order_key=f"a{i}",
+                        )
+                        for i in range(count)
+                    ],
+                )
+                for title, key, count in [("First", "a0", 3), ("Second", "a1", 1)]
+            ],
+        )
+
+    def test_full_projection_matches_template_json(self, template):
+        """Test that the default projection is the template's JSON document."""
+        document = FULL_PROJECTION.apply(template)
+
+        assert document == json.loads(template.model_dump_json())
+
+    def test_sections_without_questions_carry_counts(self, template):
+        """Test the sidebar view: section titles with question counts."""
+        projection = TemplateProjection(fields={"title"}, include={"sections"})
+
+        document = projection.apply(template)
+
+        assert document == {
+            "title": "Survey",
+            "sections": [
+                {
+                    "id": str(template.sections[0].id),
+                    "title": "First",
+                    "description": None,
+                    "question_count": 3,
+                    "order_key": "a0",
+                },
+                {
+                    "id": str(template.sections[1].id),
+                    "title": "Second",
+                    "description": None,
+                    "question_count": 1,
+                    "order_key": "a1",
+                },
+            ],
+        }
+
+    def test_questions_without_options(self, template):
+        """Test that options can be left out of the questions."""
+        projection = TemplateProjection(include={"sections", "questions"})
+
+        document = projection.apply(template)
+
+        question = document["sections"][0]["questions"][0]
+        assert "options" not in question
+        assert question["text"] == "First 0"
+
+    def test_single_section(self, template):
+        """Test selecting one section by ID."""
+        section = template.sections[1]
+        projection = TemplateProjection(section_id=section.id)
+
+        document = projection.apply(template)
+
+        assert [s["id"] for s in document["sections"]] == [str(section.id)]
+
+    def test_missing_section_raises(self, template):
+        """Test that selecting an unknown section is an error."""
+        with pytest.raises(SectionNotFoundError):
+            TemplateProjection(section_id=uuid4()).apply(template)
+
+    def test_counts_of_a_partial_load(self, template):
+        """Test that given question counts replace those of loaded sections."""
+        for section in template.sections:
+            section.questions = []
+        counts = {template.sections[0].id: 7}
+        projection = TemplateProjection(include={"sections"})
+
+        document = projection.apply(template, counts)
+
+        assert [s["question_count"] for s in document["sections"]] == [7, 0]
+
+    @pytest.mark.parametrize(
+        "values",
+        [
+            {"fields": {"secret"}},
+            {"include": {"answers"}},
+            {"include": {"questions"}},
+            {"include": {"sections", "options"}},
+            {"include": set(), "section_id": uuid4()},
+        ],
+    )
+    def test_invalid_projections(self, values):
+        """Test that unknown names and orphan parts are rejected."""
+        with pytest.raises(ValidationError):
+            TemplateProjection(**values)
@@ -0,0 +1 @@
+# Persistence tests package
@@ -0,0 +1,160 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from app.application.queries.search_index import SearchIndex
+from app.domain.aggregates.template import TemplateAggregate
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.search_indexer import SearchIndexer
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+
+
+async def wait_for(condition) -> None:
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("Condition not met")
+
+
+class TestInMemorySearchIndexer:
+    """Test cases for indexing commits to the in-memory store."""
+
+    @pytest.mark.asyncio
+    async def test_indexes_existing_and_committed_templates(self):
+        """Test stored templates are indexed at start, commits after them."""
+        store = InMemoryTemplateStore()
+        existing = TemplateAggregate(title="Existing survey")
+        async with InMemoryUnitOfWork(store) as uow:
+            existing = await uow.template.create(existing)
+
+        index = SearchIndex()
+        indexer = SearchIndexer(index, store)
+        await indexer.start()
+        await indexer.ready.wait()
+        try:
+            async with InMemoryUnitOfWork(store) as uow:
+                created = await uow.template.create(TemplateAggregate(title="New one"))
+
+            await wait_for(lambda: created.id in index)
+            assert [hit.template_id for hit in index.search("new")] == [created.id]
+            assert [hit.template_id for hit in index.search("existing")] == [
+                existing.id
+            ]
+
+            async with InMemoryUnitOfWork(store) as uow:
+                await uow.template.delete(created.id)
+            await wait_for(lambda: created.id not in index)
+            assert index.search("new") == []
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_indexes_off_the_commit_path(self, monkeypatch):
+        """Test a commit only queues its templates, and a template committed
+        repeatedly meanwhile is indexed once, at its latest version."""
+        store = InMemoryTemplateStore()
+        index = SearchIndex()
+        indexer = SearchIndexer(index, store)
+        await indexer.start()
+        await indexer.ready.wait()
+        added = []
+        index_add = index.add
+
+        def add(template, version):
+            added.append(version)
+            index_add(template, version)
+
+        monkeypatch.setattr(index, "add", add)
+        try:
+            template = TemplateAggregate(title="Draft")
+            for title in ["Draft", "Climat", "Climat social"]:
+                template.title = title
+                store.apply({template.id: template}, {})
+            assert added == []
+
+            await wait_for(lambda: template.id in index)
+            assert added == [3]
+            assert len(index.search("social")) == 1
+        finally:
+            await indexer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_template_does_not_stop_its_batch(self, monkeypatch, caplog):
+        """Test that a template failing to index is logged and skipped, and the
+        templates committed with it are still indexed."""
+        store = InMemoryTemplateStore()
+        index = SearchIndex()
+        indexer = SearchIndexer(index, store)
+        await indexer.start()
+        await indexer.ready.wait()
+        index_add = index.add
+
+        def add(template, version):
+            if template.title == "Broken":
+                raise ValueError("cannot tokenize")
+            index_add(template, version)
+
+        monkeypatch.setattr(index, "add", add)
+        try:
+            templates = [
+                TemplateAggregate(id=uuid4(), title=title)
+                for title in ["First", "Broken", "Last"]
+            ]
+            store.apply({template.id: template for template in templates}, {})
+
+            await wait_for(lambda: templates[2].id in index)
+            assert templates[0].id in index
+            assert templates[1].id not in index
+            assert f"Indexing template {templates[1].id} failed" in caplog.text
+        finally:
+            await indexer.close()
+
+
+class TestSQLiteSearchIndexer:
+    """Test cases for indexing commits to SQLite through the change feed."""
+
+    @pytest_asyncio.fixture
+    async def database(self, tmp_path):
+        """Fixture for a SQLite database polled by hand."""
+        database = SQLiteDatabase(
+            str(tmp_path / "templates.db"), readers=1, change_poll_interval=3600
+        )
+        await database.open()
+        yield database
+        await database.close()
+
+    @pytest.mark.asyncio
+    async def test_follows_commits(self, database):
+        """Test existing templates are indexed, then changes as they are fed."""
+        async with SQLiteUnitOfWork(database) as uow:
+            existing = await uow.template.create(TemplateAggregate(title="Existing"))
+
+        index = SearchIndex()
+        indexer = SearchIndexer(index, database)
+        await indexer.start()
+        try:
+            await indexer.ready.wait()
+            assert [hit.template_id for hit in index.search("existing")] == [
+                existing.id
+            ]
+
+            async with SQLiteUnitOfWork(database) as uow:
+                template = await uow.template.get_by_id(existing.id)
+                template.title = "Renamed"
+                await uow.template.update(template)
+            await database.changes.poll()
+            await wait_for(lambda: index.version(existing.id) == 2)
+            assert index.search("existing") == []
+            assert len(index.search("renamed")) == 1
+
+            async with SQLiteUnitOfWork(database) as uow:
+                await uow.template.delete(existing.id)
+            await database.changes.poll()
+            assert existing.id not in index
+        finally:
+            await indexer.close()
@@ -0,0 +1,70 @@
+import pytest
+import pytest_asyncio
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.infrastructure.persistence import template_repository_sqlite
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+
+
+class TestSQLiteChangeFeed:
+    """Test cases for cross-process change notifications."""
+
+    @pytest_asyncio.fixture
+    async def databases(self, tmp_path):
+        """Fixture for two databases on one file, standing for two processes."""
+        path = str(tmp_path / "templates.db")
+        writer = SQLiteDatabase(path, readers=1, change_poll_interval=3600)
+        reader = SQLiteDatabase(path, readers=1, change_poll_interval=3600)
+        await writer.open()
+        await reader.open()
+        yield writer, reader
+        await reader.close()
+        await writer.close()
+
+    @pytest.fixture
+    def received(self, databases):
+        """Fixture collecting what the second database's feed delivers."""
+        received = []
+        databases[1].changes.subscribe(received.append)
+        return received
+
+    @pytest.mark.asyncio
+    async def test_commits_of_another_process_are_delivered(self, databases, received):
+        """Test that creates, updates and deletes arrive with their versions."""
+        writer, reader = databases
+        uow = SQLiteUnitOfWork(writer)
+        async with uow:
+            template = await uow.template.create(TemplateAggregate(title="T"))
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.title = "Renamed"
+            await uow.template.update(loaded)
+        async with uow:
+            await uow.template.delete(template.id)
+
+        await reader.changes.poll()
+
+        assert received == [[(template.id, 1), (template.id, 2), (template.id, 0)]]
+
+    @pytest.mark.asyncio
+    async def test_idle_poll_notifies_nobody(self, databases, received):
+        """Test that listeners are not called when nothing was committed."""
+        await databases[1].changes.poll()
+
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_missed_changes_invalidate_everything(
+        self, databases, received, monkeypatch
+    ):
+        """Test that a feed lagging past the retained rows reports a gap."""
+        monkeypatch.setattr(template_repository_sqlite, "CHANGE_RETENTION", 2)
+        uow = SQLiteUnitOfWork(databases[0])
+        for i in range(5):
+            async with uow:
+                await uow.template.create(TemplateAggregate(title=f"T{i}"))
+
+        await databases[1].changes.poll()
+
+        assert received == [None]
@@ -0,0 +1,247 @@
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import ConcurrentModificationError
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.persistence.template_cache import TemplateCache, estimate_size
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+
+
+def _template(title: str = "T") -> TemplateAggregate:
+    return TemplateAggregate(
+        id=uuid4(), title=title, sections=[SectionEntity(id=uuid4(), title="S")]
+    )
+
+
+class TestTemplateCache:
+    """Test cases for the byte-bounded LRU template cache."""
+
+    def test_hit_returns_isolated_working_copy(self):
+        """Test that editing a cached copy leaves the cached snapshot intact."""
+        cache = TemplateCache(max_bytes=100_000)
+        template = _template()
+        cache.put(template, version=1)
+
+        copy = cache.get(template.id, version=1)
+        copy.add_question(
+            copy.sections[0].id, QuestionEntity(text="Q", type=QuestionType.TEXT)
+        )
+
+        assert cache.get(template.id, version=1).sections[0].questions == []
+        assert cache.hits == 2
+
+    def test_version_mismatch_is_a_stale_miss(self):
+        """Test that an outdated snapshot is dropped instead of returned."""
+        cache = TemplateCache(max_bytes=100_000)
+        template = _template()
+        cache.put(template, version=1)
+
+        assert cache.get(template.id, version=2) is None
+        assert template.id not in cache
+        assert (cache.misses, cache.stale) == (1, 1)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Test that the byte budget evicts the least recently used entries."""
+        templates = [_template(f"T{i}") for i in range(3)]
+        cache = TemplateCache(max_bytes=estimate_size(templates[0]) * 2)
+        cache.put(templates[0], 1)
+        cache.put(templates[1], 1)
+        cache.get(templates[0].id, 1)
+
+        cache.put(templates[2], 1)
+
+        assert templates[0].id in cache and templates[2].id in cache
+        assert templates[1].id not in cache
+        assert cache.evictions == 1
+        assert cache.size_bytes <= cache.max_bytes
+
+    def test_oversized_template_is_not_cached(self):
+        """Test that a template larger than the budget is never stored."""
+        cache = TemplateCache(max_bytes=100)
+        cache.put(_template(), 1)
+
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    def test_older_version_does_not_replace_newer(self):
+        """Test that a slow reader cannot overwrite a fresher snapshot."""
+        cache = TemplateCache(max_bytes=100_000)
+        template = _template("New")
+        cache.put(template, 3)
+
+        cache.put(template.model_copy(update={"title": "Old"}), 2)
+
+        assert cache.get(template.id, 3).title == "New"
+
+    def test_ttl_expires_entries(self, monkeypatch):
+        """Test that entries older than the TTL count as misses."""
+        clock = iter([0.0, 10.0])
+        monkeypatch.setattr(
+            "app.infrastructure.persistence.template_cache.time.monotonic",
+            lambda: next(clock),
+        )
+        cache = TemplateCache(max_bytes=100_000, ttl=5)
+        template = _template()
+        cache.put(template, 1)
+
+        assert cache.get(template.id, 1) is None
+        assert cache.stale == 1
+
+    def test_change_feed_invalidates_superseded_versions(self):
+        """Test that notified versions drop older snapshots only."""
+        cache = TemplateCache(max_bytes=100_000)
+        first, second, third = _template(), _template(), _template()
+        for template in (first, second, third):
+            cache.put(template, 2)
+
+        cache.on_changes([(first.id, 2), (second.id, 3), (third.id, 0)])
+
+        assert first.id in cache
+        assert second.id not in cache and third.id not in cache
+
+        cache.on_changes(None)
+        assert len(cache) == 0 and cache.size_bytes == 0
+
+    def test_estimate_counts_shared_options_once(self):
+        """Test that interned option lists are not charged per question."""
+        options = [
+            QuestionOption(label=f"Option {i}", value=str(i), order=i) for i in range(5)
+        ]
+
+        def build(shared: bool) -> TemplateAggregate:
+            template = _template()
+            # Unvalidated, so that the unshared options are not interned.
+            template.sections[0].questions = [
+                QuestionEntity.model_construct(
+                    text="Q",
+                    type=QuestionType.SINGLE_CHOICE,
+                    options=options if shared else [o.model_copy() for o in options],
+                )
+                for _ in range(20)
+            ]
+            return template
+
+        assert estimate_size(build(shared=True)) < estimate_size(build(shared=False))
+
+
+class TestSQLiteUnitOfWorkCache:
+    """Test cases for the cache in front of the SQLite repository."""
+
+    @pytest_asyncio.fixture
+    async def database(self, tmp_path):
+        """Fixture for an open SQLite database in a temporary directory."""
+        database = SQLiteDatabase(
+            str(tmp_path / "templates.db"), readers=1, change_poll_interval=3600
+        )
+        await database.open()
+        yield database
+        await database.close()
+
+    @pytest.fixture
+    def cache(self):
+        """Fixture for an empty template cache."""
+        return TemplateCache(max_bytes=1024 * 1024)
+
+    @pytest_asyncio.fixture
+    async def template_id(self, database, cache):
+        """Fixture for a committed template, cached by its commit."""
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            template = await uow.template.create(_template())
+        return template.id
+
+    @pytest.mark.asyncio
+    async def test_commit_populates_cache_and_loads_hit(
+        self, database, cache, template_id
+    ):
+        """Test that a committed template is served from the cache."""
+        assert cache.version(template_id) == 1
+
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            loaded = await uow.template.get_by_id(template_id)
+
+        assert loaded.title == "T"
+        assert (cache.hits, cache.misses) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_update_caches_new_version(self, database, cache, template_id):
+        """Test that a successful commit replaces the snapshot."""
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            loaded = await uow.template.get_by_id(template_id)
+            loaded.title = "Renamed"
+            await uow.template.update(loaded)
+
+        assert cache.version(template_id) == 2
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            assert (await uow.template.get_by_id(template_id)).title == "Renamed"
+
+    @pytest.mark.asyncio
+    async def test_rollback_drops_touched_templates(self, database, cache, template_id):
+        """Test that templates loaded by a rolled-back unit of work are evicted."""
+        with pytest.raises(RuntimeError):
+            async with SQLiteUnitOfWork(database, cache) as uow:
+                loaded = await uow.template.get_by_id(template_id)
+                loaded.title = "Discarded"
+                raise RuntimeError("boom")
+
+        assert template_id not in cache
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            assert (await uow.template.get_by_id(template_id)).title == "T"
+
+    @pytest.mark.asyncio
+    async def test_write_by_another_process_is_detected(
+        self, database, cache, template_id
+    ):
+        """Test that the version check catches writes the cache has not seen."""
+        async with SQLiteUnitOfWork(database) as uow:  # another process
+            loaded = await uow.template.get_by_id(template_id)
+            loaded.title = "Elsewhere"
+            await uow.template.update(loaded)
+
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            loaded = await uow.template.get_by_id(template_id)
+
+        assert loaded.title == "Elsewhere"
+        assert cache.stale == 1
+        assert cache.version(template_id) == 2
+
+    @pytest.mark.asyncio
+    async def test_conflicting_commit_drops_template(
+        self, database, cache, template_id
+    ):
+        """Test that a commit failing its version check evicts the template."""
+        with pytest.raises(ConcurrentModificationError):
+            async with SQLiteUnitOfWork(database, cache) as uow:
+                loaded = await uow.template.get_by_id(template_id)
+                async with SQLiteUnitOfWork(database) as other:
+                    winner = await other.template.get_by_id(template_id)
+                    winner.title = "Winner"
+                    await other.template.update(winner)
+                loaded.title = "Loser"
+                await uow.template.update(loaded)
+
+        assert template_id not in cache
+
+    @pytest.mark.asyncio
+    async def test_change_feed_invalidates_cache(self, database, cache, template_id):
+        """Test that commits from another process evict the snapshot."""
+        database.changes.subscribe(cache.on_changes)
+        other = SQLiteDatabase(database.path, readers=1)
+        await other.open()
+        try:
+            async with SQLiteUnitOfWork(other) as uow:
+                loaded = await uow.template.get_by_id(template_id)
+                loaded.title = "Elsewhere"
+                await uow.template.update(loaded)
+        finally:
+            await other.close()
+
+        await database.changes.poll()
+
+        assert template_id not in cache
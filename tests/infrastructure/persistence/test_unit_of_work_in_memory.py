@@ -0,0 +1,294 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from app.application.commands.factory import create_command_bus
+from app.application.commands.template_commands import (
+    AddQuestionCommand,
+    AddSectionCommand,
+    CreateTemplateCommand,
+)
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import (
+    ConcurrentModificationError,
+    TemplateNotFoundError,
+)
+from app.domain.identifiers import UUID4Generator, new_id
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+
+
+def _question(text: str) -> QuestionEntity:
+    return QuestionEntity(text=text, type=QuestionType.TEXT)
+
+
+class TestInMemoryUnitOfWork:
+    """Test cases for the transactional in-memory unit of work."""
+
+    @pytest.fixture
+    def store(self):
+        """Fixture for an empty in-memory template store."""
+        return InMemoryTemplateStore()
+
+    @pytest.fixture
+    def template(self, store):
+        """Fixture for a committed template with one section."""
+        template = TemplateAggregate(
+            id=uuid4(),
+            title="Stored Template",
+            sections=[SectionEntity(id=uuid4(), title="Section")],
+        )
+        store.put(template)
+        return template
+
+    @pytest.mark.asyncio
+    async def test_commit_applies_staged_writes(self, store):
+        """Test that created templates reach the store only on commit."""
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            created = await uow.template.create(TemplateAggregate(title="New"))
+            assert created.id not in store
+
+        assert created.id in store
+        assert store.version(created.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_create_assigns_time_ordered_ids(self, store):
+        """Test that a created template and its entities get increasing UUIDv7s."""
+        template = TemplateAggregate(
+            title="New",
+            sections=[SectionEntity(title="Section", questions=[_question("Q")])],
+        )
+        async with InMemoryUnitOfWork(store) as uow:
+            created = await uow.template.create(template)
+
+        section = created.sections[0]
+        ids = [created.id, section.id, section.questions[0].id]
+        assert [uid.version for uid in ids] == [7, 7, 7]
+        assert ids == sorted(ids)
+
+    @pytest.mark.asyncio
+    async def test_create_uses_the_given_id_generator(self, store):
+        """Test that a unit of work given UUIDv4s assigns them, leaving the
+        default generator alone."""
+        template = TemplateAggregate(
+            title="New",
+            sections=[SectionEntity(title="Section", questions=[_question("Q")])],
+        )
+        async with InMemoryUnitOfWork(store, UUID4Generator()) as uow:
+            created = await uow.template.create(template)
+
+        section = created.sections[0]
+        ids = [created.id, section.id, section.questions[0].id]
+        assert [uid.version for uid in ids] == [4, 4, 4]
+        assert new_id().version == 7
+
+    @pytest.mark.asyncio
+    async def test_exception_rolls_back_staged_writes(self, store):
+        """Test that an exception inside the context discards staged writes."""
+        uow = InMemoryUnitOfWork(store)
+
+        with pytest.raises(RuntimeError):
+            async with uow:
+                await uow.template.create(TemplateAggregate(title="New"))
+                raise RuntimeError("boom")
+
+        assert len(store) == 0
+        assert uow._committed is False
+
+    @pytest.mark.asyncio
+    async def test_rollback_undoes_in_place_mutations(self, store, template):
+        """Test that rollback discards changes made to a loaded aggregate."""
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.title = "Changed"
+            loaded.add_question(loaded.sections[0].id, _question("Q"))
+            await uow.template.update(loaded)
+            await uow.rollback()
+
+        async with uow:
+            reloaded = await uow.template.get_by_id(template.id)
+
+        assert reloaded.title == "Stored Template"
+        assert reloaded.sections[0].questions == []
+        assert store.version(template.id) == 1
+
+    @pytest.mark.asyncio
+    async def test_uncommitted_changes_are_isolated(self, store, template):
+        """Test that other units of work do not see uncommitted changes."""
+        writer = InMemoryUnitOfWork(store)
+        reader = InMemoryUnitOfWork(store)
+
+        async with writer:
+            loaded = await writer.template.get_by_id(template.id)
+            loaded.add_section(SectionEntity(title="Draft Section"))
+            await writer.template.update(loaded)
+
+            async with reader:
+                seen = await reader.template.get_by_id(template.id)
+                assert len(seen.sections) == 1
+
+        async with reader:
+            seen = await reader.template.get_by_id(template.id)
+            assert len(seen.sections) == 2
+
+    @pytest.mark.asyncio
+    async def test_identity_map_returns_same_working_copy(self, store, template):
+        """Test that repeated loads in one unit of work return one aggregate."""
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            first = await uow.template.get_by_id(template.id)
+            second = await uow.template.get_by_id(template.id)
+
+        assert first is second
+        assert first is not template
+
+    @pytest.mark.asyncio
+    async def test_delete_is_staged_until_commit(self, store, template):
+        """Test that deletions are applied on commit."""
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            assert await uow.template.delete(template.id) is True
+            assert template.id in store
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_by_id(template.id)
+            assert await uow.template.delete(uuid4()) is False
+
+        assert template.id not in store
+
+    @pytest.mark.asyncio
+    async def test_get_version_reads_committed_version(self, store, template):
+        """Test that versions come from the store, or from what was read."""
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            assert await uow.template.get_version(template.id) == 1
+            await uow.template.get_by_id(template.id)
+            async with InMemoryUnitOfWork(store) as other:
+                loaded = await other.template.get_by_id(template.id)
+                await other.template.update(loaded)
+            assert await uow.template.get_version(template.id) == 1
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_version(uuid4())
+
+        async with uow:
+            assert await uow.template.get_version(template.id) == 2
+
+    @pytest.mark.asyncio
+    async def test_repository_works_on_its_own_unit_of_work(self, store):
+        """Test that a repository stages into the unit of work it came from,
+        even inside another one, and is built once per unit of work."""
+        outer = InMemoryUnitOfWork(store)
+        inner = InMemoryUnitOfWork(store)
+        assert outer.template is outer.template
+        assert outer.template is not inner.template
+
+        async with outer:
+            async with inner:
+                created = await outer.template.create(TemplateAggregate(title="New"))
+                assert created.id in outer.staged
+                assert not inner.staged
+            assert created.id not in store
+
+        assert created.id in store
+
+    @pytest.mark.asyncio
+    async def test_many_concurrent_units_of_work_commit_independently(self, store):
+        """Test that many simultaneous units of work all commit their writes."""
+
+        async def create(i: int):
+            uow = InMemoryUnitOfWork(store)
+            async with uow:
+                command_bus = create_command_bus(uow)
+                template = await command_bus.execute(
+                    CreateTemplateCommand(title=f"Template {i}")
+                )
+                await asyncio.sleep(0)
+                await command_bus.execute(
+                    AddSectionCommand(template_id=template.id, title="Section")
+                )
+            return template.id
+
+        template_ids = await asyncio.gather(*(create(i) for i in range(500)))
+
+        assert len(store) == 500
+        for template_id in template_ids:
+            stored, version = store.get(template_id)
+            assert len(stored.sections) == 1
+            assert version == 2  # each handler commits
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_to_one_template_conflict(self, store, template):
+        """Test that only one of many racing units of work wins."""
+        section_id = template.sections[0].id
+
+        async def add_question(i: int):
+            uow = InMemoryUnitOfWork(store)
+            async with uow:
+                loaded = await uow.template.get_by_id(template.id)
+                await asyncio.sleep(0)
+                loaded.add_question(section_id, _question(f"Q{i}"))
+                await uow.template.update(loaded)
+
+        results = await asyncio.gather(
+            *(add_question(i) for i in range(100)), return_exceptions=True
+        )
+
+        conflicts = [r for r in results if isinstance(r, ConcurrentModificationError)]
+        assert len(conflicts) == 99
+        stored, version = store.get(template.id)
+        assert len(stored.sections[0].questions) == 1
+        assert version == 2
+
+    @pytest.mark.asyncio
+    async def test_serialized_writes_to_one_template_all_apply(self, store, template):
+        """Test that retried command-bus writes on one template all land."""
+        section_id = template.sections[0].id
+
+        async def add_question(i: int):
+            while True:
+                uow = InMemoryUnitOfWork(store)
+                try:
+                    async with uow:
+                        await create_command_bus(uow).execute(
+                            AddQuestionCommand(
+                                template_id=template.id,
+                                section_id=section_id,
+                                question_text=f"Q{i}",
+                                question_type="text",
+                            )
+                        )
+                    return
+                except ConcurrentModificationError:
+                    await asyncio.sleep(0)
+
+        await asyncio.gather(*(add_question(i) for i in range(50)))
+
+        stored, version = store.get(template.id)
+        assert sorted(q.text for q in stored.sections[0].questions) == sorted(
+            f"Q{i}" for i in range(50)
+        )
+        assert version == 51
+
+    @pytest.mark.asyncio
+    async def test_conflicting_commit_applies_nothing(self, store, template):
+        """Test that a commit with one stale template writes none of them."""
+        other = TemplateAggregate(id=uuid4(), title="Other")
+        store.put(other)
+        uow = InMemoryUnitOfWork(store)
+
+        with pytest.raises(ConcurrentModificationError):
+            async with uow:
+                first = await uow.template.get_by_id(template.id)
+                second = await uow.template.get_by_id(other.id)
+                first.title = second.title = "Changed"
+                await uow.template.update(first)
+                await uow.template.update(second)
+                store.put(template)  # a concurrent writer commits first
+
+        assert store.get(other.id)[0].title == "Other"
+        assert store.version(other.id) == 1
@@ -0,0 +1,551 @@
+import asyncio
+import random
+import sqlite3
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+
+from app.application.commands.factory import create_command_bus
+from app.application.commands.template_commands import (
+    AddSectionCommand,
+    CreateTemplateCommand,
+)
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.exceptions.template import (
+    ConcurrentModificationError,
+    TemplateNotFoundError,
+)
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_limits import TemplateLimits
+from app.domain.value_objects.template_projection import TemplateProjection
+from app.domain.value_objects.template_status import TemplateStatus
+from app.infrastructure.persistence.sqlite_database import (
+    OPTION_SETS_SCHEMA,
+    SCHEMA,
+    SQLiteDatabase,
+)
+from app.infrastructure.persistence.template_cache import TemplateCache
+from app.infrastructure.persistence.unit_of_work_sqlite import SQLiteUnitOfWork
+from tests.infrastructure.serialization.test_template_codec import random_template
+
+
+def _question(text: str) -> QuestionEntity:
+    return QuestionEntity(text=text, type=QuestionType.TEXT)
+
+
+def _options_per_question_schema() -> str:
+    """`SCHEMA` as it was before option sets, with options per question."""
+    return SCHEMA.replace(
+        "    -- NULL for a question without options.\n    option_set_id BLOB,",
+        "    has_options INTEGER NOT NULL,",
+    ).replace(
+        OPTION_SETS_SCHEMA,
+        """
+CREATE TABLE IF NOT EXISTS options (
+    template_id BLOB NOT NULL,
+    question_id BLOB NOT NULL,
+    position INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    value TEXT NOT NULL,
+    "order" INTEGER NOT NULL,
+    PRIMARY KEY (template_id, question_id, position),
+    FOREIGN KEY (template_id, question_id)
+        REFERENCES questions (template_id, id) ON DELETE CASCADE
+) WITHOUT ROWID;
+""",
+    )
+
+
+class TestSQLiteUnitOfWork:
+    """Test cases for the SQLite unit of work."""
+
+    @pytest_asyncio.fixture
+    async def database(self, tmp_path):
+        """Fixture for an open SQLite database in a temporary directory."""
+        database = SQLiteDatabase(str(tmp_path / "templates.db"), readers=2)
+        await database.open()
+        yield database
+        await database.close()
+
+    @pytest.fixture(params=[False, True], ids=["uncached", "cached"])
+    def cache(self, request):
+        """Fixture for no cache, or a template cache in front of the database."""
+        return TemplateCache(max_bytes=1024 * 1024) if request.param else None
+
+    @pytest_asyncio.fixture
+    async def template(self, database, cache):
+        """Fixture for a committed template with one section."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            template = await uow.template.create(
+                TemplateAggregate(
+                    title="Stored Template",
+                    sections=[SectionEntity(title="Section")],
+                )
+            )
+        return template
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("seed", range(20))
+    async def test_template_round_trip(self, database, cache, seed):
+        """Property: a committed template loads back equal to what was saved."""
+        template = random_template(random.Random(seed))
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            created = await uow.template.create(template)
+
+        async with uow:
+            loaded = await uow.template.get_by_id(created.id)
+
+        assert loaded.model_dump() == created.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_exception_rolls_back_staged_writes(self, database, cache):
+        """Test that an exception inside the context writes nothing."""
+        uow = SQLiteUnitOfWork(database, cache)
+
+        with pytest.raises(RuntimeError):
+            async with uow:
+                await uow.template.create(TemplateAggregate(title="New"))
+                raise RuntimeError("boom")
+
+        async with uow:
+            assert await uow.template.get_all() == []
+
+    @pytest.mark.asyncio
+    async def test_repository_works_on_its_own_unit_of_work(self, database, cache):
+        """Test that a repository stages into the unit of work it came from,
+        even inside another one."""
+        outer = SQLiteUnitOfWork(database, cache)
+        inner = SQLiteUnitOfWork(database, cache)
+        assert outer.template is not inner.template
+
+        async with outer:
+            async with inner:
+                created = await outer.template.create(TemplateAggregate(title="New"))
+                assert created.id in outer.staged
+                assert not inner.staged
+
+        async with inner:
+            assert await inner.template.get_by_id(created.id) is not None
+
+    @pytest.mark.asyncio
+    async def test_update_replaces_children(self, database, cache, template):
+        """Test that sections and questions are rewritten on update."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.add_question(loaded.sections[0].id, _question("Q1"))
+            loaded.add_section(SectionEntity(title="Second"))
+            await uow.template.update(loaded)
+
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.sections = loaded.sections[1:]
+            await uow.template.update(loaded)
+
+        async with uow:
+            reloaded = await uow.template.get_by_id(template.id)
+
+        assert [s.title for s in reloaded.sections] == ["Second"]
+        assert reloaded.sections[0].questions == []
+
+    @pytest.mark.asyncio
+    async def test_update_writes_only_changed_rows(self, database, cache, template):
+        """Test that editing, adding and moving entities write back exactly
+        the resulting template."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            section_id = loaded.sections[0].id
+            for text in ["Q1", "Q2", "Q3"]:
+                loaded.add_question(section_id, _question(text))
+            loaded.add_section(SectionEntity(title="Second"))
+            await uow.template.update(loaded)
+
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            first, second, third = loaded.sections[0].questions
+            loaded.move_question(section_id, third.id, 0)
+            loaded.edit_question(
+                section_id,
+                first.id,
+                QuestionEntity(id=first.id, text="Edited", type=QuestionType.TEXT),
+            )
+            loaded.move_section(section_id, 1)
+            loaded.sections[1].questions.remove(loaded.sections[1].questions[2])
+            await uow.template.update(loaded)
+            expected = loaded.model_dump()
+
+        async with SQLiteUnitOfWork(database) as uow:
+            reloaded = await uow.template.get_by_id(template.id)
+
+        assert reloaded.model_dump() == expected
+        assert [s.title for s in reloaded.sections] == ["Second", "Section"]
+        assert [q.text for q in reloaded.sections[1].questions] == ["Q3", "Edited"]
+
+    @pytest.mark.asyncio
+    async def test_move_among_10k_questions_writes_one_row(self, database, cache):
+        """Test that moving one of 10k questions updates only its own row."""
+        limits = TemplateLimits(max_questions_per_section=10_000)
+        template = TemplateAggregate(title="Large")
+        template.add_section(SectionEntity(title="Section"))
+        for i in range(10_000):
+            template.add_question(template.sections[0].id, _question(f"Q{i}"), limits)
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            await uow.template.create(template)
+        moved = template.sections[0].questions[-1]
+
+        changes_before = database._writer.total_changes
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.move_question(loaded.sections[0].id, moved.id, 0)
+            await uow.template.update(loaded)
+        # The template row, the moved question's row and the change feed entry.
+        assert database._writer.total_changes - changes_before == 3
+
+        async with SQLiteUnitOfWork(database) as uow:
+            reloaded = await uow.template.get_by_id(template.id)
+        assert reloaded.sections[0].questions[0].id == moved.id
+        assert len(reloaded.sections[0].questions) == 10_000
+
+    @pytest.mark.asyncio
+    async def test_equal_options_are_stored_once(self, database, cache, template):
+        """Test that 1,000 questions on one scale store a single option set."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            loaded.add_section(SectionEntity(title="Second"))
+            for section in loaded.sections:
+                for i in range(500):
+                    loaded.add_question(
+                        section.id,
+                        QuestionEntity(
+                            text=f"Q{i}",
+                            type=QuestionType.SINGLE_CHOICE,
+                            options=[
+                                QuestionOption(label=label, value=label, order=order)
+                                for order, label in enumerate("12345")
+                            ],
+                        ),
+                    )
+            await uow.template.update(loaded)
+
+        async with SQLiteUnitOfWork(database) as uow:
+            reloaded = await uow.template.get_by_id(template.id)
+
+        rows = await database.read(
+            lambda connection: connection.execute(
+                "SELECT COUNT(*) FROM option_sets"
+            ).fetchone()[0]
+        )
+        assert rows == 5
+        questions = [q for section in reloaded.sections for q in section.questions]
+        assert len(questions) == 1000
+        assert all(q.options is questions[0].options for q in questions)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "projection",
+        [
+            TemplateProjection(fields={"title"}, include={"sections"}),
+            TemplateProjection(include={"sections", "questions"}),
+            TemplateProjection(include=set()),
+            TemplateProjection(),
+        ],
+        ids=["sections", "questions", "template", "full"],
+    )
+    async def test_projection_matches_full_template(
+        self, database, cache, template, projection
+    ):
+        """Test that a projected read gives the projection of the whole template."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+            section_id = loaded.sections[0].id
+            loaded.add_section(SectionEntity(title="Empty"))
+            for text in ["Q1", "Q2"]:
+                loaded.add_question(
+                    section_id,
+                    QuestionEntity(
+                        text=text,
+                        type=QuestionType.SINGLE_CHOICE,
+                        options=[QuestionOption(label="Yes", value="y", order=0)],
+                    ),
+                )
+            await uow.template.update(loaded)
+
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            document = await uow.template.get_projection(template.id, projection)
+            section = None
+            if projection.sections:
+                single = projection.model_copy(update={"section_id": section_id})
+                section = await uow.template.get_projection(template.id, single)
+        async with SQLiteUnitOfWork(database) as uow:
+            full = await uow.template.get_by_id(template.id)
+
+        assert document == projection.apply(full)
+        if section is not None:
+            assert section["sections"] == document["sections"][:1]
+
+    @pytest.mark.asyncio
+    async def test_projection_skips_unselected_parts(self, database, template):
+        """Test that reading sections without questions queries no question or
+        option rows."""
+        statements = []
+        for connection in database._all_readers:
+            connection.set_trace_callback(statements.append)
+        projection = TemplateProjection(include={"sections"})
+
+        async with SQLiteUnitOfWork(database) as uow:
+            document = await uow.template.get_projection(template.id, projection)
+
+        assert document["sections"][0]["question_count"] == 0
+        assert not any("option_sets" in sql for sql in statements)
+        assert not any(
+            "SELECT template_id, section_id, id" in sql for sql in statements
+        )
+
+    @pytest.mark.asyncio
+    async def test_projection_of_missing_template_raises(self, database, cache):
+        """Test that projecting an unknown template raises."""
+        async with SQLiteUnitOfWork(database, cache) as uow:
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_projection(uuid4(), TemplateProjection())
+
+    @pytest.mark.asyncio
+    async def test_get_version_reads_committed_version(self, database, cache, template):
+        """Test that versions come from the database, or from what was read."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            assert await uow.template.get_version(template.id) == 1
+            await uow.template.get_by_id(template.id)
+            async with SQLiteUnitOfWork(database, cache) as other:
+                loaded = await other.template.get_by_id(template.id)
+                loaded.title = "Renamed"
+                await other.template.update(loaded)
+            assert await uow.template.get_version(template.id) == 1
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_version(uuid4())
+
+        async with uow:
+            assert await uow.template.get_version(template.id) == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_cascades(self, database, cache, template):
+        """Test that deleting a template removes its rows."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            assert await uow.template.delete(template.id) is True
+
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_by_id(template.id)
+            assert await uow.template.delete(template.id) is False
+
+        counts = await database.read(
+            lambda connection: connection.execute(
+                "SELECT (SELECT count(*) FROM sections),"
+                " (SELECT count(*) FROM questions)"
+            ).fetchone()
+        )
+        assert counts == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_revision_keeps_ids_of_its_source(self, database, cache, template):
+        """Test that a revision may reuse section and question IDs."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            published = await uow.template.get_by_id(template.id)
+            published.add_question(published.sections[0].id, _question("Q"))
+            published.publish()
+            await uow.template.update(published)
+            revision = await uow.template.create(published.create_revision())
+
+        async with uow:
+            loaded = await uow.template.get_by_id(revision.id)
+
+        assert loaded.revision_of == template.id
+        assert loaded.status == TemplateStatus.DRAFT
+        assert loaded.sections[0].id == template.sections[0].id
+
+    @pytest.mark.asyncio
+    async def test_get_all_includes_staged_changes(self, database, cache, template):
+        """Test that get_all merges committed rows with this unit of work."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            created = await uow.template.create(TemplateAggregate(title="New"))
+            await uow.template.delete(template.id)
+
+            assert [t.id for t in await uow.template.get_all()] == [created.id]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_to_one_template_conflict(
+        self, database, cache, template
+    ):
+        """Test that only one of many racing units of work wins."""
+        section_id = template.sections[0].id
+
+        async def add_question(i: int):
+            uow = SQLiteUnitOfWork(database, cache)
+            async with uow:
+                loaded = await uow.template.get_by_id(template.id)
+                await asyncio.sleep(0.01)
+                loaded.add_question(section_id, _question(f"Q{i}"))
+                await uow.template.update(loaded)
+
+        results = await asyncio.gather(
+            *(add_question(i) for i in range(20)), return_exceptions=True
+        )
+
+        conflicts = [r for r in results if isinstance(r, ConcurrentModificationError)]
+        assert len(conflicts) == 19
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            loaded = await uow.template.get_by_id(template.id)
+        assert len(loaded.sections[0].questions) == 1
+
+    @pytest.mark.asyncio
+    async def test_many_concurrent_command_buses(self, database, cache):
+        """Test that concurrent commands through the bus all commit."""
+
+        async def create(i: int):
+            uow = SQLiteUnitOfWork(database, cache)
+            async with uow:
+                command_bus = create_command_bus(uow)
+                template = await command_bus.execute(
+                    CreateTemplateCommand(title=f"Template {i}")
+                )
+                await command_bus.execute(
+                    AddSectionCommand(template_id=template.id, title="Section")
+                )
+
+        await asyncio.gather(*(create(i) for i in range(50)))
+
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            templates = await uow.template.get_all()
+        assert len(templates) == 50
+        assert all(len(t.sections) == 1 for t in templates)
+
+    @pytest.mark.asyncio
+    async def test_missing_template_raises(self, database, cache):
+        """Test that loading an unknown ID raises TemplateNotFoundError."""
+        uow = SQLiteUnitOfWork(database, cache)
+        async with uow:
+            with pytest.raises(TemplateNotFoundError):
+                await uow.template.get_by_id(uuid4())
+
+
+class TestSQLiteMigration:
+    """Test cases for upgrading databases created by earlier versions."""
+
+    @pytest.mark.asyncio
+    async def test_positions_become_order_keys(self, tmp_path):
+        """Test that integer positions are replaced by keys in the same order."""
+        path = str(tmp_path / "templates.db")
+        template_id, section_ids = uuid4().bytes, [uuid4().bytes, uuid4().bytes]
+        question_ids = [uuid4().bytes for _ in range(3)]
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            _options_per_question_schema()
+            .replace("order_key TEXT NOT NULL", "position INTEGER NOT NULL")
+            .replace("section_id, order_key)", "section_id, position)")
+        )
+        connection.execute(
+            "INSERT INTO templates VALUES (?, 'Old', NULL, 'draft',"
+            " '2024-01-01T00:00:00', '2024-01-01T00:00:00', NULL, 1)",
+            (template_id,),
+        )
+        for position, section_id in [(1, section_ids[0]), (0, section_ids[1])]:
+            connection.execute(
+                "INSERT INTO sections VALUES (?, ?, ?, 'S', NULL)",
+                (template_id, section_id, position),
+            )
+        for position, question_id in zip([2, 0, 1], question_ids):
+            connection.execute(
+                "INSERT INTO questions VALUES (?, ?, ?, ?, 'Q', 'text', 1, 0)",
+                (template_id, question_id, section_ids[0], position),
+            )
+        connection.commit()
+        connection.close()
+
+        database = SQLiteDatabase(path, readers=1)
+        await database.open()
+        try:
+            async with SQLiteUnitOfWork(database) as uow:
+                loaded = await uow.template.get_by_id(UUID(bytes=template_id))
+                loaded.move_question(
+                    loaded.sections[1].id, loaded.sections[1].questions[0].id, 2
+                )
+                await uow.template.update(loaded)
+            async with SQLiteUnitOfWork(database) as uow:
+                reloaded = await uow.template.get_by_id(UUID(bytes=template_id))
+        finally:
+            await database.close()
+
+        assert [s.id.bytes for s in loaded.sections] == section_ids[::-1]
+        questions = [q.id.bytes for q in reloaded.sections[1].questions]
+        assert questions == [question_ids[2], question_ids[0], question_ids[1]]
+        assert all(q.order_key for q in reloaded.sections[1].questions)
+
+    @pytest.mark.asyncio
+    async def test_options_become_shared_option_sets(self, tmp_path):
+        """Test that equal per-question options are stored as one option set."""
+        path = str(tmp_path / "templates.db")
+        template_id, section_id = uuid4().bytes, uuid4().bytes
+        question_ids = [uuid4().bytes for _ in range(4)]
+        connection = sqlite3.connect(path)
+        connection.executescript(_options_per_question_schema())
+        connection.execute(
+            "INSERT INTO templates VALUES (?, 'Old', NULL, 'draft',"
+            " '2024-01-01T00:00:00', '2024-01-01T00:00:00', NULL, 1)",
+            (template_id,),
+        )
+        connection.execute(
+            "INSERT INTO sections VALUES (?, ?, 'a', 'S', NULL)",
+            (template_id, section_id),
+        )
+        # Two questions with Yes/No, one with no options, one with an empty list.
+        for key, question_id, has_options in zip(
+            "abcd", question_ids, [1, 1, 0, 1], strict=True
+        ):
+            connection.execute(
+                "INSERT INTO questions VALUES (?, ?, ?, ?, 'Q', 'single_choice', 1, ?)",
+                (template_id, question_id, section_id, key, has_options),
+            )
+        for question_id in question_ids[:2]:
+            for position, label in enumerate(["Yes", "No"]):
+                connection.execute(
+                    "INSERT INTO options VALUES (?, ?, ?, ?, ?, ?)",
+                    (template_id, question_id, position, label, label, position),
+                )
+        connection.commit()
+        connection.close()
+
+        database = SQLiteDatabase(path, readers=1)
+        await database.open()
+        try:
+            async with SQLiteUnitOfWork(database) as uow:
+                loaded = await uow.template.get_by_id(UUID(bytes=template_id))
+        finally:
+            await database.close()
+
+        connection = sqlite3.connect(path)
+        tables = {
+            row[0] for row in connection.execute("SELECT name FROM sqlite_master")
+        }
+        set_rows = connection.execute("SELECT COUNT(*) FROM option_sets").fetchone()[0]
+        connection.close()
+        first, second, without, empty = loaded.sections[0].questions
+        assert [option.label for option in first.options] == ["Yes", "No"]
+        assert first.options is second.options
+        assert without.options is None
+        assert empty.options == ()
+        assert "options" not in tables
+        assert set_rows == 2
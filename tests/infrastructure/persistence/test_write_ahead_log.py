@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.unit_of_work_in_memory import InMemoryUnitOfWork
+from app.infrastructure.persistence.write_ahead_log import (
+    CHECKPOINT_FILE,
+    WriteAheadLog,
+    WriteAheadLogError,
+)
+
+
+async def open_store(directory, **options) -> InMemoryTemplateStore:
+    store = InMemoryTemplateStore(wal=WriteAheadLog(directory, **options))
+    await store.open()
+    return store
+
+
+async def crash(store: InMemoryTemplateStore) -> None:
+    """Stop the log writer without flushing or checkpointing, like a kill."""
+    wal = store.wal
+    wal._writer.cancel()
+    if wal._checkpoint_task is not None:
+        await wal._checkpoint_task
+    wal._close_segment()
+
+
+async def create_template(store: InMemoryTemplateStore, title: str) -> UUID:
+    uow = InMemoryUnitOfWork(store)
+    async with uow:
+        template = await uow.template.create(
+            TemplateAggregate(
+                title=title, sections=[SectionEntity(id=uuid4(), title="Section")]
+            )
+        )
+    return template.id
+
+
+class TestWriteAheadLog:
+    """Test cases for the write-ahead log of the in-memory store."""
+
+    @pytest.mark.asyncio
+    async def test_committed_templates_survive_crash(self, tmp_path):
+        """Test that every acknowledged commit is recovered after a crash."""
+        store = await open_store(tmp_path)
+        template_ids = await asyncio.gather(
+            *(create_template(store, f"Template {i}") for i in range(50))
+        )
+        uow = InMemoryUnitOfWork(store)
+        async with uow:
+            loaded = await uow.template.get_by_id(template_ids[0])
+            loaded.add_question(
+                loaded.sections[0].id,
+                QuestionEntity(text="Q", type=QuestionType.TEXT),
+            )
+            await uow.template.update(loaded)
+            await uow.template.delete(template_ids[1])
+        await crash(store)
+
+        recovered = await open_store(tmp_path)
+
+        assert len(recovered) == 49
+        assert template_ids[1] not in recovered
+        stored, version = recovered.get(template_ids[0])
+        assert stored.sections[0].questions[0].text == "Q"
+        assert version == 2
+        assert recovered.get(template_ids[2])[0].title == "Template 2"
+        await recovered.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_commits_share_fsyncs(self, tmp_path):
+        """Test that commits arriving together are written in one batch."""
+        store = await open_store(tmp_path, group_commit_window=0.01)
+
+        await asyncio.gather(*(create_template(store, f"T{i}") for i in range(100)))
+
+        assert store.wal.durable_lsn == 100
+        assert store.wal.batches_written < 10
+        await store.close()
+
+    @pytest.mark.asyncio
+    async def test_torn_tail_is_truncated(self, tmp_path):
+        """Test that a partially written last record is dropped on recovery."""
+        store = await open_store(tmp_path)
+        kept = await create_template(store, "Kept")
+        await crash(store)
+        (segment,) = tmp_path.glob("wal-*.log")
+        size = segment.stat().st_size
+        with open(segment, "ab") as f:
+            f.write(b"\x40\x00\x00\x00garbage")
+
+        recovered = await open_store(tmp_path)
+
+        assert list(recovered.ids()) == [kept]
+        assert segment.stat().st_size == size
+        assert await create_template(recovered, "After recovery") in recovered
+        await recovered.close()
+
+    @pytest.mark.asyncio
+    async def test_corrupt_record_before_tail_fails_recovery(self, tmp_path):
+        """Test that damage to a closed segment is reported, not skipped."""
+        store = await open_store(tmp_path)
+        await create_template(store, "First")
+        await crash(store)
+        (first,) = tmp_path.glob("wal-*.log")
+        (tmp_path / "wal-00000000000000000002.log").touch()
+        data = bytearray(first.read_bytes())
+        data[-1] ^= 0xFF
+        first.write_bytes(bytes(data))
+
+        with pytest.raises(WriteAheadLogError, match="Corrupt record"):
+            await open_store(tmp_path)
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_removes_covered_segments(self, tmp_path):
+        """Test that checkpoints bound the log and recovery uses them."""
+        store = await open_store(tmp_path, checkpoint_interval=10)
+        template_ids = []
+        for i in range(45):
+            template_ids.append(await create_template(store, f"T{i}"))
+        await store.wal.checkpoint()
+        await crash(store)
+
+        assert (tmp_path / CHECKPOINT_FILE).exists()
+        assert len(list(tmp_path.glob("wal-*.log"))) == 1
+
+        recovered = await open_store(tmp_path)
+
+        assert recovered.wal.checkpoint_lsn == 45
+        assert set(recovered.ids()) == set(template_ids)
+        await recovered.close()
+
+    @pytest.mark.asyncio
+    async def test_close_writes_final_checkpoint(self, tmp_path):
+        """Test that a clean shutdown leaves nothing to replay."""
+        store = await open_store(tmp_path)
+        template_id = await create_template(store, "T")
+        await store.close()
+
+        recovered = await open_store(tmp_path)
+
+        assert recovered.wal.checkpoint_lsn == 1
+        assert recovered.wal._records_since_checkpoint == 0
+        assert template_id in recovered
+        await recovered.close()
+
+    @pytest.mark.asyncio
+    async def test_append_after_close_fails(self, tmp_path):
+        """Test that a closed log refuses further commits."""
+        store = await open_store(tmp_path)
+        await store.close()
+
+        with pytest.raises(WriteAheadLogError, match="not running"):
+            await create_template(store, "Late")
+
+    @pytest.mark.asyncio
+    async def test_failed_write_fails_commits_queued_behind_it(self, tmp_path):
+        """Test that commits appended while a write fails are failed too, and
+        that no failed commit stays readable or reaches the listeners."""
+        store = await open_store(tmp_path)
+        kept = await create_template(store, "Kept")
+        notified = []
+        store.subscribe(notified.append)
+        writing, release = threading.Event(), threading.Event()
+
+        def failing_write(batch):
+            writing.set()
+            release.wait(5)
+            raise OSError("No space left on device")
+
+        store.wal._write_batch = failing_write
+        first = TemplateAggregate(title="First")
+        second = TemplateAggregate(title="Second")
+        written = store.apply({first.id: first}, {})
+        await asyncio.to_thread(writing.wait, 5)
+        queued = store.apply({second.id: second}, {})
+        assert second.id in store
+        release.set()
+
+        with pytest.raises(WriteAheadLogError, match="No space"):
+            await written
+        with pytest.raises(WriteAheadLogError, match="No space"):
+            await queued
+        assert list(store.ids()) == [kept]
+        assert store.version(first.id) == store.version(second.id) == 0
+        assert notified == []
+        assert store.wal._pending == []
+        with pytest.raises(WriteAheadLogError, match="failed"):
+            await create_template(store, "Late")
+        await asyncio.wait_for(store.close(), 5)
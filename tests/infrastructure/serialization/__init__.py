@@ -0,0 +1 @@
+# Serialization tests package
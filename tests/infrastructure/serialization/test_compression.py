@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+
+from app.infrastructure.serialization.compression import (
+    ENCODINGS,
+    Compressor,
+    negotiate,
+)
+
+
+class TestNegotiate:
+    """Test cases for `Accept-Encoding` negotiation."""
+
+    @pytest.mark.parametrize(
+        "accept_encoding, expected",
+        [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate, br", "br"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("br;q=0, gzip;q=0", None),
+            ("*", "br"),
+            ("*;q=0.1, br;q=0", "gzip"),
+            ("GZIP ; Q=0.8", "gzip"),
+            ("gzip;q=invalid", None),
+        ],
+    )
+    def test_negotiate(self, accept_encoding, expected):
+        """Test that quality values rank codings and ties keep our order."""
+        assert negotiate(accept_encoding, ("br", "gzip")) == expected
+
+    def test_only_offered_encodings_are_chosen(self):
+        """Test that codings the server lacks are never negotiated."""
+        assert negotiate("br", ("gzip",)) is None
+
+
+class TestCompressor:
+    """Test cases for the response body compressor."""
+
+    @pytest.fixture
+    def compressor(self):
+        """Fixture for a gzip compressor skipping bodies under 100 bytes."""
+        return Compressor(min_size=100, encodings=("gzip",))
+
+    def test_encode_all_compresses_large_bodies(self, compressor):
+        """Test that large bodies are compressed in every coding."""
+        body = b'{"title":"Survey"}' * 100
+
+        encoded = compressor.encode_all(body)
+
+        assert set(encoded) == {"gzip"}
+        assert gzip.decompress(encoded["gzip"]) == body
+        assert len(encoded["gzip"]) < len(body) // 10
+
+    def test_small_bodies_are_left_alone(self, compressor):
+        """Test that bodies under the threshold are not compressed."""
+        assert compressor.encode_all(b"{}") == {}
+        assert not compressor.should_compress(b"x" * 99)
+        assert compressor.should_compress(b"x" * 100)
+
+    def test_gzip_output_is_deterministic(self, compressor):
+        """Test that equal bodies compress to equal bytes."""
+        body = b"x" * 1000
+
+        assert compressor.encode(body, "gzip") == compressor.encode(body, "gzip")
+
+    def test_unavailable_encodings_are_rejected(self):
+        """Test that a compressor cannot offer codings it cannot produce."""
+        with pytest.raises(ValueError):
+            Compressor(encodings=("gzip", "zstd"))
+
+    def test_gzip_is_always_available(self):
+        """Test that gzip is offered whether or not brotli is installed."""
+        assert "gzip" in ENCODINGS
+        assert Compressor().negotiate("gzip") == "gzip"
@@ -0,0 +1,245 @@
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.order_key import keys_between
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+from app.domain.value_objects.template_status import TemplateStatus
+from app.infrastructure.serialization.template_codec import (
+    FORMAT_VERSION,
+    MAGIC,
+    QUESTION_TYPE_CODES,
+    TEMPLATE_STATUS_CODES,
+    CodecError,
+    decode_question,
+    decode_section,
+    decode_template,
+    encode_question,
+    encode_section,
+    encode_template,
+)
+
+ALPHABET = "abcdefghijklmnopqrstuvwxyz ÀÉîøü漢字😀\n\"'"
+LIKERT = ["Strongly disagree", "Disagree", "Neutral", "Agree", "Strongly agree"]
+
+
+def random_text(rng: random.Random, max_length: int = 40) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, max_length)))
+
+
+def random_datetime(rng: random.Random) -> datetime:
+    value = datetime(1900, 1, 1) + timedelta(microseconds=rng.randint(0, 2**52))
+    if rng.random() < 0.3:
+        offset = timedelta(minutes=rng.randint(-14 * 60, 14 * 60))
+        value = value.replace(tzinfo=timezone(offset))
+    return value
+
+
+def with_order_keys(rng: random.Random, entities: list) -> list:
+    """Give most lists of siblings increasing order keys, leave others without."""
+    if rng.random() < 0.8:
+        for entity, key in zip(entities, keys_between(None, None, len(entities))):
+            entity.order_key = key
+    return entities
+
+
+def random_question(rng: random.Random) -> QuestionEntity:
+    options = None
+    if rng.random() < 0.5:
+        labels = LIKERT if rng.random() < 0.5 else [random_text(rng, 10)]
+        options = [
+            QuestionOption(label=label, value=random_text(rng, 5), order=order)
+            for order, label in zip(range(-2, 100), labels * rng.randint(0, 3))
+        ]
+    return QuestionEntity(
+        id=uuid4() if rng.random() < 0.9 else None,
+        text=random_text(rng, 200),
+        type=rng.choice(list(QuestionType)),
+        options=options,
+        is_required=rng.random() < 0.5,
+    )
+
+
+def random_section(rng: random.Random) -> SectionEntity:
+    return SectionEntity(
+        id=uuid4() if rng.random() < 0.9 else None,
+        title=random_text(rng),
+        description=random_text(rng) if rng.random() < 0.7 else None,
+        questions=with_order_keys(
+            rng, [random_question(rng) for _ in range(rng.randint(0, 8))]
+        ),
+    )
+
+
+def random_template(rng: random.Random) -> TemplateAggregate:
+    return TemplateAggregate(
+        id=uuid4() if rng.random() < 0.9 else None,
+        title=random_text(rng),
+        description=random_text(rng, 300) if rng.random() < 0.7 else None,
+        status=rng.choice(list(TemplateStatus)),
+        sections=with_order_keys(
+            rng, [random_section(rng) for _ in range(rng.randint(0, 6))]
+        ),
+        created_at=random_datetime(rng),
+        updated_at=random_datetime(rng),
+        revision_of=uuid4() if rng.random() < 0.3 else None,
+    )
+
+
+class TestTemplateCodec:
+    """Test cases for the compact binary template codec."""
+
+    @pytest.mark.parametrize("seed", range(200))
+    def test_template_round_trip(self, seed):
+        """Property: decoding an encoded template yields an equal template."""
+        template = random_template(random.Random(seed))
+
+        decoded = decode_template(encode_template(template))
+
+        assert decoded == template
+        assert decoded.model_dump() == template.model_dump()
+
+    @pytest.mark.parametrize("seed", range(50))
+    def test_section_and_question_round_trip(self, seed):
+        """Property: sections and questions round-trip on their own."""
+        section = random_section(random.Random(seed))
+
+        assert decode_section(encode_section(section)) == section
+        for question in section.questions:
+            assert decode_question(encode_question(question)) == question
+
+    def test_encoding_is_deterministic(self):
+        """Test that equal templates encode to identical bytes."""
+        template = random_template(random.Random(7))
+
+        assert encode_template(template) == encode_template(template.model_copy())
+
+    def test_uuids_are_raw_bytes(self):
+        """Test that UUIDs are stored as 16 raw bytes, not strings."""
+        template_id = UUID("12345678-1234-5678-1234-567812345678")
+        template = TemplateAggregate(id=template_id, title="T")
+
+        payload = encode_template(template)
+
+        assert template_id.bytes in payload
+        assert str(template_id).encode() not in payload
+
+    def test_repeated_option_lists_are_stored_once(self):
+        """Test that a repeated answer scale costs one varint per question."""
+        options = [
+            QuestionOption(label=label, value=label, order=i)
+            for i, label in enumerate(LIKERT)
+        ]
+        section = SectionEntity(
+            title="Likert",
+            questions=[
+                QuestionEntity(
+                    text="Q", type=QuestionType.SINGLE_CHOICE, options=options
+                )
+                for _ in range(1000)
+            ],
+        )
+        template = TemplateAggregate(title="T", sections=[section])
+
+        payload = encode_template(template)
+        decoded = decode_template(payload)
+
+        assert payload.count(b"Strongly agree") == 1
+        assert len(payload) < 20 * 1000
+        first, second = decoded.sections[0].questions[:2]
+        assert first.options == tuple(options)
+        assert first.options is second.options
+
+    def test_decoded_template_remains_editable(self):
+        """Test that decoded aggregates obey domain rules like validated ones."""
+        section_id = uuid4()
+        template = TemplateAggregate(
+            id=uuid4(), title="T", sections=[SectionEntity(id=section_id, title="S")]
+        )
+        decoded = decode_template(encode_template(template))
+
+        decoded.add_question(
+            section_id, QuestionEntity(text="New", type=QuestionType.TEXT)
+        )
+
+        assert decoded.sections[0].questions[0].text == "New"
+        assert template.sections[0].questions == []
+
+    def test_enum_codes_cover_every_member(self):
+        """Test that every enum member has a stable, unique code."""
+        assert set(QUESTION_TYPE_CODES) == set(QuestionType)
+        assert set(TEMPLATE_STATUS_CODES) == set(TemplateStatus)
+        assert len(set(QUESTION_TYPE_CODES.values())) == len(QuestionType)
+        assert len(set(TEMPLATE_STATUS_CODES.values())) == len(TemplateStatus)
+
+    def test_header_carries_magic_and_version(self):
+        """Test the payload header."""
+        payload = encode_template(TemplateAggregate(title="T"))
+
+        assert payload.startswith(MAGIC)
+        assert payload[len(MAGIC)] == FORMAT_VERSION
+
+    def test_decode_accepts_version_1_payload(self):
+        """Test that payloads written before `revision_of` still decode."""
+        template = random_template(random.Random(3)).model_copy(
+            update={"revision_of": None}
+        )
+        payload = bytearray(encode_template(template))
+        payload[len(MAGIC)] = 1
+
+        assert decode_template(bytes(payload)) == template
+
+    def test_decoded_revision_shares_nothing(self):
+        """Test that a decoded revision owns its sections."""
+        published = random_template(random.Random(5)).model_copy(
+            update={"status": TemplateStatus.PUBLISHED}
+        )
+        revision = published.create_revision()
+
+        decoded = decode_template(encode_template(revision))
+
+        assert decoded.revision_of == published.id
+        assert decoded._shared_section_ids == set()
+
+    def test_decode_rejects_foreign_payload(self):
+        """Test that non-codec bytes are rejected."""
+        with pytest.raises(CodecError, match="Not an encoded template"):
+            decode_template(b'{"title": "T"}')
+
+    def test_decode_rejects_unknown_version(self):
+        """Test that payloads from a newer format version are rejected."""
+        payload = bytearray(encode_template(TemplateAggregate(title="T")))
+        payload[len(MAGIC)] = FORMAT_VERSION + 1
+
+        with pytest.raises(CodecError, match="Unsupported payload version"):
+            decode_template(bytes(payload))
+
+    def test_decode_rejects_wrong_kind(self):
+        """Test that a section payload is not accepted as a template."""
+        payload = encode_section(SectionEntity(title="S"))
+
+        with pytest.raises(CodecError, match="Expected payload kind"):
+            decode_template(payload)
+
+    @pytest.mark.parametrize("seed", range(20))
+    def test_decode_rejects_truncated_payload(self, seed):
+        """Property: any strict prefix of a payload fails with CodecError."""
+        rng = random.Random(seed)
+        payload = encode_template(random_template(rng))
+        cut = rng.randrange(0, len(payload))
+
+        with pytest.raises(CodecError):
+            decode_template(payload[:cut])
+
+    def test_decode_rejects_trailing_bytes(self):
+        """Test that extra bytes after the body are rejected."""
+        payload = encode_template(TemplateAggregate(title="T"))
+
+        with pytest.raises(CodecError, match="Trailing bytes"):
+            decode_template(payload + b"\x00")
@@ -0,0 +1,175 @@
+from uuid import UUID
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.api.main import create_app
+from app.infrastructure.persistence.in_memory_store import InMemoryTemplateStore
+from app.infrastructure.persistence.sqlite_database import SQLiteDatabase
+from app.infrastructure.settings import Settings
+
+
+class TestSettings:
+    """Test cases for environment-driven settings."""
+
+    @pytest.fixture(autouse=True)
+    def clean_environment(self, monkeypatch):
+        """Fixture removing setting variables inherited from the shell."""
+        for name in Settings.model_fields:
+            monkeypatch.delenv(name.upper(), raising=False)
+
+    def test_defaults(self):
+        """Test that no configuration selects the in-memory backend."""
+        settings = Settings.from_env(env_file=None)
+
+        assert settings.persistence_backend == "memory"
+        assert settings.wal_directory is None
+        assert settings.process_pool_workers is None
+
+    def test_reads_environment(self, monkeypatch):
+        """Test that upper-case variables set the matching fields."""
+        monkeypatch.setenv("PERSISTENCE_BACKEND", "sqlite")
+        monkeypatch.setenv("SQLITE_READERS", "8")
+        monkeypatch.setenv("PROCESS_POOL_WORKERS", "")
+
+        settings = Settings.from_env(env_file=None)
+
+        assert settings.persistence_backend == "sqlite"
+        assert settings.sqlite_readers == 8
+        assert settings.process_pool_workers is None
+
+    def test_env_file_does_not_override_environment(self, tmp_path, monkeypatch):
+        """Test that a .env file fills gaps but the environment wins."""
+        env_file = tmp_path / ".env"
+        env_file.write_text("SQLITE_PATH=/data/t.db\nSQLITE_READERS=2\n")
+        monkeypatch.setenv("SQLITE_READERS", "6")
+
+        settings = Settings.from_env(env_file)
+
+        assert settings.sqlite_path == "/data/t.db"
+        assert settings.sqlite_readers == 6
+
+    def test_rejects_unknown_backend(self, monkeypatch):
+        """Test that a typo in the backend fails at startup."""
+        monkeypatch.setenv("PERSISTENCE_BACKEND", "postgres")
+
+        with pytest.raises(ValidationError):
+            Settings.from_env(env_file=None)
+
+    def test_memory_backend_rejects_several_workers(self, monkeypatch):
+        """Test that worker processes cannot each get a private store."""
+        monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+        with pytest.raises(ValidationError, match="PERSISTENCE_BACKEND=sqlite"):
+            Settings.from_env(env_file=None)
+
+        monkeypatch.setenv("PERSISTENCE_BACKEND", "sqlite")
+        assert Settings.from_env(env_file=None).web_concurrency == 4
+
+
+class TestLifespan:
+    """Test cases for resources built by the application lifespan."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["memory", "sqlite"])
+    async def test_lifespan_builds_configured_storage(self, tmp_path, backend):
+        """Test that the selected backend serves requests and is closed."""
+        settings = Settings(
+            persistence_backend=backend,
+            sqlite_path=str(tmp_path / "templates.db"),
+            process_pool_workers=1,
+        )
+        app = create_app(settings)
+
+        async with app.router.lifespan_context(app):
+            storage = app.state.storage
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                response = await client.post(
+                    "/templates/create", json={"title": "Configured"}
+                )
+            assert response.status_code == 201
+            assert app.state.process_pool.started
+
+        expected = SQLiteDatabase if backend == "sqlite" else InMemoryTemplateStore
+        assert isinstance(storage, expected)
+        assert not app.state.process_pool.started
+
+    @pytest.mark.asyncio
+    async def test_sqlite_data_survives_restart(self, tmp_path):
+        """Test that a restarted app sees what the previous one committed."""
+        settings = Settings(
+            persistence_backend="sqlite",
+            sqlite_path=str(tmp_path / "templates.db"),
+            process_pool_workers=1,
+        )
+
+        async def call(path: str, payload: dict) -> httpx.Response:
+            app = create_app(settings)
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    return await client.post(path, json=payload)
+
+        created = await call("/templates/create", {"title": "Persisted"})
+        template_id = created.json()["template_id"]
+        response = await call(f"/templates/{template_id}/sections", {"title": "S"})
+
+        assert response.status_code == 201
+
+    @pytest.mark.asyncio
+    async def test_apps_keep_their_own_id_generator(self):
+        """Test that starting an app does not change another app's IDs."""
+        uuid4_app = create_app(Settings(id_version="uuid4", process_pool_workers=1))
+        uuid7_app = create_app(Settings(process_pool_workers=1))
+
+        async with uuid4_app.router.lifespan_context(uuid4_app):
+            async with uuid7_app.router.lifespan_context(uuid7_app):
+                ids = {}
+                for name, app in [("uuid4", uuid4_app), ("uuid7", uuid7_app)]:
+                    async with httpx.AsyncClient(
+                        transport=httpx.ASGITransport(app=app),
+                        base_url="http://test",
+                    ) as client:
+                        response = await client.post(
+                            "/templates/create", json={"title": name}
+                        )
+                    ids[name] = UUID(response.json()["template_id"])
+
+        assert ids["uuid4"].version == 4
+        assert ids["uuid7"].version == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_startup_releases_started_resources(
+        self, tmp_path, monkeypatch
+    ):
+        """Test that a startup step failing closes what was started before it."""
+        closed = []
+        close = SQLiteDatabase.close
+
+        async def record_close(storage):
+            closed.append(storage)
+            await close(storage)
+
+        def fail(settings, state):
+            raise RuntimeError("queue")
+
+        monkeypatch.setattr(SQLiteDatabase, "close", record_close)
+        monkeypatch.setattr("app.api.main.create_command_queue", fail)
+        app = create_app(
+            Settings(
+                persistence_backend="sqlite",
+                sqlite_path=str(tmp_path / "templates.db"),
+                process_pool_workers=1,
+            )
+        )
+
+        with pytest.raises(RuntimeError, match="queue"):
+            async with app.router.lifespan_context(app):
+                pass
+
+        assert closed == [app.state.storage]
+        assert not app.state.process_pool.started
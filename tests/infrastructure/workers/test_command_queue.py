@@ -0,0 +1,252 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.application.commands.template_commands import (
+    CreateTemplateCommand,
+    PublishTemplateCommand,
+)
+from app.infrastructure.workers.command_queue import (
+    CommandQueue,
+    CommandQueueFullError,
+    JobJournal,
+    JobNotFoundError,
+)
+
+COMMAND_TYPES = [CreateTemplateCommand, PublishTemplateCommand]
+
+
+async def wait_finished(queue: CommandQueue, job_id) -> None:
+    for _ in range(1000):
+        if queue.get(job_id).status in ("succeeded", "failed"):
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+class TestCommandQueue:
+    """Test cases for background execution of commands."""
+
+    @pytest.mark.asyncio
+    async def test_runs_command_and_records_result(self):
+        """Test a submitted command runs and its result can be polled."""
+
+        async def execute(command):
+            return {"title": command.title}
+
+        queue = CommandQueue(execute, COMMAND_TYPES)
+        await queue.start()
+        try:
+            job = await queue.submit(CreateTemplateCommand(title="Survey"))
+            assert job.status == "queued"
+            await wait_finished(queue, job.id)
+        finally:
+            await queue.close()
+
+        job = queue.get(job.id)
+        assert job.status == "succeeded"
+        assert job.command == "CreateTemplateCommand"
+        assert job.result == {"title": "Survey"}
+        assert job.submitted_at <= job.started_at <= job.finished_at
+        assert queue.stats()["succeeded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_command_records_error(self):
+        """Test an error of the command is reported on its job."""
+
+        async def execute(command):
+            raise ValueError("Cannot publish an empty survey template.")
+
+        queue = CommandQueue(execute, COMMAND_TYPES)
+        await queue.start()
+        try:
+            job = await queue.submit(PublishTemplateCommand(template_id=uuid4()))
+            await wait_finished(queue, job.id)
+        finally:
+            await queue.close()
+
+        job = queue.get(job.id)
+        assert job.status == "failed"
+        assert job.error == {
+            "type": "ValueError",
+            "detail": "Cannot publish an empty survey template.",
+        }
+        assert queue.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_workers_bound_concurrency_and_queue_bounds_depth(self):
+        """Test at most `workers` commands run at once and the queue sheds
+        submissions beyond `max_queued`."""
+        release = asyncio.Event()
+        running = 0
+        peak = 0
+
+        async def execute(command):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+        queue = CommandQueue(execute, COMMAND_TYPES, workers=2, max_queued=3)
+        await queue.start()
+        try:
+            jobs = []
+            for i in range(5):
+                jobs.append(await queue.submit(CreateTemplateCommand(title=str(i))))
+                await asyncio.sleep(0.001)
+            assert queue.stats()["running"] == 2
+            assert queue.stats()["queued"] == 3
+            assert queue.stats()["oldest_queued_seconds"] >= 0
+
+            with pytest.raises(CommandQueueFullError):
+                await queue.submit(CreateTemplateCommand(title="rejected"))
+
+            release.set()
+            for job in jobs:
+                await wait_finished(queue, job.id)
+        finally:
+            await queue.close()
+
+        assert peak == 2
+        assert queue.stats()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retention_evicts_oldest_finished_jobs(self):
+        """Test only the last `retention` finished jobs are kept."""
+
+        async def execute(command):
+            return None
+
+        queue = CommandQueue(execute, COMMAND_TYPES, retention=2)
+        await queue.start()
+        try:
+            jobs = []
+            for i in range(3):
+                jobs.append(await queue.submit(CreateTemplateCommand(title=str(i))))
+                await wait_finished(queue, jobs[-1].id)
+        finally:
+            await queue.close()
+
+        with pytest.raises(JobNotFoundError):
+            queue.get(jobs[0].id)
+        assert queue.get(jobs[2].id).status == "succeeded"
+
+
+class TestJobJournal:
+    """Test cases for jobs surviving a restart."""
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_run_after_restart(self, tmp_path):
+        """Test jobs queued at shutdown are run by the next queue."""
+        path = tmp_path / "jobs.log"
+        blocked = asyncio.Event()
+
+        async def stall(command):
+            await blocked.wait()
+
+        queue = CommandQueue(stall, COMMAND_TYPES, workers=1, journal=JobJournal(path))
+        await queue.start()
+        first = await queue.submit(CreateTemplateCommand(title="first"))
+        second = await queue.submit(CreateTemplateCommand(title="second"))
+        await asyncio.sleep(0.01)
+        blocked.set()
+        await queue.close()
+        assert queue.get(first.id).status == "succeeded"
+
+        titles = []
+
+        async def execute(command):
+            titles.append(command.title)
+            return {"title": command.title}
+
+        queue = CommandQueue(execute, COMMAND_TYPES, journal=JobJournal(path))
+        await queue.start()
+        try:
+            await wait_finished(queue, second.id)
+        finally:
+            await queue.close()
+
+        assert titles == ["second"]
+        assert queue.get(first.id).status == "succeeded"
+        assert queue.get(second.id).result == {"title": "second"}
+
+    @pytest.mark.asyncio
+    async def test_running_job_is_failed_after_crash(self, tmp_path):
+        """Test a job started but not finished is not run again."""
+        path = tmp_path / "jobs.log"
+        job_id = uuid4()
+        records = [
+            {
+                "op": "job",
+                "id": str(job_id),
+                "command": "PublishTemplateCommand",
+                "status": "queued",
+                "submitted_at": 1.0,
+                "payload": {"template_id": str(uuid4())},
+            },
+            {"op": "start", "id": str(job_id), "at": 2.0},
+        ]
+        path.write_text("".join(json.dumps(r) + "\n" for r in records) + '{"op": "fin')
+        executed = []
+
+        async def execute(command):
+            executed.append(command)
+
+        queue = CommandQueue(execute, COMMAND_TYPES, journal=JobJournal(path))
+        await queue.start()
+        await queue.close()
+
+        job = queue.get(job_id)
+        assert executed == []
+        assert job.status == "failed"
+        assert job.error["type"] == "JobInterruptedError"
+        assert len(path.read_text().splitlines()) == 1
+
+    @pytest.mark.asyncio
+    async def test_journal_failure_fails_the_job(self, tmp_path):
+        """Test a job whose start cannot be journaled fails without running,
+        and one whose finish cannot keeps its outcome, flagged."""
+
+        class FailingJournal(JobJournal):
+            failing = set()
+
+            def append(self, op, job_id, **fields):
+                if op in self.failing:
+                    raise OSError("No space left on device")
+                super().append(op, job_id, **fields)
+
+        executed = []
+
+        async def execute(command):
+            executed.append(command.title)
+            return {"title": command.title}
+
+        journal = FailingJournal(tmp_path / "jobs.log")
+        queue = CommandQueue(execute, COMMAND_TYPES, journal=journal)
+        await queue.start()
+        try:
+            journal.failing = {"start"}
+            unstarted = await queue.submit(CreateTemplateCommand(title="unstarted"))
+            await wait_finished(queue, unstarted.id)
+            journal.failing = {"finish"}
+            unrecorded = await queue.submit(CreateTemplateCommand(title="unrecorded"))
+            await wait_finished(queue, unrecorded.id)
+        finally:
+            await queue.close()
+
+        assert executed == ["unrecorded"]
+        job = queue.get(unstarted.id)
+        assert job.status == "failed"
+        assert job.error["type"] == "JobJournalError"
+        assert "was not run" in job.error["detail"]
+        job = queue.get(unrecorded.id)
+        assert job.status == "succeeded"
+        assert job.result == {"title": "unrecorded"}
+        assert job.error is None
+        assert job.journal_error["type"] == "JobJournalError"
+        assert queue.stats()["failed"] == 1
+        assert queue.stats()["succeeded"] == 1
+        assert queue.stats()["running"] == 0
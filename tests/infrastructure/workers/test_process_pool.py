@@ -0,0 +1,170 @@
+import asyncio
+import multiprocessing
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.api.main import app
+from app.domain.aggregates.template import TemplateAggregate
+from app.domain.entities.question import QuestionEntity
+from app.domain.entities.section import SectionEntity
+from app.domain.value_objects.question_options import QuestionOption
+from app.domain.value_objects.question_type import QuestionType
+from app.infrastructure.serialization.template_codec import encode_template
+from app.infrastructure.workers.jobs import (
+    template_statistics,
+    validate_template_import,
+)
+from app.infrastructure.workers.process_pool import (
+    ProcessPoolSaturatedError,
+    ProcessPoolService,
+)
+
+
+def build_template(sections: int, questions_per_section: int) -> TemplateAggregate:
+    template = TemplateAggregate(title="Large Template", description="Load test")
+    for s in range(sections):
+        section = SectionEntity(title=f"Section {s}")
+        for q in range(questions_per_section):
+            section.questions.append(
+                QuestionEntity(
+                    text=f"Question {s}.{q}",
+                    type=QuestionType.SINGLE_CHOICE,
+                    options=[
+                        QuestionOption(label=f"Option {i}", value=str(i), order=i)
+                        for i in range(5)
+                    ],
+                )
+            )
+        template.sections.append(section)
+    return template
+
+
+def validate_until_stopped(payload: bytes, started, stop) -> int:
+    """Validate `payload` over and over until `stop` is set; a heavy job whose
+    duration the test controls."""
+    started.put(None)
+    rounds = 0
+    while not stop.is_set():
+        validate_template_import([payload])
+        rounds += 1
+    return rounds
+
+
+def p99(samples: list[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[int(len(ordered) * 0.99) - 1]
+
+
+class TestProcessPoolService:
+    """Test cases for the process pool service."""
+
+    @pytest_asyncio.fixture
+    async def pool(self):
+        """Fixture for a started process pool service."""
+        service = ProcessPoolService(max_workers=2, max_pending=4)
+        service.start()
+        yield service
+        await service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_submit_runs_job_in_worker(self, pool):
+        """Test that a job result is returned from the worker process."""
+        payload = encode_template(build_template(sections=2, questions_per_section=3))
+
+        stats = await pool.submit(template_statistics, payload)
+
+        assert stats["sections"] == 2
+        assert stats["questions"] == 6
+        assert stats["questions_by_type"] == {"single_choice": 6}
+        assert stats["options_total"] == 30
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_before_start_fails(self):
+        """Test that submitting to a stopped service raises an error."""
+        service = ProcessPoolService(max_workers=1)
+
+        with pytest.raises(RuntimeError, match="not started"):
+            await service.submit(template_statistics, b"")
+
+    @pytest.mark.asyncio
+    async def test_submit_rejects_when_queue_is_full(self, pool):
+        """Test back-pressure once max_pending jobs are in flight."""
+        payload = encode_template(build_template(sections=1, questions_per_section=5))
+        with multiprocessing.Manager() as manager:
+            started, stop = manager.Queue(), manager.Event()
+            running = asyncio.gather(
+                *(
+                    pool.submit(validate_until_stopped, payload, started, stop)
+                    for _ in range(pool.max_pending)
+                )
+            )
+            await asyncio.to_thread(started.get, timeout=30)
+            try:
+                with pytest.raises(ProcessPoolSaturatedError):
+                    await pool.submit(template_statistics, payload)
+                assert pool.rejected == 1
+            finally:
+                stop.set()
+                rounds = await running
+
+        assert len(rounds) == pool.max_pending
+        assert pool.pending == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_waits_for_slot_within_queue_timeout(self):
+        """Test that a submission waits for a free slot when a timeout is set."""
+        service = ProcessPoolService(max_workers=1, max_pending=1, queue_timeout=30)
+        service.start()
+        payload = encode_template(build_template(sections=1, questions_per_section=5))
+        try:
+            results = await asyncio.gather(
+                service.submit(template_statistics, payload),
+                service.submit(template_statistics, payload),
+            )
+            assert [r["questions"] for r in results] == [5, 5]
+            assert service.rejected == 0
+        finally:
+            await service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_p99_latency_stays_flat_while_heavy_jobs_run(self, pool):
+        """Test that offloaded CPU-bound jobs do not stall simple endpoints."""
+        payload = encode_template(build_template(sections=20, questions_per_section=50))
+        transport = httpx.ASGITransport(app=app)
+
+        async def measure(requests: int) -> list[float]:
+            samples = []
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    response = await client.get("/")
+                    samples.append(time.perf_counter() - start)
+                    assert response.status_code == 200
+                    await asyncio.sleep(0.002)
+            return samples
+
+        baseline = await measure(200)
+
+        with multiprocessing.Manager() as manager:
+            started, stop = manager.Queue(), manager.Event()
+            jobs = asyncio.gather(
+                *(
+                    pool.submit(validate_until_stopped, payload, started, stop)
+                    for _ in range(pool.max_workers)
+                )
+            )
+            for _ in range(pool.max_workers):
+                await asyncio.to_thread(started.get, timeout=30)
+            loaded = await measure(200)
+            assert not jobs.done(), "heavy jobs should still be running"
+            stop.set()
+            rounds = await jobs
+
+        assert all(rounds)
+        assert p99(loaded) < max(p99(baseline) * 10, 0.05)
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api.main import create_app
+from app.infrastructure.settings import Settings
+from app.infrastructure.workers.write_limiter import (
+    WriteBacklogFullError,
+    WriteLimiter,
+    WriteQueueTimeoutError,
+)
+
+
+class TestWriteLimiter:
+    """Test cases for admission control of write commands."""
+
+    @pytest.mark.asyncio
+    async def test_queued_write_runs_when_a_slot_frees(self):
+        """Test that a write within the backlog waits for its turn."""
+        limiter = WriteLimiter(max_concurrent=1, max_queued=1)
+        order = []
+
+        async def write(name: str) -> None:
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(write("first"), write("second"))
+
+        assert order == ["first", "second"]
+        assert limiter.stats() == {
+            "running": 0,
+            "queued": 0,
+            "admitted": 2,
+            "rejected_full": 0,
+            "rejected_timeout": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_full_backlog_rejects_immediately(self):
+        """Test that writes beyond the queue are shed without waiting."""
+        limiter = WriteLimiter(max_concurrent=1, max_queued=1)
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with limiter.slot():
+                await release.wait()
+
+        running = asyncio.ensure_future(hold())
+        queued = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+
+        with pytest.raises(WriteBacklogFullError):
+            async with limiter.slot():
+                pass
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert limiter.rejected_full == 1
+        assert limiter.admitted == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_rejects_waiting_write(self):
+        """Test that a write waiting longer than the timeout gives up."""
+        limiter = WriteLimiter(max_concurrent=1, max_queued=1, queue_timeout=0.01)
+
+        async with limiter.slot():
+            with pytest.raises(WriteQueueTimeoutError):
+                async with limiter.slot():
+                    pass
+
+        assert limiter.rejected_timeout == 1
+        assert limiter.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_saturated_api_answers_429_with_retry_after(self):
+        """Test that the write endpoints shed load once the backlog is full."""
+        app = create_app(
+            Settings(write_max_concurrent=1, write_max_queued=0, process_pool_workers=1)
+        )
+
+        async with app.router.lifespan_context(app):
+            limiter = app.state.write_limiter
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://test"
+            ) as client:
+                async with limiter.slot():
+                    response = await client.post(
+                        "/templates/create", json={"title": "Shed"}
+                    )
+                accepted = await client.post(
+                    "/templates/create", json={"title": "Admitted"}
+                )
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "1"
+        assert accepted.status_code == 201
+        assert limiter.rejected_full == 1